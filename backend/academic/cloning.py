@@ -0,0 +1,287 @@
+"""
+Cloning the curriculum structure of one academic year into another.
+
+    clone_curriculum(source, target, branches=[3, 4], dry_run=True)
+
+For the given branches (by default every branch with a curriculum in the
+source year) the CURRICULUM rows of the target year are made to match the
+source year, keyed by (BRANCH, PROGRAM, COURSE, SEMESTER):
+
+    added      in the source but not live in the target; inserted, or a
+               soft-deleted target row is brought back
+    changed    in both, with a different IS_ELECTIVE / IS_ACTIVE; updated
+    removed    live in the target but not in the source; soft-deleted,
+               unless timetables, attendance or marks already refer to it
+               (those are reported as kept). remove=False keeps them all.
+
+ACADEMIC_TERM and EXAMINATION rows are year-wide, not per branch, so their
+skeletons are only ever added: every source term and examination missing
+from the target year is copied with its dates shifted by the distance
+between the two years' START_DATEs (in whole years when they fall on the
+same day of the year, so dates keep their calendar day across leap years).
+Their CODEs are carried over by replacing the source year's name (e.g.
+2025-26) with the target's, or failing that its starting year (2025) with
+the target's; an examination CODE that contains neither cannot be made
+unique and is reported instead.
+
+The diff is computed from one read per table, so a preview is cheap.
+Applying runs in one transaction holding a lock on the target year and
+writes each table with a single INSERT ... SELECT from the source rows (an
+upsert on the curriculum's unique key) plus one UPDATE for the removals.
+Running the same clone again changes nothing.
+"""
+import logging
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+from core.schedule import invalidate
+from .models import ACADEMIC_TERM, ACADEMIC_YEAR, CURRICULUM, EXAMINATION
+
+logger = logging.getLogger(__name__)
+
+
+class CloneError(ValueError):
+    def __init__(self, message, errors=None):
+        super().__init__(message)
+        self.message = message
+        self.errors = errors or []
+
+
+def _key(row):
+    return row['BRANCH_id'], row['PROGRAM_id'], row['COURSE_id'], row['SEMESTER']
+
+
+def _translate(code, source, target):
+    """The target year's CODE for a source CODE, or None when it has no year in it."""
+    if source.ACADEMIC_YEAR and target.ACADEMIC_YEAR and source.ACADEMIC_YEAR in code:
+        return code.replace(source.ACADEMIC_YEAR, target.ACADEMIC_YEAR)
+    start, end = str(source.START_DATE.year), str(target.START_DATE.year)
+    if start != end and start in code:
+        return code.replace(start, end)
+    return None
+
+
+def _shift(start, to):
+    """The interval moving dates of the source year into the target year."""
+    years = to.year - start.year
+    try:
+        aligned = start.replace(year=to.year) == to
+    except ValueError:  # 29 February
+        aligned = False
+    return f'{years} years' if aligned else f'{(to - start).days} days'
+
+
+def _in_use(ids):
+    """Curriculum ids that other rows (timetables, attendance, marks) refer to."""
+    used = set()
+    if not ids:
+        return used
+    for relation in CURRICULUM._meta.related_objects:
+        if relation.many_to_many or relation.one_to_one or not relation.field.concrete:
+            continue
+        model = relation.related_model
+        references = model.objects.filter(**{f'{relation.field.name}__in': ids})
+        if any(field.name == 'IS_DELETED' for field in model._meta.fields):
+            references = references.filter(IS_DELETED=False)
+        used.update(references.values_list(relation.field.attname, flat=True).distinct())
+    return used
+
+
+def diff_curriculum(source, target, branches, remove=True):
+    fields = ('CURRICULUM_ID', 'BRANCH_id', 'PROGRAM_id', 'COURSE_id', 'SEMESTER', 'IS_ELECTIVE', 'IS_ACTIVE',
+              'IS_DELETED')
+    wanted = {
+        _key(row): row for row in CURRICULUM.objects.filter(
+            ACADEMIC_YEAR=source, BRANCH_id__in=branches, IS_DELETED=False,
+        ).values(*fields)
+    }
+    present = {
+        _key(row): row for row in CURRICULUM.objects.filter(
+            ACADEMIC_YEAR=target, BRANCH_id__in=branches,
+        ).values(*fields)
+    }
+    added, changed, removed = [], [], []
+    for key, row in wanted.items():
+        current = present.get(key)
+        if current is None or current['IS_DELETED']:
+            added.append(row)
+        elif (current['IS_ELECTIVE'], current['IS_ACTIVE']) != (row['IS_ELECTIVE'], row['IS_ACTIVE']):
+            changed.append(row)
+    extra = [row for key, row in present.items() if key not in wanted and not row['IS_DELETED']]
+    kept = []
+    if extra:
+        used = _in_use([row['CURRICULUM_ID'] for row in extra]) if remove else None
+        for row in extra:
+            (removed if remove and row['CURRICULUM_ID'] not in used else kept).append(row)
+    return {'added': added, 'changed': changed, 'removed': removed, 'kept': kept,
+            'unchanged': len(wanted) - len(added) - len(changed)}
+
+
+def diff_skeletons(source, target):
+    terms = list(ACADEMIC_TERM.objects.filter(ACADEMIC_YEAR=source, IS_DELETED=False).values('ACADEMIC_TERM_ID', 'CODE'))
+    # Deleted rows still hold their CODE in the unique constraints
+    target_terms = dict(ACADEMIC_TERM.objects.filter(ACADEMIC_YEAR=target).values_list('CODE', 'ACADEMIC_TERM_ID'))
+    term_codes = {term['ACADEMIC_TERM_ID']: _translate(term['CODE'], source, target) or term['CODE'] for term in terms}
+    new_terms = [
+        {'ACADEMIC_TERM_ID': term['ACADEMIC_TERM_ID'], 'CODE': term['CODE'], 'NEW_CODE': term_codes[term['ACADEMIC_TERM_ID']]}
+        for term in terms if term_codes[term['ACADEMIC_TERM_ID']] not in target_terms
+    ]
+
+    exams = list(EXAMINATION.objects.filter(
+        ACADEMIC_TERM__ACADEMIC_YEAR=source, ACADEMIC_TERM__IS_DELETED=False, IS_DELETED=False,
+    ).values('EXAMINATION_ID', 'CODE', 'ACADEMIC_TERM_id'))
+    exam_codes = {exam['EXAMINATION_ID']: _translate(exam['CODE'], source, target) for exam in exams}
+    taken = set(EXAMINATION.objects.filter(
+        CODE__in=[code for code in exam_codes.values() if code]
+    ).values_list('CODE', flat=True))
+    new_exams, untranslatable = [], []
+    for exam in exams:
+        code = exam_codes[exam['EXAMINATION_ID']]
+        if code is None:
+            untranslatable.append(exam['CODE'])
+        elif code not in taken:
+            new_exams.append({**exam, 'NEW_CODE': code, 'TERM_CODE': term_codes[exam['ACADEMIC_TERM_id']]})
+    return {'terms': new_terms, 'examinations': new_exams, 'untranslatable': untranslatable}
+
+
+CURRICULUM_TABLE = CURRICULUM._meta.db_table
+TERM_TABLE = ACADEMIC_TERM._meta.db_table
+EXAM_TABLE = EXAMINATION._meta.db_table
+AUDIT_COLUMNS = '"CREATED_BY", "CREATED_AT", "UPDATED_BY", "UPDATED_AT", "DELETED_BY", "DELETED_AT", "IS_DELETED"'
+AUDIT_VALUES = '%(user)s, %(now)s, %(user)s, %(now)s, NULL, NULL, FALSE'
+
+CLONE_CURRICULUM_SQL = f'''
+    INSERT INTO {CURRICULUM_TABLE} (
+        "BRANCH_ID", "PROGRAM_ID", "ACADEMIC_YEAR_ID", "COURSE_ID", "SEMESTER", "IS_ELECTIVE", "IS_ACTIVE",
+        {AUDIT_COLUMNS}
+    )
+    SELECT c."BRANCH_ID", c."PROGRAM_ID", %(target)s, c."COURSE_ID", c."SEMESTER", c."IS_ELECTIVE", c."IS_ACTIVE",
+           {AUDIT_VALUES}
+      FROM {CURRICULUM_TABLE} c
+     WHERE c."CURRICULUM_ID" = ANY(%(ids)s)
+    ON CONFLICT ("BRANCH_ID", "PROGRAM_ID", "ACADEMIC_YEAR_ID", "COURSE_ID", "SEMESTER") DO UPDATE
+       SET "IS_ELECTIVE" = EXCLUDED."IS_ELECTIVE", "IS_ACTIVE" = EXCLUDED."IS_ACTIVE",
+           "UPDATED_BY" = EXCLUDED."UPDATED_BY", "UPDATED_AT" = EXCLUDED."UPDATED_AT",
+           "DELETED_BY" = NULL, "DELETED_AT" = NULL, "IS_DELETED" = FALSE
+'''
+
+CLONE_TERMS_SQL = f'''
+    INSERT INTO {TERM_TABLE} (
+        "ACADEMIC_YEAR_ID", "NAME", "CODE", "START_DATE", "END_DATE", "IS_ACTIVE", {AUDIT_COLUMNS}
+    )
+    SELECT %(target)s, t."NAME", n.code, (t."START_DATE" + %(shift)s::interval)::date,
+           (t."END_DATE" + %(shift)s::interval)::date, t."IS_ACTIVE",
+           {AUDIT_VALUES}
+      FROM {TERM_TABLE} t
+      JOIN unnest(%(ids)s::integer[], %(codes)s::varchar[]) AS n(id, code) ON n.id = t."ACADEMIC_TERM_ID"
+    ON CONFLICT DO NOTHING
+'''
+
+# Examinations follow their term into the target year by the term's new CODE
+CLONE_EXAMS_SQL = f'''
+    INSERT INTO {EXAM_TABLE} (
+        "ACADEMIC_TERM_ID", "NAME", "CODE", "EXAM_TYPE", "START_DATE", "END_DATE", "MAX_MARKS", "PASSING_MARKS",
+        "IS_ACTIVE", {AUDIT_COLUMNS}
+    )
+    SELECT t."ACADEMIC_TERM_ID", e."NAME", n.code, e."EXAM_TYPE", (e."START_DATE" + %(shift)s::interval)::date,
+           (e."END_DATE" + %(shift)s::interval)::date, e."MAX_MARKS", e."PASSING_MARKS", e."IS_ACTIVE", {AUDIT_VALUES}
+      FROM {EXAM_TABLE} e
+      JOIN unnest(%(ids)s::integer[], %(codes)s::varchar[], %(terms)s::varchar[]) AS n(id, code, term)
+           ON n.id = e."EXAMINATION_ID"
+      JOIN {TERM_TABLE} t ON t."ACADEMIC_YEAR_ID" = %(target)s AND t."CODE" = n.term AND t."IS_DELETED" = FALSE
+    ON CONFLICT DO NOTHING
+'''
+
+
+def _summary(curriculum, skeletons, source, target, branches, shift):
+    def listing(rows):
+        return [
+            {'branch': row['BRANCH_id'], 'program': row['PROGRAM_id'], 'course': row['COURSE_id'],
+             'semester': row['SEMESTER']}
+            for row in rows
+        ]
+
+    return {
+        'from_academic_year': source.pk,
+        'to_academic_year': target.pk,
+        'branches': branches,
+        'shift': shift,
+        'curriculum': {
+            'added': listing(curriculum['added']),
+            'changed': listing(curriculum['changed']),
+            'removed': listing(curriculum['removed']),
+            'kept': listing(curriculum['kept']),
+            'unchanged': curriculum['unchanged'],
+        },
+        'terms': [{'from': term['CODE'], 'to': term['NEW_CODE']} for term in skeletons['terms']],
+        'examinations': [{'from': exam['CODE'], 'to': exam['NEW_CODE']} for exam in skeletons['examinations']],
+        'untranslatable_examinations': skeletons['untranslatable'],
+    }
+
+
+def clone_curriculum(source, target, branches=None, terms=True, remove=True, username='SYSTEM', dry_run=False):
+    """
+    Make the target ACADEMIC_YEAR's curriculum for the branches match the
+    source year's and add the missing term and examination skeletons.
+    Returns the diff, with the number of rows written when applied.
+    """
+    if source.pk == target.pk:
+        raise CloneError('The source and target academic years are the same')
+    if branches is None:
+        branches = sorted(set(CURRICULUM.objects.filter(
+            ACADEMIC_YEAR=source, IS_DELETED=False,
+        ).values_list('BRANCH_id', flat=True)))
+    if not branches:
+        raise CloneError('The source academic year has no curriculum to clone')
+    shift = _shift(source.START_DATE, target.START_DATE)
+
+    with transaction.atomic():
+        if not dry_run:
+            # Serialize clones into the same year
+            ACADEMIC_YEAR.objects.select_for_update().filter(pk=target.pk).first()
+        curriculum = diff_curriculum(source, target, branches, remove)
+        skeletons = diff_skeletons(source, target) if terms else {'terms': [], 'examinations': [], 'untranslatable': []}
+        summary = _summary(curriculum, skeletons, source, target, branches, shift)
+        if dry_run:
+            return summary
+
+        now = timezone.now()
+        params = {'target': target.pk, 'user': username, 'now': now, 'shift': shift}
+        written = {'curriculum': 0, 'removed': 0, 'terms': 0, 'examinations': 0}
+        with connection.cursor() as cursor:
+            upserts = [row['CURRICULUM_ID'] for row in curriculum['added'] + curriculum['changed']]
+            if upserts:
+                cursor.execute(CLONE_CURRICULUM_SQL, {**params, 'ids': upserts})
+                written['curriculum'] = cursor.rowcount
+            if skeletons['terms']:
+                cursor.execute(CLONE_TERMS_SQL, {
+                    **params,
+                    'ids': [term['ACADEMIC_TERM_ID'] for term in skeletons['terms']],
+                    'codes': [term['NEW_CODE'] for term in skeletons['terms']],
+                })
+                written['terms'] = cursor.rowcount
+            if skeletons['examinations']:
+                cursor.execute(CLONE_EXAMS_SQL, {
+                    **params,
+                    'ids': [exam['EXAMINATION_ID'] for exam in skeletons['examinations']],
+                    'codes': [exam['NEW_CODE'] for exam in skeletons['examinations']],
+                    'terms': [exam['TERM_CODE'] for exam in skeletons['examinations']],
+                })
+                written['examinations'] = cursor.rowcount
+        if curriculum['removed']:
+            written['removed'] = CURRICULUM.objects.filter(
+                pk__in=[row['CURRICULUM_ID'] for row in curriculum['removed']],
+            ).update(IS_DELETED=True, DELETED_BY=username, DELETED_AT=now, UPDATED_BY=username, UPDATED_AT=now)
+
+    # The raw inserts bypass the signals that keep the overlap indexes fresh
+    if written['terms']:
+        invalidate('academic-term')
+    if written['examinations']:
+        invalidate('examination')
+    logger.info(
+        "Cloned curriculum %s -> %s for branches %s: %s",
+        source.pk, target.pk, branches, written
+    )
+    summary['written'] = written
+    return summary
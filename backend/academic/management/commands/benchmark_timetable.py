@@ -0,0 +1,54 @@
+import random
+
+from django.core.management.base import BaseCommand
+
+from academic.timetable import solve, synthetic_problem
+
+
+class Command(BaseCommand):
+    help = 'Benchmark the timetable solver on a synthetic institute, then re-solve after one faculty absence'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--branches', type=int, default=10)
+        parser.add_argument('--semesters', type=int, default=4)
+        parser.add_argument('--divisions', type=int, default=2)
+        parser.add_argument('--courses', type=int, default=7, help='Courses per semester')
+        parser.add_argument('--days', type=int, default=6)
+        parser.add_argument('--periods', type=int, default=7)
+        parser.add_argument('--time-limit', type=float, default=60)
+        parser.add_argument('--seed', type=int, default=1)
+
+    def _print(self, label, stats):
+        seconds = stats['seconds']
+        self.stdout.write(
+            f"{label}: {stats['hard']} hard ({stats['section_clashes']} section, {stats['faculty_clashes']} faculty, "
+            f"{stats['room_clashes']} room, {stats['without_room']} roomless, {stats['faculty_unavailable']} "
+            f"unavailable), soft {stats['soft']}; {stats['iterations']} iterations, {stats['moves']} moves, "
+            f"{stats['moved']} sessions moved; construct {seconds['construct']}s, search {seconds['search']}s, "
+            f"total {seconds['total']}s"
+        )
+
+    def handle(self, *args, **options):
+        problem = synthetic_problem(
+            branches=options['branches'], semesters=options['semesters'], divisions=options['divisions'],
+            courses=options['courses'], days=options['days'], periods=options['periods'], seed=options['seed'],
+        )
+        self.stdout.write(f"Instance: {problem.describe()}")
+        solver, stats = solve(problem, seed=options['seed'], time_limit=options['time_limit'])
+        self._print('Full solve', stats)
+
+        # One change: a teacher with sessions on the busiest day is away that day
+        for index, event in enumerate(problem.events):
+            event.previous = (solver.start[index], solver.room[index])
+        rng = random.Random(options['seed'])
+        index = rng.randrange(len(problem.events))
+        event = problem.events[index]
+        day = solver.start[index] // problem.periods
+        problem.unavailable[event.faculty] = (
+            set(problem.unavailable.get(event.faculty, ()))
+            | {day * problem.periods + period for period in range(problem.periods)}
+        )
+        problem._prepare()
+        _, stats = solve(problem, seed=options['seed'], time_limit=options['time_limit'], stability=5,
+                         patience=2 * len(problem.events))
+        self._print(f"Re-solve after faculty {event.faculty} is away on day {day}", stats)
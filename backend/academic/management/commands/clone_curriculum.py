@@ -0,0 +1,49 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from academic.cloning import CloneError, clone_curriculum
+from academic.models import ACADEMIC_YEAR
+
+
+class Command(BaseCommand):
+    help = "Copy one academic year's curriculum and term/examination skeletons into another"
+
+    def add_arguments(self, parser):
+        parser.add_argument('source', help='ACADEMIC_YEAR to copy from, by id or name (e.g. 2025-26)')
+        parser.add_argument('target', help='ACADEMIC_YEAR to copy into, by id or name')
+        parser.add_argument('--branch', type=int, action='append', dest='branches',
+                            help='BRANCH_ID to clone; repeat for several (default: all in the source year)')
+        parser.add_argument('--no-terms', action='store_true', help='Leave academic terms and examinations alone')
+        parser.add_argument('--keep', action='store_true', help='Keep target curriculum rows missing from the source')
+        parser.add_argument('--dry-run', action='store_true', help='Only print the diff')
+        parser.add_argument('--user', default='SYSTEM', help='Recorded as CREATED_BY / UPDATED_BY')
+
+    def _year(self, value):
+        years = ACADEMIC_YEAR.objects.filter(IS_DELETED=False)
+        year = years.filter(pk=int(value)).first() if value.isdigit() else years.filter(ACADEMIC_YEAR=value).first()
+        if year is None:
+            raise CommandError(f'Unknown academic year {value}')
+        return year
+
+    def handle(self, *args, **options):
+        try:
+            summary = clone_curriculum(
+                self._year(options['source']), self._year(options['target']),
+                branches=options['branches'], terms=not options['no_terms'], remove=not options['keep'],
+                username=options['user'], dry_run=options['dry_run'],
+            )
+        except CloneError as e:
+            raise CommandError(e.message)
+
+        self.stdout.write(json.dumps(summary, indent=2))
+        curriculum = summary['curriculum']
+        counts = (
+            f"curriculum +{len(curriculum['added'])} ~{len(curriculum['changed'])} -{len(curriculum['removed'])} "
+            f"({len(curriculum['kept'])} kept, {curriculum['unchanged']} unchanged); "
+            f"{len(summary['terms'])} terms, {len(summary['examinations'])} examinations"
+        )
+        if options['dry_run']:
+            self.stdout.write(self.style.WARNING(f'Preview only: {counts}'))
+        else:
+            self.stdout.write(self.style.SUCCESS(f"Cloned: {counts}; written {summary['written']}"))
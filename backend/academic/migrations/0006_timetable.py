@@ -0,0 +1,118 @@
+# Generated by Django 4.2.7 on 2026-10-19 16:12
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0031_profile_picture_blob_storage'),
+        ('faculty', '0002_alter_faculty_created_by_alter_faculty_deleted_by_and_more'),
+        ('academic', '0005_drop_audit_fk_constraints'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ROOM',
+            fields=[
+                ('CREATED_BY', models.CharField(blank=True, db_column='CREATED_BY', max_length=50, null=True)),
+                ('CREATED_AT', models.DateTimeField(auto_now_add=True, db_column='CREATED_AT')),
+                ('UPDATED_BY', models.CharField(blank=True, db_column='UPDATED_BY', max_length=50, null=True)),
+                ('UPDATED_AT', models.DateTimeField(auto_now=True, db_column='UPDATED_AT')),
+                ('DELETED_BY', models.CharField(blank=True, db_column='DELETED_BY', max_length=50, null=True)),
+                ('DELETED_AT', models.DateTimeField(blank=True, db_column='DELETED_AT', null=True)),
+                ('IS_DELETED', models.BooleanField(db_column='IS_DELETED', default=False)),
+                ('ROOM_ID', models.AutoField(db_column='ROOM_ID', primary_key=True, serialize=False)),
+                ('CODE', models.CharField(db_column='CODE', max_length=20, unique=True)),
+                ('NAME', models.CharField(db_column='NAME', max_length=100)),
+                ('ROOM_TYPE', models.CharField(choices=[('LECTURE', 'Lecture Hall'), ('LAB', 'Laboratory')], db_column='ROOM_TYPE', default='LECTURE', max_length=10)),
+                ('CAPACITY', models.IntegerField(db_column='CAPACITY')),
+                ('IS_ACTIVE', models.BooleanField(db_column='IS_ACTIVE', default=True)),
+                ('BRANCH', models.ForeignKey(blank=True, db_column='BRANCH_ID', null=True, on_delete=django.db.models.deletion.PROTECT, to='accounts.branch')),
+            ],
+            options={
+                'verbose_name': 'Room',
+                'verbose_name_plural': 'Rooms',
+                'db_table': '"ACADEMIC"."ROOMS"',
+            },
+        ),
+        migrations.CreateModel(
+            name='TIMETABLE',
+            fields=[
+                ('CREATED_BY', models.CharField(blank=True, db_column='CREATED_BY', max_length=50, null=True)),
+                ('CREATED_AT', models.DateTimeField(auto_now_add=True, db_column='CREATED_AT')),
+                ('UPDATED_BY', models.CharField(blank=True, db_column='UPDATED_BY', max_length=50, null=True)),
+                ('UPDATED_AT', models.DateTimeField(auto_now=True, db_column='UPDATED_AT')),
+                ('DELETED_BY', models.CharField(blank=True, db_column='DELETED_BY', max_length=50, null=True)),
+                ('DELETED_AT', models.DateTimeField(blank=True, db_column='DELETED_AT', null=True)),
+                ('IS_DELETED', models.BooleanField(db_column='IS_DELETED', default=False)),
+                ('TIMETABLE_ID', models.AutoField(db_column='TIMETABLE_ID', primary_key=True, serialize=False)),
+                ('NAME', models.CharField(db_column='NAME', max_length=100)),
+                ('OPTIONS', models.JSONField(blank=True, db_column='OPTIONS', default=dict)),
+                ('STATUS', models.CharField(choices=[('DRAFT', 'Draft'), ('PUBLISHED', 'Published')], db_column='STATUS', default='DRAFT', max_length=10)),
+                ('HARD_VIOLATIONS', models.IntegerField(db_column='HARD_VIOLATIONS', default=0)),
+                ('SOFT_PENALTY', models.IntegerField(db_column='SOFT_PENALTY', default=0)),
+                ('SOLVE_SECONDS', models.DecimalField(db_column='SOLVE_SECONDS', decimal_places=2, default=0, max_digits=8)),
+                ('ACADEMIC_TERM', models.ForeignKey(db_column='ACADEMIC_TERM_ID', on_delete=django.db.models.deletion.PROTECT, related_name='timetables', to='academic.academic_term')),
+            ],
+            options={
+                'verbose_name': 'Timetable',
+                'verbose_name_plural': 'Timetables',
+                'db_table': '"ACADEMIC"."TIMETABLES"',
+            },
+        ),
+        migrations.CreateModel(
+            name='FACULTY_UNAVAILABILITY',
+            fields=[
+                ('CREATED_BY', models.CharField(blank=True, db_column='CREATED_BY', max_length=50, null=True)),
+                ('CREATED_AT', models.DateTimeField(auto_now_add=True, db_column='CREATED_AT')),
+                ('UPDATED_BY', models.CharField(blank=True, db_column='UPDATED_BY', max_length=50, null=True)),
+                ('UPDATED_AT', models.DateTimeField(auto_now=True, db_column='UPDATED_AT')),
+                ('DELETED_BY', models.CharField(blank=True, db_column='DELETED_BY', max_length=50, null=True)),
+                ('DELETED_AT', models.DateTimeField(blank=True, db_column='DELETED_AT', null=True)),
+                ('IS_DELETED', models.BooleanField(db_column='IS_DELETED', default=False)),
+                ('RECORD_ID', models.AutoField(db_column='RECORD_ID', primary_key=True, serialize=False)),
+                ('DAY', models.IntegerField(db_column='DAY')),
+                ('PERIOD', models.IntegerField(blank=True, db_column='PERIOD', null=True)),
+                ('REASON', models.CharField(blank=True, db_column='REASON', default='', max_length=255)),
+                ('FACULTY', models.ForeignKey(db_column='FACULTY_ID', on_delete=django.db.models.deletion.CASCADE, related_name='unavailability', to='faculty.faculty')),
+            ],
+            options={
+                'verbose_name': 'Faculty Unavailability',
+                'verbose_name_plural': 'Faculty Unavailability',
+                'db_table': '"ACADEMIC"."FACULTY_UNAVAILABILITY"',
+            },
+        ),
+        migrations.CreateModel(
+            name='TIMETABLE_ENTRY',
+            fields=[
+                ('CREATED_BY', models.CharField(blank=True, db_column='CREATED_BY', max_length=50, null=True)),
+                ('CREATED_AT', models.DateTimeField(auto_now_add=True, db_column='CREATED_AT')),
+                ('UPDATED_BY', models.CharField(blank=True, db_column='UPDATED_BY', max_length=50, null=True)),
+                ('UPDATED_AT', models.DateTimeField(auto_now=True, db_column='UPDATED_AT')),
+                ('DELETED_BY', models.CharField(blank=True, db_column='DELETED_BY', max_length=50, null=True)),
+                ('DELETED_AT', models.DateTimeField(blank=True, db_column='DELETED_AT', null=True)),
+                ('IS_DELETED', models.BooleanField(db_column='IS_DELETED', default=False)),
+                ('ENTRY_ID', models.BigAutoField(db_column='ENTRY_ID', primary_key=True, serialize=False)),
+                ('SECTION', models.CharField(db_column='SECTION', default='A', max_length=5)),
+                ('SESSION_TYPE', models.CharField(choices=[('LECTURE', 'Lecture'), ('TUTORIAL', 'Tutorial'), ('LAB', 'Lab')], db_column='SESSION_TYPE', max_length=10)),
+                ('SEQUENCE', models.IntegerField(db_column='SEQUENCE', default=1)),
+                ('DAY', models.IntegerField(db_column='DAY')),
+                ('PERIOD', models.IntegerField(db_column='PERIOD')),
+                ('LENGTH', models.IntegerField(db_column='LENGTH', default=1)),
+                ('IS_LOCKED', models.BooleanField(db_column='IS_LOCKED', default=False)),
+                ('CURRICULUM', models.ForeignKey(db_column='CURRICULUM_ID', on_delete=django.db.models.deletion.PROTECT, to='academic.curriculum')),
+                ('FACULTY', models.ForeignKey(blank=True, db_column='FACULTY_ID', null=True, on_delete=django.db.models.deletion.SET_NULL, to='faculty.faculty')),
+                ('ROOM', models.ForeignKey(blank=True, db_column='ROOM_ID', null=True, on_delete=django.db.models.deletion.SET_NULL, to='academic.room')),
+                ('TIMETABLE', models.ForeignKey(db_column='TIMETABLE_ID', on_delete=django.db.models.deletion.CASCADE, related_name='entries', to='academic.timetable')),
+            ],
+            options={
+                'verbose_name': 'Timetable Entry',
+                'verbose_name_plural': 'Timetable Entries',
+                'db_table': '"ACADEMIC"."TIMETABLE_ENTRIES"',
+                'indexes': [models.Index(fields=['TIMETABLE', 'DAY', 'PERIOD'], name='idx_timetable_entry_slot')],
+                'unique_together': {('TIMETABLE', 'CURRICULUM', 'SECTION', 'SESSION_TYPE', 'SEQUENCE')},
+            },
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 4.2.7 on 2026-10-19 16:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('academic', '0006_timetable'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='room',
+            name='BENCH_COLUMNS',
+            field=models.IntegerField(db_column='BENCH_COLUMNS', default=0),
+        ),
+        migrations.AddField(
+            model_name='room',
+            name='BENCH_ROWS',
+            field=models.IntegerField(db_column='BENCH_ROWS', default=0),
+        ),
+        migrations.AddField(
+            model_name='room',
+            name='SEATS_PER_BENCH',
+            field=models.IntegerField(db_column='SEATS_PER_BENCH', default=2),
+        ),
+    ]
@@ -1,6 +1,7 @@
 from django.db import models
 from core.models import AuditModel
 from accounts.models import BRANCH, PROGRAM
+from faculty.models import FACULTY
 
 class ACADEMIC_YEAR(AuditModel):
     ACADEMIC_YEAR_ID = models.AutoField(primary_key=True, db_column='ACADEMIC_YEAR_ID')
@@ -110,3 +111,114 @@ class EXAMINATION(AuditModel):
 
     def __str__(self):
         return f"{self.ACADEMIC_TERM} - {self.NAME}"
+
+
+class ROOM(AuditModel):
+    LECTURE = 'LECTURE'
+    LAB = 'LAB'
+
+    ROOM_ID = models.AutoField(primary_key=True, db_column='ROOM_ID')
+    CODE = models.CharField(max_length=20, unique=True, db_column='CODE')
+    NAME = models.CharField(max_length=100, db_column='NAME')
+    ROOM_TYPE = models.CharField(
+        max_length=10,
+        choices=[(LECTURE, 'Lecture Hall'), (LAB, 'Laboratory')],
+        default=LECTURE,
+        db_column='ROOM_TYPE'
+    )
+    CAPACITY = models.IntegerField(db_column='CAPACITY')
+    # Bench layout for examinations; a room without benches is not an exam hall
+    BENCH_ROWS = models.IntegerField(default=0, db_column='BENCH_ROWS')
+    BENCH_COLUMNS = models.IntegerField(default=0, db_column='BENCH_COLUMNS')
+    SEATS_PER_BENCH = models.IntegerField(default=2, db_column='SEATS_PER_BENCH')
+    # A laboratory tied to a branch only hosts that branch's sessions
+    BRANCH = models.ForeignKey(BRANCH, on_delete=models.PROTECT, null=True, blank=True, db_column='BRANCH_ID')
+    IS_ACTIVE = models.BooleanField(default=True, db_column='IS_ACTIVE')
+
+    class Meta:
+        db_table = '"ACADEMIC"."ROOMS"'
+        verbose_name = 'Room'
+        verbose_name_plural = 'Rooms'
+
+    def __str__(self):
+        return f"{self.CODE} - {self.NAME}"
+
+
+class FACULTY_UNAVAILABILITY(AuditModel):
+    RECORD_ID = models.AutoField(primary_key=True, db_column='RECORD_ID')
+    FACULTY = models.ForeignKey(FACULTY, on_delete=models.CASCADE, db_column='FACULTY_ID', related_name='unavailability')
+    DAY = models.IntegerField(db_column='DAY')  # 0 = Monday
+    PERIOD = models.IntegerField(null=True, blank=True, db_column='PERIOD')  # null = the whole day
+    REASON = models.CharField(max_length=255, blank=True, default='', db_column='REASON')
+
+    class Meta:
+        db_table = '"ACADEMIC"."FACULTY_UNAVAILABILITY"'
+        verbose_name = 'Faculty Unavailability'
+        verbose_name_plural = 'Faculty Unavailability'
+
+    def __str__(self):
+        return f"{self.FACULTY_id} - {self.DAY}/{self.PERIOD if self.PERIOD is not None else '*'}"
+
+
+class TIMETABLE(AuditModel):
+    DRAFT = 'DRAFT'
+    PUBLISHED = 'PUBLISHED'
+
+    TIMETABLE_ID = models.AutoField(primary_key=True, db_column='TIMETABLE_ID')
+    ACADEMIC_TERM = models.ForeignKey(ACADEMIC_TERM, on_delete=models.PROTECT, db_column='ACADEMIC_TERM_ID', related_name='timetables')
+    NAME = models.CharField(max_length=100, db_column='NAME')
+    # Generation inputs (semesters, divisions, days, periods), reused on re-solve
+    OPTIONS = models.JSONField(default=dict, blank=True, db_column='OPTIONS')
+    STATUS = models.CharField(
+        max_length=10,
+        choices=[(DRAFT, 'Draft'), (PUBLISHED, 'Published')],
+        default=DRAFT,
+        db_column='STATUS'
+    )
+    HARD_VIOLATIONS = models.IntegerField(default=0, db_column='HARD_VIOLATIONS')
+    SOFT_PENALTY = models.IntegerField(default=0, db_column='SOFT_PENALTY')
+    SOLVE_SECONDS = models.DecimalField(max_digits=8, decimal_places=2, default=0, db_column='SOLVE_SECONDS')
+
+    class Meta:
+        db_table = '"ACADEMIC"."TIMETABLES"'
+        verbose_name = 'Timetable'
+        verbose_name_plural = 'Timetables'
+
+    def __str__(self):
+        return f"{self.ACADEMIC_TERM_id} - {self.NAME}"
+
+
+class TIMETABLE_ENTRY(AuditModel):
+    LECTURE = 'LECTURE'
+    TUTORIAL = 'TUTORIAL'
+    LAB = 'LAB'
+
+    ENTRY_ID = models.BigAutoField(primary_key=True, db_column='ENTRY_ID')
+    TIMETABLE = models.ForeignKey(TIMETABLE, on_delete=models.CASCADE, db_column='TIMETABLE_ID', related_name='entries')
+    CURRICULUM = models.ForeignKey(CURRICULUM, on_delete=models.PROTECT, db_column='CURRICULUM_ID')
+    SECTION = models.CharField(max_length=5, default='A', db_column='SECTION')  # division of the class
+    SESSION_TYPE = models.CharField(
+        max_length=10,
+        choices=[(LECTURE, 'Lecture'), (TUTORIAL, 'Tutorial'), (LAB, 'Lab')],
+        db_column='SESSION_TYPE'
+    )
+    SEQUENCE = models.IntegerField(default=1, db_column='SEQUENCE')  # nth session of its type in the week
+    DAY = models.IntegerField(db_column='DAY')  # 0 = Monday
+    PERIOD = models.IntegerField(db_column='PERIOD')  # first period, 0-based
+    LENGTH = models.IntegerField(default=1, db_column='LENGTH')  # consecutive periods
+    ROOM = models.ForeignKey(ROOM, on_delete=models.SET_NULL, null=True, blank=True, db_column='ROOM_ID')
+    FACULTY = models.ForeignKey(FACULTY, on_delete=models.SET_NULL, null=True, blank=True, db_column='FACULTY_ID')
+    # Locked entries keep their slot, room and faculty when the timetable is re-solved
+    IS_LOCKED = models.BooleanField(default=False, db_column='IS_LOCKED')
+
+    class Meta:
+        db_table = '"ACADEMIC"."TIMETABLE_ENTRIES"'
+        verbose_name = 'Timetable Entry'
+        verbose_name_plural = 'Timetable Entries'
+        unique_together = ['TIMETABLE', 'CURRICULUM', 'SECTION', 'SESSION_TYPE', 'SEQUENCE']
+        indexes = [
+            models.Index(fields=['TIMETABLE', 'DAY', 'PERIOD'], name='idx_timetable_entry_slot'),
+        ]
+
+    def __str__(self):
+        return f"{self.TIMETABLE_id} - {self.CURRICULUM_id}/{self.SECTION} {self.DAY}:{self.PERIOD}"
@@ -0,0 +1,93 @@
+from rest_framework import serializers
+
+from core.schedule import check_overlap
+from .models import ACADEMIC_TERM, EXAMINATION, FACULTY_UNAVAILABILITY, ROOM, TIMETABLE, TIMETABLE_ENTRY
+from .timetable import week_shape
+
+
+class AcademicTermSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ACADEMIC_TERM
+        fields = '__all__'
+
+    def validate(self, attrs):
+        year = attrs.get('ACADEMIC_YEAR') or getattr(self.instance, 'ACADEMIC_YEAR', None)
+        check_overlap('academic-term', attrs, self.instance, scope=year.INSTITUTE if year else None)
+        return attrs
+
+
+class ExaminationSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = EXAMINATION
+        fields = '__all__'
+
+    def validate(self, attrs):
+        term = attrs.get('ACADEMIC_TERM') or getattr(self.instance, 'ACADEMIC_TERM', None)
+        # Overlapping examinations are allowed; the response carries a warning
+        self.overlap = check_overlap('examination', attrs, self.instance,
+                                     scope=term.ACADEMIC_YEAR.INSTITUTE if term else None)
+        return attrs
+
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        if getattr(self, 'overlap', None):
+            data['warnings'] = [self.overlap]
+        return data
+
+
+class RoomSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ROOM
+        fields = '__all__'
+
+
+class FacultyUnavailabilitySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = FACULTY_UNAVAILABILITY
+        fields = '__all__'
+
+    def validate_DAY(self, value):
+        if not 0 <= value <= 6:
+            raise serializers.ValidationError('DAY must be 0 (Monday) to 6')
+        return value
+
+
+class TimetableSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = TIMETABLE
+        fields = '__all__'
+        read_only_fields = ['HARD_VIOLATIONS', 'SOFT_PENALTY', 'SOLVE_SECONDS']
+
+    def validate_OPTIONS(self, value):
+        if not isinstance(value, dict):
+            raise serializers.ValidationError('OPTIONS must be an object')
+        unknown = set(value) - {'semesters', 'divisions', 'days', 'periods', 'lab_block'}
+        if unknown:
+            raise serializers.ValidationError(f"Unknown options: {', '.join(sorted(unknown))}")
+        return value
+
+
+class TimetableEntrySerializer(serializers.ModelSerializer):
+    COURSE_CODE = serializers.CharField(source='CURRICULUM.COURSE.CODE', read_only=True)
+    ROOM_CODE = serializers.CharField(source='ROOM.CODE', read_only=True, default=None)
+
+    class Meta:
+        model = TIMETABLE_ENTRY
+        fields = [
+            'ENTRY_ID', 'TIMETABLE', 'CURRICULUM', 'COURSE_CODE', 'SECTION', 'SESSION_TYPE', 'SEQUENCE',
+            'DAY', 'PERIOD', 'LENGTH', 'ROOM', 'ROOM_CODE', 'FACULTY', 'IS_LOCKED'
+        ]
+        # Sessions come from the curriculum; only placement is edited by hand
+        read_only_fields = ['TIMETABLE', 'CURRICULUM', 'SECTION', 'SESSION_TYPE', 'SEQUENCE', 'LENGTH']
+
+    def validate(self, attrs):
+        instance = self.instance
+        if instance is not None:
+            days, periods, _ = week_shape(instance.TIMETABLE.OPTIONS)
+            day = attrs.get('DAY', instance.DAY)
+            period = attrs.get('PERIOD', instance.PERIOD)
+            if not 0 <= day < days:
+                raise serializers.ValidationError({'DAY': f'DAY must be 0-{days - 1}'})
+            if not 0 <= period or period + instance.LENGTH > periods:
+                raise serializers.ValidationError({'PERIOD': f'The session must fit in periods 0-{periods - 1}'})
+        return attrs
@@ -1,3 +1,178 @@
-from django.test import TestCase
+from collections import defaultdict
+from datetime import date
 
-# Create your tests here.
+from django.test import SimpleTestCase, TestCase
+
+from accounts.models import SEMESTER, YEAR
+from student.models import ATTENDANCE_ROSTER, STUDENT_ROLL_NUMBER_DETAILS
+from student.tests import _branch, _student
+from .cloning import CloneError, clone_curriculum
+from .models import ACADEMIC_TERM, ACADEMIC_YEAR, COURSE, CURRICULUM, EXAMINATION, TIMETABLE
+from .timetable import ROOM_TYPES, Problem, build_problem, solve, synthetic_problem
+
+
+def _small_problem():
+    return synthetic_problem(branches=1, semesters=2, divisions=2, courses=4, days=5, periods=6)
+
+
+class TimetableSolverTest(SimpleTestCase):
+    def _assert_feasible(self, problem, solver):
+        occupied = defaultdict(list)
+        for index, event in enumerate(problem.events):
+            start, room = solver.start[index], solver.room[index]
+            self.assertGreaterEqual(room, 0)
+            self.assertEqual(problem.rooms[room].type, ROOM_TYPES[event.kind])
+            self.assertGreaterEqual(problem.rooms[room].capacity, problem.sections[event.section].size)
+            # A block stays within one day
+            self.assertEqual(start // problem.periods, (start + event.length - 1) // problem.periods)
+            for slot in range(start, start + event.length):
+                self.assertNotIn(slot, problem.unavailable.get(event.faculty, ()))
+                occupied['section', event.section, slot].append(index)
+                occupied['faculty', event.faculty, slot].append(index)
+                occupied['room', room, slot].append(index)
+        self.assertEqual([cell for cell, events in occupied.items() if len(events) > 1], [])
+
+    def test_solution_has_no_clashes(self):
+        problem = _small_problem()
+        solver, stats = solve(problem, time_limit=5)
+        self.assertEqual(stats['hard'], 0)
+        self._assert_feasible(problem, solver)
+
+    def test_resolve_moves_only_what_the_change_broke(self):
+        problem = _small_problem()
+        solver, _ = solve(problem, time_limit=5)
+
+        changed = _small_problem()
+        for index, event in enumerate(changed.events):
+            event.previous = (solver.start[index], solver.room[index])
+        changed.events[0].locked = True
+        # The teacher of the second session becomes unavailable when it is held
+        absent = changed.events[1]
+        blocked = {**changed.unavailable, absent.faculty: {solver.start[1]}}
+        changed = Problem(changed.days, changed.periods, changed.sections, changed.rooms,
+                          changed.faculty, blocked, changed.events)
+
+        resolved, stats = solve(changed, time_limit=5, stability=1)
+        self.assertEqual(stats['hard'], 0)
+        self._assert_feasible(changed, resolved)
+        self.assertEqual((resolved.start[0], resolved.room[0]), changed.events[0].previous)
+        self.assertNotEqual(resolved.start[1], solver.start[1])
+        self.assertLess(stats['moved'], len(changed.events) // 4)
+
+
+class TimetableProblemTest(TestCase):
+    def setUp(self):
+        self.branch = _branch()
+        course = COURSE.objects.create(CODE='CS101', NAME='Course', CREDITS=4, LECTURE_HOURS=3)
+        self.years = {}
+        for label, start in (('2024-25', 2024), ('2025-26', 2025)):
+            self.years[label] = ACADEMIC_YEAR.objects.create(
+                ACADEMIC_YEAR=label, START_DATE=date(start, 6, 1), END_DATE=date(start + 1, 5, 31),
+            )
+        for semester in (1, 3):
+            CURRICULUM.objects.create(BRANCH=self.branch, PROGRAM=self.branch.PROGRAM, COURSE=course,
+                                      ACADEMIC_YEAR=self.years['2025-26'], SEMESTER=semester)
+        term = ACADEMIC_TERM.objects.create(ACADEMIC_YEAR=self.years['2025-26'], NAME='Odd', CODE='2025-1',
+                                            START_DATE=date(2025, 6, 1), END_DATE=date(2025, 11, 30))
+        self.timetable = TIMETABLE.objects.create(ACADEMIC_TERM=term, NAME='Odd', OPTIONS={'divisions': {
+            str(self.branch.pk): 2,
+        }})
+
+    def _enrol(self, count, year, semester, academic_year='2025-26', prefix='CE25'):
+        year = YEAR.objects.get_or_create(YEAR=year, BRANCH=self.branch)[0]
+        semester = SEMESTER.objects.get_or_create(SEMESTER=semester, YEAR=year)[0]
+        for number in range(count):
+            student_id = f'{prefix}{semester.pk}{number:02d}'
+            STUDENT_ROLL_NUMBER_DETAILS.objects.create(
+                STUDENT=_student(student_id, self.branch, year), INSTITUTE=self.branch.PROGRAM.INSTITUTE,
+                BRANCH=self.branch, YEAR=year, SEMESTER=semester, ACADEMIC_YEAR=academic_year, ROLL_NO=student_id,
+            )
+
+    def test_sections_are_sized_from_the_terms_enrolment(self):
+        self._enrol(9, 'FY', 'SEM 1')
+        self._enrol(5, 'SY', 'SEM 3')
+        # Last year's roll numbers for the same semester do not count
+        self._enrol(40, 'SY', 'SEM 3', academic_year='2024-25', prefix='CE24')
+        sizes = {section.label: section.size for section in build_problem(self.timetable).sections}
+        self.assertEqual(sizes, {'CE S1-A': 5, 'CE S1-B': 5, 'CE S3-A': 3, 'CE S3-B': 3})
+
+    def test_semesters_without_students_use_the_default_size(self):
+        self._enrol(4, 'FY', 'SEM 1')
+        sizes = {section.label: section.size for section in build_problem(self.timetable).sections}
+        self.assertEqual((sizes['CE S1-A'], sizes['CE S3-A']), (2, 60))
+
+
+class CurriculumCloneTest(TestCase):
+    def setUp(self):
+        self.branch = _branch()
+        self.program = self.branch.PROGRAM
+        self.source = ACADEMIC_YEAR.objects.create(ACADEMIC_YEAR='2025-26', START_DATE=date(2025, 6, 1),
+                                                   END_DATE=date(2026, 5, 31))
+        self.target = ACADEMIC_YEAR.objects.create(ACADEMIC_YEAR='2026-27', START_DATE=date(2026, 6, 1),
+                                                   END_DATE=date(2027, 5, 31))
+        self.courses = [
+            COURSE.objects.create(CODE=f'CS10{number}', NAME=f'Course {number}', CREDITS=4, LECTURE_HOURS=3)
+            for number in range(1, 4)
+        ]
+        self._curriculum(self.source, 0, 1)
+        self._curriculum(self.source, 1, 2, IS_ELECTIVE=True)
+        self._curriculum(self.target, 1, 2)
+        self.stale = self._curriculum(self.target, 2, 1)
+
+        term = ACADEMIC_TERM.objects.create(ACADEMIC_YEAR=self.source, NAME='Odd', CODE='2025-1',
+                                            START_DATE=date(2025, 6, 1), END_DATE=date(2025, 11, 30))
+        EXAMINATION.objects.create(ACADEMIC_TERM=term, NAME='End term', CODE='END-2025-26', EXAM_TYPE='ENDTERM',
+                                   START_DATE=date(2025, 11, 15), END_DATE=date(2025, 11, 29),
+                                   MAX_MARKS=100, PASSING_MARKS=40)
+        EXAMINATION.objects.create(ACADEMIC_TERM=term, NAME='Viva', CODE='VIVA', EXAM_TYPE='VIVA',
+                                   START_DATE=date(2025, 11, 1), END_DATE=date(2025, 11, 2),
+                                   MAX_MARKS=50, PASSING_MARKS=20)
+
+    def _curriculum(self, year, course, semester, **fields):
+        return CURRICULUM.objects.create(BRANCH=self.branch, PROGRAM=self.program, ACADEMIC_YEAR=year,
+                                         COURSE=self.courses[course], SEMESTER=semester, **fields)
+
+    def _target(self):
+        return sorted(
+            CURRICULUM.objects.filter(ACADEMIC_YEAR=self.target, IS_DELETED=False)
+            .values_list('COURSE__CODE', 'SEMESTER', 'IS_ELECTIVE')
+        )
+
+    def test_preview_writes_nothing(self):
+        summary = clone_curriculum(self.source, self.target, dry_run=True)
+        self.assertEqual(
+            [len(summary['curriculum'][outcome]) for outcome in ('added', 'changed', 'removed', 'kept')],
+            [1, 1, 1, 0],
+        )
+        self.assertEqual(summary['examinations'], [{'from': 'END-2025-26', 'to': 'END-2026-27'}])
+        self.assertEqual(summary['untranslatable_examinations'], ['VIVA'])
+        self.assertEqual(self._target(), [('CS102', 2, False), ('CS103', 1, False)])
+        self.assertFalse(ACADEMIC_TERM.objects.filter(ACADEMIC_YEAR=self.target).exists())
+
+    def test_apply_then_rerun_changes_nothing(self):
+        summary = clone_curriculum(self.source, self.target)
+        self.assertEqual(summary['written'], {'curriculum': 2, 'removed': 1, 'terms': 1, 'examinations': 1})
+        self.assertEqual(self._target(), [('CS101', 1, False), ('CS102', 2, True)])
+        term = ACADEMIC_TERM.objects.get(ACADEMIC_YEAR=self.target)
+        self.assertEqual((term.CODE, term.START_DATE, term.END_DATE),
+                         ('2026-1', date(2026, 6, 1), date(2026, 11, 30)))
+        exam = EXAMINATION.objects.get(CODE='END-2026-27')
+        self.assertEqual((exam.ACADEMIC_TERM_id, exam.START_DATE), (term.pk, date(2026, 11, 15)))
+
+        summary = clone_curriculum(self.source, self.target)
+        self.assertEqual(summary['written'], {'curriculum': 0, 'removed': 0, 'terms': 0, 'examinations': 0})
+        self.assertEqual(summary['curriculum']['unchanged'], 2)
+        self.assertEqual(self._target(), [('CS101', 1, False), ('CS102', 2, True)])
+
+    def test_rows_in_use_are_kept(self):
+        year = YEAR.objects.create(YEAR='FY', BRANCH=self.branch)
+        ATTENDANCE_ROSTER.objects.create(CURRICULUM=self.stale, ACADEMIC_YEAR='2026-27',
+                                         SEMESTER=SEMESTER.objects.create(SEMESTER='SEM 1', YEAR=year))
+        summary = clone_curriculum(self.source, self.target, terms=False)
+        self.assertEqual(summary['curriculum']['kept'][0]['course'], self.courses[2].pk)
+        self.assertEqual(summary['written']['removed'], 0)
+        self.assertIn(('CS103', 1, False), self._target())
+
+    def test_same_year_is_refused(self):
+        with self.assertRaises(CloneError):
+            clone_curriculum(self.source, self.source)
@@ -0,0 +1,846 @@
+"""
+Weekly timetable generation for the sections of an academic term.
+
+Every CURRICULUM entry of the term's academic year becomes a set of sessions
+per section (division) of its branch/program/semester: LECTURE_HOURS and
+TUTORIAL_HOURS one-period sessions and LAB_HOURS in blocks of
+TIMETABLE_LAB_BLOCK consecutive periods. Each (course, section) is given a
+faculty member whose TEACHING_AREAS name the course code or name, preferring
+the course's own branch and the least loaded teacher.
+
+The solver then places every session on a (day, period) and a room.
+
+Hard constraints (weighted so one outweighs every soft penalty together):
+
+* a section, a faculty member or a room holds one session per period
+* a session has a room of its type that seats the section
+* a faculty member is not scheduled when marked unavailable
+* a block of periods stays within one day
+
+Soft penalties:
+
+* the same course and session type twice on one day for a section
+* a faculty member teaching more than TIMETABLE_MAX_DAILY_PERIODS in a day
+* on re-solve, every session moved away from its previous slot
+
+Sessions are first placed greedily, hardest first (long blocks, then the
+fewest allowed slots), each on its cheapest slot. A min-conflicts local
+search with a short tabu list then repeatedly takes a session in conflict
+and moves it to its best slot; once no conflicts remain it keeps making
+non-worsening moves against the soft penalties until it stalls or runs out
+of time. Occupancy is kept per (section / faculty / room, slot) so a move
+is priced from the handful of cells it touches.
+
+Re-solving after a change (a faculty absence, a locked or edited entry,
+changed course hours) starts from the stored timetable, keeps locked
+entries fixed and only moves what the change put in conflict; the stability
+penalty keeps everything else where it was.
+"""
+import logging
+import math
+import random
+import re
+import string
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count
+
+from faculty.models import FACULTY
+from student.models import STUDENT_ROLL_NUMBER_DETAILS
+from .models import CURRICULUM, FACULTY_UNAVAILABILITY, ROOM, TIMETABLE_ENTRY
+
+logger = logging.getLogger(__name__)
+
+HARD = 1000
+LECTURE, TUTORIAL, LAB = TIMETABLE_ENTRY.LECTURE, TIMETABLE_ENTRY.TUTORIAL, TIMETABLE_ENTRY.LAB
+ROOM_TYPES = {LECTURE: ROOM.LECTURE, TUTORIAL: ROOM.LECTURE, LAB: ROOM.LAB}
+DAY_NAMES = ['MON', 'TUE', 'WED', 'THU', 'FRI', 'SAT', 'SUN']
+WRITE_BATCH = 2000
+
+
+class TimetableError(ValueError):
+    pass
+
+
+def _option(name, default):
+    return getattr(settings, name, default)
+
+
+def week_shape(options):
+    """(days, periods, lab block) of a timetable's OPTIONS, defaulting to the settings."""
+    options = options or {}
+    return (
+        int(options.get('days') or _option('TIMETABLE_DAYS', 6)),
+        int(options.get('periods') or _option('TIMETABLE_PERIODS', 7)),
+        int(options.get('lab_block') or _option('TIMETABLE_LAB_BLOCK', 2)),
+    )
+
+
+class Section:
+    __slots__ = ('key', 'label', 'size', 'branch')
+
+    def __init__(self, key, label, size, branch):
+        self.key = key
+        self.label = label
+        self.size = size
+        self.branch = branch
+
+
+class Room:
+    __slots__ = ('id', 'code', 'capacity', 'type', 'branch')
+
+    def __init__(self, id, code, capacity, type, branch=None):
+        self.id = id
+        self.code = code
+        self.capacity = capacity
+        self.type = type
+        self.branch = branch
+
+
+class Event:
+    """One session to place: `length` consecutive periods of one course for one section."""
+    __slots__ = ('key', 'section', 'faculty', 'course', 'kind', 'length', 'starts', 'allowed',
+                 'rooms', 'locked', 'previous')
+
+    def __init__(self, key, section, faculty, course, kind, length):
+        self.key = key              # (curriculum id, section division, kind, sequence)
+        self.section = section      # index into Problem.sections
+        self.faculty = faculty      # index into Problem.faculty, or None
+        self.course = course
+        self.kind = kind
+        self.length = length
+        self.starts = []            # candidate first slots
+        self.allowed = frozenset()  # starts that break no availability rule
+        self.rooms = []             # suitable room indices, smallest first
+        self.locked = False
+        self.previous = None        # (slot, room index) from the stored timetable
+
+
+class Problem:
+    def __init__(self, days, periods, sections, rooms, faculty, unavailable, events, max_daily=None):
+        self.days = days
+        self.periods = periods
+        self.slots = days * periods
+        self.sections = sections
+        self.rooms = rooms
+        self.faculty = faculty          # faculty ids, indexed by Event.faculty
+        self.unavailable = unavailable  # faculty index -> set of slots
+        self.events = events
+        self.max_daily = max_daily if max_daily is not None else _option('TIMETABLE_MAX_DAILY_PERIODS', 5)
+        self.warnings = []
+        self._prepare()
+
+    def _prepare(self):
+        by_type = defaultdict(list)
+        for index, room in enumerate(self.rooms):
+            by_type[room.type].append(index)
+        for indices in by_type.values():
+            indices.sort(key=lambda index: (self.rooms[index].capacity, index))
+
+        suitable = {}
+        roomless = set()
+        for event in self.events:
+            section = self.sections[event.section]
+            profile = (ROOM_TYPES[event.kind], section.size, section.branch)
+            rooms = suitable.get(profile)
+            if rooms is None:
+                rooms = [
+                    index for index in by_type.get(profile[0], ())
+                    if self.rooms[index].capacity >= section.size
+                    and self.rooms[index].branch in (None, section.branch)
+                ]
+                suitable[profile] = rooms
+            event.rooms = rooms
+            if not rooms:
+                roomless.add((section.label, event.kind))
+
+            starts = [
+                day * self.periods + period
+                for day in range(self.days)
+                for period in range(self.periods - event.length + 1)
+            ]
+            blocked = self.unavailable.get(event.faculty, ()) if event.faculty is not None else ()
+            allowed = [
+                start for start in starts
+                if not any(slot in blocked for slot in range(start, start + event.length))
+            ]
+            if event.locked and event.previous is not None:
+                event.starts = [event.previous[0]]
+                event.allowed = frozenset(event.starts)
+            else:
+                # Without any allowed slot the search may still use the rest, at a cost
+                event.starts = allowed or starts
+                event.allowed = frozenset(allowed)
+        for label, kind in sorted(roomless):
+            self.warnings.append(f'No {ROOM_TYPES[kind].lower()} room seats section {label}')
+
+    def describe(self):
+        return {
+            'days': self.days,
+            'periods': self.periods,
+            'sections': len(self.sections),
+            'rooms': len(self.rooms),
+            'faculty': len(self.faculty),
+            'sessions': len(self.events),
+            'periods_to_place': sum(event.length for event in self.events),
+        }
+
+
+class Solver:
+    """Incremental cost bookkeeping and the local search; see the module docstring."""
+
+    def __init__(self, problem, seed=0, stability=0):
+        self.problem = problem
+        self.rng = random.Random(seed)
+        self.stability = stability
+        slots = problem.slots
+        self.section_cells = [[[] for _ in range(slots)] for _ in problem.sections]
+        self.faculty_cells = [[[] for _ in range(slots)] for _ in problem.faculty]
+        self.room_cells = [[[] for _ in range(slots)] for _ in problem.rooms]
+        self.course_days = defaultdict(lambda: [0] * problem.days)
+        self.faculty_days = [[0] * problem.days for _ in problem.faculty]
+        self.start = [-1] * len(problem.events)
+        self.room = [-1] * len(problem.events)
+        self.hard = 0
+        self.soft = 0
+
+    @property
+    def cost(self):
+        return self.hard * HARD + self.soft
+
+    def _day_key(self, event):
+        return event.section, event.key[0], event.kind
+
+    def _overload(self, load):
+        return max(0, load - self.problem.max_daily)
+
+    # -- bookkeeping -------------------------------------------------------
+
+    def place(self, index, start, room):
+        event = self.problem.events[index]
+        for slot in range(start, start + event.length):
+            cell = self.section_cells[event.section][slot]
+            if cell:
+                self.hard += 1
+            cell.append(index)
+            if event.faculty is not None:
+                cell = self.faculty_cells[event.faculty][slot]
+                if cell:
+                    self.hard += 1
+                cell.append(index)
+            if room >= 0:
+                cell = self.room_cells[room][slot]
+                if cell:
+                    self.hard += 1
+                cell.append(index)
+        if room < 0:
+            self.hard += 1
+        if start not in event.allowed:
+            self.hard += 1
+
+        day = start // self.problem.periods
+        counts = self.course_days[self._day_key(event)]
+        if counts[day]:
+            self.soft += 1
+        counts[day] += 1
+        if event.faculty is not None:
+            load = self.faculty_days[event.faculty]
+            self.soft += self._overload(load[day] + event.length) - self._overload(load[day])
+            load[day] += event.length
+        if self.stability and event.previous is not None and event.previous[0] != start:
+            self.soft += self.stability
+
+        self.start[index] = start
+        self.room[index] = room
+
+    def unplace(self, index):
+        event = self.problem.events[index]
+        start, room = self.start[index], self.room[index]
+        for slot in range(start, start + event.length):
+            cell = self.section_cells[event.section][slot]
+            cell.remove(index)
+            if cell:
+                self.hard -= 1
+            if event.faculty is not None:
+                cell = self.faculty_cells[event.faculty][slot]
+                cell.remove(index)
+                if cell:
+                    self.hard -= 1
+            if room >= 0:
+                cell = self.room_cells[room][slot]
+                cell.remove(index)
+                if cell:
+                    self.hard -= 1
+        if room < 0:
+            self.hard -= 1
+        if start not in event.allowed:
+            self.hard -= 1
+
+        day = start // self.problem.periods
+        counts = self.course_days[self._day_key(event)]
+        counts[day] -= 1
+        if counts[day]:
+            self.soft -= 1
+        if event.faculty is not None:
+            load = self.faculty_days[event.faculty]
+            load[day] -= event.length
+            self.soft -= self._overload(load[day] + event.length) - self._overload(load[day])
+        if self.stability and event.previous is not None and event.previous[0] != start:
+            self.soft -= self.stability
+
+        self.start[index] = -1
+        self.room[index] = -1
+
+    def candidate(self, index, start):
+        """(cost of placing the unplaced event at start, best room for it there)."""
+        event = self.problem.events[index]
+        slots = range(start, start + event.length)
+        hard = 0 if start in event.allowed else 1
+        section_cells = self.section_cells[event.section]
+        for slot in slots:
+            if section_cells[slot]:
+                hard += 1
+        if event.faculty is not None:
+            faculty_cells = self.faculty_cells[event.faculty]
+            for slot in slots:
+                if faculty_cells[slot]:
+                    hard += 1
+
+        # The previous room first, so a re-solve keeps rooms where it can
+        rooms = event.rooms
+        if event.previous is not None and event.previous[1] >= 0:
+            rooms = [event.previous[1]] + rooms
+        best_room, best_clashes = -1, None
+        for room in rooms:
+            cells = self.room_cells[room]
+            clashes = 0
+            for slot in slots:
+                if cells[slot]:
+                    clashes += 1
+            if not clashes:
+                best_room, best_clashes = room, 0
+                break
+            if best_clashes is None or clashes < best_clashes:
+                best_room, best_clashes = room, clashes
+        hard += 1 if best_room < 0 else best_clashes
+
+        day = start // self.problem.periods
+        soft = 1 if self.course_days[self._day_key(event)][day] else 0
+        if event.faculty is not None:
+            load = self.faculty_days[event.faculty][day]
+            soft += self._overload(load + event.length) - self._overload(load)
+        if self.stability and event.previous is not None and event.previous[0] != start:
+            soft += self.stability
+        return hard * HARD + soft, best_room
+
+    def best_move(self, index, tabu=None):
+        best, moves = None, []
+        for start in self.problem.events[index].starts:
+            if tabu is not None and start in tabu:
+                continue
+            cost, room = self.candidate(index, start)
+            if best is None or cost < best:
+                best, moves = cost, [(start, room)]
+            elif cost == best:
+                moves.append((start, room))
+        if not moves:
+            return None, None, None
+        start, room = self.rng.choice(moves)
+        return best, start, room
+
+    def conflicted(self, index):
+        event = self.problem.events[index]
+        start, room = self.start[index], self.room[index]
+        if room < 0 or start not in event.allowed:
+            return True
+        for slot in range(start, start + event.length):
+            if len(self.section_cells[event.section][slot]) > 1 or len(self.room_cells[room][slot]) > 1:
+                return True
+            if event.faculty is not None and len(self.faculty_cells[event.faculty][slot]) > 1:
+                return True
+        return False
+
+    def _neighbours(self, index, start, room):
+        event = self.problem.events[index]
+        found = set()
+        for slot in range(start, start + event.length):
+            found.update(self.section_cells[event.section][slot])
+            if event.faculty is not None:
+                found.update(self.faculty_cells[event.faculty][slot])
+            if room >= 0:
+                found.update(self.room_cells[room][slot])
+        return found
+
+    def penalized(self, movable):
+        """Movable events that carry a soft penalty, the only ones worth moving once clash-free."""
+        events = self.problem.events
+        periods = self.problem.periods
+        found = []
+        for index in movable:
+            event = events[index]
+            start = self.start[index]
+            day = start // periods
+            if (
+                self.course_days[self._day_key(event)][day] > 1
+                or (event.faculty is not None and self.faculty_days[event.faculty][day] > self.problem.max_daily)
+                or (self.stability and event.previous is not None and event.previous[0] != start)
+            ):
+                found.append(index)
+        return found
+
+    # -- search ------------------------------------------------------------
+
+    def construct(self):
+        """Place every unplaced event greedily, hardest first."""
+        events = self.problem.events
+        pending = [index for index in range(len(events)) if self.start[index] < 0]
+        pending.sort(key=lambda index: (
+            -events[index].length,
+            len(events[index].allowed) or len(events[index].starts),
+            len(events[index].rooms),
+            self.rng.random(),
+        ))
+        for index in pending:
+            _, start, room = self.best_move(index)
+            self.place(index, start, room)
+
+    def load(self, starts, rooms):
+        for index, (start, room) in enumerate(zip(starts, rooms)):
+            if start >= 0:
+                self.place(index, start, room)
+
+    def improve(self, time_limit=30.0, max_iterations=None, patience=None, walk=0.05, tenure=8):
+        """Min-conflicts / tabu search; leaves the best assignment found in place."""
+        events = self.problem.events
+        movable = [index for index, event in enumerate(events) if not event.locked]
+        if not movable:
+            return {'iterations': 0, 'moves': 0}
+        deadline = time.perf_counter() + time_limit
+        max_iterations = max_iterations or 200 * len(events)
+        patience = patience or 5 * len(events)
+        conflicted = {index for index in movable if self.conflicted(index)}
+        locked = {index for index, event in enumerate(events) if event.locked}
+
+        best_cost = self.cost
+        best = (self.start[:], self.room[:])
+        tabu = defaultdict(dict)  # event -> {start: until iteration}
+        penalized = None
+        iteration = stalled = moves = 0
+        while iteration < max_iterations and self.cost:
+            iteration += 1
+            if iteration & 63 == 0 and time.perf_counter() > deadline:
+                break
+            repairing = bool(conflicted)
+            if repairing:
+                index = self.rng.choice(tuple(conflicted))
+            else:
+                if penalized is None:
+                    penalized = self.penalized(movable)
+                if not penalized:
+                    break
+                index = self.rng.choice(penalized)
+            old_start, old_room = self.start[index], self.room[index]
+            touched = self._neighbours(index, old_start, old_room)
+            self.unplace(index)
+
+            held = {start for start, until in tabu[index].items() if until > iteration}
+            if repairing and self.rng.random() < walk:
+                start = self.rng.choice(events[index].starts)
+                cost, room = self.candidate(index, start)
+            else:
+                cost, start, room = self.best_move(index, held)
+                if start is None:
+                    cost, start, room = self.best_move(index)
+            if not repairing and cost > self.candidate(index, old_start)[0]:
+                # Soft phase: never trade a clash-free timetable for a worse one
+                start, room = old_start, old_room
+            self.place(index, start, room)
+            if (start, room) != (old_start, old_room):
+                moves += 1
+                penalized = None
+                tabu[index][old_start] = iteration + tenure
+                touched |= self._neighbours(index, start, room)
+                touched.add(index)
+                for other in touched:
+                    if other in locked:
+                        continue
+                    if self.conflicted(other):
+                        conflicted.add(other)
+                    else:
+                        conflicted.discard(other)
+
+            if self.cost < best_cost:
+                best_cost = self.cost
+                best = (self.start[:], self.room[:])
+                stalled = 0
+            else:
+                stalled += 1
+                if stalled > patience:
+                    break
+
+        if self.cost > best_cost:
+            self.reset()
+            self.load(*best)
+        return {'iterations': iteration, 'moves': moves}
+
+    def reset(self):
+        for index in range(len(self.problem.events)):
+            if self.start[index] >= 0:
+                self.unplace(index)
+
+    def report(self):
+        """Hard violations by kind, and the soft penalty."""
+        section = sum(max(0, len(cell) - 1) for cells in self.section_cells for cell in cells)
+        faculty = sum(max(0, len(cell) - 1) for cells in self.faculty_cells for cell in cells)
+        room = sum(max(0, len(cell) - 1) for cells in self.room_cells for cell in cells)
+        events = self.problem.events
+        return {
+            'hard': self.hard,
+            'soft': self.soft,
+            'section_clashes': section,
+            'faculty_clashes': faculty,
+            'room_clashes': room,
+            'without_room': sum(1 for room in self.room if room < 0),
+            'faculty_unavailable': sum(
+                1 for index, event in enumerate(events) if self.start[index] not in event.allowed
+            ),
+        }
+
+
+def solve(problem, seed=0, time_limit=None, stability=0, patience=None):
+    """
+    Place every event of problem. Events with a `previous` position start
+    there (a re-solve); the rest are constructed greedily. Returns the
+    solver, holding the final assignment, and run statistics.
+    """
+    time_limit = time_limit if time_limit is not None else _option('TIMETABLE_TIME_LIMIT', 30)
+    started = time.perf_counter()
+    solver = Solver(problem, seed=seed, stability=stability)
+    solver.load(
+        [event.previous[0] if event.previous else -1 for event in problem.events],
+        [event.previous[1] if event.previous else -1 for event in problem.events],
+    )
+    solver.construct()
+    constructed = time.perf_counter()
+    initial = solver.report()
+    search = solver.improve(time_limit=max(0.0, time_limit - (constructed - started)), patience=patience)
+    finished = time.perf_counter()
+
+    stats = solver.report()
+    stats.update(search)
+    stats['initial_hard'] = initial['hard']
+    stats['moved'] = sum(
+        1 for index, event in enumerate(problem.events)
+        if event.previous is not None and (solver.start[index], solver.room[index]) != event.previous
+    )
+    stats['seconds'] = {
+        'construct': round(constructed - started, 3),
+        'search': round(finished - constructed, 3),
+        'total': round(finished - started, 3),
+    }
+    return solver, stats
+
+
+# -- database -----------------------------------------------------------------
+
+SEMESTER_NUMBER = re.compile(r'(\d+)\s*$')
+
+
+def _enrolment(academic_year):
+    """
+    Students per (branch, semester number) in an academic year, counted from
+    the year's roll-number records. CURRICULUM.SEMESTER is a number while
+    the SEMESTER master is named ('SEM 3'), so the number is read from the
+    end of the name; semesters without one are not counted.
+    """
+    strength = defaultdict(int)
+    for branch, name, count in (
+        STUDENT_ROLL_NUMBER_DETAILS.objects
+        .filter(ACADEMIC_YEAR=academic_year, IS_DELETED=False,
+                STUDENT__IS_DELETED=False, STUDENT__DATE_LEAVING__isnull=True)
+        .values_list('BRANCH_id', 'SEMESTER__SEMESTER')
+        .annotate(count=Count('STUDENT_id', distinct=True))
+        .values_list('BRANCH_id', 'SEMESTER__SEMESTER', 'count')
+    ):
+        number = SEMESTER_NUMBER.search(name or '')
+        if number:
+            strength[branch, int(number.group(1))] += count
+    return strength
+
+
+def _teaching_areas(value):
+    """TEACHING_AREAS as a set of upper-case course codes or names."""
+    if isinstance(value, dict):
+        value = value.get('courses') or value.get('areas') or list(value.values())
+    if isinstance(value, str):
+        value = value.split(',')
+    areas = set()
+    for item in value or ():
+        if isinstance(item, (list, tuple)):
+            areas.update(str(part).strip().upper() for part in item)
+        elif item is not None:
+            areas.add(str(item).strip().upper())
+    areas.discard('')
+    return areas
+
+
+def _divisions(count):
+    return list(string.ascii_uppercase[:max(1, min(count, 26))])
+
+
+def _assign_faculty(groups, faculty, fixed):
+    """
+    Faculty id per (curriculum, division). groups holds (key, code, name,
+    branch, hours); fixed carries assignments over from a stored timetable.
+    Scarce courses are assigned first, each to the least loaded qualified
+    teacher, preferring the course's branch.
+    """
+    limit = _option('TIMETABLE_MAX_WEEKLY_PERIODS', 18)
+    load = defaultdict(int)
+    assigned = {}
+    for key, _, _, _, hours in groups:
+        if fixed.get(key) is not None:
+            assigned[key] = fixed[key]
+            load[fixed[key]] += hours
+
+    qualified = {}
+    for key, code, name, branch, _ in groups:
+        names = {(code or '').upper(), (name or '').upper()} - {''}
+        qualified[key] = [
+            (faculty_id, faculty_branch) for faculty_id, faculty_branch, areas in faculty if names & areas
+        ]
+    for key, _, _, branch, hours in sorted(groups, key=lambda group: (len(qualified[group[0]]), -group[4])):
+        if key in assigned or not qualified[key]:
+            continue
+        faculty_id, _ = min(qualified[key], key=lambda candidate: (
+            load[candidate[0]] + hours > limit,
+            candidate[1] != branch,
+            load[candidate[0]],
+            candidate[0],
+        ))
+        assigned[key] = faculty_id
+        load[faculty_id] += hours
+    return assigned
+
+
+def build_problem(timetable, previous=None):
+    """
+    The Problem for a TIMETABLE from the current curriculum, faculty, rooms
+    and availability. previous maps entry keys to stored TIMETABLE_ENTRY
+    values, making this a re-solve.
+    """
+    options = timetable.OPTIONS or {}
+    days, periods, lab_block = week_shape(options)
+    default_size = _option('TIMETABLE_SECTION_SIZE', 60)
+    divisions = {str(branch): int(count) for branch, count in (options.get('divisions') or {}).items()}
+    previous = previous or {}
+    if not 1 <= days <= 7 or periods < lab_block or lab_block < 1:
+        raise TimetableError('days must be 1-7 and periods at least the lab block')
+
+    curricula = CURRICULUM.objects.filter(
+        ACADEMIC_YEAR_id=timetable.ACADEMIC_TERM.ACADEMIC_YEAR_id,
+        IS_ACTIVE=True, IS_DELETED=False, COURSE__IS_DELETED=False,
+    )
+    if options.get('semesters'):
+        curricula = curricula.filter(SEMESTER__in=options['semesters'])
+    rows = list(curricula.order_by('BRANCH_id', 'PROGRAM_id', 'SEMESTER', 'CURRICULUM_ID').values_list(
+        'CURRICULUM_ID', 'BRANCH_id', 'BRANCH__CODE', 'PROGRAM_id', 'SEMESTER', 'COURSE__CODE',
+        'COURSE__NAME', 'COURSE__LECTURE_HOURS', 'COURSE__TUTORIAL_HOURS', 'COURSE__LAB_HOURS',
+    ))
+    if not rows:
+        raise TimetableError('No curriculum for this term')
+
+    strength = _enrolment(timetable.ACADEMIC_TERM.ACADEMIC_YEAR.ACADEMIC_YEAR)
+
+    sections = []
+    section_index = {}
+    groups = []
+    for curriculum, branch, branch_code, program, semester, code, name, lecture, tutorial, lab in rows:
+        division_labels = _divisions(divisions.get(str(branch), 1))
+        students = strength.get((branch, semester))
+        size = math.ceil(students / len(division_labels)) if students else default_size
+        for division in division_labels:
+            section_key = (branch, program, semester, division)
+            if section_key not in section_index:
+                section_index[section_key] = len(sections)
+                sections.append(Section(section_key, f'{branch_code} S{semester}-{division}', size, branch))
+            hours = (lecture or 0) + (tutorial or 0) + (lab or 0)
+            if hours:
+                groups.append(((curriculum, division), code, name, branch, hours))
+
+    faculty = [
+        (faculty_id, branch, _teaching_areas(areas))
+        for faculty_id, branch, areas in FACULTY.objects.filter(IS_ACTIVE=True, IS_DELETED=False)
+        .order_by('FACULTY_ID').values_list('FACULTY_ID', 'BRANCH_id', 'TEACHING_AREAS')
+    ]
+    fixed = {}
+    for (curriculum, division, _, _), entry in previous.items():
+        if entry['FACULTY_id'] is not None:
+            fixed.setdefault((curriculum, division), entry['FACULTY_id'])
+    assigned = _assign_faculty(groups, faculty, fixed)
+    faculty_ids = sorted(set(assigned.values()))
+    faculty_index = {faculty_id: index for index, faculty_id in enumerate(faculty_ids)}
+
+    unavailable = defaultdict(set)
+    for faculty_id, day, period in FACULTY_UNAVAILABILITY.objects.filter(
+        FACULTY_id__in=faculty_ids, IS_DELETED=False
+    ).values_list('FACULTY_id', 'DAY', 'PERIOD'):
+        if not 0 <= day < days:
+            continue
+        wanted = range(periods) if period is None else [period] if 0 <= period < periods else []
+        unavailable[faculty_index[faculty_id]].update(day * periods + p for p in wanted)
+
+    rooms = [
+        Room(room_id, code, capacity, room_type, branch)
+        for room_id, code, capacity, room_type, branch in ROOM.objects.filter(IS_ACTIVE=True, IS_DELETED=False)
+        .order_by('ROOM_ID').values_list('ROOM_ID', 'CODE', 'CAPACITY', 'ROOM_TYPE', 'BRANCH_id')
+    ]
+    room_index = {room.id: index for index, room in enumerate(rooms)}
+
+    events = []
+    unstaffed = []
+    for curriculum, branch, branch_code, program, semester, code, name, lecture, tutorial, lab in rows:
+        blocks = [(LECTURE, 1)] * (lecture or 0) + [(TUTORIAL, 1)] * (tutorial or 0)
+        remaining = lab or 0
+        while remaining > 0:
+            blocks.append((LAB, min(lab_block, remaining)))
+            remaining -= lab_block
+        for division in _divisions(divisions.get(str(branch), 1)):
+            faculty_id = assigned.get((curriculum, division))
+            if faculty_id is None and blocks:
+                unstaffed.append(f'{code} for {branch_code} S{semester}-{division}')
+            sequence = defaultdict(int)
+            for kind, length in blocks:
+                sequence[kind] += 1
+                key = (curriculum, division, kind, sequence[kind])
+                event = Event(
+                    key, section_index[(branch, program, semester, division)],
+                    faculty_index.get(faculty_id), code, kind, length,
+                )
+                stored = previous.get(key)
+                if stored is not None and stored['LENGTH'] == length:
+                    start = stored['DAY'] * periods + stored['PERIOD']
+                    if stored['DAY'] < days and stored['PERIOD'] + length <= periods:
+                        event.previous = (start, room_index.get(stored['ROOM_id'], -1))
+                        event.locked = stored['IS_LOCKED']
+                events.append(event)
+
+    problem = Problem(days, periods, sections, rooms, faculty_ids, dict(unavailable), events)
+    problem.warnings.extend(f'No faculty teaches {item}' for item in unstaffed)
+    return problem
+
+
+def _stored_entries(timetable):
+    return {
+        (row['CURRICULUM_id'], row['SECTION'], row['SESSION_TYPE'], row['SEQUENCE']): row
+        for row in timetable.entries.filter(IS_DELETED=False).values(
+            'CURRICULUM_id', 'SECTION', 'SESSION_TYPE', 'SEQUENCE', 'DAY', 'PERIOD', 'LENGTH',
+            'ROOM_id', 'FACULTY_id', 'IS_LOCKED',
+        )
+    }
+
+
+def save_solution(timetable, problem, solver, stats, username='SYSTEM'):
+    """Replace the timetable's entries with the solver's assignment."""
+    periods = problem.periods
+    entries = []
+    for index, event in enumerate(problem.events):
+        start, room = solver.start[index], solver.room[index]
+        curriculum, division, kind, sequence = event.key
+        entries.append(TIMETABLE_ENTRY(
+            TIMETABLE=timetable,
+            CURRICULUM_id=curriculum,
+            SECTION=division,
+            SESSION_TYPE=kind,
+            SEQUENCE=sequence,
+            DAY=start // periods,
+            PERIOD=start % periods,
+            LENGTH=event.length,
+            ROOM_id=problem.rooms[room].id if room >= 0 else None,
+            FACULTY_id=problem.faculty[event.faculty] if event.faculty is not None else None,
+            IS_LOCKED=event.locked,
+            CREATED_BY=username,
+            UPDATED_BY=username,
+        ))
+    with transaction.atomic():
+        timetable.entries.all().delete()
+        TIMETABLE_ENTRY.objects.bulk_create(entries, batch_size=WRITE_BATCH)
+        timetable.HARD_VIOLATIONS = stats['hard']
+        timetable.SOFT_PENALTY = stats['soft']
+        timetable.SOLVE_SECONDS = stats['seconds']['total']
+        timetable.UPDATED_BY = username
+        timetable.save(update_fields=['HARD_VIOLATIONS', 'SOFT_PENALTY', 'SOLVE_SECONDS', 'UPDATED_BY', 'UPDATED_AT'])
+    return len(entries)
+
+
+def generate(timetable, username='SYSTEM', seed=0, time_limit=None, resolve=False):
+    """
+    Solve and store a timetable. With resolve=True the stored entries are
+    the starting point: locked entries stay put and the rest move only to
+    clear conflicts.
+    """
+    previous = _stored_entries(timetable) if resolve else None
+    if resolve and not previous:
+        raise TimetableError('The timetable has no entries to re-solve; generate it first')
+    problem = build_problem(timetable, previous)
+    stability = _option('TIMETABLE_STABILITY_PENALTY', 5) if resolve else 0
+    solver, stats = solve(
+        problem, seed=seed, time_limit=time_limit, stability=stability,
+        # A re-solve should settle quickly around the change
+        patience=2 * len(problem.events) if resolve else None,
+    )
+    written = save_solution(timetable, problem, solver, stats, username)
+    summary = {
+        'timetable': timetable.pk,
+        'problem': problem.describe(),
+        'result': stats,
+        'warnings': problem.warnings,
+        'written': written,
+    }
+    logger.info("Timetable %s %s: %s", timetable.pk, 're-solved' if resolve else 'generated', stats)
+    return summary
+
+
+def synthetic_problem(branches=8, semesters=4, divisions=2, courses=6, days=6, periods=8, seed=0):
+    """
+    An institute-sized instance without the database, for benchmarking:
+    every section takes `courses` courses of 3 lectures, 1 tutorial and a
+    2-period lab; teachers cover two courses each in their own branch.
+    """
+    rng = random.Random(seed)
+    sections = []
+    events = []
+    faculty = []
+    rooms = []
+    for branch in range(branches):
+        # Rooms for about 85% use: tight, but leaving the search some room
+        classes = semesters * divisions
+        for number in range(math.ceil(classes * courses * 4 / (days * periods) / 0.85)):
+            rooms.append(Room(len(rooms), f'LH{branch}{number:02d}', rng.choice([66, 72, 90]), ROOM.LECTURE))
+        for number in range(math.ceil(classes * courses / (days * (periods // 2)) / 0.85)):
+            rooms.append(Room(len(rooms), f'LB{branch}{number:02d}', 72, ROOM.LAB, branch))
+        for semester in range(semesters):
+            course_faculty = []
+            for course in range(courses):
+                if course % 2 == 0:
+                    faculty.append(len(faculty))
+                course_faculty.append(faculty[-1])
+            for division in _divisions(divisions):
+                section = len(sections)
+                sections.append(Section((branch, 0, semester, division), f'B{branch} S{semester}-{division}',
+                                        rng.randint(55, 70), branch))
+                for course in range(courses):
+                    curriculum = (branch * semesters + semester) * courses + course
+                    # Divisions of a class share teachers round-robin
+                    teacher = course_faculty[(course + ord(division) - 65) % courses]
+                    for kind, count, length in ((LECTURE, 3, 1), (TUTORIAL, 1, 1), (LAB, 1, 2)):
+                        for sequence in range(1, count + 1):
+                            events.append(Event((curriculum, division, kind, sequence), section, teacher,
+                                                f'C{curriculum}', kind, length))
+    unavailable = {}
+    for teacher in rng.sample(faculty, len(faculty) // 10):
+        unavailable[teacher] = {rng.randrange(days) * periods + period for period in range(periods)}
+    return Problem(days, periods, sections, rooms, faculty, unavailable, events)
@@ -0,0 +1,18 @@
+from django.urls import path, include
+from rest_framework.routers import DefaultRouter
+from . import views
+
+router = DefaultRouter()
+router.register(r'academic/terms', views.AcademicTermViewSet, basename='academic-terms')
+router.register(r'academic/examinations', views.ExaminationViewSet, basename='examinations')
+router.register(r'academic/rooms', views.RoomViewSet, basename='rooms')
+router.register(r'academic/faculty-unavailability', views.FacultyUnavailabilityViewSet, basename='faculty-unavailability')
+router.register(r'academic/timetables', views.TimetableViewSet, basename='timetables')
+router.register(r'academic/timetable-entries', views.TimetableEntryViewSet, basename='timetable-entries')
+
+app_name = 'academic'
+
+urlpatterns = [
+    path('', include(router.urls)),
+    path('academic/curriculum/clone/', views.CurriculumCloneView.as_view(), name='curriculum-clone'),
+]
@@ -1,3 +1,237 @@
-from django.shortcuts import render
+from rest_framework import status
+from rest_framework.decorators import action
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
 
-# Create your views here.
+from accounts.views import BaseModelViewSet
+from .cloning import CloneError, clone_curriculum
+from .models import ACADEMIC_TERM, ACADEMIC_YEAR, EXAMINATION, FACULTY_UNAVAILABILITY, ROOM, TIMETABLE, TIMETABLE_ENTRY
+from .serializers import (
+    AcademicTermSerializer, ExaminationSerializer, FacultyUnavailabilitySerializer, RoomSerializer,
+    TimetableEntrySerializer, TimetableSerializer
+)
+from .timetable import DAY_NAMES, TimetableError, generate, week_shape
+
+
+class AcademicTermViewSet(BaseModelViewSet):
+    """Terms of an academic year; overlapping terms of one institute are refused."""
+    queryset = ACADEMIC_TERM.objects.select_related('ACADEMIC_YEAR')
+    serializer_class = AcademicTermSerializer
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        academic_year = self.request.query_params.get('academic_year')
+        if academic_year:
+            queryset = queryset.filter(ACADEMIC_YEAR_id=academic_year)
+        return queryset.order_by('START_DATE')
+
+
+class ExaminationViewSet(BaseModelViewSet):
+    """Examinations of a term; overlapping examinations of one institute are saved with a warning."""
+    queryset = EXAMINATION.objects.select_related('ACADEMIC_TERM__ACADEMIC_YEAR')
+    serializer_class = ExaminationSerializer
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        params = self.request.query_params
+        if params.get('academic_term'):
+            queryset = queryset.filter(ACADEMIC_TERM_id=params['academic_term'])
+        if params.get('academic_year'):
+            queryset = queryset.filter(ACADEMIC_TERM__ACADEMIC_YEAR_id=params['academic_year'])
+        return queryset.order_by('START_DATE')
+
+
+class RoomViewSet(BaseModelViewSet):
+    queryset = ROOM.objects.all()
+    serializer_class = RoomSerializer
+
+
+class FacultyUnavailabilityViewSet(BaseModelViewSet):
+    queryset = FACULTY_UNAVAILABILITY.objects.all()
+    serializer_class = FacultyUnavailabilitySerializer
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        faculty = self.request.query_params.get('faculty')
+        if faculty:
+            queryset = queryset.filter(FACULTY_id=faculty)
+        return queryset
+
+
+class TimetableViewSet(BaseModelViewSet):
+    """
+    Timetables of an academic term (see academic/timetable.py). Create one
+    with its OPTIONS, then POST generate/ to solve it from scratch or
+    resolve/ to repair it after a change while keeping everything else.
+    """
+    queryset = TIMETABLE.objects.all()
+    serializer_class = TimetableSerializer
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        term = self.request.query_params.get('academic_term')
+        if term:
+            queryset = queryset.filter(ACADEMIC_TERM_id=term)
+        return queryset
+
+    def _solve(self, request, resolve):
+        timetable = self.get_object()
+        if timetable.STATUS == TIMETABLE.PUBLISHED:
+            return Response({
+                'status': 'error',
+                'message': 'A published timetable cannot be regenerated'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            time_limit = float(request.data['time_limit']) if request.data.get('time_limit') else None
+            seed = int(request.data.get('seed') or 0)
+        except (TypeError, ValueError):
+            return Response({
+                'status': 'error',
+                'message': 'time_limit and seed must be numbers'
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        user = request.user
+        username = getattr(user, 'USERNAME', None) or getattr(user, 'username', None) or 'SYSTEM'
+        try:
+            summary = generate(timetable, username=username, seed=seed, time_limit=time_limit, resolve=resolve)
+        except TimetableError as e:
+            return Response({'status': 'error', 'message': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        result = summary['result']
+        return Response({
+            'status': 'success',
+            'message': f"{summary['written']} sessions placed with {result['hard']} hard violations",
+            'data': summary
+        })
+
+    @action(detail=True, methods=['post'])
+    def generate(self, request, pk=None):
+        """{"time_limit": 30, "seed": 0}"""
+        return self._solve(request, resolve=False)
+
+    @action(detail=True, methods=['post'])
+    def resolve(self, request, pk=None):
+        """Re-solve from the stored entries; locked entries do not move."""
+        return self._solve(request, resolve=True)
+
+    @action(detail=True, methods=['get'])
+    def grid(self, request, pk=None):
+        """
+        Week grid for one view of the timetable:
+        ?branch=&semester=&section=, ?faculty= or ?room=.
+        """
+        timetable = self.get_object()
+        params = request.query_params
+        entries = timetable.entries.filter(IS_DELETED=False)
+        if params.get('faculty'):
+            entries = entries.filter(FACULTY_id=params['faculty'])
+        elif params.get('room'):
+            entries = entries.filter(ROOM_id=params['room'])
+        elif params.get('branch') and params.get('semester'):
+            entries = entries.filter(CURRICULUM__BRANCH_id=params['branch'],
+                                     CURRICULUM__SEMESTER=params['semester'])
+            if params.get('section'):
+                entries = entries.filter(SECTION=params['section'].upper())
+        else:
+            return Response({
+                'status': 'error',
+                'message': 'Pass branch and semester (and section), faculty or room'
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        days, periods, _ = week_shape(timetable.OPTIONS)
+        cells = [[[] for _ in range(periods)] for _ in range(days)]
+        for entry in entries.values(
+            'ENTRY_ID', 'CURRICULUM__COURSE__CODE', 'CURRICULUM__BRANCH__CODE', 'CURRICULUM__SEMESTER',
+            'SECTION', 'SESSION_TYPE', 'DAY', 'PERIOD', 'LENGTH', 'ROOM__CODE', 'FACULTY_id', 'IS_LOCKED'
+        ).order_by('DAY', 'PERIOD'):
+            item = {
+                'entry': entry['ENTRY_ID'],
+                'course': entry['CURRICULUM__COURSE__CODE'],
+                'class': f"{entry['CURRICULUM__BRANCH__CODE']} S{entry['CURRICULUM__SEMESTER']}-{entry['SECTION']}",
+                'type': entry['SESSION_TYPE'],
+                'room': entry['ROOM__CODE'],
+                'faculty': entry['FACULTY_id'],
+                'locked': entry['IS_LOCKED'],
+            }
+            for period in range(entry['PERIOD'], min(entry['PERIOD'] + entry['LENGTH'], periods)):
+                if entry['DAY'] < days:
+                    cells[entry['DAY']][period].append(item)
+
+        return Response({
+            'status': 'success',
+            'data': {
+                'days': DAY_NAMES[:days],
+                'periods': periods,
+                'cells': cells,
+            }
+        })
+
+
+class TimetableEntryViewSet(BaseModelViewSet):
+    """Sessions of a timetable; PATCH moves, reassigns or locks one before a re-solve."""
+    queryset = TIMETABLE_ENTRY.objects.select_related('TIMETABLE', 'CURRICULUM__COURSE', 'ROOM')
+    serializer_class = TimetableEntrySerializer
+    http_method_names = ['get', 'patch', 'head', 'options']
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        params = self.request.query_params
+        if params.get('timetable'):
+            queryset = queryset.filter(TIMETABLE_id=params['timetable'])
+        if params.get('faculty'):
+            queryset = queryset.filter(FACULTY_id=params['faculty'])
+        if params.get('room'):
+            queryset = queryset.filter(ROOM_id=params['room'])
+        return queryset.order_by('DAY', 'PERIOD', 'ENTRY_ID')
+
+
+class CurriculumCloneView(APIView):
+    """
+    POST {"from_academic_year": 4, "to_academic_year": 5, "branches": [3],
+    "terms": true, "remove": true, "dry_run": true} copies a year's
+    curriculum and term/examination skeletons into another (see
+    academic/cloning.py); dry_run only returns the diff.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        data = request.data
+        ids = [str(data.get(name, '')) for name in ('from_academic_year', 'to_academic_year')]
+        years = ACADEMIC_YEAR.objects.filter(IS_DELETED=False).in_bulk(
+            [int(pk) for pk in ids if pk.isdigit()]
+        )
+        source, target = (years.get(int(pk)) if pk.isdigit() else None for pk in ids)
+        if source is None or target is None:
+            return Response({
+                'status': 'error',
+                'message': 'from_academic_year and to_academic_year must be academic years'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        branches = data.get('branches')
+        if branches is not None and (not isinstance(branches, list) or not all(str(b).isdigit() for b in branches)):
+            return Response({
+                'status': 'error',
+                'message': 'branches must be a list of BRANCH ids'
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        def flag(name, default):
+            value = data.get(name)
+            return default if value is None else str(value).lower() in ('1', 'true', 'yes')
+
+        user = request.user
+        username = getattr(user, 'USERNAME', None) or getattr(user, 'username', None) or 'SYSTEM'
+        dry_run = flag('dry_run', False)
+        try:
+            summary = clone_curriculum(
+                source, target,
+                branches=[int(branch) for branch in branches] if branches is not None else None,
+                terms=flag('terms', True), remove=flag('remove', True),
+                username=username, dry_run=dry_run,
+            )
+        except CloneError as e:
+            return Response({'status': 'error', 'message': e.message}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({
+            'status': 'success',
+            'message': 'Curriculum clone previewed' if dry_run else 'Curriculum cloned',
+            'data': summary
+        })
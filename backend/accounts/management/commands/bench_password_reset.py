@@ -0,0 +1,105 @@
+import statistics
+import time
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory
+
+from accounts.models import CustomUser, PASSWORD_HISTORY, PASSWORD_HISTORY_DEPTH
+from accounts.views import ResetPasswordView
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmark ResetPasswordView against a full password history and fail '
+        'if it exceeds the allowed time or query count. Runs inside a '
+        'transaction that is rolled back, so no data is left behind.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=5)
+        parser.add_argument(
+            '--max-ms', type=float, default=None,
+            help='Fail if the median request takes longer (default: history budget + 1s)'
+        )
+        parser.add_argument(
+            '--max-queries', type=int, default=12,
+            help='Fail if a request issues more queries'
+        )
+
+    def handle(self, *args, **options):
+        max_ms = options['max_ms']
+        if max_ms is None:
+            max_ms = (getattr(settings, 'PASSWORD_HISTORY_CHECK_BUDGET', 2.0) + 1.0) * 1000
+
+        timings = []
+        query_counts = []
+        try:
+            with transaction.atomic():
+                timings, query_counts = self._run(options['iterations'])
+                raise _Rollback()
+        except _Rollback:
+            pass
+
+        median_ms = statistics.median(timings)
+        self.stdout.write(
+            f"ResetPasswordView: median {median_ms:.0f}ms, max {max(timings):.0f}ms, "
+            f"queries {max(query_counts)} (history depth {PASSWORD_HISTORY_DEPTH})"
+        )
+
+        if median_ms > max_ms:
+            raise CommandError(f"Median {median_ms:.0f}ms exceeds the {max_ms:.0f}ms limit")
+        if max(query_counts) > options['max_queries']:
+            raise CommandError(
+                f"{max(query_counts)} queries exceed the limit of {options['max_queries']}"
+            )
+        self.stdout.write(self.style.SUCCESS('Password reset is within budget'))
+
+    def _run(self, iterations):
+        user = CustomUser(
+            USER_ID='BENCHRESET01',
+            USERNAME='bench_reset_user',
+            EMAIL='bench_reset_user@example.invalid',
+            FIRST_NAME='Bench',
+            LAST_NAME='Reset',
+        )
+        user.PASSWORD = make_password('Initial#0')
+        user.save()
+        PASSWORD_HISTORY.objects.bulk_create([
+            PASSWORD_HISTORY(USER=user, PASSWORD=make_password(f'Previous#{i}'))
+            for i in range(PASSWORD_HISTORY_DEPTH)
+        ])
+
+        view = ResetPasswordView.as_view()
+        factory = APIRequestFactory()
+        timings = []
+        query_counts = []
+        for i in range(iterations):
+            CustomUser.objects.filter(pk=user.pk).update(
+                OTP_SECRET='123456',
+                OTP_EXPIRY=timezone.now() + timezone.timedelta(minutes=3),
+                OTP_ATTEMPTS=0,
+            )
+            request = factory.post('/api/auth/reset-password/', {
+                'user_id': user.USER_ID,
+                'otp': '123456',
+                'new_password': f'Benchmark#{i}',
+            }, format='json')
+
+            with CaptureQueriesContext(connection) as queries:
+                started = time.perf_counter()
+                response = view(request)
+                timings.append((time.perf_counter() - started) * 1000)
+            query_counts.append(len(queries))
+
+            if response.status_code != 200:
+                raise CommandError(f"Reset failed: {response.data}")
+        return timings, query_counts
@@ -0,0 +1,58 @@
+import csv
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.provisioning import provision_users
+
+
+class Command(BaseCommand):
+    help = (
+        'Create user accounts in bulk from a CSV file with USER_ID, USERNAME, '
+        'EMAIL and DESIGNATION columns (optional: FIRST_NAME, LAST_NAME, PASSWORD).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('csv_file', help='Path to the intake CSV file')
+        parser.add_argument(
+            '--workers', type=int, default=None,
+            help='Processes used for password hashing (default: CPU count)'
+        )
+        parser.add_argument(
+            '--no-email', action='store_true',
+            help='Do not send credential mails'
+        )
+
+    def handle(self, *args, **options):
+        try:
+            with open(options['csv_file'], newline='', encoding='utf-8-sig') as handle:
+                reader = csv.DictReader(handle)
+                records = [
+                    {key.strip().upper(): value for key, value in row.items() if key}
+                    for row in reader
+                ]
+        except OSError as e:
+            raise CommandError(f"Cannot read {options['csv_file']}: {e}")
+
+        missing = {'USER_ID', 'USERNAME', 'EMAIL'} - set(records[0] if records else ())
+        if missing:
+            raise CommandError(f"Missing columns: {', '.join(sorted(missing))}")
+
+        self.stdout.write(f"Provisioning {len(records)} users...")
+        started = time.perf_counter()
+        result = provision_users(
+            records,
+            send_emails=not options['no_email'],
+            workers=options['workers'],
+        )
+        elapsed = time.perf_counter() - started
+
+        for skipped in result['skipped']:
+            self.stderr.write(
+                f"Row {skipped['index'] + 2} ({skipped['USER_ID'] or '-'}): {skipped['errors']}"
+            )
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Created {len(result['created'])} users, skipped {len(result['skipped'])}, "
+            f"queued {result['emails_queued']} credential mails in {elapsed:.1f}s"
+        ))
@@ -0,0 +1,85 @@
+# Generated by Django 4.2.7 on 2026-10-19 15:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0029_menu_item_master_user_form_permission'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='admission_quota_master',
+            index=models.Index(fields=['UPDATED_AT', 'ADMN_QUOTA_ID'], name='idx_admission_quota_mast_sync'),
+        ),
+        migrations.AddIndex(
+            model_name='branch',
+            index=models.Index(fields=['UPDATED_AT', 'BRANCH_ID'], name='idx_branch_sync'),
+        ),
+        migrations.AddIndex(
+            model_name='caste_master',
+            index=models.Index(fields=['UPDATED_AT', 'CASTE_ID'], name='idx_caste_master_sync'),
+        ),
+        migrations.AddIndex(
+            model_name='category',
+            index=models.Index(fields=['UPDATED_AT', 'CATEGORY_ID'], name='idx_category_sync'),
+        ),
+        migrations.AddIndex(
+            model_name='city',
+            index=models.Index(fields=['UPDATED_AT', 'CITY_ID'], name='idx_city_sync'),
+        ),
+        migrations.AddIndex(
+            model_name='country',
+            index=models.Index(fields=['UPDATED_AT', 'COUNTRY_ID'], name='idx_country_sync'),
+        ),
+        migrations.AddIndex(
+            model_name='currency',
+            index=models.Index(fields=['UPDATED_AT', 'CURRENCY_ID'], name='idx_currency_sync'),
+        ),
+        migrations.AddIndex(
+            model_name='department',
+            index=models.Index(fields=['UPDATED_AT', 'DEPARTMENT_ID'], name='idx_department_sync'),
+        ),
+        migrations.AddIndex(
+            model_name='designation',
+            index=models.Index(fields=['UPDATED_AT', 'DESIGNATION_ID'], name='idx_designation_sync'),
+        ),
+        migrations.AddIndex(
+            model_name='institute',
+            index=models.Index(fields=['UPDATED_AT', 'INSTITUTE_ID'], name='idx_institute_sync'),
+        ),
+        migrations.AddIndex(
+            model_name='language',
+            index=models.Index(fields=['UPDATED_AT', 'LANGUAGE_ID'], name='idx_language_sync'),
+        ),
+        migrations.AddIndex(
+            model_name='program',
+            index=models.Index(fields=['UPDATED_AT', 'PROGRAM_ID'], name='idx_program_sync'),
+        ),
+        migrations.AddIndex(
+            model_name='quota_master',
+            index=models.Index(fields=['UPDATED_AT', 'QUOTA_ID'], name='idx_quota_master_sync'),
+        ),
+        migrations.AddIndex(
+            model_name='semester',
+            index=models.Index(fields=['UPDATED_AT', 'SEMESTER_ID'], name='idx_semester_sync'),
+        ),
+        migrations.AddIndex(
+            model_name='semester_duration',
+            index=models.Index(fields=['UPDATED_AT', 'SEMESTER_DURATION_ID'], name='idx_semester_duration_sync'),
+        ),
+        migrations.AddIndex(
+            model_name='state',
+            index=models.Index(fields=['UPDATED_AT', 'STATE_ID'], name='idx_state_sync'),
+        ),
+        migrations.AddIndex(
+            model_name='university',
+            index=models.Index(fields=['UPDATED_AT', 'UNIVERSITY_ID'], name='idx_university_sync'),
+        ),
+        migrations.AddIndex(
+            model_name='year',
+            index=models.Index(fields=['UPDATED_AT', 'YEAR_ID'], name='idx_year_sync'),
+        ),
+    ]
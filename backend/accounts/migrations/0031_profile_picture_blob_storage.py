@@ -0,0 +1,19 @@
+# Generated by Django 4.2.7 on 2026-10-19 15:53
+
+import core.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0030_sync_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='customuser',
+            name='PROFILE_PICTURE',
+            field=models.ImageField(blank=True, db_column='PROFILE_PICTURE', null=True, storage=core.storage.media_blob_storage, upload_to='profile_pics/'),
+        ),
+    ]
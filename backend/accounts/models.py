@@ -4,9 +4,31 @@ from django.utils import timezone
 import random
 import string
 from core.models import AuditModel
+from core.storage import media_blob_storage
 from django.contrib.auth.models import AbstractUser, BaseUserManager
 import secrets
 from datetime import datetime, timedelta
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+import os
+from django.conf import settings
+from django.db import transaction
+
+# Number of previous passwords a user may not reuse
+PASSWORD_HISTORY_DEPTH = 5
+
+_history_pool = None
+
+
+def _password_history_pool():
+    """Shared pool for history checks so concurrent resets can't exhaust the CPU."""
+    global _history_pool
+    if _history_pool is None:
+        workers = getattr(settings, 'PASSWORD_HISTORY_CHECK_WORKERS', None) or os.cpu_count() or 1
+        _history_pool = ThreadPoolExecutor(
+            max_workers=max(workers, 1), thread_name_prefix='password-history'
+        )
+    return _history_pool
 
 class CustomUserManager(BaseUserManager):
     def get_by_natural_key(self, username):
@@ -88,6 +110,9 @@ class DESIGNATION(AuditModel):
         db_table = 'DESIGNATIONS'
         verbose_name = 'Designation'
         verbose_name_plural = 'Designations'
+        indexes = [
+            models.Index(fields=['UPDATED_AT', 'DESIGNATION_ID'], name='idx_designation_sync'),
+        ]
 
     def __str__(self):
         return f"{self.DESIGNATION_ID} - {self.NAME}"
@@ -155,7 +180,7 @@ class CustomUser(AbstractUser):
         related_name='users'
     )
     PHONE_NUMBER = models.CharField(max_length=15, null=True, blank=True, db_column='PHONE_NUMBER')
-    PROFILE_PICTURE = models.ImageField(upload_to='profile_pics/', null=True, blank=True, db_column='PROFILE_PICTURE')
+    PROFILE_PICTURE = models.ImageField(upload_to='profile_pics/', storage=media_blob_storage, null=True, blank=True, db_column='PROFILE_PICTURE')
 
     # Status fields
     IS_ACTIVE = models.BooleanField(default=True, db_column='IS_ACTIVE')
@@ -262,11 +287,43 @@ class CustomUser(AbstractUser):
         return self.USERNAME
 
     def check_password_history(self, raw_password):
-        """Check if password exists in user's password history"""
-        for history in self.password_history.all()[:5]:
-            if check_password(raw_password, history.PASSWORD):
-                return False
-        return True
+        """
+        Check if password exists in user's password history.
+
+        The stored hashes are verified concurrently on a shared, bounded pool
+        (PBKDF2 releases the GIL) and the whole check is capped by
+        PASSWORD_HISTORY_CHECK_BUDGET seconds. Returns True when the password
+        is not in the history; raises ValueError if the history could not be
+        verified within the budget.
+        """
+        hashes = list(
+            PASSWORD_HISTORY.objects.filter(USER_id=self.pk)
+            .order_by('-CREATED_AT', '-PASSWORD_HISTORY_ID')
+            .values_list('PASSWORD', flat=True)[:PASSWORD_HISTORY_DEPTH]
+        )
+        if not hashes:
+            return True
+
+        budget = getattr(settings, 'PASSWORD_HISTORY_CHECK_BUDGET', 2.0)
+        deadline = time.monotonic() + budget
+        pending = {
+            _password_history_pool().submit(check_password, raw_password, encoded)
+            for encoded in hashes
+        }
+        try:
+            while pending:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise ValueError(
+                        "Password history could not be verified in time. Please try again."
+                    )
+                done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+                if any(future.result() for future in done):
+                    return False
+            return True
+        finally:
+            for future in pending:
+                future.cancel()
 
     def set_password(self, raw_password):
         """Override set_password to include password history"""
@@ -274,25 +331,29 @@ class CustomUser(AbstractUser):
             return
 
         # Only check password history if user already exists
-        if self.pk and not self.check_password_history(raw_password):
-            raise ValueError("Cannot reuse any of your last 5 passwords")
+        if self.pk and not self._state.adding and not self.check_password_history(raw_password):
+            raise ValueError(f"Cannot reuse any of your last {PASSWORD_HISTORY_DEPTH} passwords")
 
         self.PASSWORD = make_password(raw_password)
         self.PASSWORD_CHANGED_AT = timezone.now()
         
         # Don't save or create password history during initial user creation
         if not self._state.adding:  # Only if this is an update, not a new user
-            self.save()
-            
-            PASSWORD_HISTORY.objects.create(
-                USER=self,
-                PASSWORD=self.PASSWORD
-            )
-            
-            # Keep only last 5 passwords
-            old_passwords = self.password_history.all()[5:]
-            for old_password in old_passwords:
-                old_password.delete()
+            with transaction.atomic():
+                self.save(update_fields=['PASSWORD', 'PASSWORD_CHANGED_AT'])
+
+                PASSWORD_HISTORY.objects.create(
+                    USER=self,
+                    PASSWORD=self.PASSWORD
+                )
+
+                # Keep only the last PASSWORD_HISTORY_DEPTH passwords, in one DELETE
+                keep = PASSWORD_HISTORY.objects.filter(USER_id=self.pk).order_by(
+                    '-CREATED_AT', '-PASSWORD_HISTORY_ID'
+                ).values('PASSWORD_HISTORY_ID')[:PASSWORD_HISTORY_DEPTH]
+                PASSWORD_HISTORY.objects.filter(USER_id=self.pk).exclude(
+                    PASSWORD_HISTORY_ID__in=keep
+                ).delete()
 
     def check_password(self, raw_password):
         return check_password(raw_password, self.PASSWORD)
@@ -508,22 +569,25 @@ class CustomUser(AbstractUser):
         return cls.EMAIL_FIELD
 
     def save(self, *args, **kwargs):
-        if self.pk:  # If this is an update
+        # Store all audit fields
+        audit_fields = [
+            'LAST_LOGIN_ATTEMPT',
+            'LAST_FAILED_LOGIN',
+            'LAST_LOGIN_IP',
+            'FAILED_LOGIN_ATTEMPTS',
+            'IS_LOCKED',
+            'LOCKED_UNTIL',
+            'PERMANENT_LOCK',
+            'LOCK_REASON',
+            'OTP_BLOCKED_UNTIL'
+        ]
+        update_fields = kwargs.get('update_fields')
+        # Partial saves that don't touch the audit fields can skip the lookup
+        if self.pk and not self._state.adding and (
+                update_fields is None or set(update_fields) & set(audit_fields)):
             try:
                 old_instance = self.__class__.objects.filter(pk=self.pk).first()
                 if old_instance:
-                    # Store all audit fields
-                    audit_fields = [
-                        'LAST_LOGIN_ATTEMPT',
-                        'LAST_FAILED_LOGIN',
-                        'LAST_LOGIN_IP',
-                        'FAILED_LOGIN_ATTEMPTS',
-                        'IS_LOCKED',
-                        'LOCKED_UNTIL',
-                        'PERMANENT_LOCK',
-                        'LOCK_REASON',
-                        'OTP_BLOCKED_UNTIL'
-                    ]
                     # Preserve existing audit field values
                     for field in audit_fields:
                         current_value = getattr(self, field, None)
@@ -553,6 +617,9 @@ class UNIVERSITY(AuditModel):
         db_table = 'UNIVERSITIES'
         verbose_name = 'University'
         verbose_name_plural = 'Universities'
+        indexes = [
+            models.Index(fields=['UPDATED_AT', 'UNIVERSITY_ID'], name='idx_university_sync'),
+        ]
 
     def __str__(self):
         return f"{self.CODE} - {self.NAME}"
@@ -580,6 +647,9 @@ class INSTITUTE(AuditModel):
         db_table = 'INSTITUTES'
         verbose_name = 'Institute'
         verbose_name_plural = 'Institutes'
+        indexes = [
+            models.Index(fields=['UPDATED_AT', 'INSTITUTE_ID'], name='idx_institute_sync'),
+        ]
 
     def __str__(self):
         return f"{self.CODE} - {self.NAME}"
@@ -628,6 +698,9 @@ class PROGRAM(AuditModel):
         verbose_name = 'Program'
         verbose_name_plural = 'Programs'
         unique_together = [['INSTITUTE', 'CODE']]  # Allow same CODE in different institutes
+        indexes = [
+            models.Index(fields=['UPDATED_AT', 'PROGRAM_ID'], name='idx_program_sync'),
+        ]
 
     def __str__(self):
         return f"{self.CODE} - {self.NAME}"
@@ -647,6 +720,9 @@ class DEPARTMENT(AuditModel):
         db_table = 'DEPARTMENTS'
         verbose_name = 'Department'
         verbose_name_plural = 'Departments'
+        indexes = [
+            models.Index(fields=['UPDATED_AT', 'DEPARTMENT_ID'], name='idx_department_sync'),
+        ]
 
     def __str__(self):
         return f"{self.CODE} - {self.NAME}"
@@ -676,6 +752,9 @@ class BRANCH(AuditModel):
         verbose_name = 'Branch'
         verbose_name_plural = 'Branches'
         unique_together = [['PROGRAM', 'CODE']]
+        indexes = [
+            models.Index(fields=['UPDATED_AT', 'BRANCH_ID'], name='idx_branch_sync'),
+        ]
 
     def __str__(self):
         return f"{self.CODE} - {self.NAME}"
@@ -696,6 +775,9 @@ class YEAR(AuditModel):
         verbose_name = 'Year'
         verbose_name_plural = 'Years'
         unique_together = [['BRANCH', 'YEAR']]
+        indexes = [
+            models.Index(fields=['UPDATED_AT', 'YEAR_ID'], name='idx_year_sync'),
+        ]
 
     def _str_(self):
         return f"{self.YEAR_ID} - {self.YEAR}"
@@ -716,6 +798,9 @@ class SEMESTER(AuditModel):
         verbose_name = 'Semester'
         verbose_name_plural = 'Semesters'
         unique_together = [['YEAR', 'SEMESTER']]
+        indexes = [
+            models.Index(fields=['UPDATED_AT', 'SEMESTER_ID'], name='idx_semester_sync'),
+        ]
 
     def _str_(self):
         return f"{self.SEMESTER_ID} - {self.SEMESTER}"
@@ -733,6 +818,9 @@ class COUNTRY(AuditModel):
         db_table = 'COUNTRIES'
         verbose_name = 'Country'
         verbose_name_plural = 'Countries'
+        indexes = [
+            models.Index(fields=['UPDATED_AT', 'COUNTRY_ID'], name='idx_country_sync'),
+        ]
 
     def __str__(self):
         return f"{self.CODE} - {self.NAME}"
@@ -758,6 +846,9 @@ class STATE(AuditModel):
         verbose_name = 'State'
         verbose_name_plural = 'States'
         unique_together = ('COUNTRY', 'CODE')
+        indexes = [
+            models.Index(fields=['UPDATED_AT', 'STATE_ID'], name='idx_state_sync'),
+        ]
 
     def __str__(self):
         return f"{self.CODE} - {self.NAME}"
@@ -781,6 +872,9 @@ class CITY(AuditModel):
         verbose_name = 'City'
         verbose_name_plural = 'Cities'
         unique_together = ('STATE', 'CODE')
+        indexes = [
+            models.Index(fields=['UPDATED_AT', 'CITY_ID'], name='idx_city_sync'),
+        ]
 
     def __str__(self):
         return f"{self.CODE} - {self.NAME}"
@@ -798,6 +892,9 @@ class CURRENCY(AuditModel):
         db_table = 'CURRENCIES'
         verbose_name = 'Currency'
         verbose_name_plural = 'Currencies'
+        indexes = [
+            models.Index(fields=['UPDATED_AT', 'CURRENCY_ID'], name='idx_currency_sync'),
+        ]
 
     def __str__(self):
         return f"{self.CODE} ({self.SYMBOL})"
@@ -814,6 +911,9 @@ class LANGUAGE(AuditModel):
         db_table = 'LANGUAGES'
         verbose_name = 'Language'
         verbose_name_plural = 'Languages'
+        indexes = [
+            models.Index(fields=['UPDATED_AT', 'LANGUAGE_ID'], name='idx_language_sync'),
+        ]
 
     def __str__(self):
         return f"{self.CODE} - {self.NAME}"
@@ -837,6 +937,9 @@ class CATEGORY(AuditModel):
         db_table = 'CATEGORIES'
         verbose_name = 'Category'
         verbose_name_plural = 'Categories'
+        indexes = [
+            models.Index(fields=['UPDATED_AT', 'CATEGORY_ID'], name='idx_category_sync'),
+        ]
     def __str__(self):
         return f"{self.CODE} - {self.NAME}"
 
@@ -871,6 +974,9 @@ class SEMESTER_DURATION(AuditModel):
         db_table = 'SEMESTER_DURATION'
         verbose_name = 'Semester Duration'
         verbose_name_plural = 'Semester Durations'
+        indexes = [
+            models.Index(fields=['UPDATED_AT', 'SEMESTER_DURATION_ID'], name='idx_semester_duration_sync'),
+        ]
 
     def __str__(self):
         return f"{self.SEMESTER} ({self.START_DATE} - {self.END_DATE})"
@@ -883,6 +989,9 @@ class CASTE_MASTER(AuditModel):
         db_table = 'CASTE_MASTER'
         verbose_name = 'Caste Master'
         verbose_name_plural = 'Caste Masters'
+        indexes = [
+            models.Index(fields=['UPDATED_AT', 'CASTE_ID'], name='idx_caste_master_sync'),
+        ]
 
     def __str__(self):
         return f"{self.NAME} - {self.CASTE_ID}"
@@ -895,6 +1004,9 @@ class QUOTA_MASTER(AuditModel):
         db_table = 'QUOTA_MASTER'
         verbose_name = 'Quota Master'
         verbose_name_plural = 'Quota Masters'
+        indexes = [
+            models.Index(fields=['UPDATED_AT', 'QUOTA_ID'], name='idx_quota_master_sync'),
+        ]
 
     def __str__(self):
         return f"{self.NAME} - {self.QUOTA_ID}"
@@ -907,6 +1019,9 @@ class ADMISSION_QUOTA_MASTER(AuditModel):
         db_table = 'ADMISSION_QUOTA_MASTER'
         verbose_name = 'Admission Quota Master'
         verbose_name_plural = 'Admission Quota Masters'
+        indexes = [
+            models.Index(fields=['UPDATED_AT', 'ADMN_QUOTA_ID'], name='idx_admission_quota_mast_sync'),
+        ]
 
     def __str__(self):
         return f"{self.NAME} - {self.ADMN_QUOTA_ID}"
@@ -5,9 +5,9 @@ class HasFormPermission(permissions.BasePermission):
     """
     Granular permission check for form-based actions.
     Maps DRF actions to internal permission flags:
-    - create -> CAN_ADD
-    - update, partial_update -> CAN_EDIT
-    - destroy -> CAN_DELETE
+    - create, bulk_create -> CAN_ADD
+    - update, partial_update, bulk_update, bulk_replace -> CAN_EDIT
+    - destroy, bulk_destroy -> CAN_DELETE
     - list, retrieve -> CAN_VIEW
     """
     
@@ -49,11 +49,11 @@ class HasFormPermission(permissions.BasePermission):
             if not permission:
                 return False
                 
-            if action == 'create':
+            if action in ['create', 'bulk_create']:
                 return permission.CAN_ADD
-            elif action in ['update', 'partial_update']:
+            elif action in ['update', 'partial_update', 'bulk_update', 'bulk_replace']:
                 return permission.CAN_EDIT
-            elif action == 'destroy':
+            elif action in ['destroy', 'bulk_destroy']:
                 return permission.CAN_DELETE
             elif action in ['list', 'retrieve', 'search']:
                 return permission.CAN_VIEW
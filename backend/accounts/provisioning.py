@@ -0,0 +1,271 @@
+"""
+Bulk user provisioning.
+
+Creating accounts one at a time through CustomUser.objects.create() +
+set_password() + save() costs three round trips and one full PBKDF2 hash per
+user, all on the request thread. For intake batches (a whole admission year
+of students, a faculty import) this module hashes the passwords across a
+process pool, inserts the users with bulk_create() in one transaction and
+sends the credential mails over a single SMTP connection once the
+transaction has committed.
+"""
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.db.models import Q
+from django.db.models.functions import Lower
+from django.utils import timezone
+
+from .models import CustomUser, DESIGNATION, MENU_ITEM_MASTER, USER_FORM_PERMISSION
+from .signals import DEFAULT_ADMIN_MENU_IDS
+
+logger = logging.getLogger(__name__)
+
+# Passwords handed to each worker per task; large enough to amortise the
+# pickling overhead, small enough to keep every worker busy until the end.
+HASH_CHUNK_SIZE = 32
+
+# Below this many passwords the pool start-up costs more than it saves.
+MIN_PARALLEL_BATCH = 8
+
+BULK_CREATE_BATCH_SIZE = 1000
+
+
+def _init_hash_worker():
+    """Configure Django in pool workers started with the spawn method (Windows/macOS)."""
+    import django
+    from django.apps import apps
+
+    if not apps.ready:
+        django.setup()
+
+
+def _hash_chunk(passwords):
+    return [make_password(password) for password in passwords]
+
+
+def hash_passwords(passwords, workers=None):
+    """
+    Hash raw passwords with the configured hasher, spreading the work over a
+    process pool. The result preserves the order of the input.
+    """
+    passwords = list(passwords)
+    if not passwords:
+        return []
+
+    if workers is None:
+        workers = getattr(settings, 'PROVISIONING_HASH_WORKERS', None) or os.cpu_count() or 1
+    workers = max(1, min(workers, len(passwords)))
+
+    if workers == 1 or len(passwords) < MIN_PARALLEL_BATCH:
+        return _hash_chunk(passwords)
+
+    chunks = [
+        passwords[i:i + HASH_CHUNK_SIZE]
+        for i in range(0, len(passwords), HASH_CHUNK_SIZE)
+    ]
+    hashed = []
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_hash_worker) as pool:
+        for part in pool.map(_hash_chunk, chunks):
+            hashed.extend(part)
+    return hashed
+
+
+def _resolve_designations(values):
+    """Map the designation references used in the input (id, CODE or NAME) to DESIGNATION rows."""
+    ids = set()
+    labels = set()
+    for value in values:
+        if value in (None, ''):
+            continue
+        if isinstance(value, int) or str(value).isdigit():
+            ids.add(int(value))
+        else:
+            labels.add(str(value).strip().upper())
+
+    if not ids and not labels:
+        return {}
+
+    query = Q(DESIGNATION_ID__in=ids)
+    for label in labels:
+        query |= Q(CODE__iexact=label) | Q(NAME__iexact=label)
+
+    resolved = {}
+    for designation in DESIGNATION.objects.filter(query):
+        resolved[designation.DESIGNATION_ID] = designation
+        resolved[str(designation.DESIGNATION_ID)] = designation
+        resolved[designation.CODE.upper()] = designation
+        resolved[designation.NAME.upper()] = designation
+    return resolved
+
+
+def _lookup_designation(resolved, value):
+    if value in (None, ''):
+        return None
+    if isinstance(value, int):
+        return resolved.get(value)
+    return resolved.get(str(value).strip().upper())
+
+
+def _validate_records(records):
+    """
+    Normalise the input rows and split them into valid rows and per-row
+    errors. Uniqueness against the database is checked with one query per
+    unique column instead of one per row.
+    """
+    rows = []
+    errors = []
+    seen = {'USER_ID': set(), 'USERNAME': set(), 'EMAIL': set()}
+
+    for index, record in enumerate(records):
+        row = {
+            'USER_ID': str(record.get('USER_ID') or '').strip(),
+            'USERNAME': str(record.get('USERNAME') or '').strip(),
+            'EMAIL': str(record.get('EMAIL') or '').strip().lower(),
+            'DESIGNATION': record.get('DESIGNATION'),
+            'FIRST_NAME': str(record.get('FIRST_NAME') or '').strip(),
+            'LAST_NAME': str(record.get('LAST_NAME') or '').strip(),
+            'PASSWORD': record.get('PASSWORD') or None,
+        }
+        row_errors = {}
+        for field in ('USER_ID', 'USERNAME', 'EMAIL'):
+            if not row[field]:
+                row_errors[field] = 'This field is required.'
+            elif row[field] in seen[field]:
+                row_errors[field] = 'Duplicate value in this batch.'
+        if row_errors:
+            errors.append({'index': index, 'USER_ID': row['USER_ID'], 'errors': row_errors})
+            continue
+
+        for field in seen:
+            seen[field].add(row[field])
+        row['index'] = index
+        rows.append(row)
+
+    existing = {
+        'USER_ID': set(CustomUser.objects.filter(
+            USER_ID__in=seen['USER_ID']).values_list('USER_ID', flat=True)),
+        'USERNAME': set(CustomUser.objects.filter(
+            USERNAME__in=seen['USERNAME']).values_list('USERNAME', flat=True)),
+        # Stored addresses keep whatever case they were entered in
+        'EMAIL': set(CustomUser.objects.annotate(email=Lower('EMAIL')).filter(
+            email__in=seen['EMAIL']).values_list('email', flat=True)),
+    }
+
+    designations = _resolve_designations(row['DESIGNATION'] for row in rows)
+
+    valid = []
+    for row in rows:
+        row_errors = {
+            field: 'A user with this value already exists.'
+            for field in existing if row[field] in existing[field]
+        }
+        reference = row['DESIGNATION']
+        row['DESIGNATION'] = _lookup_designation(designations, reference)
+        if reference not in (None, '') and row['DESIGNATION'] is None:
+            row_errors['DESIGNATION'] = f'Unknown designation: {reference}'
+        if row_errors:
+            errors.append({'index': row['index'], 'USER_ID': row['USER_ID'], 'errors': row_errors})
+        else:
+            valid.append(row)
+
+    return valid, errors
+
+
+def _grant_default_admin_permissions(users):
+    """
+    bulk_create() does not send post_save, so replicate
+    assign_default_admin_permissions for the ADMIN users of the batch.
+    """
+    admins = [
+        user for user in users
+        if user.DESIGNATION and user.DESIGNATION.NAME.upper() == 'ADMIN'
+    ]
+    if not admins:
+        return
+
+    menu_items = list(MENU_ITEM_MASTER.objects.filter(MENU_ID__in=DEFAULT_ADMIN_MENU_IDS))
+    USER_FORM_PERMISSION.objects.bulk_create(
+        [
+            USER_FORM_PERMISSION(
+                USER=user,
+                MENU_ITEM=menu_item,
+                CAN_VIEW=True,
+                CAN_ADD=True,
+                CAN_EDIT=True,
+                CAN_DELETE=True,
+                CREATED_BY='system',
+                UPDATED_BY='system',
+            )
+            for user in admins
+            for menu_item in menu_items
+        ],
+        batch_size=BULK_CREATE_BATCH_SIZE,
+        ignore_conflicts=True,
+    )
+
+
+def provision_users(records, send_emails=True, workers=None):
+    """
+    Create user accounts in bulk.
+
+    records: iterable of dicts with USER_ID, USERNAME, EMAIL and DESIGNATION
+    (DESIGNATION_ID, CODE or NAME) keys, plus optional FIRST_NAME, LAST_NAME
+    and PASSWORD. Rows without a PASSWORD get a generated one.
+
+    Returns a dict with the created USER_IDs and the rows that were skipped
+    together with their validation errors. Nothing is written if the insert
+    fails; credential mails are only sent after the transaction commits.
+    """
+    from utils.email_sender import send_credentials_emails
+    from utils.id_generators import generate_password
+
+    rows, errors = _validate_records(list(records))
+    if not rows:
+        return {'created': [], 'skipped': errors, 'emails_queued': 0}
+
+    raw_passwords = [row['PASSWORD'] or generate_password(8) for row in rows]
+    hashed_passwords = hash_passwords(raw_passwords, workers=workers)
+
+    now = timezone.now()
+    users = [
+        CustomUser(
+            USER_ID=row['USER_ID'],
+            USERNAME=row['USERNAME'],
+            EMAIL=row['EMAIL'],
+            FIRST_NAME=row['FIRST_NAME'],
+            LAST_NAME=row['LAST_NAME'],
+            DESIGNATION=row['DESIGNATION'],
+            PASSWORD=hashed,
+            PASSWORD_CHANGED_AT=now,
+            IS_ACTIVE=True,
+        )
+        for row, hashed in zip(rows, hashed_passwords)
+    ]
+
+    credentials = [
+        {
+            'email': row['EMAIL'],
+            'user_id': row['USER_ID'],
+            'username': row['USERNAME'],
+            'password': raw,
+        }
+        for row, raw in zip(rows, raw_passwords)
+    ]
+
+    with transaction.atomic():
+        CustomUser.objects.bulk_create(users, batch_size=BULK_CREATE_BATCH_SIZE)
+        _grant_default_admin_permissions(users)
+        if send_emails:
+            transaction.on_commit(lambda: send_credentials_emails(credentials))
+
+    logger.info("Provisioned %s users (%s skipped)", len(users), len(errors))
+    return {
+        'created': [user.USER_ID for user in users],
+        'skipped': errors,
+        'emails_queued': len(credentials) if send_emails else 0,
+    }
@@ -1,6 +1,7 @@
 from rest_framework import serializers
 from .models import COUNTRY, STATE, CITY, CURRENCY, LANGUAGE, DESIGNATION, CATEGORY, UNIVERSITY, INSTITUTE, DEPARTMENT, PROGRAM, BRANCH, YEAR, SEMESTER, SEMESTER_DURATION, DASHBOARD_MASTER, CASTE_MASTER, QUOTA_MASTER, ADMISSION_QUOTA_MASTER, MENU_ITEM_MASTER, USER_FORM_PERMISSION 
 from academic.models import ACADEMIC_YEAR
+from core.schedule import check_overlap
 
 class CountrySerializer(serializers.ModelSerializer):
     class Meta:
@@ -156,6 +157,11 @@ class SemesterDurationSerializer(serializers.ModelSerializer):
     class Meta:
         model = SEMESTER_DURATION
         fields = ['SEMESTER', 'START_DATE', 'END_DATE', 'IS_ACTIVE', 'CREATED_BY', 'UPDATED_BY']
+
+    def validate(self, attrs):
+        semester = attrs['SEMESTER'] if 'SEMESTER' in attrs else getattr(self.instance, 'SEMESTER', None)
+        check_overlap('semester-duration', attrs, self.instance, scope=semester)
+        return attrs
         
 
 class CasteSerializer(serializers.ModelSerializer):
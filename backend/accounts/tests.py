@@ -1,6 +1,55 @@
-from django.test import TestCase
+from django.contrib.auth.hashers import check_password
+from django.test import TestCase, override_settings
+
+from .models import PASSWORD_HISTORY, PASSWORD_HISTORY_DEPTH, CustomUser
+from .provisioning import provision_users
 
 class BasicTest(TestCase):
     def test_basic(self):
         """Basic test to ensure test setup works"""
         self.assertEqual(1 + 1, 2)
+
+
+class ProvisionUsersTest(TestCase):
+    def test_existing_email_matches_in_any_case(self):
+        CustomUser.objects.create(USER_ID='F001', USERNAME='asha', EMAIL='Asha.Patil@Example.com')
+        result = provision_users([
+            {'USER_ID': 'F002', 'USERNAME': 'asha2', 'EMAIL': 'asha.patil@example.COM'},
+            {'USER_ID': 'F003', 'USERNAME': 'ravi', 'EMAIL': 'Ravi@Example.com', 'PASSWORD': 'Secret#123'},
+        ], send_emails=False, workers=1)
+
+        self.assertEqual(result['created'], ['F003'])
+        self.assertEqual([row['USER_ID'] for row in result['skipped']], ['F002'])
+        self.assertIn('EMAIL', result['skipped'][0]['errors'])
+        user = CustomUser.objects.get(USER_ID='F003')
+        self.assertEqual(user.EMAIL, 'ravi@example.com')
+        self.assertTrue(check_password('Secret#123', user.PASSWORD))
+
+    def test_duplicates_within_a_batch_are_skipped(self):
+        result = provision_users([
+            {'USER_ID': 'F010', 'USERNAME': 'one', 'EMAIL': 'one@example.com'},
+            {'USER_ID': 'F010', 'USERNAME': 'two', 'EMAIL': 'two@example.com'},
+        ], send_emails=False, workers=1)
+        self.assertEqual(result['created'], ['F010'])
+        self.assertEqual(result['skipped'][0]['errors'], {'USER_ID': 'Duplicate value in this batch.'})
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class PasswordHistoryTest(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create(USER_ID='F001', USERNAME='asha', EMAIL='asha@example.com')
+        for number in range(PASSWORD_HISTORY_DEPTH + 1):
+            self.user.set_password(f'Secret#{number}')
+
+    def test_history_is_trimmed_and_enforced(self):
+        self.assertEqual(PASSWORD_HISTORY.objects.filter(USER=self.user).count(), PASSWORD_HISTORY_DEPTH)
+        with self.assertRaisesMessage(ValueError, 'Cannot reuse'):
+            self.user.set_password('Secret#1')
+        # The oldest password has dropped out of the history
+        self.user.set_password('Secret#0')
+        self.assertTrue(self.user.check_password('Secret#0'))
+
+    @override_settings(PASSWORD_HISTORY_CHECK_BUDGET=0)
+    def test_check_gives_up_after_its_budget(self):
+        with self.assertRaisesMessage(ValueError, 'could not be verified in time'):
+            self.user.check_password_history('Secret#9')
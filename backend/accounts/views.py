@@ -42,6 +42,8 @@ from django.http import JsonResponse
 from django.db import connection
 import logging  # Add this at the top with other imports
 from establishments.models import EMPLOYEE_MASTER  # Add this import
+from core.bulk import BulkActionsMixin
+from core.images import photo_urls
 
 logger = logging.getLogger(__name__)  # Add this after imports
 
@@ -292,7 +294,10 @@ class VerifyOTPView(APIView):
                     'message': message,
                     'token': str(refresh.access_token),
                     'refresh': str(refresh),
-                    'user': session_data
+                    'user': {
+                        **session_data,
+                        'photo_urls': photo_urls('user', user.USER_ID, user.PROFILE_PICTURE, request),
+                    }
                 }, status=status.HTTP_200_OK)
             
             return Response({
@@ -420,9 +425,15 @@ class ResetPasswordView(APIView):
                 }, status=status.HTTP_400_BAD_REQUEST)
             
             # Set new password
-            user.set_password(new_password)
+            try:
+                user.set_password(new_password)
+            except ValueError as e:
+                return Response({
+                    'status': 'error',
+                    'message': str(e)
+                }, status=status.HTTP_400_BAD_REQUEST)
             user.OTP_SECRET = None  # Clear OTP after successful password reset
-            user.save()
+            user.save(update_fields=['OTP_SECRET'])
             
             return Response({
                 'status': 'success',
@@ -521,7 +532,7 @@ class BaseModelViewSet(viewsets.ModelViewSet):
         return queryset
 
 # Update all ViewSets to inherit from BaseModelViewSet
-class CountryViewSet(BaseModelViewSet):
+class CountryViewSet(BulkActionsMixin, BaseModelViewSet):
     queryset = COUNTRY.objects.all()
     serializer_class = CountrySerializer
 
@@ -530,7 +541,7 @@ class CountryViewSet(BaseModelViewSet):
         serializer = self.get_serializer(countries, many=True)
         return Response(serializer.data)
 
-class StateViewSet(BaseModelViewSet):
+class StateViewSet(BulkActionsMixin, BaseModelViewSet):
     queryset = STATE.objects.all()
     serializer_class = StateSerializer
 
@@ -539,7 +550,7 @@ class StateViewSet(BaseModelViewSet):
         serializer = self.get_serializer(states, many=True)
         return Response(serializer.data)
 
-class CityViewSet(BaseModelViewSet):
+class CityViewSet(BulkActionsMixin, BaseModelViewSet):
     queryset = CITY.objects.all()
     serializer_class = CitySerializer
 
@@ -548,7 +559,7 @@ class CityViewSet(BaseModelViewSet):
         serializer = self.get_serializer(cities, many=True)
         return Response(serializer.data)
 
-class CurrencyViewSet(BaseModelViewSet):
+class CurrencyViewSet(BulkActionsMixin, BaseModelViewSet):
     queryset = CURRENCY.objects.all()
     serializer_class = CurrencySerializer
 
@@ -557,7 +568,7 @@ class CurrencyViewSet(BaseModelViewSet):
         serializer = self.get_serializer(currencies, many=True)
         return Response(serializer.data)
 
-class LanguageViewSet(BaseModelViewSet):
+class LanguageViewSet(BulkActionsMixin, BaseModelViewSet):
     queryset = LANGUAGE.objects.all()
     serializer_class = LanguageSerializer
 
@@ -566,7 +577,7 @@ class LanguageViewSet(BaseModelViewSet):
         serializer = self.get_serializer(languages, many=True)
         return Response(serializer.data)
 
-class DesignationViewSet(BaseModelViewSet):
+class DesignationViewSet(BulkActionsMixin, BaseModelViewSet):
     queryset = DESIGNATION.objects.all()
     serializer_class = DesignationSerializer
 
@@ -575,7 +586,7 @@ class DesignationViewSet(BaseModelViewSet):
         serializer = self.get_serializer(designations, many=True)
         return Response(serializer.data)
 
-class CategoryViewSet(BaseModelViewSet):
+class CategoryViewSet(BulkActionsMixin, BaseModelViewSet):
     queryset = CATEGORY.objects.all()
     serializer_class = CategorySerializer
     menu_item_path = '/dashboard/master'
@@ -642,7 +653,7 @@ class CategoryViewSet(BaseModelViewSet):
         return Response(serializer.data)
     
 
-class UniversityViewSet(BaseModelViewSet):
+class UniversityViewSet(BulkActionsMixin, BaseModelViewSet):
     queryset = UNIVERSITY.objects.all()
     serializer_class = UniversitySerializer
 
@@ -651,7 +662,7 @@ class UniversityViewSet(BaseModelViewSet):
         serializer = self.get_serializer(universities, many=True)
         return Response(serializer.data)
 
-class InstituteViewSet(BaseModelViewSet):
+class InstituteViewSet(BulkActionsMixin, BaseModelViewSet):
     queryset = INSTITUTE.objects.all()
     serializer_class = InstituteSerializer
     
@@ -690,13 +701,13 @@ class InstituteViewSet(BaseModelViewSet):
         return Response(serializer.data)
 
             
-class AcademicYearViewSet(BaseModelViewSet):
+class AcademicYearViewSet(BulkActionsMixin, BaseModelViewSet):
     queryset = ACADEMIC_YEAR.objects.all()
     serializer_class = AcademicYearSerializer
 
     pass
    
-class DepartmentViewSet(BaseModelViewSet):
+class DepartmentViewSet(BulkActionsMixin, BaseModelViewSet):
     queryset = DEPARTMENT.objects.all()
     serializer_class = DepartmentSerializer
 
@@ -705,7 +716,7 @@ class DepartmentViewSet(BaseModelViewSet):
         serializer = self.get_serializer(departments, many=True)
         return Response(serializer.data)
     
-class ProgramListCreateView(BaseModelViewSet):
+class ProgramListCreateView(BulkActionsMixin, BaseModelViewSet):
     queryset = PROGRAM.objects.all()
     serializer_class = ProgramSerializer
     permission_classes = [IsAuthenticated, HasFormPermission]
@@ -742,7 +753,7 @@ class ProgramTableListView(View):
 
 
 
-class BranchListCreateView(BaseModelViewSet):
+class BranchListCreateView(BulkActionsMixin, BaseModelViewSet):
     queryset = BRANCH.objects.all().select_related("PROGRAM") 
     serializer_class = BranchSerializer
 
@@ -837,7 +848,7 @@ class LogoutView(APIView):
                 'message': 'Error during logout'
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
             
-class YearListCreateView(BaseModelViewSet):
+class YearListCreateView(BulkActionsMixin, BaseModelViewSet):
     queryset = YEAR.objects.all().select_related("BRANCH")  # ✅ Optimize DB query
     serializer_class = YearSerializer
     
@@ -912,7 +923,7 @@ class YearListCreateView(BaseModelViewSet):
             status=status.HTTP_204_NO_CONTENT,
         )
 
-class SemesterListCreateView(BaseModelViewSet):
+class SemesterListCreateView(BulkActionsMixin, BaseModelViewSet):
     """
     API endpoint for listing and creating Semester records.
     """
@@ -1002,7 +1013,7 @@ class SemesterDurationViewSet(BaseModelViewSet):
         serializer = self.get_serializer(active_semesters, many=True)
         return Response(serializer.data)
 
-class DashboardMasterViewSet(BaseModelViewSet):
+class DashboardMasterViewSet(BulkActionsMixin, BaseModelViewSet):
     queryset = DASHBOARD_MASTER.objects.all()
     serializer_class = DashboardMasterSerializer
     
@@ -1078,15 +1089,15 @@ class DashboardMasterViewSet(BaseModelViewSet):
                 'message': str(e)
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
-class CasteViewSet(BaseModelViewSet):
+class CasteViewSet(BulkActionsMixin, BaseModelViewSet):
     queryset = CASTE_MASTER.objects.all()   
     serializer_class = CasteSerializer
 
-class QuotaViewSet(BaseModelViewSet):
+class QuotaViewSet(BulkActionsMixin, BaseModelViewSet):
     queryset = QUOTA_MASTER.objects.all()
     serializer_class = QuotaSerializer
       
-class AdmissionQuotaViewSet(BaseModelViewSet):
+class AdmissionQuotaViewSet(BulkActionsMixin, BaseModelViewSet):
       queryset = ADMISSION_QUOTA_MASTER.objects.all()   
       serializer_class = AdmissionQuotaSerializer
 
@@ -0,0 +1,25 @@
+# Generated by Django 4.2.7 on 2026-10-19 15:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('committee', '0002_alter_event_master_event_purpose'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='committee_master',
+            index=models.Index(fields=['UPDATED_AT', 'RECORD_ID'], name='idx_committee_master_sync'),
+        ),
+        migrations.AddIndex(
+            model_name='event_master',
+            index=models.Index(fields=['UPDATED_AT', 'RECORD_ID'], name='idx_event_master_sync'),
+        ),
+        migrations.AddIndex(
+            model_name='event_type_master',
+            index=models.Index(fields=['UPDATED_AT', 'RECORD_ID'], name='idx_event_type_master_sync'),
+        ),
+    ]
@@ -16,6 +16,9 @@ class EVENT_TYPE_MASTER(AuditModel):
         db_table =  '"COMMITTEE"."EVENT_TYPE_MASTER"'
         verbose_name = 'Event Type Master'
         verbose_name_plural = 'Event Type Masters'
+        indexes = [
+            models.Index(fields=['UPDATED_AT', 'RECORD_ID'], name='idx_event_type_master_sync'),
+        ]
 
     def __str__(self):
         return f"{self.MAIN_TYPE} - {self.SUBTYPE}"
@@ -35,6 +38,9 @@ class EVENT_MASTER(AuditModel):
         db_table = '"COMMITTEE"."EVENT_MASTER"'
         verbose_name = 'Event Master'
         verbose_name_plural = 'Event Masters'
+        indexes = [
+            models.Index(fields=['UPDATED_AT', 'RECORD_ID'], name='idx_event_master_sync'),
+        ]
 
     def __str__(self):
         return self.EVENT_NAME
@@ -53,6 +59,9 @@ class COMMITTEE_MASTER(AuditModel):
         db_table ='"COMMITTEE"."COMMITTEE_MASTER"'
         verbose_name = 'Committee Master'
         verbose_name_plural = 'Committee Masters'
+        indexes = [
+            models.Index(fields=['UPDATED_AT', 'RECORD_ID'], name='idx_committee_master_sync'),
+        ]
 
     def __str__(self):
         return self.COM_NAME
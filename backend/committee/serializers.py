@@ -1,6 +1,7 @@
 from rest_framework import serializers
 from .models import EVENT_TYPE_MASTER, EVENT_MASTER, COMMITTEE_MASTER
 from django.utils import timezone
+from core.schedule import check_overlap
 
 class EventTypeMasterSerializer(serializers.ModelSerializer):
     class Meta:
@@ -31,3 +32,8 @@ class EventMasterSerializer(serializers.ModelSerializer):
             'EVENT_PURPOSE', 'EVENT_REMARKS'
         ]
 
+    def validate(self, attrs):
+        committee = attrs.get('ORGANIZED_BY') or getattr(self.instance, 'ORGANIZED_BY', None)
+        check_overlap('event', attrs, self.instance, scope=committee.pk if committee else None)
+        return attrs
+
@@ -6,6 +6,7 @@ from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.authentication import TokenAuthentication
 from django.core.mail import send_mail
 from accounts.views import BaseModelViewSet
+from core.bulk import BulkActionsMixin
 from django.conf import settings
 import logging
 from django.http import Http404
@@ -21,11 +22,11 @@ from rest_framework import viewsets
 from .models import EVENT_TYPE_MASTER, EVENT_MASTER, COMMITTEE_MASTER
 from .serializers import EventTypeMasterSerializer, EventMasterSerializer, CommitteeMasterSerializer
 
-class EventTypeMasterViewSet(BaseModelViewSet):
+class EventTypeMasterViewSet(BulkActionsMixin, BaseModelViewSet):
     queryset = EVENT_TYPE_MASTER.objects.all()
     serializer_class = EventTypeMasterSerializer
 
-class CommitteeMasterViewSet(BaseModelViewSet):
+class CommitteeMasterViewSet(BulkActionsMixin, BaseModelViewSet):
     queryset = COMMITTEE_MASTER.objects.all()
     serializer_class = CommitteeMasterSerializer
 
@@ -7,3 +7,12 @@ class CoreConfig(AppConfig):
     def ready(self):
         from .schema import create_schemas
         create_schemas()
+
+        from .images import connect_signals
+        connect_signals()
+
+        from . import schedule
+        schedule.connect_signals()
+
+        from . import storage
+        storage.connect_signals()
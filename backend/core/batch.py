@@ -0,0 +1,179 @@
+"""
+Multi-request batch endpoint.
+
+POST /api/batch/
+    {
+        "parallel": true,
+        "requests": [
+            {"id": "countries", "method": "GET", "path": "/api/master/countries/"},
+            {"id": "states", "method": "GET", "path": "/api/master/states/?country=1"},
+            {"id": "caste", "method": "POST", "path": "/api/master/caste/", "body": {...}}
+        ]
+    }
+
+Sub-requests are dispatched in-process to the same views the URLconf would
+route them to. They reuse the outer request's authenticated user and session,
+so authentication, session loading and the middleware stack run once per
+batch instead of once per call. Each result comes back in request order as
+{"id", "status", "body"}. A failing sub-request never fails the batch.
+
+Writes run one after another in the order given. With "parallel": true, a
+batch made only of GET requests is spread over a small thread pool.
+"""
+import io
+import json
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.handlers.wsgi import WSGIRequest
+from django.db import connections
+from django.urls import Resolver404, resolve
+from rest_framework import status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+logger = logging.getLogger(__name__)
+
+ALLOWED_METHODS = {'GET', 'POST', 'PUT', 'PATCH', 'DELETE'}
+READ_METHODS = {'GET'}
+
+
+def _max_requests():
+    return getattr(settings, 'BATCH_MAX_REQUESTS', 20)
+
+
+def _max_workers():
+    return getattr(settings, 'BATCH_MAX_WORKERS', 4)
+
+
+def _build_request(request, method, path, query, body):
+    """A WSGIRequest for one sub-request that shares the outer request's identity."""
+    raw = b'' if body is None else json.dumps(body).encode()
+    environ = {
+        key: value for key, value in request.META.items()
+        if key not in ('CONTENT_TYPE', 'CONTENT_LENGTH', 'HTTP_IDEMPOTENCY_KEY')
+    }
+    environ.update({
+        'REQUEST_METHOD': method,
+        'PATH_INFO': path,
+        'SCRIPT_NAME': '',
+        'QUERY_STRING': query,
+        'CONTENT_TYPE': 'application/json',
+        'CONTENT_LENGTH': str(len(raw)),
+        'wsgi.input': io.BytesIO(raw),
+    })
+    environ.setdefault('wsgi.url_scheme', request.scheme)
+
+    sub_request = WSGIRequest(environ)
+    sub_request.user = request.user
+    # DRF skips the authenticators when these are set
+    sub_request._force_auth_user = request.user
+    sub_request._force_auth_token = request.auth
+    session = getattr(request._request, 'session', None)
+    if session is not None:
+        sub_request.session = session
+    return sub_request
+
+
+def _response_body(response):
+    if hasattr(response, 'data'):
+        return response.data
+    content = getattr(response, 'content', b'')
+    if 'json' in response.get('Content-Type', ''):
+        try:
+            return json.loads(content or b'null')
+        except ValueError:
+            pass
+    return content.decode(errors='replace')
+
+
+class BatchView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        specs = request.data.get('requests') if isinstance(request.data, dict) else None
+        if not isinstance(specs, list) or not specs:
+            return Response({
+                'status': 'error',
+                'message': 'Expected {"requests": [...]}'
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        if len(specs) > _max_requests():
+            return Response({
+                'status': 'error',
+                'message': f'A batch may contain at most {_max_requests()} requests'
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        errors = []
+        for index, spec in enumerate(specs):
+            error = self._check_spec(request, spec)
+            if error:
+                errors.append({'index': index, 'message': error})
+        if errors:
+            return Response({
+                'status': 'error',
+                'message': 'Invalid sub-requests',
+                'errors': errors
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        parallel = bool(request.data.get('parallel')) and all(
+            spec.get('method', 'GET').upper() in READ_METHODS for spec in specs
+        )
+        if parallel and len(specs) > 1:
+            with ThreadPoolExecutor(max_workers=min(_max_workers(), len(specs))) as pool:
+                results = list(pool.map(lambda spec: self._dispatch_in_thread(request, spec), specs))
+        else:
+            results = [self._dispatch(request, spec) for spec in specs]
+
+        return Response({
+            'status': 'success',
+            'data': results
+        })
+
+    def _check_spec(self, request, spec):
+        if not isinstance(spec, dict):
+            return 'Each sub-request must be an object'
+        method = str(spec.get('method', 'GET')).upper()
+        if method not in ALLOWED_METHODS:
+            return f'Method {method} is not allowed'
+        path = spec.get('path')
+        if not isinstance(path, str) or not path.startswith('/api/'):
+            return 'path must be an /api/ URL'
+        if path.split('?', 1)[0].rstrip('/') == request.path.rstrip('/'):
+            return 'Batches cannot be nested'
+        return None
+
+    def _dispatch_in_thread(self, request, spec):
+        try:
+            return self._dispatch(request, spec)
+        finally:
+            # Worker threads get their own connections; don't leak them
+            connections.close_all()
+
+    def _dispatch(self, request, spec):
+        method = str(spec.get('method', 'GET')).upper()
+        path, _, query = spec['path'].partition('?')
+        result = {'id': spec.get('id'), 'status': None, 'body': None}
+
+        try:
+            match = resolve(path)
+        except Resolver404:
+            result.update(status=status.HTTP_404_NOT_FOUND, body={'detail': 'Not found.'})
+            return result
+
+        sub_request = _build_request(request, method, path, query, spec.get('body'))
+        sub_request.resolver_match = match
+        try:
+            response = match.func(sub_request, *match.args, **match.kwargs)
+        except Exception as e:
+            logger.exception("Batch sub-request %s %s failed: %s", method, path, e)
+            result.update(
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                body={'detail': 'Internal server error.'}
+            )
+            return result
+
+        result.update(status=response.status_code, body=_response_body(response))
+        return result
@@ -0,0 +1,391 @@
+"""
+Bulk create/update/delete actions for the master viewsets.
+
+Opt-in: mixed into the plain master viewsets (countries, branches, castes,
+...) and establishments.views.BaseMasterViewSet, which gives them:
+
+    POST   <endpoint>/bulk/   [{...}, {...}]           create rows
+    PATCH  <endpoint>/bulk/   [{"<pk>": 1, ...}, ...]  partial update rows
+    PUT    <endpoint>/bulk/   [{"<pk>": 1, ...}, ...]  full update rows
+    DELETE <endpoint>/bulk/   {"ids": [1, 2, 3]}       soft delete rows
+
+A batch is all-or-nothing. Rows are validated with the viewset's serializer,
+but the checks that would otherwise cost one query per row are batched:
+foreign keys are resolved with one query per related model, and unique
+fields / unique_together sets are checked once for the whole batch (against
+the database and within the batch). If any row fails, nothing is written and
+the response lists the errors by row index. Otherwise the rows are written
+with bulk_create()/bulk_update() in a single transaction, with the audit
+columns stamped for the whole batch.
+
+The writes bypass the viewset's own create()/destroy() and model signals,
+so the mixin does not belong on viewsets that guard those (attendance
+sessions, seat allocations) or on rows other data is derived from (the
+scheduling overlap indexes of terms, examinations, semester durations and
+events).
+"""
+import logging
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from rest_framework import serializers, status
+from rest_framework.decorators import action
+from rest_framework.response import Response
+from rest_framework.validators import UniqueTogetherValidator, UniqueValidator
+
+logger = logging.getLogger(__name__)
+
+# Rows per IN (...) / OR lookup when checking uniqueness
+LOOKUP_CHUNK_SIZE = 500
+
+
+def _unique_sets(model):
+    """Field-name tuples that must be unique for the model (ignoring the pk)."""
+    sets = []
+    for field in model._meta.concrete_fields:
+        if field.unique and not field.primary_key:
+            sets.append((field.name,))
+    for fields in model._meta.unique_together:
+        sets.append(tuple(fields))
+    for constraint in model._meta.total_unique_constraints:
+        sets.append(tuple(constraint.fields))
+    return sets
+
+
+def _db_value(model, name, value):
+    field = model._meta.get_field(name)
+    if field.is_relation and value is not None and hasattr(value, 'pk'):
+        return value.pk
+    return field.get_prep_value(value) if value is not None else None
+
+
+class BulkActionsMixin:
+    bulk_max_rows = 2000
+    bulk_batch_size = 500
+
+    def get_bulk_username(self):
+        if hasattr(self, 'get_username'):
+            return self.get_username()
+        user = self.request.user
+        if user and user.is_authenticated:
+            return getattr(user, 'USERNAME', None) or \
+                getattr(user, 'username', None) or \
+                f'USER_{user.pk}'
+        return 'SYSTEM'
+
+    # Request parsing -------------------------------------------------------
+
+    def _bulk_rows(self, request):
+        rows = request.data
+        if isinstance(rows, dict):
+            rows = rows.get('rows')
+        if not isinstance(rows, list) or not rows:
+            raise serializers.ValidationError('Expected a non-empty list of rows')
+        if len(rows) > self.bulk_max_rows:
+            raise serializers.ValidationError(
+                f'A batch may contain at most {self.bulk_max_rows} rows'
+            )
+        if not all(isinstance(row, dict) for row in rows):
+            raise serializers.ValidationError('Every row must be an object')
+        return rows
+
+    def _bulk_child(self, rows, partial=False):
+        """
+        A single child serializer used to validate every row, with per-row
+        uniqueness validators removed (checked in bulk instead) and foreign
+        keys resolved from one prefetch per related model.
+        """
+        child = self.get_serializer(many=True, partial=partial).child
+        child.validators = [
+            validator for validator in child.validators
+            if not isinstance(validator, UniqueTogetherValidator)
+        ]
+        for name, field in child.fields.items():
+            field.validators = [
+                validator for validator in field.validators
+                if not isinstance(validator, UniqueValidator)
+            ]
+            if isinstance(field, serializers.PrimaryKeyRelatedField) and not field.read_only:
+                self._prefetch_related_field(field, rows)
+        return child
+
+    def _prefetch_related_field(self, field, rows):
+        queryset = field.get_queryset()
+        if queryset is None:
+            return
+        pk_field = queryset.model._meta.pk
+        raw_values = {row.get(field.field_name) for row in rows} - {None, ''}
+        keys = set()
+        for value in raw_values:
+            try:
+                keys.add(pk_field.to_python(value))
+            except Exception:
+                continue
+        if not keys:
+            return
+
+        objects = queryset.in_bulk(list(keys))
+        original = field.to_internal_value
+
+        def to_internal_value(data):
+            try:
+                return objects[pk_field.to_python(data)]
+            except Exception:
+                # Unknown or malformed key: let the field raise its usual error
+                return original(data)
+
+        field.to_internal_value = to_internal_value
+
+    # Validation -------------------------------------------------------------
+
+    def _validate_rows(self, child, rows, instances=None):
+        validated = []
+        errors = []
+        for index, row in enumerate(rows):
+            instance = instances[index] if instances else None
+            child.instance = instance
+            try:
+                validated.append(child.run_validation(row))
+                errors.append({})
+            except serializers.ValidationError as exc:
+                validated.append(None)
+                errors.append(exc.detail)
+        child.instance = None
+        return validated, errors
+
+    def _check_uniqueness(self, model, validated, errors, instances=None):
+        """Adds errors for rows that collide with each other or with stored rows."""
+        excluded_pks = [instance.pk for instance in instances or [] if instance is not None]
+
+        for names in _unique_sets(model):
+            keys = {}
+            for index, data in enumerate(validated):
+                if data is None:
+                    continue
+                values = []
+                for name in names:
+                    if name in data:
+                        value = data[name]
+                    elif instances and instances[index] is not None:
+                        value = getattr(instances[index], name)
+                    else:
+                        value = None
+                    values.append(_db_value(model, name, value))
+                if any(value is None for value in values):
+                    continue
+                keys.setdefault(tuple(values), []).append(index)
+
+            if not keys:
+                continue
+
+            taken = set()
+            attnames = [model._meta.get_field(name).attname for name in names]
+            key_list = list(keys)
+            for start in range(0, len(key_list), LOOKUP_CHUNK_SIZE):
+                chunk = key_list[start:start + LOOKUP_CHUNK_SIZE]
+                if len(attnames) == 1:
+                    query = Q(**{f'{attnames[0]}__in': [key[0] for key in chunk]})
+                else:
+                    query = Q()
+                    for key in chunk:
+                        query |= Q(**dict(zip(attnames, key)))
+                stored = model._default_manager.filter(query)
+                if excluded_pks:
+                    stored = stored.exclude(pk__in=excluded_pks)
+                taken.update(tuple(row) for row in stored.values_list(*attnames))
+
+            label = ', '.join(names)
+            for key, indexes in keys.items():
+                duplicate_in_batch = len(indexes) > 1
+                if key not in taken and not duplicate_in_batch:
+                    continue
+                message = (
+                    f'{model._meta.verbose_name} with this {label} already exists.'
+                    if key in taken else
+                    f'Duplicate {label} within this batch.'
+                )
+                target = names[0] if len(names) == 1 else 'non_field_errors'
+                for index in indexes:
+                    if not isinstance(errors[index], dict):
+                        errors[index] = {'non_field_errors': errors[index]}
+                    errors[index].setdefault(target, []).append(message)
+
+    def _error_response(self, errors):
+        return Response({
+            'status': 'error',
+            'message': 'No rows were saved; fix the listed rows and retry',
+            'errors': [
+                {'index': index, 'errors': error}
+                for index, error in enumerate(errors) if error
+            ]
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    def _model_has_field(self, model, name):
+        try:
+            model._meta.get_field(name)
+            return True
+        except Exception:
+            return False
+
+    # Actions ------------------------------------------------------------------
+
+    @action(detail=False, methods=['post'], url_path='bulk')
+    def bulk_create(self, request, *args, **kwargs):
+        try:
+            rows = self._bulk_rows(request)
+        except serializers.ValidationError as e:
+            return Response({'status': 'error', 'message': e.detail}, status=status.HTTP_400_BAD_REQUEST)
+
+        model = self.get_queryset().model
+        child = self._bulk_child(rows)
+        validated, errors = self._validate_rows(child, rows)
+        self._check_uniqueness(model, validated, errors)
+        if any(errors):
+            return self._error_response(errors)
+
+        username = self.get_bulk_username()
+        now = timezone.now()
+        stamps = {
+            name: value for name, value in (
+                ('CREATED_BY', username),
+                ('UPDATED_BY', username),
+                ('CREATED_AT', now),
+                ('UPDATED_AT', now),
+            ) if self._model_has_field(model, name)
+        }
+        objects = [model(**{**data, **stamps}) for data in validated]
+
+        with transaction.atomic():
+            model._default_manager.bulk_create(objects, batch_size=self.bulk_batch_size)
+
+        logger.info("Bulk created %s %s rows by %s", len(objects), model.__name__, username)
+        return Response({
+            'status': 'success',
+            'message': f'{len(objects)} records created',
+            'data': self.get_serializer(objects, many=True).data
+        }, status=status.HTTP_201_CREATED)
+
+    @bulk_create.mapping.put
+    def bulk_replace(self, request, *args, **kwargs):
+        return self._bulk_update(request, partial=False)
+
+    @bulk_create.mapping.patch
+    def bulk_update(self, request, *args, **kwargs):
+        return self._bulk_update(request, partial=True)
+
+    def _bulk_update(self, request, partial):
+        try:
+            rows = self._bulk_rows(request)
+        except serializers.ValidationError as e:
+            return Response({'status': 'error', 'message': e.detail}, status=status.HTTP_400_BAD_REQUEST)
+
+        queryset = self.get_queryset()
+        model = queryset.model
+        pk_name = model._meta.pk.name
+
+        keys = [row.get(pk_name, row.get('pk')) for row in rows]
+        pk_field = model._meta.pk
+        values = []
+        for key in keys:
+            try:
+                values.append(pk_field.to_python(key) if key not in (None, '') else None)
+            except (TypeError, ValidationError):
+                values.append(None)
+        found = queryset.in_bulk([value for value in values if value is not None])
+        instances = [found.get(value) if value is not None else None for value in values]
+
+        child = self._bulk_child(rows, partial=partial)
+        validated, errors = self._validate_rows(child, rows, instances)
+        for index, instance in enumerate(instances):
+            if instance is None:
+                errors[index] = {pk_name: [f'Record {keys[index]} not found.']}
+                validated[index] = None
+        self._check_uniqueness(model, validated, errors, instances)
+        if any(errors):
+            return self._error_response(errors)
+
+        if len({instance.pk for instance in instances}) != len(instances):
+            return Response({
+                'status': 'error',
+                'message': 'Each record may only appear once in a batch'
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        username = self.get_bulk_username()
+        now = timezone.now()
+        changed = set()
+        for instance, data in zip(instances, validated):
+            for name, value in data.items():
+                setattr(instance, name, value)
+                changed.add(name)
+            if self._model_has_field(model, 'UPDATED_BY'):
+                instance.UPDATED_BY = username
+                changed.add('UPDATED_BY')
+            if self._model_has_field(model, 'UPDATED_AT'):
+                instance.UPDATED_AT = now
+                changed.add('UPDATED_AT')
+
+        changed.discard(pk_name)
+        if changed:
+            with transaction.atomic():
+                model._default_manager.bulk_update(
+                    instances, sorted(changed), batch_size=self.bulk_batch_size
+                )
+
+        logger.info("Bulk updated %s %s rows by %s", len(instances), model.__name__, username)
+        return Response({
+            'status': 'success',
+            'message': f'{len(instances)} records updated',
+            'data': self.get_serializer(instances, many=True).data
+        })
+
+    @bulk_create.mapping.delete
+    def bulk_destroy(self, request, *args, **kwargs):
+        data = request.data if isinstance(request.data, dict) else {'ids': request.data}
+        ids = data.get('ids')
+        if not isinstance(ids, list) or not ids:
+            return Response({
+                'status': 'error',
+                'message': 'Expected {"ids": [...]}'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        if len(ids) > self.bulk_max_rows:
+            return Response({
+                'status': 'error',
+                'message': f'A batch may contain at most {self.bulk_max_rows} rows'
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        queryset = self.get_queryset()
+        model = queryset.model
+        pk_field = model._meta.pk
+        keys = {}
+        missing = []
+        for key in ids:
+            try:
+                keys[key] = pk_field.to_python(key)
+            except (TypeError, ValidationError):
+                missing.append(key)
+        existing = set(queryset.filter(pk__in=list(keys.values())).values_list('pk', flat=True))
+        missing.extend(key for key, value in keys.items() if value not in existing)
+        if missing:
+            return Response({
+                'status': 'error',
+                'message': 'No rows were deleted; some records were not found',
+                'missing': missing
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        username = self.get_bulk_username()
+        now = timezone.now()
+        changes = {'IS_DELETED': True, 'DELETED_BY': username, 'DELETED_AT': now}
+        for name, value in (('UPDATED_BY', username), ('UPDATED_AT', now), ('IS_ACTIVE', False)):
+            if self._model_has_field(model, name):
+                changes[name] = value
+
+        with transaction.atomic():
+            deleted = model._default_manager.filter(pk__in=existing).update(**changes)
+
+        logger.info("Bulk deleted %s %s rows by %s", deleted, model.__name__, username)
+        return Response({
+            'status': 'success',
+            'message': f'{deleted} records deleted'
+        })
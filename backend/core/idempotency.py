@@ -0,0 +1,208 @@
+"""
+Idempotency-Key support for POST endpoints.
+
+Flaky networks make the frontend and the Syncronik app retry POSTs that
+actually succeeded, which created duplicate students and employees. A client
+that sends an ``Idempotency-Key`` header gets exactly-once semantics:
+
+* the first request with a key claims it (a PROCESSING row) and runs;
+* its response is stored and replayed for every retry with the same key,
+  flagged with an ``Idempotent-Replayed: true`` header;
+* a duplicate that arrives while the first one is still running waits for it
+  (up to IDEMPOTENCY_LOCK_TIMEOUT) and replays its result, or gets a 409;
+* reusing a key for a different payload is rejected with 422;
+* keys expire after IDEMPOTENCY_KEY_TTL.
+
+Server errors (5xx and exceptions) release the key so the client can retry.
+"""
+import functools
+import hashlib
+import json
+import logging
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.response import Response
+
+from .models import IDEMPOTENCY_KEY
+
+logger = logging.getLogger(__name__)
+
+HEADER = 'Idempotency-Key'
+REPLAYED_HEADER = 'Idempotent-Replayed'
+MAX_KEY_LENGTH = 255
+POLL_INTERVAL = 0.1
+
+
+def _ttl():
+    return getattr(settings, 'IDEMPOTENCY_KEY_TTL', timedelta(hours=24))
+
+
+def _lock_timeout():
+    return getattr(settings, 'IDEMPOTENCY_LOCK_TIMEOUT', 10)
+
+
+def _processing_timeout():
+    return getattr(settings, 'IDEMPOTENCY_PROCESSING_TIMEOUT', 120)
+
+
+def _fingerprint(request):
+    """Hash of the request payload; uploaded files contribute their name and size."""
+    digest = hashlib.sha256()
+    digest.update(f"{request.method} {request.path}".encode())
+
+    data = request.data
+    if hasattr(data, 'lists'):
+        items = sorted(data.lists())
+    elif isinstance(data, dict):
+        items = sorted((key, [value]) for key, value in data.items())
+    else:
+        items = [('', [data])]
+
+    for key, values in items:
+        for value in values:
+            if hasattr(value, 'read'):
+                value = f"{getattr(value, 'name', '')}:{getattr(value, 'size', '')}"
+            digest.update(key.encode())
+            digest.update(json.dumps(value, sort_keys=True, default=str).encode())
+    return digest.hexdigest()
+
+
+def _claim(scope, fingerprint):
+    """
+    Try to become the owner of the key. Returns (record, claimed); when the
+    key is already held, record is the existing row.
+    """
+    now = timezone.now()
+    IDEMPOTENCY_KEY.objects.filter(**scope).filter(
+        Q(EXPIRES_AT__lte=now) |
+        Q(STATUS=IDEMPOTENCY_KEY.STATUS_PROCESSING,
+          CREATED_AT__lte=now - timedelta(seconds=_processing_timeout()))
+    ).delete()
+
+    try:
+        with transaction.atomic():
+            record = IDEMPOTENCY_KEY.objects.create(
+                REQUEST_HASH=fingerprint,
+                EXPIRES_AT=now + _ttl(),
+                **scope
+            )
+        return record, True
+    except IntegrityError:
+        return IDEMPOTENCY_KEY.objects.filter(**scope).first(), False
+
+
+def _replay(record):
+    response = Response(record.RESPONSE_BODY, status=record.RESPONSE_STATUS)
+    response[REPLAYED_HEADER] = 'true'
+    return response
+
+
+def _conflict(message, http_status):
+    return Response({
+        'status': 'error',
+        'message': message
+    }, status=http_status)
+
+
+def idempotent(view_method):
+    """
+    Decorator for viewset/APIView handlers (create, post) that honours the
+    Idempotency-Key header. Requests without the header are unaffected.
+    """
+    @functools.wraps(view_method)
+    def wrapper(self, request, *args, **kwargs):
+        key = request.headers.get(HEADER)
+        if not key:
+            return view_method(self, request, *args, **kwargs)
+
+        key = key.strip()
+        if not key or len(key) > MAX_KEY_LENGTH:
+            return _conflict(
+                f'{HEADER} must be between 1 and {MAX_KEY_LENGTH} characters',
+                status.HTTP_400_BAD_REQUEST
+            )
+
+        user = getattr(request, 'user', None)
+        scope = {
+            'KEY': key,
+            'USER_ID': str(user.pk) if user is not None and user.is_authenticated else '',
+            'METHOD': request.method,
+            'PATH': request.path[:255],
+        }
+        fingerprint = _fingerprint(request)
+
+        deadline = time.monotonic() + _lock_timeout()
+        while True:
+            record, claimed = _claim(scope, fingerprint)
+            if claimed:
+                break
+            if record is None:
+                # Released between our insert and lookup; try again
+                if time.monotonic() >= deadline:
+                    return _conflict(
+                        'A request with this Idempotency-Key is still being processed',
+                        status.HTTP_409_CONFLICT
+                    )
+                time.sleep(POLL_INTERVAL)
+                continue
+            if record.REQUEST_HASH != fingerprint:
+                return _conflict(
+                    f'{HEADER} was already used for a different request',
+                    status.HTTP_422_UNPROCESSABLE_ENTITY
+                )
+
+            # Coalesce behind the request that holds the key
+            while record is not None and record.STATUS == IDEMPOTENCY_KEY.STATUS_PROCESSING:
+                if time.monotonic() >= deadline:
+                    response = _conflict(
+                        'A request with this Idempotency-Key is still being processed',
+                        status.HTTP_409_CONFLICT
+                    )
+                    response['Retry-After'] = '1'
+                    return response
+                time.sleep(POLL_INTERVAL)
+                record = IDEMPOTENCY_KEY.objects.filter(pk=record.pk).first()
+
+            if record is not None:
+                return _replay(record)
+            # The first request failed and released the key; run it ourselves
+
+        try:
+            response = view_method(self, request, *args, **kwargs)
+        except Exception:
+            record.delete()
+            raise
+
+        if response.status_code >= 500:
+            record.delete()
+            return response
+
+        # A claim that ran past IDEMPOTENCY_PROCESSING_TIMEOUT may have been
+        # dropped (and the key claimed again) meanwhile; then nothing is stored
+        try:
+            stored = IDEMPOTENCY_KEY.objects.filter(pk=record.pk).update(
+                STATUS=IDEMPOTENCY_KEY.STATUS_COMPLETED,
+                RESPONSE_STATUS=response.status_code,
+                RESPONSE_BODY=getattr(response, 'data', None),
+            )
+        except (TypeError, ValueError) as e:
+            logger.warning("Could not store response for %s: %s", key, e)
+            record.delete()
+        else:
+            if not stored:
+                logger.warning("Idempotency key %s expired before its request finished", key)
+        return response
+
+    return wrapper
+
+
+def purge_expired_keys():
+    """Delete expired keys. Returns the number of rows removed."""
+    deleted, _ = IDEMPOTENCY_KEY.objects.filter(EXPIRES_AT__lte=timezone.now()).delete()
+    return deleted
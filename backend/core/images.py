@@ -0,0 +1,269 @@
+"""
+Resized variants of profile photos.
+
+EMPLOYEE_MASTER.PROFILE_IMAGE and CustomUser.PROFILE_PICTURE hold whatever
+the phone produced, often several megabytes. After a photo is saved, a
+background worker renders the sizes in VARIANTS as recompressed JPEGs and
+caches them under IMAGE_VARIANT_ROOT:
+
+    MEDIA_ROOT/variants/thumbnail/3f/3fa2...e9.jpg
+
+Variants are keyed by the stored file name. Photos live in content-addressed
+storage, so that name changes whenever the picture does, a cached variant
+never goes stale, and identical photos share their variants.
+
+GET /api/media/photos/<kind>/<pk>/?size=thumbnail|card|full serves a variant.
+photo_urls() builds those URLs with a v=<version> parameter; a request that
+carries the current version is cached by the browser for a year, since a
+new photo means a new URL. A variant that the worker hasn't produced yet is
+rendered on the request that first needs it.
+
+An <img src> can't send the JWT header, so the URLs also carry sig=, a
+signature of kind, pk and version. A signed URL is served without
+authentication for as long as it names the current photo; replacing the
+photo retires every URL handed out for the old one.
+"""
+import hashlib
+import logging
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+from django.apps import apps
+from django.conf import settings
+from django.core import signing
+from django.db import transaction
+from django.db.models.signals import post_save
+from django.http import FileResponse, HttpResponseNotModified
+from django.urls import reverse
+from django.utils.http import quote_etag
+from PIL import Image, ImageOps, UnidentifiedImageError
+from rest_framework import status
+from rest_framework.permissions import AllowAny
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+logger = logging.getLogger(__name__)
+
+# name: (longest edge in pixels, JPEG quality)
+VARIANTS = {
+    'thumbnail': (96, 75),
+    'card': (320, 80),
+    'full': (1280, 85),
+}
+DEFAULT_VARIANT = 'card'
+
+# kind in the URL: (model label, lookup field, image field)
+PHOTO_SOURCES = {
+    'employee': ('establishments.EMPLOYEE_MASTER', 'EMPLOYEE_ID', 'PROFILE_IMAGE'),
+    'user': ('accounts.CustomUser', 'USER_ID', 'PROFILE_PICTURE'),
+}
+
+CACHE_FOREVER = 'private, max-age=31536000, immutable'
+CACHE_REVALIDATE = 'private, no-cache'
+
+
+class ImageVariantError(Exception):
+    pass
+
+
+def _variant_root():
+    return getattr(settings, 'IMAGE_VARIANT_ROOT', os.path.join(settings.MEDIA_ROOT, 'variants'))
+
+
+_variant_pool = None
+
+
+def _image_variant_pool():
+    """Shared worker threads that render variants off the request path."""
+    global _variant_pool
+    if _variant_pool is None:
+        workers = getattr(settings, 'IMAGE_VARIANT_WORKERS', 2)
+        _variant_pool = ThreadPoolExecutor(
+            max_workers=max(workers, 1), thread_name_prefix='image-variants'
+        )
+    return _variant_pool
+
+
+def source_key(name):
+    return hashlib.sha256(name.encode('utf-8')).hexdigest()
+
+
+def variant_path(name, variant):
+    key = source_key(name)
+    return os.path.join(_variant_root(), variant, key[:2], f'{key}.jpg')
+
+
+def _render(image, name, variant):
+    edge, quality = VARIANTS[variant]
+    resized = image.copy()
+    resized.thumbnail((edge, edge), Image.LANCZOS)
+
+    path = variant_path(name, variant)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # Write beside the target and rename, so readers never see half a file
+    handle, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.part')
+    try:
+        with os.fdopen(handle, 'wb') as output:
+            resized.save(output, 'JPEG', quality=quality, optimize=True, progressive=True)
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    return path
+
+
+def _open_source(field_file, largest):
+    with field_file.storage.open(field_file.name, 'rb') as handle:
+        image = Image.open(handle)
+        # JPEGs can be decoded at a fraction of their size, which is most of the saving
+        image.draft('RGB', (largest, largest))
+        image = ImageOps.exif_transpose(image)
+        if image.mode in ('RGBA', 'LA', 'P'):
+            image = image.convert('RGBA')
+            background = Image.new('RGB', image.size, (255, 255, 255))
+            background.paste(image, mask=image.getchannel('A'))
+            image = background
+        elif image.mode != 'RGB':
+            image = image.convert('RGB')
+    return image
+
+
+def build_variants(field_file, variants=None, force=False):
+    """Render the missing variants of a stored photo. Returns the paths written."""
+    variants = list(variants or VARIANTS)
+    if not force:
+        variants = [v for v in variants if not os.path.exists(variant_path(field_file.name, v))]
+    if not variants:
+        return []
+    largest = max(VARIANTS[v][0] for v in variants)
+    try:
+        image = _open_source(field_file, largest)
+    except (OSError, UnidentifiedImageError, Image.DecompressionBombError) as e:
+        raise ImageVariantError(f'{field_file.name} is not a readable image: {e}')
+    return [_render(image, field_file.name, variant) for variant in variants]
+
+
+def _build_in_background(field_file):
+    try:
+        build_variants(field_file)
+    except ImageVariantError as e:
+        logger.warning("Skipping image variants: %s", e)
+    except Exception:
+        logger.exception("Building image variants for %s failed", field_file.name)
+
+
+def schedule_variants(field_file):
+    """Queue variant rendering once the current transaction commits."""
+    if not field_file:
+        return
+    transaction.on_commit(lambda: _image_variant_pool().submit(_build_in_background, field_file))
+
+
+def _schedule_on_save(field_name):
+    def receiver(sender, instance, update_fields=None, **kwargs):
+        if update_fields is not None and field_name not in update_fields:
+            return
+        field_file = getattr(instance, field_name)
+        if field_file and not os.path.exists(variant_path(field_file.name, DEFAULT_VARIANT)):
+            schedule_variants(field_file)
+    return receiver
+
+
+def connect_signals():
+    for label, _, field_name in PHOTO_SOURCES.values():
+        post_save.connect(
+            _schedule_on_save(field_name), sender=apps.get_model(label),
+            weak=False, dispatch_uid=f'image-variants-{label}'
+        )
+
+
+def photo_version(name):
+    return source_key(name)[:16]
+
+
+def _signature(kind, pk, version):
+    return signing.Signer(salt='core.images.photo').signature(f'{kind}:{pk}:{version}')
+
+
+def _signed(kind, pk, version, signature):
+    return bool(version and signature) and signing.constant_time_compare(
+        signature, _signature(kind, pk, version)
+    )
+
+
+def photo_urls(kind, pk, field_file, request=None):
+    """{variant: url} for a photo, or None when there is no photo."""
+    if not field_file:
+        return None
+    path = reverse('photo-variant', kwargs={'kind': kind, 'pk': pk})
+    version = photo_version(field_file.name)
+    signature = _signature(kind, pk, version)
+    urls = {variant: f'{path}?size={variant}&v={version}&sig={signature}' for variant in VARIANTS}
+    if request is not None:
+        urls = {variant: request.build_absolute_uri(url) for variant, url in urls.items()}
+    return urls
+
+
+class PhotoVariantView(APIView):
+    # Authenticated users, or anyone holding a signed URL (checked in get())
+    permission_classes = [AllowAny]
+
+    def get(self, request, kind, pk):
+        authenticated = bool(request.user and request.user.is_authenticated)
+        requested = request.query_params.get('v')
+        if not authenticated and not _signed(kind, pk, requested, request.query_params.get('sig')):
+            self.permission_denied(request)
+
+        if kind not in PHOTO_SOURCES:
+            return Response({
+                'status': 'error',
+                'message': f'Unknown photo kind; use one of {", ".join(PHOTO_SOURCES)}'
+            }, status=status.HTTP_404_NOT_FOUND)
+
+        variant = request.query_params.get('size', DEFAULT_VARIANT)
+        if variant not in VARIANTS:
+            return Response({
+                'status': 'error',
+                'message': f'size must be one of {", ".join(VARIANTS)}'
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        label, lookup, field_name = PHOTO_SOURCES[kind]
+        model = apps.get_model(label)
+        filters = {lookup: pk}
+        if any(field.name == 'IS_DELETED' for field in model._meta.concrete_fields):
+            filters['IS_DELETED'] = False
+        name = model.objects.filter(**filters).values_list(field_name, flat=True).first()
+        if not name:
+            return Response({
+                'status': 'error',
+                'message': 'No photo found'
+            }, status=status.HTTP_404_NOT_FOUND)
+
+        version = photo_version(name)
+        if not authenticated and requested != version:
+            return Response({
+                'status': 'error',
+                'message': 'This photo link has expired'
+            }, status=status.HTTP_404_NOT_FOUND)
+        etag = quote_etag(f'{version}-{variant}')
+        cache_control = CACHE_FOREVER if requested == version else CACHE_REVALIDATE
+        if etag in request.headers.get('If-None-Match', ''):
+            response = HttpResponseNotModified()
+        else:
+            path = variant_path(name, variant)
+            if not os.path.exists(path):
+                field_file = getattr(model(**{field_name: name}), field_name)
+                try:
+                    build_variants(field_file, [variant])
+                except ImageVariantError as e:
+                    logger.warning("Cannot serve %s photo %s: %s", kind, pk, e)
+                    return Response({
+                        'status': 'error',
+                        'message': 'The stored photo could not be read'
+                    }, status=status.HTTP_422_UNPROCESSABLE_ENTITY)
+            response = FileResponse(open(path, 'rb'), content_type='image/jpeg')
+        response['ETag'] = etag
+        response['Cache-Control'] = cache_control
+        return response
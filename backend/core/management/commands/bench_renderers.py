@@ -0,0 +1,82 @@
+import datetime
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from rest_framework.renderers import JSONRenderer
+
+from core.renderers import MessagePackRenderer, ORJSONRenderer
+from student.models import STUDENT_MASTER
+from student.serializers import StudentMasterSerializer
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare the response renderers on a student master list. Rows are '
+        'built in memory and serialized with StudentMasterSerializer, so the '
+        'benchmark needs no data in the database.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=10000)
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def handle(self, *args, **options):
+        rows = options['rows']
+        students = [self._student(i) for i in range(rows)]
+
+        started = time.perf_counter()
+        payload = {'status': 'success', 'data': StudentMasterSerializer(students, many=True).data}
+        serialize_ms = (time.perf_counter() - started) * 1000
+        self.stdout.write(f"Serializing {rows} students: {serialize_ms:.0f}ms")
+
+        renderers = [
+            ('DRF JSONRenderer', JSONRenderer()),
+            ('ORJSONRenderer', ORJSONRenderer()),
+            ('MessagePackRenderer', MessagePackRenderer()),
+        ]
+        baseline = None
+        for name, renderer in renderers:
+            timings = []
+            for _ in range(options['repeat']):
+                started = time.perf_counter()
+                body = renderer.render(payload, renderer.media_type, {})
+                timings.append((time.perf_counter() - started) * 1000)
+            median_ms = statistics.median(timings)
+            baseline = baseline or median_ms
+            self.stdout.write(
+                f"{name:<22} {median_ms:8.1f}ms  {len(body) / 1024:9.0f} KiB  "
+                f"x{baseline / median_ms:.1f}"
+            )
+
+    def _student(self, i):
+        today = datetime.date(2025, 6, 1)
+        return STUDENT_MASTER(
+            RECORD_ID=i + 1,
+            STUDENT_ID=f"BTECH25{i:05d}",
+            INSTITUTE='INST01',
+            ACADEMIC_YEAR='2025-26',
+            BATCH='2025',
+            BRANCH_ID_id=(i % 12) + 1,
+            YEAR_SEM_ID=1,
+            ADMISSION_CATEGORY='1',
+            FORM_NO=100000 + i,
+            NAME=f"Student{i}",
+            SURNAME='Kulkarni',
+            FATHER_NAME='Prakash',
+            MOTHER_NAME='Sunita',
+            PARENT_NAME='Prakash',
+            GENDER='female' if i % 2 else 'male',
+            DOB=datetime.date(2007, 1 + i % 12, 1 + i % 28),
+            MOB_NO=f"98{i:08d}",
+            EMAIL_ID=f"student{i}@example.org",
+            PER_ADDRESS='12, MG Road, Pune',
+            LOC_ADDRESS='12, MG Road, Pune',
+            ADMISSION_DATE=today,
+            REGISTRATION_DATE=today,
+            VALIDITY=today,
+            JOINING_STATUS_DATE=today,
+            RETENTION_STATUS_DATE=today,
+            CREATED_AT=datetime.datetime(2025, 6, 1, 10, 30, tzinfo=datetime.timezone.utc),
+            UPDATED_AT=datetime.datetime(2025, 6, 1, 10, 30, tzinfo=datetime.timezone.utc),
+        )
@@ -0,0 +1,28 @@
+from django.apps import apps
+from django.core.management.base import BaseCommand
+
+from core.images import PHOTO_SOURCES, ImageVariantError, build_variants
+
+
+class Command(BaseCommand):
+    help = 'Render the thumbnail/card/full variants of stored profile photos'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true',
+                            help='Re-render variants that already exist')
+
+    def handle(self, *args, **options):
+        written = 0
+        failed = 0
+        for kind, (label, lookup, field_name) in PHOTO_SOURCES.items():
+            model = apps.get_model(label)
+            rows = model._base_manager.exclude(**{field_name: ''}).exclude(**{f'{field_name}__isnull': True})
+            for instance in rows.only(lookup, field_name).iterator(chunk_size=500):
+                try:
+                    written += len(build_variants(getattr(instance, field_name), force=options['force']))
+                except ImageVariantError as e:
+                    failed += 1
+                    self.stderr.write(f"{kind} {getattr(instance, lookup)}: {e}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Wrote {written} variants; {failed} photos could not be read"
+        ))
@@ -0,0 +1,31 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from core.storage import collect_garbage, recount
+
+
+class Command(BaseCommand):
+    help = 'Delete content-addressed media blobs that are no longer referenced'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--no-recount', action='store_true',
+                            help='Trust the stored reference counts instead of rebuilding them from the database; '
+                                 'blobs replaced in their field are then never collected')
+        parser.add_argument('--grace-hours', type=float, default=1,
+                            help='Keep unreferenced blobs this long before deleting them')
+        parser.add_argument('--dry-run', action='store_true')
+
+    def handle(self, *args, **options):
+        if not options['no_recount']:
+            changed = recount()
+            self.stdout.write(f"Reference counts corrected for {changed} blobs")
+
+        removed, freed = collect_garbage(
+            grace=timedelta(hours=options['grace_hours']),
+            dry_run=options['dry_run']
+        )
+        prefix = 'Would delete' if options['dry_run'] else 'Deleted'
+        self.stdout.write(self.style.SUCCESS(
+            f"{prefix} {removed} unreferenced blobs ({freed / (1024 * 1024):.1f} MiB)"
+        ))
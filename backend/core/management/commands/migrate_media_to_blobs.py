@@ -0,0 +1,81 @@
+import os
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from core.storage import BLOB_PREFIX, blob_fields, blob_name_for, hash_file, media_blob_storage
+
+
+class Command(BaseCommand):
+    help = (
+        'Move media written before content-addressed storage into MEDIA_ROOT/blobs, '
+        'deduplicating identical files and pointing the rows at their blobs.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Report what would change without moving files')
+
+    def handle(self, *args, **options):
+        dry_run = options['dry_run']
+        storage = media_blob_storage()
+        converted = {}
+        originals = set()
+        stats = {'rows': 0, 'missing': 0, 'duplicates': 0, 'bytes_saved': 0}
+
+        for model, field in blob_fields():
+            rows = (
+                model._base_manager
+                .exclude(**{f'{field.attname}__startswith': f'{BLOB_PREFIX}/'})
+                .exclude(**{field.attname: ''})
+                .exclude(**{f'{field.attname}__isnull': True})
+                .values_list('pk', field.attname)
+            )
+            for pk, name in rows.iterator(chunk_size=500):
+                if name in converted:
+                    blob_name = converted[name]
+                elif not storage.exists(name):
+                    stats['missing'] += 1
+                    self.stderr.write(f"{model.__name__}.{field.name} #{pk}: {name} is missing, skipped")
+                    continue
+                else:
+                    blob_name = self._convert(storage, name, stats, dry_run)
+                    converted[name] = blob_name
+                    originals.add(name)
+
+                stats['rows'] += 1
+                if dry_run:
+                    continue
+                with transaction.atomic():
+                    model._base_manager.filter(pk=pk).update(**{field.attname: blob_name})
+                    blob = storage.path(blob_name)
+                    storage.add_reference(blob_name, os.path.basename(blob).split('.')[0], os.path.getsize(blob))
+
+        # Only now that every row points at its blob; a crash before this
+        # leaves stray originals, never rows without a file
+        if not dry_run:
+            for name in originals:
+                os.remove(storage.path(name))
+
+        prefix = 'Would convert' if dry_run else 'Converted'
+        self.stdout.write(self.style.SUCCESS(
+            f"{prefix} {stats['rows']} rows; {stats['duplicates']} duplicate files, "
+            f"{stats['bytes_saved'] / (1024 * 1024):.1f} MiB saved; {stats['missing']} missing"
+        ))
+
+    def _convert(self, storage, name, stats, dry_run):
+        with storage.open(name, 'rb') as handle:
+            digest, size = hash_file(handle)
+        blob_name = blob_name_for(digest, name)
+        target = storage.path(blob_name)
+
+        if os.path.exists(target):
+            stats['duplicates'] += 1
+            stats['bytes_saved'] += size
+        elif not dry_run:
+            # Linked, not moved: the original goes once its rows are updated
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            try:
+                os.link(storage.path(name), target)
+            except FileExistsError:
+                pass
+        return blob_name
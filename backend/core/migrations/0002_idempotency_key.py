@@ -0,0 +1,39 @@
+# Generated by Django 4.2.7 on 2026-10-19 15:37
+
+import django.core.serializers.json
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_create_schemas'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IDEMPOTENCY_KEY',
+            fields=[
+                ('RECORD_ID', models.BigAutoField(db_column='RECORD_ID', primary_key=True, serialize=False)),
+                ('KEY', models.CharField(db_column='KEY', max_length=255)),
+                ('USER_ID', models.CharField(blank=True, db_column='USER_ID', default='', max_length=50)),
+                ('METHOD', models.CharField(db_column='METHOD', max_length=10)),
+                ('PATH', models.CharField(db_column='PATH', max_length=255)),
+                ('REQUEST_HASH', models.CharField(db_column='REQUEST_HASH', max_length=64)),
+                ('STATUS', models.CharField(choices=[('PROCESSING', 'Processing'), ('COMPLETED', 'Completed')], db_column='STATUS', default='PROCESSING', max_length=20)),
+                ('RESPONSE_STATUS', models.IntegerField(blank=True, db_column='RESPONSE_STATUS', null=True)),
+                ('RESPONSE_BODY', models.JSONField(blank=True, db_column='RESPONSE_BODY', encoder=django.core.serializers.json.DjangoJSONEncoder, null=True)),
+                ('CREATED_AT', models.DateTimeField(db_column='CREATED_AT', default=django.utils.timezone.now)),
+                ('EXPIRES_AT', models.DateTimeField(db_column='EXPIRES_AT')),
+            ],
+            options={
+                'db_table': '"ADMIN"."IDEMPOTENCY_KEYS"',
+                'indexes': [models.Index(fields=['EXPIRES_AT'], name='idx_idempotency_expires')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='idempotency_key',
+            constraint=models.UniqueConstraint(fields=('KEY', 'USER_ID', 'METHOD', 'PATH'), name='uq_idempotency_key_scope'),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 4.2.7 on 2026-10-19 15:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_idempotency_key'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MEDIA_BLOB',
+            fields=[
+                ('NAME', models.CharField(db_column='NAME', max_length=255, primary_key=True, serialize=False)),
+                ('SHA256', models.CharField(db_column='SHA256', max_length=64)),
+                ('SIZE', models.BigIntegerField(db_column='SIZE')),
+                ('REFCOUNT', models.IntegerField(db_column='REFCOUNT', default=0)),
+                ('CREATED_AT', models.DateTimeField(auto_now_add=True, db_column='CREATED_AT')),
+                ('UPDATED_AT', models.DateTimeField(auto_now=True, db_column='UPDATED_AT')),
+            ],
+            options={
+                'db_table': '"ADMIN"."MEDIA_BLOBS"',
+                'indexes': [models.Index(fields=['SHA256'], name='idx_media_blob_sha256'), models.Index(fields=['REFCOUNT', 'UPDATED_AT'], name='idx_media_blob_gc')],
+            },
+        ),
+    ]
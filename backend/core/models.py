@@ -1,6 +1,7 @@
 from django.db import models
 from django.conf import settings
 from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
 from django.utils import timezone
 
 class SchemaModel(models.Model):
@@ -73,3 +74,76 @@ class AuditModel(SchemaModel):
 
     class Meta:
         abstract = True
+
+
+class IDEMPOTENCY_KEY(models.Model):
+    """
+    First response recorded for an Idempotency-Key so that retried POSTs
+    replay it instead of creating duplicates. See core/idempotency.py.
+    """
+    STATUS_PROCESSING = 'PROCESSING'
+    STATUS_COMPLETED = 'COMPLETED'
+    STATUS_CHOICES = [
+        (STATUS_PROCESSING, 'Processing'),
+        (STATUS_COMPLETED, 'Completed'),
+    ]
+
+    RECORD_ID = models.BigAutoField(primary_key=True, db_column='RECORD_ID')
+    KEY = models.CharField(max_length=255, db_column='KEY')
+    USER_ID = models.CharField(max_length=50, blank=True, default='', db_column='USER_ID')
+    METHOD = models.CharField(max_length=10, db_column='METHOD')
+    PATH = models.CharField(max_length=255, db_column='PATH')
+    REQUEST_HASH = models.CharField(max_length=64, db_column='REQUEST_HASH')
+    STATUS = models.CharField(
+        max_length=20,
+        choices=STATUS_CHOICES,
+        default=STATUS_PROCESSING,
+        db_column='STATUS'
+    )
+    RESPONSE_STATUS = models.IntegerField(null=True, blank=True, db_column='RESPONSE_STATUS')
+    RESPONSE_BODY = models.JSONField(
+        null=True,
+        blank=True,
+        encoder=DjangoJSONEncoder,
+        db_column='RESPONSE_BODY'
+    )
+    CREATED_AT = models.DateTimeField(default=timezone.now, db_column='CREATED_AT')
+    EXPIRES_AT = models.DateTimeField(db_column='EXPIRES_AT')
+
+    class Meta:
+        db_table = '"ADMIN"."IDEMPOTENCY_KEYS"'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['KEY', 'USER_ID', 'METHOD', 'PATH'],
+                name='uq_idempotency_key_scope'
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['EXPIRES_AT'], name='idx_idempotency_expires'),
+        ]
+
+    def __str__(self):
+        return f"{self.METHOD} {self.PATH} [{self.KEY}] - {self.STATUS}"
+
+
+class MEDIA_BLOB(models.Model):
+    """
+    A content-addressed media file and the number of file fields that point
+    at it. See core/storage.py.
+    """
+    NAME = models.CharField(max_length=255, primary_key=True, db_column='NAME')
+    SHA256 = models.CharField(max_length=64, db_column='SHA256')
+    SIZE = models.BigIntegerField(db_column='SIZE')
+    REFCOUNT = models.IntegerField(default=0, db_column='REFCOUNT')
+    CREATED_AT = models.DateTimeField(auto_now_add=True, db_column='CREATED_AT')
+    UPDATED_AT = models.DateTimeField(auto_now=True, db_column='UPDATED_AT')
+
+    class Meta:
+        db_table = '"ADMIN"."MEDIA_BLOBS"'
+        indexes = [
+            models.Index(fields=['SHA256'], name='idx_media_blob_sha256'),
+            models.Index(fields=['REFCOUNT', 'UPDATED_AT'], name='idx_media_blob_gc'),
+        ]
+
+    def __str__(self):
+        return f"{self.NAME} ({self.REFCOUNT} refs)"
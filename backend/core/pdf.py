@@ -0,0 +1,105 @@
+"""
+Minimal text-only PDF writer.
+
+Reports such as seat maps and door lists are fixed-width text. They are
+set in the standard Courier font, which every PDF reader provides, so
+nothing is embedded and no PDF library is needed.
+
+    document = TextPDF(title='Door lists')
+    document.add_page(['Room LH-101', '', 'CE25001  R1 B1 1', ...])
+    response = HttpResponse(document.render(), content_type='application/pdf')
+
+Lines beyond a page's capacity continue on a new page; text is encoded as
+Latin-1 with unknown characters replaced.
+"""
+import zlib
+
+A4 = (595, 842)
+MARGIN = 36
+LEADING = 1.2
+
+
+def _escape(text):
+    return text.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+
+
+class TextPDF:
+    def __init__(self, title='', font_size=9, landscape=False):
+        self.title = title
+        self.font_size = font_size
+        self.width, self.height = (A4[1], A4[0]) if landscape else A4
+        self.pages = []
+
+    @property
+    def lines_per_page(self):
+        return int((self.height - 2 * MARGIN) // (self.font_size * LEADING))
+
+    @property
+    def columns(self):
+        # Courier glyphs are 0.6 em wide
+        return int((self.width - 2 * MARGIN) // (self.font_size * 0.6))
+
+    def add_page(self, lines, header=None):
+        """Add lines as one or more pages; header is repeated atop each of them."""
+        header = list(header or [])
+        room = max(1, self.lines_per_page - len(header))
+        lines = list(lines) or ['']
+        for start in range(0, len(lines), room):
+            self.pages.append(header + lines[start:start + room])
+
+    def _content(self, lines):
+        leading = self.font_size * LEADING
+        out = [
+            'BT',
+            f'/F1 {self.font_size} Tf',
+            f'{leading:.2f} TL',
+            f'{MARGIN} {self.height - MARGIN - self.font_size} Td',
+        ]
+        for line in lines:
+            text = str(line)[:self.columns].encode('latin-1', 'replace').decode('latin-1')
+            out.append(f'({_escape(text)}) Tj T*')
+        out.append('ET')
+        return zlib.compress('\n'.join(out).encode('latin-1'))
+
+    def render(self):
+        pages = self.pages or [['']]
+        objects = []
+
+        def add(body):
+            objects.append(body)
+            return len(objects)
+
+        catalog = add(None)
+        tree = add(None)
+        font = add(b'<< /Type /Font /Subtype /Type1 /BaseFont /Courier /Encoding /WinAnsiEncoding >>')
+        info = add(f'<< /Title ({_escape(self.title)}) /Producer (collegeERP) >>'.encode('latin-1', 'replace'))
+        kids = []
+        for lines in pages:
+            stream = self._content(lines)
+            content = add(
+                f'<< /Length {len(stream)} /Filter /FlateDecode >>\nstream\n'.encode('latin-1')
+                + stream + b'\nendstream'
+            )
+            kids.append(add(
+                f'<< /Type /Page /Parent {tree} 0 R /MediaBox [0 0 {self.width} {self.height}] '
+                f'/Resources << /Font << /F1 {font} 0 R >> >> /Contents {content} 0 R >>'.encode('latin-1')
+            ))
+        objects[catalog - 1] = f'<< /Type /Catalog /Pages {tree} 0 R >>'.encode('latin-1')
+        objects[tree - 1] = (
+            f"<< /Type /Pages /Kids [{' '.join(f'{kid} 0 R' for kid in kids)}] /Count {len(kids)} >>"
+        ).encode('latin-1')
+
+        out = bytearray(b'%PDF-1.4\n%\xe2\xe3\xcf\xd3\n')
+        offsets = []
+        for number, body in enumerate(objects, start=1):
+            offsets.append(len(out))
+            out += f'{number} 0 obj\n'.encode('latin-1') + body + b'\nendobj\n'
+        xref = len(out)
+        out += f'xref\n0 {len(objects) + 1}\n0000000000 65535 f \n'.encode('latin-1')
+        for offset in offsets:
+            out += f'{offset:010d} 00000 n \n'.encode('latin-1')
+        out += (
+            f'trailer\n<< /Size {len(objects) + 1} /Root {catalog} 0 R /Info {info} 0 R >>\n'
+            f'startxref\n{xref}\n%%EOF\n'
+        ).encode('latin-1')
+        return bytes(out)
@@ -0,0 +1,113 @@
+"""
+Response renderers used by every API view (see REST_FRAMEWORK in settings).
+
+ORJSONRenderer is a drop-in replacement for DRF's JSONRenderer backed by
+orjson, which encodes large lists (the 10k-row student master) several times
+faster. MessagePackRenderer serves the same payloads as MessagePack for
+clients that send ``Accept: application/msgpack`` (the Syncronik app).
+
+Both renderers encode the types DRF's JSONEncoder knows about in the same
+way, so switching the Accept header never changes the values a client sees.
+"""
+import datetime
+import decimal
+import uuid
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db.models.query import QuerySet
+from django.utils.functional import Promise
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+
+try:
+    import orjson
+except ImportError:  # fall back to the stdlib encoder
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+
+def _encode_datetime(obj):
+    # Same format as rest_framework.utils.encoders.JSONEncoder (DRF 3.14
+    # keeps the microseconds)
+    representation = obj.isoformat()
+    if representation.endswith('+00:00'):
+        representation = representation[:-6] + 'Z'
+    return representation
+
+
+def encode_default(obj):
+    """Fallback for values the fast encoders don't handle natively."""
+    if isinstance(obj, Promise):
+        return str(obj)
+    if isinstance(obj, datetime.datetime):
+        return _encode_datetime(obj)
+    if isinstance(obj, datetime.date):
+        return obj.isoformat()
+    if isinstance(obj, datetime.time):
+        if obj.utcoffset() is not None:
+            raise ValueError("JSON can't represent timezone-aware times.")
+        return obj.isoformat()
+    if isinstance(obj, datetime.timedelta):
+        return str(obj.total_seconds())
+    if isinstance(obj, decimal.Decimal):
+        return float(obj)
+    if isinstance(obj, uuid.UUID):
+        return str(obj)
+    if isinstance(obj, QuerySet):
+        return tuple(obj)
+    if isinstance(obj, bytes):
+        return obj.decode()
+    if hasattr(obj, 'tolist'):
+        # Numpy arrays and array scalars
+        return obj.tolist()
+    if hasattr(obj, '__getitem__'):
+        cls = list if isinstance(obj, (list, tuple)) else dict
+        try:
+            return cls(obj)
+        except Exception:
+            pass
+    if hasattr(obj, '__iter__'):
+        return tuple(item for item in obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not serializable")
+
+
+class ORJSONRenderer(JSONRenderer):
+    """JSONRenderer with the encoding done by orjson."""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        if data is None:
+            return b''
+
+        renderer_context = renderer_context or {}
+        options = (
+            orjson.OPT_NON_STR_KEYS |
+            orjson.OPT_PASSTHROUGH_DATETIME |
+            orjson.OPT_SERIALIZE_NUMPY
+        )
+        if self.get_indent(accepted_media_type, renderer_context):
+            options |= orjson.OPT_INDENT_2
+
+        return orjson.dumps(data, default=encode_default, option=options)
+
+
+class MessagePackRenderer(BaseRenderer):
+    """Renders the response as MessagePack for Accept: application/msgpack."""
+    media_type = 'application/msgpack'
+    format = 'msgpack'
+    charset = None
+    render_style = 'binary'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if msgpack is None:
+            raise ImproperlyConfigured('MessagePackRenderer requires the msgpack package')
+
+        if data is None:
+            return b''
+
+        return msgpack.packb(data, default=encode_default, use_bin_type=True, datetime=False)
@@ -0,0 +1,25 @@
+"""
+Database routing.
+
+Promotion progress (student/promotion.py) is kept in its own cache table,
+CACHES['progress'], which is read and written through the 'progress'
+database alias. That alias is a second connection to the same database and
+is never inside a request's or a job's transaction, so every progress write
+commits at once and other workers can poll a long job while it runs.
+"""
+
+PROGRESS_CACHE_TABLE = 'CACHE_PROGRESS'
+PROGRESS_DATABASE = 'progress'
+
+
+class ProgressCacheRouter:
+    def _route(self, model):
+        if model._meta.db_table == PROGRESS_CACHE_TABLE:
+            return PROGRESS_DATABASE
+        return None
+
+    def db_for_read(self, model, **hints):
+        return self._route(model)
+
+    def db_for_write(self, model, **hints):
+        return self._route(model)
@@ -0,0 +1,417 @@
+"""
+Scheduling conflicts between date ranges.
+
+Examinations, academic terms, semester durations and committee events each
+carry a START/END date pair. Two rows of the same kind conflict when their
+ranges overlap (both ends inclusive) and they share a scope; deleted and
+inactive rows are left out:
+
+    examination         same institute (of the exam's academic year)
+    academic-term       same institute
+    semester-duration   same SEMESTER
+    event               same organizing committee
+
+Each (kind, scope) pair has an interval index: the rows sorted by start
+date, laid out as an implicit balanced binary tree (the middle element of a
+slice is the root of that slice) where every node also records the latest
+end date in its subtree. "What overlaps [start, end]" walks down from the
+root and skips any subtree whose latest end is before ``start`` and any
+right subtree whose root already starts after ``end``, which makes a lookup
+O(log n) plus the matches.
+
+The indexes for a kind are built from one query the first time they are
+needed and kept in the process. Each lookup reads a version in the shared
+cache that saving or deleting a row bumps, and rebuilds the indexes when it
+moved. Writes that send no signal (bulk_create(), an update() that sets
+UPDATED_AT) are caught by the kind's row count and latest UPDATED_AT, which
+are read at most every SCHEDULE_FINGERPRINT_SECONDS.
+
+Serializers call ``check_overlap()`` from validate() so overlapping rows are
+refused on create and update. Examinations are only warned about: one
+institute runs the exams of many programs side by side, so an overlap there
+is usually intended. Two endpoints sit on top:
+
+    GET /api/schedule/overlaps/?start=2025-11-01&end=2025-11-10&kinds=examination,event&scope=...
+    GET /api/schedule/conflicts/?academic_year=3
+
+the second one listing every conflicting pair within an academic year plus
+the committee events that fall during an examination.
+"""
+import time
+from collections import defaultdict
+from datetime import date
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, F, Max
+from django.db.models.signals import post_delete, post_save
+from django.utils.dateparse import parse_date
+from rest_framework import serializers, status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+CACHE_PREFIX = 'core:schedule'
+ALL_SCOPES = object()
+
+
+class Kind:
+    __slots__ = ('name', 'label', 'start', 'end', 'scope', 'title', 'describe', 'refuse')
+
+    def __init__(self, name, label, start, end, scope, title, describe, refuse=True):
+        self.name = name
+        self.label = label          # model label
+        self.start = start          # start date field
+        self.end = end              # end date field
+        self.scope = scope          # lookup giving the row's scope
+        self.title = title          # lookup used to name the row in messages
+        self.describe = describe    # what the scope is, for messages
+        self.refuse = refuse        # False: overlaps are returned as warnings
+
+    @property
+    def model(self):
+        return apps.get_model(self.label)
+
+
+KINDS = {
+    kind.name: kind for kind in (
+        Kind('examination', 'academic.EXAMINATION', 'START_DATE', 'END_DATE',
+             'ACADEMIC_TERM__ACADEMIC_YEAR__INSTITUTE', 'NAME', 'institute', refuse=False),
+        Kind('academic-term', 'academic.ACADEMIC_TERM', 'START_DATE', 'END_DATE',
+             'ACADEMIC_YEAR__INSTITUTE', 'NAME', 'institute'),
+        Kind('semester-duration', 'accounts.SEMESTER_DURATION', 'START_DATE', 'END_DATE',
+             'SEMESTER', 'SEMESTER', 'semester'),
+        Kind('event', 'committee.EVENT_MASTER', 'EVENT_START_DT', 'EVENT_END_DT',
+             'ORGANIZED_BY', 'EVENT_NAME', 'committee'),
+    )
+}
+
+
+class IntervalIndex:
+    """Static interval tree over (start, end, key) triples; ends are inclusive."""
+
+    __slots__ = ('starts', 'ends', 'keys', 'max_end')
+
+    def __init__(self, items):
+        items = sorted(items, key=lambda item: (item[0], item[1]))
+        self.starts = [item[0] for item in items]
+        self.ends = [item[1] for item in items]
+        self.keys = [item[2] for item in items]
+        self.max_end = [None] * len(items)
+        self._augment(0, len(items))
+
+    def __len__(self):
+        return len(self.keys)
+
+    def _augment(self, lo, hi):
+        if lo >= hi:
+            return date.min
+        mid = (lo + hi) // 2
+        latest = max(self.ends[mid], self._augment(lo, mid), self._augment(mid + 1, hi))
+        self.max_end[mid] = latest
+        return latest
+
+    def positions(self, start, end):
+        """Positions (in start order) of the intervals overlapping [start, end]."""
+        found = []
+        stack = [(0, len(self.keys))]
+        while stack:
+            lo, hi = stack.pop()
+            if lo >= hi:
+                continue
+            mid = (lo + hi) // 2
+            if self.max_end[mid] < start:
+                continue
+            stack.append((lo, mid))
+            if self.starts[mid] <= end:
+                if self.ends[mid] >= start:
+                    found.append(mid)
+                stack.append((mid + 1, hi))
+        found.sort()
+        return found
+
+    def overlapping(self, start, end):
+        return [self.keys[position] for position in self.positions(start, end)]
+
+    def pairs(self):
+        """Every overlapping pair of keys, each reported once."""
+        out = []
+        for i, (start, end) in enumerate(zip(self.starts, self.ends)):
+            for j in self.positions(start, end):
+                if j > i:
+                    out.append((self.keys[i], self.keys[j]))
+        return out
+
+
+class _Indexes:
+    __slots__ = ('version', 'fingerprint', 'checked', 'by_scope', 'rows')
+
+    def __init__(self, version, fingerprint, by_scope, rows):
+        self.version = version
+        self.fingerprint = fingerprint
+        self.checked = time.monotonic()   # when the fingerprint was last read
+        self.by_scope = by_scope    # scope -> IntervalIndex of pks
+        self.rows = rows            # pk -> row dict
+
+
+_memo = {}
+
+
+def _version_key(kind):
+    return f'{CACHE_PREFIX}:version:{kind}'
+
+
+def _version(kind):
+    return cache.get_or_set(_version_key(kind), 1, None)
+
+
+def _fingerprint(kind):
+    # Catches inserts, deletes and saves the signal-driven version missed
+    totals = kind.model.objects.aggregate(rows=Count('pk'), updated=Max('UPDATED_AT'))
+    return totals['rows'], totals['updated']
+
+
+def invalidate(kind):
+    try:
+        cache.incr(_version_key(kind))
+    except ValueError:
+        cache.set(_version_key(kind), 2, None)
+
+
+def _live(model):
+    queryset = model.objects.filter(IS_DELETED=False)
+    if any(field.name == 'IS_ACTIVE' for field in model._meta.fields):
+        queryset = queryset.filter(IS_ACTIVE=True)
+    return queryset
+
+
+def _row(kind, values):
+    return {
+        'kind': kind.name,
+        'id': values['pk'],
+        'title': values['title'],
+        'scope': values['scope'],
+        'start': values['start'],
+        'end': values['end'],
+    }
+
+
+def _values(kind, queryset):
+    return queryset.values(
+        'pk', scope=F(kind.scope), title=F(kind.title), start=F(kind.start), end=F(kind.end)
+    )
+
+
+def indexes(kind_name):
+    """The per-scope indexes of a kind, rebuilt when its version moved."""
+    kind = KINDS[kind_name]
+    version = _version(kind_name)
+    held = _memo.get(kind_name)
+    if held is not None and held.version == version:
+        interval = getattr(settings, 'SCHEDULE_FINGERPRINT_SECONDS', 5)
+        if time.monotonic() - held.checked < interval:
+            return held
+        fingerprint = _fingerprint(kind)
+        if held.fingerprint == fingerprint:
+            held.checked = time.monotonic()
+            return held
+    else:
+        fingerprint = _fingerprint(kind)
+    rows = {}
+    grouped = defaultdict(list)
+    for values in _values(kind, _live(kind.model)).iterator(chunk_size=2000):
+        row = _row(kind, values)
+        rows[row['id']] = row
+        grouped[row['scope']].append((row['start'], row['end'], row['id']))
+    held = _Indexes(version, fingerprint, {scope: IntervalIndex(items) for scope, items in grouped.items()}, rows)
+    _memo[kind_name] = held
+    return held
+
+
+def overlapping(kind_name, start, end, scope=ALL_SCOPES, exclude=None):
+    """Rows of a kind overlapping [start, end], in one scope or in all of them."""
+    held = indexes(kind_name)
+    if scope is ALL_SCOPES:
+        trees = held.by_scope.values()
+    else:
+        trees = [held.by_scope[scope]] if scope in held.by_scope else []
+    found = []
+    for tree in trees:
+        found.extend(held.rows[pk] for pk in tree.overlapping(start, end) if pk != exclude)
+    found.sort(key=lambda row: (row['start'], row['end'], row['id']))
+    return found
+
+
+def check_overlap(kind_name, attrs, instance=None, scope=None):
+    """
+    Serializer validation: raise ValidationError when the dates in attrs (or
+    the instance's, for partial updates) are reversed or overlap another row
+    of the same kind and scope. ``scope`` is the scope the row will have,
+    in the form its scope lookup returns (a committee's pk, not the row).
+    For a kind that does not refuse overlaps, returns them as warnings
+    ({'message', 'conflicts'}) instead; otherwise returns None.
+    """
+    kind = KINDS[kind_name]
+    start = attrs.get(kind.start, getattr(instance, kind.start, None))
+    end = attrs.get(kind.end, getattr(instance, kind.end, None))
+    if start is None or end is None:
+        return None
+    if end < start:
+        raise serializers.ValidationError({kind.end: f'{kind.end} cannot be before {kind.start}'})
+    if instance is not None \
+            and (start, end) == (getattr(instance, kind.start), getattr(instance, kind.end)) \
+            and scope == scope_of(kind_name, instance):
+        # Dates and scope unchanged: nothing new to conflict with
+        return None
+    clashes = overlapping(kind_name, start, end, scope=scope, exclude=getattr(instance, 'pk', None))
+    if not clashes:
+        return None
+    names = ', '.join(f"{row['title']} ({row['start']} - {row['end']})" for row in clashes[:5])
+    more = f' and {len(clashes) - 5} more' if len(clashes) > 5 else ''
+    message = f'Overlaps another {kind_name.replace("-", " ")} of the same {kind.describe}: {names}{more}'
+    conflicts = [{key: str(value) if key in ('start', 'end') else value for key, value in row.items()}
+                 for row in clashes]
+    if not kind.refuse:
+        return {'message': message, 'conflicts': conflicts}
+    raise serializers.ValidationError({'non_field_errors': [message], 'conflicts': conflicts})
+
+
+def scope_of(kind_name, instance):
+    """Current scope of a saved row."""
+    kind = KINDS[kind_name]
+    return kind.model.objects.filter(pk=instance.pk).values_list(kind.scope, flat=True).first()
+
+
+def conflict_report(academic_year):
+    """
+    Every overlapping pair within the academic year's dates, per kind, plus
+    the events that run during one of the year's examinations. Terms and
+    examinations are limited to the year's institute.
+    """
+    window = (academic_year.START_DATE, academic_year.END_DATE)
+    in_year = {}
+    for name, kind in KINDS.items():
+        held = indexes(name)
+        rows = {}
+        for scope, tree in held.by_scope.items():
+            if kind.describe == 'institute' and scope != academic_year.INSTITUTE:
+                continue
+            for pk in tree.overlapping(*window):
+                rows[pk] = held.rows[pk]
+        in_year[name] = rows
+
+    report = {}
+    for name, rows in in_year.items():
+        by_scope = defaultdict(list)
+        for row in rows.values():
+            by_scope[row['scope']].append((row['start'], row['end'], row['id']))
+        pairs = []
+        for scope, items in by_scope.items():
+            for first, second in IntervalIndex(items).pairs():
+                pairs.append(_pair(rows[first], rows[second]))
+        pairs.sort(key=lambda pair: (pair['from'], pair['a']['id'], pair['b']['id']))
+        report[name] = {'rows': len(rows), 'conflicts': pairs}
+
+    exams = IntervalIndex(
+        [(row['start'], row['end'], row['id']) for row in in_year['examination'].values()]
+    )
+    during = []
+    for event in in_year['event'].values():
+        for pk in exams.overlapping(event['start'], event['end']):
+            during.append(_pair(event, in_year['examination'][pk]))
+    during.sort(key=lambda pair: (pair['from'], pair['a']['id'], pair['b']['id']))
+    report['events-during-examinations'] = during
+    return report
+
+
+def _pair(a, b):
+    return {
+        'a': a,
+        'b': b,
+        'from': max(a['start'], b['start']),
+        'to': min(a['end'], b['end']),
+    }
+
+
+def _invalidator(kind_name):
+    def handler(sender, **kwargs):
+        invalidate(kind_name)
+    return handler
+
+
+def connect_signals():
+    for name, kind in KINDS.items():
+        handler = _invalidator(name)
+        post_save.connect(handler, sender=apps.get_model(kind.label), weak=False,
+                          dispatch_uid=f'schedule-save-{name}')
+        post_delete.connect(handler, sender=apps.get_model(kind.label), weak=False,
+                            dispatch_uid=f'schedule-delete-{name}')
+    # A term moving to another academic year changes its exams' institute
+    term_changed = _invalidator('examination')
+    post_save.connect(term_changed, sender=apps.get_model('academic.ACADEMIC_TERM'), weak=False,
+                      dispatch_uid='schedule-save-term-exams')
+    post_save.connect(_invalidator('academic-term'), sender=apps.get_model('academic.ACADEMIC_YEAR'),
+                      weak=False, dispatch_uid='schedule-save-year-terms')
+    post_save.connect(term_changed, sender=apps.get_model('academic.ACADEMIC_YEAR'), weak=False,
+                      dispatch_uid='schedule-save-year-exams')
+
+
+def _kinds_param(request):
+    raw = request.query_params.get('kinds')
+    names = [name.strip() for name in raw.split(',') if name.strip()] if raw else list(KINDS)
+    unknown = [name for name in names if name not in KINDS]
+    if unknown:
+        raise ValueError(f"Unknown kinds: {', '.join(unknown)}; expected {', '.join(KINDS)}")
+    return names
+
+
+class ScheduleOverlapView(APIView):
+    """GET rows overlapping ?start..?end, optionally limited to ?kinds and ?scope."""
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        start = parse_date(request.query_params.get('start') or '')
+        end = parse_date(request.query_params.get('end') or '') or start
+        if start is None or end < start:
+            return Response({
+                'status': 'error',
+                'message': 'start (and optionally end, not before it) must be YYYY-MM-DD dates'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            names = _kinds_param(request)
+        except ValueError as exc:
+            return Response({'status': 'error', 'message': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        scope = request.query_params.get('scope')
+        data = {}
+        for name in names:
+            rows = overlapping(name, start, end)
+            if scope is not None:
+                rows = [row for row in rows if str(row['scope']) == scope]
+            data[name] = rows
+        return Response({'status': 'success', 'data': data})
+
+
+class ScheduleConflictReportView(APIView):
+    """GET every scheduling conflict within ?academic_year."""
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        year_id = request.query_params.get('academic_year')
+        year = None
+        if year_id and year_id.isdigit():
+            year = apps.get_model('academic.ACADEMIC_YEAR').objects.filter(IS_DELETED=False, pk=year_id).first()
+        if year is None:
+            return Response({
+                'status': 'error', 'message': 'academic_year must be an existing academic year id'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        return Response({
+            'status': 'success',
+            'data': {
+                'academic_year': year.pk,
+                'start': year.START_DATE,
+                'end': year.END_DATE,
+                'institute': year.INSTITUTE,
+                **conflict_report(year),
+            }
+        })
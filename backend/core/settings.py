@@ -116,6 +116,41 @@ DATABASES = {
     }
 }
 
+# Shared cache: the document matrix (student/matrix.py) and schedule index
+# versions (core/schedule.py) must be visible to every worker process, so the
+# default is a table in the database (created by
+# core/migrations/0004_cache_table.py). Set REDIS_URL to use Redis instead.
+#
+# Promotion progress (student/promotion.py) is written while the job's own
+# transaction is open. In the database it therefore goes to a separate table
+# on the 'progress' connection, which stays in autocommit (core/routers.py),
+# so other workers see it before the job commits.
+DATABASES['progress'] = {**DATABASES['default'], 'TEST': {'MIRROR': 'default'}}
+DATABASE_ROUTERS = ['core.routers.ProgressCacheRouter']
+
+if os.getenv('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.getenv('REDIS_URL'),
+        },
+        'progress': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.getenv('REDIS_URL'),
+        },
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+            'LOCATION': 'CACHE_ENTRIES',
+        },
+        'progress': {
+            'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+            'LOCATION': 'CACHE_PROGRESS',
+        },
+    }
+
 # Remove these as we don't need them anymore
 # DATABASE_ROUTERS = []
 # AUTH_GROUP_TABLE = 'AUTH_GROUPS'
@@ -194,6 +229,14 @@ EMAIL_HOST_USER = os.getenv('EMAIL_HOST_USER')
 EMAIL_HOST_PASSWORD = os.getenv('EMAIL_HOST_PASSWORD')
 DEFAULT_FROM_EMAIL = os.getenv('DEFAULT_FROM_EMAIL')
 
+# Bulk user provisioning: processes used to hash passwords (defaults to CPU count)
+PROVISIONING_HASH_WORKERS = int(os.getenv('PROVISIONING_HASH_WORKERS', '0')) or None
+
+# Password history: upper bound (seconds) on verifying a new password against
+# the stored history, and threads shared by all history checks
+PASSWORD_HISTORY_CHECK_BUDGET = float(os.getenv('PASSWORD_HISTORY_CHECK_BUDGET', '2.0'))
+PASSWORD_HISTORY_CHECK_WORKERS = int(os.getenv('PASSWORD_HISTORY_CHECK_WORKERS', '0')) or None
+
 # JWT Settings
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
@@ -203,6 +246,12 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.AllowAny',  # Change this temporarily
     ),
+    # orjson for JSON, MessagePack for clients sending Accept: application/msgpack
+    'DEFAULT_RENDERER_CLASSES': (
+        'core.renderers.ORJSONRenderer',
+        'core.renderers.MessagePackRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
 }
 
 SIMPLE_JWT = {
@@ -239,8 +288,70 @@ CORS_ALLOW_HEADERS = [
     'x-csrftoken',
     'x-requested-with',
     'x-username',  # Add this line for our custom header
+    'idempotency-key',
+    'upload-offset',
+    'upload-checksum',
+    'range',
+    'if-range',
+]
+CORS_EXPOSE_HEADERS = [
+    'idempotent-replayed', 'upload-offset', 'upload-length', 'location',
+    'content-disposition', 'content-range', 'accept-ranges', 'etag',
 ]
 
+# Idempotency-Key handling for POST create endpoints (core/idempotency.py)
+IDEMPOTENCY_KEY_TTL = timedelta(hours=int(os.getenv('IDEMPOTENCY_KEY_TTL_HOURS', '24')))
+IDEMPOTENCY_LOCK_TIMEOUT = 10  # seconds a duplicate waits for the original request
+IDEMPOTENCY_PROCESSING_TIMEOUT = 120  # seconds before an unfinished claim is abandoned
+
+# Delta-sync feed (core/sync.py): changes younger than this, or than the oldest
+# uncommitted write transaction, are held back a sync
+SYNC_SETTLE_SECONDS = 2
+
+# Schedule indexes (core/schedule.py): how often a worker looks for writes that
+# sent no save/delete signal
+SCHEDULE_FINGERPRINT_SECONDS = 5
+
+# Batch endpoint (core/batch.py)
+BATCH_MAX_REQUESTS = 20
+BATCH_MAX_WORKERS = 4  # threads for parallel read-only batches
+
+# Resumable student document uploads (student/uploads.py)
+DOCUMENT_UPLOAD_MAX_SIZE = 100 * 1024 * 1024
+DOCUMENT_UPLOAD_MAX_CHUNK = 16 * 1024 * 1024
+DOCUMENT_UPLOAD_TTL = timedelta(hours=24)
+DOCUMENT_UPLOAD_TEMP_DIR = os.path.join(MEDIA_ROOT, '.uploads')  # same filesystem as MEDIA_ROOT
+
+# Profile photo variants (core/images.py)
+IMAGE_VARIANT_ROOT = os.path.join(MEDIA_ROOT, 'variants')
+IMAGE_VARIANT_WORKERS = 2  # background threads rendering variants after upload
+
+# Document checklist matrix cache (student/matrix.py), kept in the default cache
+DOCUMENT_MATRIX_CACHE_TTL = 600
+
+# Grade tables for marks entry (exam/marks.py): (minimum percentage, grade,
+# grade points), picked per request with "grade_table"
+GRADE_TABLES = {
+    'default': [
+        (90, 'O', 10), (80, 'A+', 9), (70, 'A', 8), (60, 'B+', 7),
+        (55, 'B', 6), (50, 'C', 5), (40, 'P', 4), (0, 'F', 0),
+    ],
+}
+
+# Timetable generation (academic/timetable.py); a timetable's OPTIONS may
+# override the week shape per timetable
+TIMETABLE_DAYS = 6                  # Monday to Saturday
+TIMETABLE_PERIODS = 7               # teaching periods per day
+TIMETABLE_LAB_BLOCK = 2             # consecutive periods per lab session
+TIMETABLE_SECTION_SIZE = 60         # when a class has no students on record yet
+TIMETABLE_MAX_DAILY_PERIODS = 5     # per faculty member, soft
+TIMETABLE_MAX_WEEKLY_PERIODS = 18   # faculty load considered when assigning courses
+TIMETABLE_STABILITY_PENALTY = 5     # per session moved by a re-solve
+TIMETABLE_TIME_LIMIT = 30           # seconds per solve
+
+# Attendance (student/attendance.py): shortage list cut-off, in percent
+ATTENDANCE_SHORTAGE_THRESHOLD = 75
+
 # CSRF Settings
 CSRF_COOKIE_SAMESITE = 'Lax'
 CSRF_COOKIE_HTTPONLY = False
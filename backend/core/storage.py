@@ -0,0 +1,300 @@
+"""
+Content-addressed, deduplicated media storage.
+
+Files saved through ContentAddressedStorage are stored once per content
+hash, sharded across two directory levels:
+
+    MEDIA_ROOT/blobs/3f/a2/3fa2...e9.pdf
+
+and the field keeps that name. Saving a file whose bytes are already stored
+only bumps the blob's reference count, so the same certificate uploaded by a
+hundred students takes the space of one. A blob is written under a
+temporary name and hard-linked into place, so two requests storing the same
+bytes at once both end up with the one complete file.
+
+collect_garbage() deletes a blob's row under a row lock and renames its
+file out of the way before the delete commits. A save of the same bytes
+meanwhile waits on that lock in add_reference(), then recreates the row and
+finds the file gone, so it writes a new one rather than pointing at a file
+about to be unlinked.
+
+The count goes down when a field file is deleted (FieldFile.delete()) and
+when a row holding a blob is deleted (connect_signals()); soft-deleted rows
+keep their reference. Django does not delete the old file when a field is
+given a new one, nor do queryset update()s or raw SQL, so those leave the
+count too high: the blob is kept, never lost. recount() rebuilds the counts
+from the rows that actually point at each blob, and the gc_media_blobs
+command runs it before collect_garbage() removes the blobs that have stayed
+unreferenced for a grace period.
+
+Names that don't start with BLOB_PREFIX (media written before the switch)
+keep working as plain files; the migrate_media_to_blobs command converts
+them in place.
+"""
+import hashlib
+import logging
+import os
+import tempfile
+from datetime import timedelta
+
+from django.apps import apps
+from django.core.files.storage import FileSystemStorage
+from django.db import connection, transaction
+from django.db.models import F, FileField
+from django.db.models.signals import post_delete
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from .models import MEDIA_BLOB
+
+logger = logging.getLogger(__name__)
+
+BLOB_PREFIX = 'blobs'
+TOMBSTONE_PREFIX = '.gc-'
+MAX_EXTENSION_LENGTH = 10
+
+
+def blob_name_for(digest, filename):
+    ext = os.path.splitext(filename)[1].lower()
+    if len(ext) > MAX_EXTENSION_LENGTH or not ext[1:].isalnum():
+        ext = ''
+    return f'{BLOB_PREFIX}/{digest[:2]}/{digest[2:4]}/{digest}{ext}'
+
+
+def is_blob_name(name):
+    return bool(name) and name.startswith(f'{BLOB_PREFIX}/')
+
+
+def hash_file(content):
+    digest = hashlib.sha256()
+    size = 0
+    for chunk in content.chunks():
+        digest.update(chunk)
+        size += len(chunk)
+    if hasattr(content, 'seek'):
+        content.seek(0)
+    return digest.hexdigest(), size
+
+
+class ContentAddressedStorage(FileSystemStorage):
+
+    def get_available_name(self, name, max_length=None):
+        # The final name comes from the content hash in _save()
+        return name
+
+    def _save(self, name, content):
+        digest, size = hash_file(content)
+        blob_name = blob_name_for(digest, name)
+
+        # Reference first: collect_garbage() never removes a referenced blob
+        self.add_reference(blob_name, digest, size)
+        if not self.exists(blob_name):
+            self._store(blob_name, content)
+        return blob_name
+
+    def _store(self, name, content):
+        path = self.path(name)
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        if self.directory_permissions_mode is not None:
+            os.chmod(directory, self.directory_permissions_mode)
+        handle, temp_path = tempfile.mkstemp(dir=directory, prefix='.part-')
+        try:
+            with os.fdopen(handle, 'wb') as output:
+                for chunk in content.chunks():
+                    output.write(chunk)
+            if self.file_permissions_mode is not None:
+                os.chmod(temp_path, self.file_permissions_mode)
+            try:
+                os.link(temp_path, path)
+            except FileExistsError:
+                # Another request stored the same bytes first
+                pass
+        finally:
+            os.remove(temp_path)
+
+    def add_reference(self, name, digest, size):
+        # One upsert: if collect_garbage() holds the row it waits, and inserts
+        # a fresh row once the delete commits
+        now = timezone.now()
+        with connection.cursor() as cursor:
+            cursor.execute(ADD_REFERENCE_SQL, [name, digest, size, now, now])
+
+    def delete(self, name):
+        if not is_blob_name(name):
+            return super().delete(name)
+        # Blobs are only removed by collect_garbage(), so a concurrent save
+        # of the same content can't lose its file
+        MEDIA_BLOB.objects.filter(NAME=name).update(
+            REFCOUNT=Greatest(F('REFCOUNT') - 1, 0),
+            UPDATED_AT=timezone.now()
+        )
+
+
+ADD_REFERENCE_SQL = f'''
+    INSERT INTO {MEDIA_BLOB._meta.db_table} AS b ("NAME", "SHA256", "SIZE", "REFCOUNT", "CREATED_AT", "UPDATED_AT")
+    VALUES (%s, %s, %s, 1, %s, %s)
+    ON CONFLICT ("NAME") DO UPDATE
+       SET "REFCOUNT" = b."REFCOUNT" + 1, "UPDATED_AT" = EXCLUDED."UPDATED_AT"
+'''
+
+
+_storage = None
+
+
+def media_blob_storage():
+    """Storage callable for the FileFields that use content-addressed storage."""
+    global _storage
+    if _storage is None:
+        _storage = ContentAddressedStorage()
+    return _storage
+
+
+def blob_fields():
+    """(model, field) pairs stored through the content-addressed storage."""
+    pairs = []
+    for model in apps.get_models():
+        for field in model._meta.concrete_fields:
+            if isinstance(field, FileField) and isinstance(field.storage, ContentAddressedStorage):
+                pairs.append((model, field))
+    return pairs
+
+
+def _release_deleted(fields):
+    def receiver(sender, instance, **kwargs):
+        storage = media_blob_storage()
+        for field in fields:
+            name = getattr(instance, field.attname).name
+            if is_blob_name(name):
+                storage.delete(name)
+    return receiver
+
+
+def connect_signals():
+    """Release the blobs of deleted rows."""
+    by_model = {}
+    for model, field in blob_fields():
+        by_model.setdefault(model, []).append(field)
+    for model, fields in by_model.items():
+        post_delete.connect(
+            _release_deleted(fields), sender=model, weak=False, dispatch_uid=f'media-blobs-{model._meta.label}'
+        )
+
+
+def recount():
+    """
+    Rebuild REFCOUNT from the rows that reference each blob, and register
+    blob files on disk that have no MEDIA_BLOB row. Returns the number of
+    blobs whose count changed.
+    """
+    counts = {}
+    for model, field in blob_fields():
+        names = (
+            model._base_manager
+            .filter(**{f'{field.attname}__startswith': f'{BLOB_PREFIX}/'})
+            .values_list(field.attname, flat=True)
+        )
+        for name in names.iterator(chunk_size=2000):
+            counts[name] = counts.get(name, 0) + 1
+
+    storage = media_blob_storage()
+    for name in _walk_blobs(storage):
+        counts.setdefault(name, 0)
+
+    changed = 0
+    known = dict(MEDIA_BLOB.objects.values_list('NAME', 'REFCOUNT'))
+    for name, count in counts.items():
+        if known.get(name) == count:
+            continue
+        if name not in known:
+            if not storage.exists(name):
+                logger.warning("Referenced blob %s is missing from storage", name)
+                continue
+            digest = os.path.basename(name).split('.')[0]
+            MEDIA_BLOB.objects.create(NAME=name, SHA256=digest, SIZE=storage.size(name), REFCOUNT=count)
+        else:
+            MEDIA_BLOB.objects.filter(NAME=name).update(REFCOUNT=count, UPDATED_AT=timezone.now())
+        changed += 1
+
+    stale = set(known) - set(counts)
+    if stale:
+        MEDIA_BLOB.objects.filter(NAME__in=stale).update(REFCOUNT=0, UPDATED_AT=timezone.now())
+        changed += len(stale)
+    return changed
+
+
+def _walk_blobs(storage):
+    root = storage.path(BLOB_PREFIX)
+    if not os.path.isdir(root):
+        return
+    for directory, _, files in os.walk(root):
+        for filename in files:
+            if filename.startswith('.'):
+                # A blob still being written by _store()
+                continue
+            path = os.path.join(directory, filename)
+            yield os.path.relpath(path, storage.location).replace(os.sep, '/')
+
+
+def _tombstone(path):
+    directory, filename = os.path.split(path)
+    return os.path.join(directory, f'{TOMBSTONE_PREFIX}{filename}')
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def _collect(storage, name):
+    """Delete one unreferenced blob; False when it was referenced again meanwhile."""
+    path = storage.path(name)
+    tombstone = _tombstone(path)
+    with transaction.atomic():
+        blob = MEDIA_BLOB.objects.select_for_update().filter(NAME=name, REFCOUNT__lte=0).first()
+        if blob is None:
+            return False
+        try:
+            os.replace(path, tombstone)
+        except FileNotFoundError:
+            tombstone = None
+        try:
+            blob.delete()
+        except Exception:
+            if tombstone:
+                os.replace(tombstone, path)
+            raise
+        if tombstone:
+            transaction.on_commit(lambda: _remove(tombstone))
+    return True
+
+
+def _sweep_tombstones(storage, cutoff):
+    """Remove tombstones a crashed run left behind (renaming sets their ctime)."""
+    root = storage.path(BLOB_PREFIX)
+    for directory, _, files in os.walk(root):
+        for filename in files:
+            path = os.path.join(directory, filename)
+            if filename.startswith(TOMBSTONE_PREFIX) and os.stat(path).st_ctime < cutoff.timestamp():
+                _remove(path)
+
+
+def collect_garbage(grace=timedelta(hours=1), dry_run=False):
+    """
+    Delete blobs that have had no references for longer than grace.
+    Returns (count, bytes) of the blobs removed.
+    """
+    storage = media_blob_storage()
+    cutoff = timezone.now() - grace
+    removed = 0
+    freed = 0
+    candidates = MEDIA_BLOB.objects.filter(REFCOUNT__lte=0, UPDATED_AT__lt=cutoff).values_list('NAME', 'SIZE')
+    for name, size in candidates.iterator():
+        if dry_run or _collect(storage, name):
+            removed += 1
+            freed += size
+    if not dry_run:
+        _sweep_tombstones(storage, cutoff)
+    return removed, freed
@@ -0,0 +1,235 @@
+"""
+Delta-sync change feed for offline clients (the Syncronik app).
+
+GET /api/sync/changes/?entities=students,branches&cursor=<opaque>&limit=200
+
+For every requested entity the feed returns the rows whose UPDATED_AT moved
+past the client's position: live rows as ``upserts`` (serialized with the
+entity's regular serializer) and soft-deleted rows as ``tombstones`` (primary
+keys only). The response carries a new opaque cursor; passing it back returns
+only what changed since. ``has_more`` tells the client to keep paging.
+
+Positions are (UPDATED_AT, pk) pairs walked with keyset pagination over an
+index on those two columns, so each page is an index range scan no matter
+how large the table is. UPDATED_AT is stamped when a row is written, not when
+its transaction commits, so a page only goes up to a horizon that no open
+transaction can still write behind: the start of the oldest transaction that
+has written and not yet committed, less SYNC_SETTLE_SECONDS for stamps taken
+just before a transaction began (and for clock skew). A job that runs for an
+hour holds the feed back for that hour instead of having its rows skipped.
+"""
+import base64
+import binascii
+import json
+from datetime import timedelta
+from importlib import import_module
+
+from django.apps import apps
+from django.conf import settings
+from django.db import connection
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from rest_framework import status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+CURSOR_VERSION = 1
+DEFAULT_LIMIT = 200
+MAX_LIMIT = 1000
+
+# entity name -> (model label, serializer path)
+SYNC_ENTITIES = {
+    # Students and staff
+    'students': ('student.STUDENT_MASTER', 'student.serializers.StudentMasterSerializer'),
+    'employees': ('establishments.EMPLOYEE_MASTER', 'establishments.serializers.EmployeeMasterSerializer'),
+
+    # Masters
+    'countries': ('accounts.COUNTRY', 'accounts.serializers.CountrySerializer'),
+    'states': ('accounts.STATE', 'accounts.serializers.StateSerializer'),
+    'cities': ('accounts.CITY', 'accounts.serializers.CitySerializer'),
+    'currencies': ('accounts.CURRENCY', 'accounts.serializers.CurrencySerializer'),
+    'languages': ('accounts.LANGUAGE', 'accounts.serializers.LanguageSerializer'),
+    'designations': ('accounts.DESIGNATION', 'accounts.serializers.DesignationSerializer'),
+    'categories': ('accounts.CATEGORY', 'accounts.serializers.CategorySerializer'),
+    'universities': ('accounts.UNIVERSITY', 'accounts.serializers.UniversitySerializer'),
+    'institutes': ('accounts.INSTITUTE', 'accounts.serializers.InstituteSerializer'),
+    'departments': ('accounts.DEPARTMENT', 'accounts.serializers.DepartmentSerializer'),
+    'programs': ('accounts.PROGRAM', 'accounts.serializers.ProgramSerializer'),
+    'branches': ('accounts.BRANCH', 'accounts.serializers.BranchSerializer'),
+    'years': ('accounts.YEAR', 'accounts.serializers.YearSerializer'),
+    'semesters': ('accounts.SEMESTER', 'accounts.serializers.SemesterSerializer'),
+    'semester-durations': ('accounts.SEMESTER_DURATION', 'accounts.serializers.SemesterDurationSerializer'),
+    'castes': ('accounts.CASTE_MASTER', 'accounts.serializers.CasteSerializer'),
+    'quotas': ('accounts.QUOTA_MASTER', 'accounts.serializers.QuotaSerializer'),
+    'admission-quotas': ('accounts.ADMISSION_QUOTA_MASTER', 'accounts.serializers.AdmissionQuotaSerializer'),
+    'checklist-documents': ('student.CHECK_LIST_DOCUMENTS', 'student.serializers.CheckListDoumentsSerializer'),
+    'employee-types': ('establishments.TYPE_MASTER', 'establishments.serializers.TypeMasterSerializer'),
+    'employee-statuses': ('establishments.STATUS_MASTER', 'establishments.serializers.StatusMasterSerializer'),
+    'shifts': ('establishments.SHIFT_MASTER', 'establishments.serializers.ShiftMasterSerializer'),
+
+    # Committees
+    'committees': ('committee.COMMITTEE_MASTER', 'committee.serializers.CommitteeMasterSerializer'),
+    'event-types': ('committee.EVENT_TYPE_MASTER', 'committee.serializers.EventTypeMasterSerializer'),
+    'events': ('committee.EVENT_MASTER', 'committee.serializers.EventMasterSerializer'),
+}
+
+
+# The oldest transaction of another session that has been assigned a
+# transaction id, i.e. has written something and not committed it yet.
+# pg_stat_activity is read once per transaction and kept, so a request that
+# runs in one must drop that copy first. Sessions of other database roles
+# are only visible with pg_read_all_stats
+CLEAR_ACTIVITY_SQL = 'SELECT pg_stat_clear_snapshot()'
+OLDEST_WRITER_SQL = '''
+    SELECT MIN(xact_start) FROM pg_stat_activity
+    WHERE datname = current_database() AND backend_xid IS NOT NULL AND pid <> pg_backend_pid()
+'''
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def _load(entity):
+    model_label, serializer_path = SYNC_ENTITIES[entity]
+    module_path, class_name = serializer_path.rsplit('.', 1)
+    return apps.get_model(model_label), getattr(import_module(module_path), class_name)
+
+
+def encode_cursor(positions):
+    payload = json.dumps({'v': CURSOR_VERSION, 'p': positions}, separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Returns {entity: (updated_at, pk)} for an opaque cursor."""
+    if not cursor:
+        return {}
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if payload.get('v') != CURSOR_VERSION:
+            raise InvalidCursor('Unsupported cursor version')
+        positions = {}
+        for entity, (updated_at, pk) in payload['p'].items():
+            stamp = parse_datetime(updated_at)
+            if stamp is None:
+                raise InvalidCursor('Malformed cursor')
+            positions[entity] = (stamp, pk)
+        return positions
+    except (binascii.Error, UnicodeDecodeError, json.JSONDecodeError, KeyError, TypeError, ValueError) as e:
+        if isinstance(e, InvalidCursor):
+            raise
+        raise InvalidCursor('Malformed cursor')
+
+
+def sync_horizon():
+    """The newest UPDATED_AT that no uncommitted transaction can still write behind."""
+    horizon = timezone.now()
+    with connection.cursor() as cursor:
+        cursor.execute(CLEAR_ACTIVITY_SQL)
+        cursor.execute(OLDEST_WRITER_SQL)
+        oldest = cursor.fetchone()[0]
+    if oldest is not None:
+        horizon = min(horizon, oldest)
+    return horizon - timedelta(seconds=getattr(settings, 'SYNC_SETTLE_SECONDS', 2))
+
+
+def changes_since(entity, position, limit, horizon, context=None):
+    """
+    One page of changes for an entity after position (None for a first sync).
+    Returns (upserts, tombstones, new_position, has_more).
+    """
+    model, serializer_class = _load(entity)
+    pk_name = model._meta.pk.name
+
+    queryset = model.objects.filter(UPDATED_AT__lte=horizon)
+    if position is None:
+        # A first sync only needs live rows
+        queryset = queryset.filter(IS_DELETED=False)
+    else:
+        updated_at, pk = position
+        queryset = queryset.filter(
+            Q(UPDATED_AT__gt=updated_at) | Q(UPDATED_AT=updated_at, **{f'{pk_name}__gt': pk})
+        )
+
+    rows = list(queryset.order_by('UPDATED_AT', pk_name)[:limit + 1])
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    if not rows:
+        return [], [], position, False
+
+    live = [row for row in rows if not row.IS_DELETED]
+    tombstones = [row.pk for row in rows if row.IS_DELETED]
+    upserts = serializer_class(live, many=True, context=context or {}).data if live else []
+
+    last = rows[-1]
+    return upserts, tombstones, (last.UPDATED_AT, last.pk), has_more
+
+
+class ChangeFeedView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        requested = request.query_params.get('entities', '')
+        entities = [name.strip() for name in requested.split(',') if name.strip()]
+        if not entities:
+            return Response({
+                'status': 'error',
+                'message': 'Specify entities as a comma separated list',
+                'available_entities': sorted(SYNC_ENTITIES)
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        unknown = [name for name in entities if name not in SYNC_ENTITIES]
+        if unknown:
+            return Response({
+                'status': 'error',
+                'message': f'Unknown entities: {", ".join(unknown)}',
+                'available_entities': sorted(SYNC_ENTITIES)
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            limit = int(request.query_params.get('limit', DEFAULT_LIMIT))
+        except ValueError:
+            limit = DEFAULT_LIMIT
+        limit = max(1, min(limit, MAX_LIMIT))
+
+        try:
+            positions = decode_cursor(request.query_params.get('cursor'))
+        except InvalidCursor as e:
+            return Response({
+                'status': 'error',
+                'message': str(e)
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        horizon = sync_horizon()
+        context = {'request': request}
+
+        data = {}
+        any_more = False
+        for entity in entities:
+            upserts, tombstones, position, has_more = changes_since(
+                entity, positions.get(entity), limit, horizon, context
+            )
+            if position is not None:
+                positions[entity] = position
+            data[entity] = {
+                'upserts': upserts,
+                'tombstones': tombstones,
+                'has_more': has_more,
+            }
+            any_more = any_more or has_more
+
+        cursor = encode_cursor({
+            entity: [updated_at.isoformat(), pk]
+            for entity, (updated_at, pk) in positions.items()
+        })
+
+        return Response({
+            'status': 'success',
+            'data': data,
+            'cursor': cursor,
+            'has_more': any_more,
+        })
@@ -0,0 +1,448 @@
+import decimal
+import io
+import json
+import os
+import uuid
+import shutil
+import tempfile
+from datetime import date, datetime, time, timezone as dt_timezone
+from unittest import mock
+
+import msgpack
+import numpy as np
+from PIL import Image
+
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from django.db import connections
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+from rest_framework.permissions import AllowAny
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+from rest_framework.test import APIClient, APIRequestFactory, force_authenticate
+from rest_framework.views import APIView
+
+from academic.models import ACADEMIC_TERM, ACADEMIC_YEAR
+from academic.serializers import ExaminationSerializer
+from academic.views import AcademicTermViewSet, ExaminationViewSet
+from accounts.models import COUNTRY, SEMESTER_DURATION, CustomUser
+from accounts.views import CountryViewSet, SemesterDurationViewSet
+from committee.views import EventMasterViewSet
+from student.views import AttendanceSessionViewSet, SeatAllocationViewSet
+from . import idempotency, schedule
+from .images import photo_urls
+from .idempotency import REPLAYED_HEADER, idempotent
+from .models import IDEMPOTENCY_KEY, MEDIA_BLOB
+from .renderers import MessagePackRenderer, ORJSONRenderer
+from .sync import ChangeFeedView
+from .storage import BLOB_PREFIX, collect_garbage, media_blob_storage, recount
+
+
+class ContentAddressedStorageTest(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.settings = override_settings(MEDIA_ROOT=self.media_root)
+        self.settings.enable()
+        self.storage = media_blob_storage()
+
+    def tearDown(self):
+        self.settings.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+
+    def _files(self):
+        found = []
+        for directory, _, files in os.walk(os.path.join(self.media_root, BLOB_PREFIX)):
+            found.extend(files)
+        return found
+
+    def test_identical_content_is_stored_once(self):
+        first = self.storage.save('a.pdf', ContentFile(b'same bytes'))
+        second = self.storage.save('b.PDF', ContentFile(b'same bytes'))
+        self.assertEqual(first, second)
+        self.assertTrue(first.startswith(f'{BLOB_PREFIX}/'))
+        self.assertEqual(len(self._files()), 1)
+        self.assertEqual(MEDIA_BLOB.objects.get(NAME=first).REFCOUNT, 2)
+
+    def test_blob_written_by_a_concurrent_request_is_reused(self):
+        # Both requests see no blob yet, so both write it
+        with mock.patch.object(type(self.storage), 'exists', return_value=False):
+            first = self.storage.save('a.pdf', ContentFile(b'raced'))
+            second = self.storage.save('a.pdf', ContentFile(b'raced'))
+        self.assertEqual(first, second)
+        self.assertEqual(self._files(), [os.path.basename(first)])
+        with self.storage.open(first) as handle:
+            self.assertEqual(handle.read(), b'raced')
+
+    def test_deleting_a_row_releases_its_blob(self):
+        user = CustomUser.objects.create(USER_ID='U1', USERNAME='u1', EMAIL='u1@example.com')
+        user.PROFILE_PICTURE.save('me.png', ContentFile(b'not really a png'))
+        name = user.PROFILE_PICTURE.name
+        self.assertEqual(MEDIA_BLOB.objects.get(NAME=name).REFCOUNT, 1)
+
+        CustomUser.objects.filter(pk='U1').delete()
+        self.assertEqual(MEDIA_BLOB.objects.get(NAME=name).REFCOUNT, 0)
+
+    def test_save_during_collection_keeps_its_file(self):
+        name = self.storage.save('a.pdf', ContentFile(b'collected'))
+        MEDIA_BLOB.objects.filter(NAME=name).update(REFCOUNT=0, UPDATED_AT='2000-01-01T00:00:00Z')
+
+        # The same bytes are saved after the collector deleted the row but
+        # before its commit unlinks the file
+        with self.captureOnCommitCallbacks() as unlinks:
+            self.assertEqual(collect_garbage(), (1, len(b'collected')))
+            self.assertFalse(MEDIA_BLOB.objects.filter(NAME=name).exists())
+            self.assertEqual(self.storage.save('b.pdf', ContentFile(b'collected')), name)
+        for unlink in unlinks:
+            unlink()
+
+        self.assertEqual(MEDIA_BLOB.objects.get(NAME=name).REFCOUNT, 1)
+        with self.storage.open(name) as handle:
+            self.assertEqual(handle.read(), b'collected')
+        self.assertEqual(self._files(), [os.path.basename(name)])
+
+    def test_media_migration_survives_a_crash(self):
+        os.makedirs(os.path.join(self.media_root, 'legacy'))
+        with open(os.path.join(self.media_root, 'legacy', 'me.png'), 'wb') as handle:
+            handle.write(b'legacy photo')
+        CustomUser.objects.create(USER_ID='U3', USERNAME='u3', EMAIL='u3@example.com', PROFILE_PICTURE='legacy/me.png')
+
+        with mock.patch.object(type(self.storage), 'add_reference', side_effect=RuntimeError), \
+                self.assertRaises(RuntimeError):
+            call_command('migrate_media_to_blobs', stdout=io.StringIO(), stderr=io.StringIO())
+        self.assertEqual(CustomUser.objects.get(pk='U3').PROFILE_PICTURE.name, 'legacy/me.png')
+        self.assertTrue(self.storage.exists('legacy/me.png'))
+
+        call_command('migrate_media_to_blobs', stdout=io.StringIO(), stderr=io.StringIO())
+        name = CustomUser.objects.get(pk='U3').PROFILE_PICTURE.name
+        self.assertTrue(name.startswith(f'{BLOB_PREFIX}/'))
+        self.assertEqual(MEDIA_BLOB.objects.get(NAME=name).REFCOUNT, 1)
+        self.assertFalse(self.storage.exists('legacy/me.png'))
+        with self.storage.open(name) as handle:
+            self.assertEqual(handle.read(), b'legacy photo')
+
+    def test_recount_and_collect_replaced_blob(self):
+        user = CustomUser.objects.create(USER_ID='U2', USERNAME='u2', EMAIL='u2@example.com')
+        user.PROFILE_PICTURE.save('old.png', ContentFile(b'old photo'))
+        old = user.PROFILE_PICTURE.name
+        user.PROFILE_PICTURE.save('new.png', ContentFile(b'new photo'))
+        new = user.PROFILE_PICTURE.name
+
+        # Replacing a field's file does not release the old blob by itself
+        self.assertEqual(MEDIA_BLOB.objects.get(NAME=old).REFCOUNT, 1)
+        self.assertEqual(recount(), 1)
+        self.assertEqual(MEDIA_BLOB.objects.get(NAME=old).REFCOUNT, 0)
+
+        MEDIA_BLOB.objects.filter(NAME=old).update(UPDATED_AT='2000-01-01T00:00:00Z')
+        removed, _ = collect_garbage()
+        self.assertEqual(removed, 1)
+        self.assertFalse(self.storage.exists(old))
+        self.assertTrue(self.storage.exists(new))
+
+
+class BulkActionsTest(TestCase):
+    def setUp(self):
+        self.factory = APIRequestFactory()
+        self.admin = CustomUser(USER_ID='ADMIN1', USERNAME='admin1', IS_SUPERUSER=True)
+        self.view = CountryViewSet.as_view({'post': 'bulk_create', 'delete': 'bulk_destroy'})
+
+    def _call(self, method, data):
+        request = getattr(self.factory, method)('/api/master/countries/bulk/', data, format='json')
+        force_authenticate(request, self.admin)
+        return self.view(request)
+
+    def test_batch_is_all_or_nothing(self):
+        response = self._call('post', [
+            {'NAME': 'India', 'CODE': 'IN', 'PHONE_CODE': '+91'},
+            {'NAME': 'Also India', 'CODE': 'IN', 'PHONE_CODE': '+91'},
+        ])
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(COUNTRY.objects.exists())
+
+        response = self._call('post', [
+            {'NAME': 'India', 'CODE': 'IN', 'PHONE_CODE': '+91'},
+            {'NAME': 'Nepal', 'CODE': 'NP', 'PHONE_CODE': '+977'},
+        ])
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(COUNTRY.objects.count(), 2)
+
+    def test_destroy_rejects_malformed_ids(self):
+        country = COUNTRY.objects.create(NAME='India', CODE='IN', PHONE_CODE='+91')
+        response = self._call('delete', {'ids': [country.pk, 'abc']})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['missing'], ['abc'])
+
+        response = self._call('delete', {'ids': [country.pk]})
+        self.assertEqual(response.status_code, 200)
+        country.refresh_from_db()
+        self.assertTrue(country.IS_DELETED)
+
+
+class BulkActionsOptInTest(SimpleTestCase):
+    def test_guarded_viewsets_have_no_bulk_route(self):
+        for viewset in (AttendanceSessionViewSet, SeatAllocationViewSet, AcademicTermViewSet, ExaminationViewSet,
+                        SemesterDurationViewSet, EventMasterViewSet):
+            self.assertFalse(hasattr(viewset, 'bulk_create'), viewset.__name__)
+        self.assertTrue(hasattr(CountryViewSet, 'bulk_create'))
+
+
+class ScheduleIndexTest(TestCase):
+    def setUp(self):
+        schedule._memo.clear()
+
+    def _overlapping(self, start, end):
+        return [row['id'] for row in schedule.overlapping('semester-duration', start, end, scope='SEM-1')]
+
+    @override_settings(SCHEDULE_FINGERPRINT_SECONDS=0)
+    def test_lookup_sees_rows_written_without_signals(self):
+        first = SEMESTER_DURATION.objects.create(SEMESTER='SEM-1', START_DATE=date(2025, 7, 1), END_DATE=date(2025, 11, 30))
+        self.assertEqual(self._overlapping(date(2025, 11, 1), date(2025, 12, 15)), [first.pk])
+
+        # bulk_create and update() send no post_save, so the cache version stays put
+        second, = SEMESTER_DURATION.objects.bulk_create([
+            SEMESTER_DURATION(SEMESTER='SEM-1', START_DATE=date(2025, 12, 1), END_DATE=date(2026, 4, 30)),
+        ])
+        self.assertEqual(self._overlapping(date(2025, 11, 1), date(2025, 12, 15)), [first.pk, second.pk])
+
+        SEMESTER_DURATION.objects.filter(pk=first.pk).update(IS_DELETED=True, UPDATED_AT=timezone.now())
+        self.assertEqual(self._overlapping(date(2025, 11, 1), date(2025, 12, 15)), [second.pk])
+
+    def test_fingerprint_is_read_at_most_every_interval(self):
+        SEMESTER_DURATION.objects.create(SEMESTER='SEM-1', START_DATE=date(2025, 7, 1), END_DATE=date(2025, 11, 30))
+        self._overlapping(date(2025, 11, 1), date(2025, 12, 15))
+        # Only the shared version is read; a save bumps it at once
+        with self.assertNumQueries(1):
+            self._overlapping(date(2025, 11, 1), date(2025, 12, 15))
+        SEMESTER_DURATION.objects.create(SEMESTER='SEM-1', START_DATE=date(2025, 12, 1), END_DATE=date(2026, 4, 30))
+        self.assertEqual(len(self._overlapping(date(2025, 11, 1), date(2025, 12, 15))), 2)
+
+    def test_overlapping_examinations_are_saved_with_a_warning(self):
+        year = ACADEMIC_YEAR.objects.create(ACADEMIC_YEAR='2025-26', START_DATE=date(2025, 6, 1),
+                                            END_DATE=date(2026, 5, 31))
+        term = ACADEMIC_TERM.objects.create(ACADEMIC_YEAR=year, NAME='Odd', CODE='2025-1',
+                                            START_DATE=date(2025, 6, 1), END_DATE=date(2025, 11, 30))
+        exam = {'ACADEMIC_TERM': term.pk, 'EXAM_TYPE': 'ENDTERM', 'START_DATE': date(2025, 11, 15),
+                'END_DATE': date(2025, 11, 29), 'MAX_MARKS': 100, 'PASSING_MARKS': 40}
+        first = ExaminationSerializer(data={**exam, 'NAME': 'B.Tech end term', 'CODE': 'BT-END'})
+        self.assertTrue(first.is_valid(), first.errors)
+        first.save()
+        self.assertNotIn('warnings', first.data)
+
+        second = ExaminationSerializer(data={**exam, 'NAME': 'MCA end term', 'CODE': 'MCA-END'})
+        self.assertTrue(second.is_valid(), second.errors)
+        second.save()
+        self.assertEqual([row['title'] for row in second.data['warnings'][0]['conflicts']], ['B.Tech end term'])
+
+    def test_adjacent_ranges_do_not_conflict(self):
+        SEMESTER_DURATION.objects.create(SEMESTER='SEM-1', START_DATE=date(2025, 7, 1), END_DATE=date(2025, 11, 30))
+        self.assertEqual(self._overlapping(date(2025, 12, 1), date(2025, 12, 31)), [])
+        self.assertEqual(len(self._overlapping(date(2025, 11, 30), date(2025, 12, 31))), 1)
+
+
+class _CountingView(APIView):
+    permission_classes = [AllowAny]
+    authentication_classes = []
+    calls = 0
+    expire_claim = False
+
+    @idempotent
+    def post(self, request):
+        type(self).calls += 1
+        if self.expire_claim:
+            # What another request's sweep of a stale PROCESSING claim does
+            IDEMPOTENCY_KEY.objects.all().delete()
+        return Response({'id': type(self).calls}, status=201)
+
+
+class IdempotencyTest(TestCase):
+    def setUp(self):
+        _CountingView.calls = 0
+
+    def _post(self, data, key='key-1', **initkwargs):
+        request = APIRequestFactory().post('/api/things/', data, format='json', HTTP_IDEMPOTENCY_KEY=key)
+        return _CountingView.as_view(**initkwargs)(request)
+
+    def test_retry_is_replayed(self):
+        first = self._post({'name': 'a'})
+        second = self._post({'name': 'a'})
+        self.assertEqual((first.status_code, second.status_code), (201, 201))
+        self.assertEqual(second.data, {'id': 1})
+        self.assertEqual(second[REPLAYED_HEADER], 'true')
+        self.assertEqual(_CountingView.calls, 1)
+        self.assertEqual(self._post({'name': 'b'}).status_code, 422)
+
+    def test_claim_dropped_while_running(self):
+        with self.assertLogs('core.idempotency', 'WARNING'):
+            response = self._post({'name': 'a'}, expire_claim=True)
+        self.assertEqual(response.status_code, 201)
+        self.assertFalse(IDEMPOTENCY_KEY.objects.exists())
+
+    def test_released_key_is_retried_after_a_pause(self):
+        claim = idempotency._claim
+        attempts = iter([(None, False), (None, False)])
+
+        def released_twice(scope, fingerprint):
+            return next(attempts, None) or claim(scope, fingerprint)
+
+        with mock.patch.object(idempotency, '_claim', released_twice), \
+                mock.patch.object(idempotency.time, 'sleep') as sleep:
+            self.assertEqual(self._post({'name': 'a'}).status_code, 201)
+        self.assertEqual(sleep.call_args_list, [mock.call(idempotency.POLL_INTERVAL)] * 2)
+
+
+def _png(color):
+    buffer = io.BytesIO()
+    Image.new('RGB', (400, 300), color).save(buffer, 'PNG')
+    return ContentFile(buffer.getvalue())
+
+
+class PhotoVariantTest(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.settings = override_settings(MEDIA_ROOT=self.media_root, IMAGE_VARIANT_ROOT=os.path.join(self.media_root, 'variants'))
+        self.settings.enable()
+        self.user = CustomUser.objects.create(USER_ID='U1', USERNAME='u1', EMAIL='u1@example.com')
+        with mock.patch('core.images.schedule_variants'):
+            self.user.PROFILE_PICTURE.save('me.png', _png('red'))
+        self.client = APIClient()
+
+    def tearDown(self):
+        self.settings.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+
+    def test_signed_url_loads_without_a_token(self):
+        url = photo_urls('user', 'U1', self.user.PROFILE_PICTURE)['thumbnail']
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Image.open(io.BytesIO(b''.join(response.streaming_content))).size, (96, 72))
+
+        self.assertEqual(self.client.get(url[:-2] + 'xx').status_code, 401)
+        self.assertEqual(self.client.get(url.split('&sig=')[0]).status_code, 401)
+        # A signature is only good for the photo it was issued for
+        self.assertEqual(self.client.get(url.replace('/U1/', '/U2/')).status_code, 401)
+
+    def test_replacing_the_photo_retires_old_urls(self):
+        old = photo_urls('user', 'U1', self.user.PROFILE_PICTURE)['card']
+        with mock.patch('core.images.schedule_variants'):
+            self.user.PROFILE_PICTURE.save('new.png', _png('blue'))
+        self.assertEqual(self.client.get(old).status_code, 404)
+
+        self.client.force_authenticate(self.user)
+        self.assertEqual(self.client.get(old.split('&sig=')[0]).status_code, 200)
+
+
+class RendererTest(SimpleTestCase):
+    payload = {
+        'created': datetime(2025, 6, 1, 9, 30, 15, 123456, tzinfo=dt_timezone.utc),
+        'dob': date(2007, 1, 1),
+        'slot': time(9, 30, 0, 250000),
+        'fee': decimal.Decimal('1250.50'),
+        'token': uuid.UUID('12345678-1234-5678-1234-567812345678'),
+        'rows': [{'id': 1, 'name': 'Asha'}, {'id': 2, 'name': None}],
+        3: 'non-string key',
+    }
+
+    def test_orjson_matches_drf_json(self):
+        expected = json.loads(JSONRenderer().render(self.payload))
+        self.assertEqual(json.loads(ORJSONRenderer().render(self.payload)), expected)
+        self.assertEqual(expected['created'], '2025-06-01T09:30:15.123456Z')
+
+    def test_msgpack_carries_the_same_values(self):
+        expected = json.loads(ORJSONRenderer().render({**self.payload, 3: None}))
+        unpacked = msgpack.unpackb(MessagePackRenderer().render({**self.payload, 3: None}), strict_map_key=False)
+        self.assertEqual(unpacked.pop(3), None)
+        expected.pop('3')
+        self.assertEqual(unpacked, expected)
+
+    def test_numpy_values(self):
+        data = {'sgpa': np.float64(8.25), 'grid': np.array([[1, 2], [3, 4]])}
+        self.assertEqual(json.loads(ORJSONRenderer().render(data)), {'sgpa': 8.25, 'grid': [[1, 2], [3, 4]]})
+        self.assertEqual(msgpack.unpackb(MessagePackRenderer().render(data)), {'sgpa': 8.25, 'grid': [[1, 2], [3, 4]]})
+
+
+@override_settings(SYNC_SETTLE_SECONDS=0)
+class ChangeFeedTest(TestCase):
+    def setUp(self):
+        self.admin = CustomUser(USER_ID='ADMIN1', USERNAME='admin1', IS_SUPERUSER=True)
+        for code in ('IN', 'NP', 'LK'):
+            COUNTRY.objects.create(NAME=code, CODE=code, PHONE_CODE='+1')
+
+    def _sync(self, **params):
+        request = APIRequestFactory().get('/api/sync/changes/', {'entities': 'countries', **params})
+        force_authenticate(request, self.admin)
+        return ChangeFeedView.as_view()(request)
+
+    def test_pages_then_reports_only_new_changes(self):
+        first = self._sync(limit=2)
+        self.assertEqual([row['CODE'] for row in first.data['data']['countries']['upserts']], ['IN', 'NP'])
+        self.assertTrue(first.data['has_more'])
+        second = self._sync(limit=2, cursor=first.data['cursor'])
+        self.assertEqual([row['CODE'] for row in second.data['data']['countries']['upserts']], ['LK'])
+        self.assertFalse(second.data['has_more'])
+
+        COUNTRY.objects.filter(CODE='NP').update(IS_DELETED=True, UPDATED_AT=timezone.now())
+        third = self._sync(cursor=second.data['cursor'])
+        changes = third.data['data']['countries']
+        self.assertEqual(changes['upserts'], [])
+        self.assertEqual(changes['tombstones'], [COUNTRY.objects.get(CODE='NP').pk])
+
+        idle = self._sync(cursor=third.data['cursor'])
+        self.assertEqual(idle.data['data']['countries'], {'upserts': [], 'tombstones': [], 'has_more': False})
+
+    @override_settings(SYNC_SETTLE_SECONDS=60)
+    def test_recent_rows_are_held_back(self):
+        self.assertEqual(self._sync().data['data']['countries']['upserts'], [])
+
+    def test_rows_behind_an_open_transaction_are_held_back(self):
+        # A long job in another session has written and not committed yet
+        job = connections.create_connection('default')
+        try:
+            with job.cursor() as cursor:
+                cursor.execute('BEGIN')
+                cursor.execute('SELECT txid_current()')
+            COUNTRY.objects.update(UPDATED_AT=timezone.now())
+            self.assertEqual(self._sync().data['data']['countries']['upserts'], [])
+            with job.cursor() as cursor:
+                cursor.execute('ROLLBACK')
+        finally:
+            job.close()
+        self.assertEqual(len(self._sync().data['data']['countries']['upserts']), 3)
+
+    def test_bad_requests(self):
+        self.assertEqual(self._sync(cursor='not-a-cursor').status_code, 400)
+        request = APIRequestFactory().get('/api/sync/changes/', {'entities': 'countries,planets'})
+        force_authenticate(request, self.admin)
+        self.assertEqual(ChangeFeedView.as_view()(request).status_code, 400)
+
+
+class BatchTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(CustomUser(USER_ID='ADMIN1', USERNAME='admin1', IS_SUPERUSER=True))
+
+    def _batch(self, requests, **options):
+        return self.client.post('/api/batch/', {'requests': requests, **options}, format='json')
+
+    def test_sub_requests_run_in_order_and_fail_alone(self):
+        response = self._batch([
+            {'id': 'create', 'method': 'POST', 'path': '/api/master/countries/',
+             'body': {'NAME': 'India', 'CODE': 'IN', 'PHONE_CODE': '+91'}},
+            {'id': 'list', 'method': 'GET', 'path': '/api/master/countries/'},
+            {'id': 'missing', 'method': 'GET', 'path': '/api/no-such-endpoint/'},
+        ])
+        self.assertEqual(response.status_code, 200)
+        results = response.data['data']
+        self.assertEqual([(result['id'], result['status']) for result in results],
+                         [('create', 201), ('list', 200), ('missing', 404)])
+        self.assertIn('India', json.dumps(results[1]['body'], default=str))
+
+    def test_invalid_batches_are_rejected_whole(self):
+        self.assertEqual(self._batch([]).status_code, 400)
+        response = self._batch([
+            {'method': 'GET', 'path': '/api/master/countries/'},
+            {'method': 'TRACE', 'path': '/api/master/countries/'},
+            {'method': 'POST', 'path': '/api/batch/'},
+        ])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual([error['index'] for error in response.data['errors']], [1, 2])
+        self.assertFalse(COUNTRY.objects.exists())
@@ -18,6 +18,10 @@ from django.contrib import admin
 from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
+from core.batch import BatchView
+from core.images import PhotoVariantView
+from core.schedule import ScheduleConflictReportView, ScheduleOverlapView
+from core.sync import ChangeFeedView
 
 urlpatterns = [
     path('admin/', admin.site.urls),
@@ -25,8 +29,14 @@ urlpatterns = [
     path('api/establishment/', include('establishments.urls')),  # Changed from employee to establishment
     path('api/', include('student.urls')),
     path('api/', include('exam.urls')),
+    path('api/', include('academic.urls')),
     path('student/', include('student.urls')),  # ✅ Add this line
     path('api/', include('committee.urls')),  # ✅ Add this line
+    path('api/sync/changes/', ChangeFeedView.as_view(), name='sync-changes'),
+    path('api/batch/', BatchView.as_view(), name='batch'),
+    path('api/media/photos/<str:kind>/<str:pk>/', PhotoVariantView.as_view(), name='photo-variant'),
+    path('api/schedule/overlaps/', ScheduleOverlapView.as_view(), name='schedule-overlaps'),
+    path('api/schedule/conflicts/', ScheduleConflictReportView.as_view(), name='schedule-conflicts'),
 
 
 ]
@@ -0,0 +1,29 @@
+# Generated by Django 4.2.7 on 2026-10-19 15:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('establishments', '0011_alter_employee_qualification_college_name_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='employee_master',
+            index=models.Index(fields=['UPDATED_AT', 'RECORD_ID'], name='idx_employee_master_sync'),
+        ),
+        migrations.AddIndex(
+            model_name='shift_master',
+            index=models.Index(fields=['UPDATED_AT', 'ID'], name='idx_shift_master_sync'),
+        ),
+        migrations.AddIndex(
+            model_name='status_master',
+            index=models.Index(fields=['UPDATED_AT', 'ID'], name='idx_status_master_sync'),
+        ),
+        migrations.AddIndex(
+            model_name='type_master',
+            index=models.Index(fields=['UPDATED_AT', 'ID'], name='idx_type_master_sync'),
+        ),
+    ]
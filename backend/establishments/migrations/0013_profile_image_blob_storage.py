@@ -0,0 +1,20 @@
+# Generated by Django 4.2.7 on 2026-10-19 15:53
+
+import core.storage
+from django.db import migrations, models
+import establishments.models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('establishments', '0012_sync_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='employee_master',
+            name='PROFILE_IMAGE',
+            field=models.ImageField(blank=True, db_column='PROFILE_IMAGE', null=True, storage=core.storage.media_blob_storage, upload_to=establishments.models.employee_profile_path),
+        ),
+    ]
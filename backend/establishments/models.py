@@ -1,5 +1,6 @@
 from django.db import models
 from core.models import AuditModel
+from core.storage import media_blob_storage
 import os
 from django.conf import settings
 
@@ -18,6 +19,9 @@ class TYPE_MASTER(AuditModel):
         db_table = '"ESTABLISHMENT"."TYPE_MASTER"'
         verbose_name = 'Type Master'
         verbose_name_plural = 'Type Masters'
+        indexes = [
+            models.Index(fields=['UPDATED_AT', 'ID'], name='idx_type_master_sync'),
+        ]
 
     def __str__(self):
         return f"{self.ID} - {self.RECORD_WORD}"
@@ -30,6 +34,9 @@ class STATUS_MASTER(AuditModel):
         db_table = '"ESTABLISHMENT"."STATUS_MASTER"'
         verbose_name = 'Status Master'
         verbose_name_plural = 'Status Masters'
+        indexes = [
+            models.Index(fields=['UPDATED_AT', 'ID'], name='idx_status_master_sync'),
+        ]
 
     def __str__(self):
         return f"{self.ID} - {self.RECORD_WORD}"
@@ -47,6 +54,9 @@ class SHIFT_MASTER(AuditModel):
         db_table = '"ESTABLISHMENT"."SHIFT_MASTER"'
         verbose_name = 'Shift Master'
         verbose_name_plural = 'Shift Masters'
+        indexes = [
+            models.Index(fields=['UPDATED_AT', 'ID'], name='idx_shift_master_sync'),
+        ]
 
     def __str__(self):
         return f"{self.ID} - {self.SHIFT_NAME}"
@@ -138,6 +148,7 @@ class EMPLOYEE_MASTER(AuditModel):
     UAN_NO = models.CharField(max_length=20, db_column='UAN_NO', null=True, blank=True)
     PROFILE_IMAGE = models.ImageField(
         upload_to=employee_profile_path,
+        storage=media_blob_storage,
         null=True,
         blank=True,
         db_column='PROFILE_IMAGE'
@@ -152,6 +163,7 @@ class EMPLOYEE_MASTER(AuditModel):
             models.Index(fields=['SHORT_CODE']),
             models.Index(fields=['EMAIL']),
             models.Index(fields=['MOBILE_NO']),
+            models.Index(fields=['UPDATED_AT', 'RECORD_ID'], name='idx_employee_master_sync')
         ]
 
     def __str__(self):
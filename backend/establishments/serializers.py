@@ -9,6 +9,8 @@ from .models import (
     EMPLOYEE_QUALIFICATION
 )
 
+from core.images import photo_urls
+
 logger = logging.getLogger(__name__)
 
 User = get_user_model()
@@ -104,6 +106,10 @@ class EmployeeMasterSerializer(BaseAuditSerializer):
     # Add these nested serializers
     DESIGNATION_NAME = serializers.CharField(source='DESIGNATION.NAME', read_only=True)
     DEPARTMENT_NAME = serializers.CharField(source='DEPARTMENT.NAME', read_only=True)
+    PROFILE_IMAGE_URLS = serializers.SerializerMethodField()
+
+    def get_PROFILE_IMAGE_URLS(self, obj):
+        return photo_urls('employee', obj.EMPLOYEE_ID, obj.PROFILE_IMAGE, self.context.get('request'))
 
     def validate(self, data):
         # Add back validation for unique fields
@@ -8,6 +8,8 @@ from django.conf import settings
 from utils.id_generators import generate_employee_id, generate_password
 from accounts.models import CustomUser, DESIGNATION
 from accounts.permissions import HasFormPermission
+from core.bulk import BulkActionsMixin
+from core.idempotency import idempotent
 from .models import TYPE_MASTER, STATUS_MASTER, SHIFT_MASTER, EMPLOYEE_MASTER, EMPLOYEE_QUALIFICATION
 from .serializers import TypeMasterSerializer, StatusMasterSerializer, ShiftMasterSerializer, EmployeeMasterSerializer, EmployeeQualificationSerializer
 import logging
@@ -45,7 +47,7 @@ class EmployeeMasterTableView(APIView):
         logger.debug(f"Returning employee master tables: {master_tables}")
         return Response(master_tables)
 
-class BaseMasterViewSet(viewsets.ModelViewSet):
+class BaseMasterViewSet(BulkActionsMixin, viewsets.ModelViewSet):
     permission_classes = [IsAuthenticated]  # Require authentication
 
     def get_username(self):
@@ -135,6 +137,7 @@ class EmployeeViewSet(viewsets.ModelViewSet):
             return getattr(self.request.user, 'USERNAME', str(self.request.user))
         return 'SYSTEM'
 
+    @idempotent
     def create(self, request, *args, **kwargs):
         try:
             logger.info("=== Starting Employee Creation Process ===")
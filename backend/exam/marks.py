@@ -0,0 +1,207 @@
+"""
+Bulk marks entry for an EXAMINATION.
+
+A whole class is entered as one grid: a row per STUDENT, a column per
+CURRICULUM entry.
+
+    {
+      "examination": 12,
+      "attempt_number": 1,
+      "grade_table": "default",
+      "curricula": [31, 32, 33],
+      "students": [501, 502],
+      "marks": [[78, "AB", null],
+                [35.5, 64, 91]]
+    }
+
+null leaves a cell untouched and "AB" records an absence. The grid is
+validated and graded with NumPy in one pass: every cell outside
+0..MAX_MARKS is reported, GRADE and GRADE_POINTS come from the percentage
+through a grade table from settings.GRADE_TABLES, and a cell passes when it
+reaches PASSING_MARKS and its grade carries points. All cells are then
+written with one INSERT ... ON CONFLICT DO UPDATE on
+(STUDENT, CURRICULUM, EXAMINATION, ATTEMPT_NUMBER).
+"""
+import numpy as np
+from django.conf import settings
+from django.utils import timezone
+
+from academic.models import CURRICULUM, EXAMINATION
+from student.models import STUDENT, STUDENT_RESULT
+
+ABSENT = 'AB'
+FAIL_GRADE = 'F'
+
+UPSERT_KEY = ['STUDENT', 'CURRICULUM', 'EXAMINATION', 'ATTEMPT_NUMBER']
+UPSERT_FIELDS = [
+    'MARKS_OBTAINED', 'IS_PASS', 'GRADE', 'GRADE_POINTS', 'REMARKS', 'IS_VERIFIED',
+    'IS_DELETED', 'UPDATED_BY', 'UPDATED_AT'
+]
+
+
+class MarksEntryError(ValueError):
+    def __init__(self, message, errors=None):
+        super().__init__(message)
+        self.message = message
+        self.errors = errors or []
+
+
+def grade_table(name=None):
+    # (minimum percentage, grade, grade points); bands may be listed in any order
+    tables = settings.GRADE_TABLES
+    name = name or 'default'
+    if name not in tables:
+        raise MarksEntryError(f"Unknown grade table '{name}'; use one of {', '.join(tables)}")
+    return sorted(tables[name], key=lambda band: band[0])
+
+
+def _parse_grid(marks, rows, columns):
+    """(values, absent, entered) arrays for the grid, plus per-cell errors."""
+    if not isinstance(marks, list) or len(marks) != rows:
+        raise MarksEntryError(f'marks must have one row per student ({rows})')
+    values = np.full((rows, columns), np.nan)
+    absent = np.zeros((rows, columns), dtype=bool)
+    errors = []
+    for row, cells in enumerate(marks):
+        if not isinstance(cells, list) or len(cells) != columns:
+            errors.append({'row': row, 'column': None,
+                           'message': f'Expected {columns} marks, one per curriculum'})
+            continue
+        for column, cell in enumerate(cells):
+            if cell is None or cell == '':
+                continue
+            if isinstance(cell, str) and cell.strip().upper() == ABSENT:
+                absent[row, column] = True
+                continue
+            try:
+                values[row, column] = float(cell)
+            except (TypeError, ValueError):
+                errors.append({'row': row, 'column': column, 'message': f'{cell!r} is not a mark'})
+    entered = ~np.isnan(values) | absent
+    return values, absent, entered, errors
+
+
+def grade_marks(values, absent, max_marks, passing_marks, table):
+    """Vectorized GRADE / GRADE_POINTS / IS_PASS for a grid of marks."""
+    thresholds = np.array([band[0] for band in table], dtype=np.float64)
+    grades = np.array([band[1] for band in table], dtype=object)
+    points = np.array([band[2] for band in table], dtype=np.float64)
+
+    marks = np.where(absent, 0.0, np.nan_to_num(values))
+    percentage = marks / max_marks * 100 if max_marks else np.zeros_like(marks)
+    band = np.clip(np.searchsorted(thresholds, percentage, side='right') - 1, 0, len(table) - 1)
+    grade = grades[band]
+    grade_points = points[band]
+    passed = (marks >= passing_marks) & (grade_points > 0) & ~absent
+
+    # Below the passing mark is a fail whatever band the percentage falls in
+    grade = np.where(passed, grade, FAIL_GRADE)
+    grade = np.where(absent, ABSENT, grade)
+    grade_points = np.where(passed, grade_points, 0.0)
+    return marks, grade, grade_points, passed
+
+
+def enter_marks(data, username='SYSTEM', dry_run=False):
+    """
+    Validate, grade and upsert a marks grid. Returns a summary; raises
+    MarksEntryError with per-cell errors when anything is invalid.
+    """
+    try:
+        examination = int(data.get('examination'))
+    except (TypeError, ValueError):
+        raise MarksEntryError('examination must be an id')
+    examination = EXAMINATION.objects.filter(pk=examination, IS_DELETED=False).first()
+    if examination is None:
+        raise MarksEntryError('examination not found')
+    try:
+        attempt = int(data.get('attempt_number', 1))
+    except (TypeError, ValueError):
+        attempt = 0
+    if attempt < 1:
+        raise MarksEntryError('attempt_number must be a positive integer')
+
+    try:
+        curricula = [int(value) for value in data.get('curricula') or []]
+        students = [int(value) for value in data.get('students') or []]
+    except (TypeError, ValueError):
+        raise MarksEntryError('curricula and students must be lists of ids')
+    if not curricula or not students:
+        raise MarksEntryError('curricula and students are required')
+    if len(set(curricula)) != len(curricula) or len(set(students)) != len(students):
+        raise MarksEntryError('curricula and students must not repeat')
+
+    known_curricula = set(CURRICULUM.objects.filter(pk__in=curricula, IS_DELETED=False).values_list('pk', flat=True))
+    known_students = set(STUDENT.objects.filter(pk__in=students, IS_DELETED=False).values_list('pk', flat=True))
+    unknown = (
+        [{'row': None, 'column': column, 'message': f'Unknown curriculum {value}'}
+         for column, value in enumerate(curricula) if value not in known_curricula]
+        + [{'row': row, 'column': None, 'message': f'Unknown student {value}'}
+           for row, value in enumerate(students) if value not in known_students]
+    )
+    if unknown:
+        raise MarksEntryError('Unknown students or curricula', unknown)
+
+    table = grade_table(data.get('grade_table'))
+    values, absent, entered, errors = _parse_grid(data.get('marks'), len(students), len(curricula))
+    max_marks = float(examination.MAX_MARKS)
+    passing_marks = float(examination.PASSING_MARKS)
+
+    out_of_range = entered & ~absent & ((values < 0) | (values > max_marks))
+    # Two decimal places is all MARKS_OBTAINED can hold
+    too_precise = entered & ~absent & (np.abs(np.round(values, 2) - values) > 1e-9)
+    for row, column in zip(*np.nonzero(out_of_range)):
+        errors.append({'row': int(row), 'column': int(column),
+                       'message': f'{values[row, column]:g} is outside 0-{max_marks:g}'})
+    for row, column in zip(*np.nonzero(too_precise & ~out_of_range)):
+        errors.append({'row': int(row), 'column': int(column),
+                       'message': 'Marks take at most two decimal places'})
+    if errors:
+        raise MarksEntryError(f'{len(errors)} invalid marks', sorted(
+            errors, key=lambda error: (error['row'] is None, error['row'] or 0, error['column'] or 0)
+        ))
+
+    marks, grade, grade_points, passed = grade_marks(values, absent, max_marks, passing_marks, table)
+
+    rows, columns = np.nonzero(entered)
+    now = timezone.now()
+    results = [
+        STUDENT_RESULT(
+            STUDENT_id=students[row],
+            CURRICULUM_id=curricula[column],
+            EXAMINATION=examination,
+            ATTEMPT_NUMBER=attempt,
+            MARKS_OBTAINED=round(float(marks[row, column]), 2),
+            IS_PASS=bool(passed[row, column]),
+            GRADE=grade[row, column],
+            GRADE_POINTS=float(grade_points[row, column]),
+            REMARKS='ABSENT' if absent[row, column] else None,
+            IS_VERIFIED=False,
+            IS_DELETED=False,
+            CREATED_BY=username,
+            UPDATED_BY=username,
+            UPDATED_AT=now,
+        )
+        for row, column in zip(rows.tolist(), columns.tolist())
+    ]
+    if results and not dry_run:
+        # One statement for the whole grid
+        STUDENT_RESULT.objects.bulk_create(
+            results,
+            update_conflicts=True,
+            unique_fields=UPSERT_KEY,
+            update_fields=UPSERT_FIELDS,
+        )
+
+    return {
+        'examination': examination.CODE,
+        'attempt_number': attempt,
+        'written': 0 if dry_run else len(results),
+        'entered': int(entered.sum()),
+        'passed': int(passed.sum()),
+        'failed': int((entered & ~passed & ~absent).sum()),
+        'absent': int(absent.sum()),
+        'grades': [
+            [grade[row, column] if entered[row, column] else None for column in range(len(curricula))]
+            for row in range(len(students))
+        ],
+    }
@@ -0,0 +1,70 @@
+# Generated by Django 4.2.7 on 2026-10-19 16:18
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0031_profile_picture_blob_storage'),
+        ('academic', '0007_room_benches'),
+        ('student', '0009_seat_matrix_allocation'),
+        ('exam', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EXAM_SEATING_PLAN',
+            fields=[
+                ('CREATED_BY', models.CharField(blank=True, db_column='CREATED_BY', max_length=50, null=True)),
+                ('CREATED_AT', models.DateTimeField(auto_now_add=True, db_column='CREATED_AT')),
+                ('UPDATED_BY', models.CharField(blank=True, db_column='UPDATED_BY', max_length=50, null=True)),
+                ('UPDATED_AT', models.DateTimeField(auto_now=True, db_column='UPDATED_AT')),
+                ('DELETED_BY', models.CharField(blank=True, db_column='DELETED_BY', max_length=50, null=True)),
+                ('DELETED_AT', models.DateTimeField(blank=True, db_column='DELETED_AT', null=True)),
+                ('IS_DELETED', models.BooleanField(db_column='IS_DELETED', default=False)),
+                ('PLAN_ID', models.AutoField(db_column='PLAN_ID', primary_key=True, serialize=False)),
+                ('SESSION_DATE', models.DateField(db_column='SESSION_DATE')),
+                ('SESSION', models.CharField(choices=[('FN', 'Forenoon'), ('AN', 'Afternoon')], db_column='SESSION', default='FN', max_length=2)),
+                ('OPTIONS', models.JSONField(blank=True, db_column='OPTIONS', default=dict)),
+                ('STUDENTS', models.IntegerField(db_column='STUDENTS', default=0)),
+                ('ROOMS_USED', models.IntegerField(db_column='ROOMS_USED', default=0)),
+                ('ADJACENT_PAIRS', models.IntegerField(db_column='ADJACENT_PAIRS', default=0)),
+                ('EXAMINATION', models.ForeignKey(db_column='EXAMINATION_ID', on_delete=django.db.models.deletion.PROTECT, related_name='seating_plans', to='academic.examination')),
+            ],
+            options={
+                'verbose_name': 'Exam Seating Plan',
+                'verbose_name_plural': 'Exam Seating Plans',
+                'db_table': '"EXAM"."SEATING_PLANS"',
+                'unique_together': {('EXAMINATION', 'SESSION_DATE', 'SESSION')},
+            },
+        ),
+        migrations.CreateModel(
+            name='EXAM_SEAT',
+            fields=[
+                ('CREATED_BY', models.CharField(blank=True, db_column='CREATED_BY', max_length=50, null=True)),
+                ('CREATED_AT', models.DateTimeField(auto_now_add=True, db_column='CREATED_AT')),
+                ('UPDATED_BY', models.CharField(blank=True, db_column='UPDATED_BY', max_length=50, null=True)),
+                ('UPDATED_AT', models.DateTimeField(auto_now=True, db_column='UPDATED_AT')),
+                ('DELETED_BY', models.CharField(blank=True, db_column='DELETED_BY', max_length=50, null=True)),
+                ('DELETED_AT', models.DateTimeField(blank=True, db_column='DELETED_AT', null=True)),
+                ('IS_DELETED', models.BooleanField(db_column='IS_DELETED', default=False)),
+                ('SEAT_ID', models.BigAutoField(db_column='SEAT_ID', primary_key=True, serialize=False)),
+                ('ROW', models.IntegerField(db_column='ROW')),
+                ('BENCH', models.IntegerField(db_column='BENCH')),
+                ('POSITION', models.IntegerField(db_column='POSITION')),
+                ('ROLL_NO', models.CharField(db_column='ROLLNO', max_length=20)),
+                ('BRANCH', models.ForeignKey(db_column='BRANCH_ID', on_delete=django.db.models.deletion.PROTECT, to='accounts.branch')),
+                ('PLAN', models.ForeignKey(db_column='PLAN_ID', on_delete=django.db.models.deletion.CASCADE, related_name='seats', to='exam.exam_seating_plan')),
+                ('ROOM', models.ForeignKey(db_column='ROOM_ID', on_delete=django.db.models.deletion.PROTECT, to='academic.room')),
+                ('STUDENT', models.ForeignKey(db_column='STUDENT_ID', on_delete=django.db.models.deletion.PROTECT, related_name='exam_seats', to='student.student_master')),
+            ],
+            options={
+                'verbose_name': 'Exam Seat',
+                'verbose_name_plural': 'Exam Seats',
+                'db_table': '"EXAM"."SEATS"',
+                'unique_together': {('PLAN', 'ROOM', 'ROW', 'BENCH', 'POSITION'), ('PLAN', 'STUDENT')},
+            },
+        ),
+    ]
@@ -1,5 +1,8 @@
 from django.db import models
 from core.models import AuditModel
+from accounts.models import BRANCH
+from academic.models import EXAMINATION, ROOM
+from student.models import STUDENT_MASTER
 
 class COLLEGE_EXAM_TYPE(AuditModel):
     RECORD_ID = models.AutoField(primary_key=True, db_column='RECORD_ID')
@@ -17,4 +20,54 @@ class COLLEGE_EXAM_TYPE(AuditModel):
         verbose_name_plural = 'College Exam Types'
 
     def __str__(self):
-        return f"{self.EXAM_TYPE} ({self.ACADEMIC_YEAR})"
\ No newline at end of file
+        return f"{self.EXAM_TYPE} ({self.ACADEMIC_YEAR})"
+
+
+class EXAM_SEATING_PLAN(AuditModel):
+    PLAN_ID = models.AutoField(primary_key=True, db_column='PLAN_ID')
+    EXAMINATION = models.ForeignKey(EXAMINATION, on_delete=models.PROTECT, db_column='EXAMINATION_ID', related_name='seating_plans')
+    SESSION_DATE = models.DateField(db_column='SESSION_DATE')
+    SESSION = models.CharField(
+        max_length=2,
+        choices=[('FN', 'Forenoon'), ('AN', 'Afternoon')],
+        default='FN',
+        db_column='SESSION'
+    )
+    # Inputs of the last generation (branches, semesters, rooms), reused on regenerate
+    OPTIONS = models.JSONField(default=dict, blank=True, db_column='OPTIONS')
+    STUDENTS = models.IntegerField(default=0, db_column='STUDENTS')
+    ROOMS_USED = models.IntegerField(default=0, db_column='ROOMS_USED')
+    ADJACENT_PAIRS = models.IntegerField(default=0, db_column='ADJACENT_PAIRS')  # same-branch neighbours
+
+    class Meta:
+        db_table = '"EXAM"."SEATING_PLANS"'
+        verbose_name = 'Exam Seating Plan'
+        verbose_name_plural = 'Exam Seating Plans'
+        unique_together = ['EXAMINATION', 'SESSION_DATE', 'SESSION']
+
+    def __str__(self):
+        return f"{self.EXAMINATION_id} - {self.SESSION_DATE} {self.SESSION}"
+
+
+class EXAM_SEAT(AuditModel):
+    SEAT_ID = models.BigAutoField(primary_key=True, db_column='SEAT_ID')
+    PLAN = models.ForeignKey(EXAM_SEATING_PLAN, on_delete=models.CASCADE, db_column='PLAN_ID', related_name='seats')
+    ROOM = models.ForeignKey(ROOM, on_delete=models.PROTECT, db_column='ROOM_ID')
+    ROW = models.IntegerField(db_column='ROW')              # 1 = front
+    BENCH = models.IntegerField(db_column='BENCH')          # 1 = left
+    POSITION = models.IntegerField(db_column='POSITION')    # seat on the bench, 1 = left
+    STUDENT = models.ForeignKey(STUDENT_MASTER, on_delete=models.PROTECT, db_column='STUDENT_ID', related_name='exam_seats')
+    ROLL_NO = models.CharField(max_length=20, db_column='ROLLNO')
+    BRANCH = models.ForeignKey(BRANCH, on_delete=models.PROTECT, db_column='BRANCH_ID')
+
+    class Meta:
+        db_table = '"EXAM"."SEATS"'
+        verbose_name = 'Exam Seat'
+        verbose_name_plural = 'Exam Seats'
+        unique_together = [
+            ['PLAN', 'STUDENT'],
+            ['PLAN', 'ROOM', 'ROW', 'BENCH', 'POSITION'],
+        ]
+
+    def __str__(self):
+        return f"{self.PLAN_id} - {self.ROLL_NO} R{self.ROW}B{self.BENCH}/{self.POSITION}"
@@ -1,7 +1,32 @@
 from rest_framework import serializers
-from exam.models import COLLEGE_EXAM_TYPE
+from exam.models import COLLEGE_EXAM_TYPE, EXAM_SEATING_PLAN
 
 class CollegeExamTypeSerializer(serializers.ModelSerializer):
     class Meta:
         model = COLLEGE_EXAM_TYPE
-        fields = ['RECORD_ID', 'ACADEMIC_YEAR', 'PROGRAM_ID', 'EXAM_TYPE', 'IS_ACTIVE', 'CREATED_BY', 'UPDATED_BY', 'DELETED_BY', 'DELETED_AT', 'IS_DELETED']
\ No newline at end of file
+        fields = ['RECORD_ID', 'ACADEMIC_YEAR', 'PROGRAM_ID', 'EXAM_TYPE', 'IS_ACTIVE', 'CREATED_BY', 'UPDATED_BY', 'DELETED_BY', 'DELETED_AT', 'IS_DELETED']
+
+
+class ExamSeatingPlanSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = EXAM_SEATING_PLAN
+        fields = '__all__'
+        read_only_fields = ['STUDENTS', 'ROOMS_USED', 'ADJACENT_PAIRS']
+
+    def validate_OPTIONS(self, value):
+        if not isinstance(value, dict):
+            raise serializers.ValidationError('OPTIONS must be an object')
+        unknown = set(value) - {'branches', 'semesters', 'rooms'}
+        if unknown:
+            raise serializers.ValidationError(f"Unknown options: {', '.join(sorted(unknown))}")
+        for key, ids in value.items():
+            if not isinstance(ids, list) or not all(isinstance(item, int) for item in ids):
+                raise serializers.ValidationError(f'{key} must be a list of ids')
+        return value
+
+    def validate(self, attrs):
+        examination = attrs.get('EXAMINATION') or getattr(self.instance, 'EXAMINATION', None)
+        session_date = attrs.get('SESSION_DATE') or getattr(self.instance, 'SESSION_DATE', None)
+        if examination and session_date and not examination.START_DATE <= session_date <= examination.END_DATE:
+            raise serializers.ValidationError({'SESSION_DATE': 'The session must fall within the examination dates'})
+        return attrs
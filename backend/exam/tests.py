@@ -0,0 +1,84 @@
+import numpy as np
+from django.test import SimpleTestCase, override_settings
+
+from .marks import MarksEntryError, enter_marks, grade_marks, grade_table
+from .seating import Candidate, Hall, SeatingError, adjacent_pairs, allocate, natural_key
+
+TABLE = [(50, 'B', 6), (0, 'F', 0), (80, 'A', 9)]
+
+
+class GradeMarksTest(SimpleTestCase):
+    def _grade(self, values, absent=None, passing_marks=40):
+        values = np.array([values], dtype=np.float64)
+        absent = np.array([absent or [False] * values.shape[1]])
+        _, grade, points, passed = grade_marks(values, absent, 100, passing_marks, sorted(TABLE))
+        return list(grade[0]), list(points[0]), list(passed[0])
+
+    def test_band_edges_are_inclusive(self):
+        grade, points, passed = self._grade([80, 79.5, 50, 49])
+        self.assertEqual(grade, ['A', 'B', 'B', 'F'])
+        self.assertEqual(points, [9, 6, 6, 0])
+        self.assertEqual(passed, [True, True, True, False])
+
+    def test_below_passing_marks_fails_whatever_the_band(self):
+        grade, points, passed = self._grade([55], passing_marks=60)
+        self.assertEqual((grade, points, passed), (['F'], [0], [False]))
+
+    def test_absent_cells(self):
+        grade, points, passed = self._grade([np.nan, 90], absent=[True, False])
+        self.assertEqual(grade, ['AB', 'A'])
+        self.assertEqual(passed, [False, True])
+
+    @override_settings(GRADE_TABLES={'default': TABLE})
+    def test_grade_table_comes_from_settings(self):
+        self.assertEqual([band[0] for band in grade_table()], [0, 50, 80])
+        with self.assertRaises(MarksEntryError):
+            grade_table('relative')
+
+
+class EnterMarksValidationTest(SimpleTestCase):
+    def test_non_numeric_examination_is_a_validation_error(self):
+        with self.assertRaisesMessage(MarksEntryError, 'examination must be an id'):
+            enter_marks({'examination': 'mid-term', 'curricula': [1], 'students': [1], 'marks': [[10]]})
+
+
+def _candidates(branch_code, count):
+    return [
+        Candidate(f'{branch_code}{number}', f'{branch_code}{number}', f'{branch_code}25{number:03d}',
+                  branch_code, branch_code, '')
+        for number in range(1, count + 1)
+    ]
+
+
+class SeatingTest(SimpleTestCase):
+    def _seated(self, grids):
+        return sorted(candidate.student for grid in grids.values() for candidate in grid.values())
+
+    def test_no_branch_sits_next_to_itself(self):
+        candidates = _candidates('CE', 12) + _candidates('ME', 10) + _candidates('EE', 8)
+        grids = allocate(candidates, [Hall(1, 'H1', 4, 3, 2), Hall(2, 'H2', 4, 3, 2)])
+        self.assertEqual(self._seated(grids), sorted(candidate.student for candidate in candidates))
+        self.assertEqual([adjacent_pairs(grid) for grid in grids.values()], [0, 0])
+
+    def test_halls_fill_in_roll_number_order(self):
+        grids = allocate(_candidates('CE', 3) + _candidates('ME', 3), [Hall(1, 'H1', 2, 2, 2)])
+        grid = next(iter(grids.values()))
+        self.assertEqual(
+            [grid[(0, column)].roll_no for column in range(4)],
+            ['CE25001', 'ME25001', 'CE25002', 'ME25002'],
+        )
+
+    def test_dominant_branch_leaves_gaps_until_the_halls_run_out(self):
+        halls = [Hall(1, 'H1', 2, 2, 2), Hall(2, 'H2', 2, 2, 2)]
+        grids = allocate(_candidates('CE', 8), halls)
+        self.assertEqual([len(grid) for grid in grids.values()], [4, 4])
+        self.assertEqual(sum(adjacent_pairs(grid) for grid in grids.values()), 0)
+
+        grids = allocate(_candidates('CE', 12), halls)
+        self.assertEqual(sum(len(grid) for grid in grids.values()), 12)
+        self.assertGreater(sum(adjacent_pairs(grid) for grid in grids.values()), 0)
+        with self.assertRaises(SeatingError):
+            allocate(_candidates('CE', 17), halls)
+
+    def test_natural_roll_number_order(self):
+        self.assertEqual(sorted(['CE25010', 'CE2509', 'CE251'], key=natural_key), ['CE251', 'CE2509', 'CE25010'])
@@ -4,10 +4,12 @@ from . import views
 
 router = DefaultRouter()
 router.register(r'exam/college-exam-type', views.CollegeExamTypeViewSet, basename='college-exam-type')
+router.register(r'exam/seating-plans', views.ExamSeatingPlanViewSet, basename='seating-plans')
 
 
 app_name = 'exam'
 
 urlpatterns = [
     path('', include(router.urls)),
+    path('exam/marks/', views.MarksEntryView.as_view(), name='marks-entry'),
 ]
\ No newline at end of file
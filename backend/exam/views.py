@@ -1,13 +1,19 @@
 from rest_framework import viewsets, status
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
+from rest_framework.views import APIView
+from rest_framework.decorators import action
+from django.http import HttpResponse
 from django.utils import timezone
 from accounts.views import BaseModelViewSet
+from core.bulk import BulkActionsMixin
 
-from .models import COLLEGE_EXAM_TYPE
-from .serializers import CollegeExamTypeSerializer
+from .marks import MarksEntryError, enter_marks
+from .models import COLLEGE_EXAM_TYPE, EXAM_SEATING_PLAN
+from .seating import SeatingError, door_list, export_csv, export_pdf, generate, seat_map, stored_rooms
+from .serializers import CollegeExamTypeSerializer, ExamSeatingPlanSerializer
 
-class CollegeExamTypeViewSet(BaseModelViewSet): 
+class CollegeExamTypeViewSet(BulkActionsMixin, BaseModelViewSet): 
     """
     API endpoint that allows users to view or edit college exam types.
     """
@@ -15,3 +21,112 @@ class CollegeExamTypeViewSet(BaseModelViewSet):
     serializer_class = CollegeExamTypeSerializer
     permission_classes = [IsAuthenticated]
 
+
+class MarksEntryView(APIView):
+    """
+    Enter a class's marks for an examination as one grid (see exam/marks.py).
+    With "dry_run": true the grid is validated and graded but not saved.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        user = request.user
+        username = getattr(user, 'USERNAME', None) or getattr(user, 'username', None) or 'SYSTEM'
+        try:
+            summary = enter_marks(request.data, username=username, dry_run=bool(request.data.get('dry_run')))
+        except MarksEntryError as e:
+            return Response({
+                'status': 'error',
+                'message': e.message,
+                'errors': e.errors
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response({
+            'status': 'success',
+            'message': f"{summary['written']} results saved",
+            'data': summary
+        }, status=status.HTTP_200_OK)
+
+
+class ExamSeatingPlanViewSet(BaseModelViewSet):
+    """
+    Seating plans of examination sessions (see exam/seating.py). Create a
+    plan with its OPTIONS, POST generate/ (again after any change), then
+    read seat-map/ and door-list/ per room or download export/.
+    """
+    queryset = EXAM_SEATING_PLAN.objects.select_related('EXAMINATION')
+    serializer_class = ExamSeatingPlanSerializer
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        examination = self.request.query_params.get('examination')
+        if examination:
+            queryset = queryset.filter(EXAMINATION_id=examination)
+        return queryset.order_by('SESSION_DATE', 'SESSION')
+
+    @action(detail=True, methods=['post'])
+    def generate(self, request, pk=None):
+        """{"dry_run": false}"""
+        plan = self.get_object()
+        user = request.user
+        username = getattr(user, 'USERNAME', None) or getattr(user, 'username', None) or 'SYSTEM'
+        try:
+            summary = generate(plan, username=username, dry_run=bool(request.data.get('dry_run')))
+        except SeatingError as e:
+            return Response({'status': 'error', 'message': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response({
+            'status': 'success',
+            'message': f"{summary['students']} students seated in {summary['rooms_used']} rooms",
+            'data': summary
+        })
+
+    @action(detail=True, methods=['get'], url_path='seat-map')
+    def seat_map(self, request, pk=None):
+        """?room=<ROOM_ID>: rows of benches of roll numbers, front row first."""
+        plan = self.get_object()
+        room = request.query_params.get('room')
+        if not room:
+            return Response({'status': 'error', 'message': 'room is required'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        rooms = stored_rooms(plan, room_id=room)
+        if not rooms:
+            return Response({'status': 'error', 'message': 'No seats in that room'},
+                            status=status.HTTP_404_NOT_FOUND)
+        room, seats = rooms[0]
+        return Response({'status': 'success', 'data': {'room': room, 'rows': seat_map(room, seats)}})
+
+    @action(detail=True, methods=['get'], url_path='door-list')
+    def door_list(self, request, pk=None):
+        """?room=<ROOM_ID>, or every room when omitted."""
+        plan = self.get_object()
+        room = request.query_params.get('room')
+        rooms = stored_rooms(plan, room_id=room)
+        if room and not rooms:
+            return Response({'status': 'error', 'message': 'No seats in that room'},
+                            status=status.HTTP_404_NOT_FOUND)
+        return Response({
+            'status': 'success',
+            'data': [dict(room=room, **door_list(seats)) for room, seats in rooms]
+        })
+
+    @action(detail=True, methods=['get'])
+    def export(self, request, pk=None):
+        """?output=csv (every seat) or ?output=pdf&kind=seats|doors."""
+        plan = self.get_object()
+        output = request.query_params.get('output', 'csv')
+        kind = request.query_params.get('kind', 'seats')
+        if output not in ('csv', 'pdf') or kind not in ('seats', 'doors'):
+            return Response({
+                'status': 'error',
+                'message': 'output must be csv or pdf and kind seats or doors'
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        name = f'seating-{plan.EXAMINATION.CODE}-{plan.SESSION_DATE:%Y%m%d}-{plan.SESSION}'
+        if output == 'csv':
+            response = HttpResponse(export_csv(plan), content_type='text/csv; charset=utf-8')
+            response['Content-Disposition'] = f'attachment; filename="{name}.csv"'
+        else:
+            response = HttpResponse(export_pdf(plan, kind), content_type='application/pdf')
+            response['Content-Disposition'] = f'attachment; filename="{name}-{kind}.pdf"'
+        return response
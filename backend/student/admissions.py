@@ -0,0 +1,390 @@
+"""
+Merit ranking and multi-round seat allocation.
+
+Applicants are the STUDENT_MASTER rows of an admission year. Their merit
+comes from STUDENT_DETAILS (MERIT, then SCORE, then STUDENT_MASTER.MARK_ID).
+Ties are broken by higher PCM_MARKS, then the older applicant, then the
+lower FORM_NO. Branch preferences are read from
+STUDENT_DETAILS.COLLEGE_PREFERENCE, a list of BRANCH_IDs or branch codes;
+without one the applicant's BRANCH_ID is the only choice.
+
+Seats come from SEAT_MATRIX buckets. At each branch an applicant tries the
+buckets they are eligible for from the least to the most specific, so open
+seats go on merit first and reserved seats then go to the remaining
+candidates of that category.
+
+Each round processes applicants from a heap in merit order. Every applicant
+takes the best (preference, bucket) with a free seat, found through
+precomputed per-branch bucket lists; nothing is queried per applicant.
+Between rounds the admission desk marks allotments:
+
+* FREEZE    - accepted; the seat is kept and the applicant leaves the pool
+* FLOAT     - accepted, but the applicant wants a better preference. The
+              seat is kept unless a higher preference frees up; an
+              unmarked ALLOTTED row counts as FLOAT
+* WITHDRAWN - the seat is released and the applicant leaves the pool
+
+An upgrade releases the floater's old seat, which may suit someone ranked
+higher who was already passed over. Seats released during a sweep are only
+returned once it ends, so nobody further down the same sweep can take them
+first, and the round sweeps the heap again from the top until no seat
+changes hands.
+
+A round can be rerun (after a seat matrix correction, say) until the desk
+has marked any of its allotments; its replaced rows are soft-deleted.
+"""
+import heapq
+import logging
+import re
+import time
+from collections import Counter, defaultdict
+from datetime import date
+
+from django.db import transaction
+from django.utils import timezone
+
+from accounts.models import BRANCH
+from .models import SEAT_ALLOCATION, SEAT_MATRIX, STUDENT_DETAILS, STUDENT_MASTER
+
+logger = logging.getLogger(__name__)
+
+PREFERENCE_SPLIT = re.compile(r'[\s,;|]+')
+WRITE_BATCH = 2000
+CARRIED_STATUSES = {
+    SEAT_ALLOCATION.STATUS_ALLOTTED,
+    SEAT_ALLOCATION.STATUS_FLOAT,
+    SEAT_ALLOCATION.STATUS_FREEZE,
+}
+
+
+class AllocationError(ValueError):
+    pass
+
+
+def _float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class Applicant:
+    __slots__ = ('record_id', 'student_id', 'key', 'rank', 'preferences', 'caste', 'quota', 'admission_quota')
+
+    def __init__(self, record_id, student_id, key, preferences, caste, quota, admission_quota):
+        self.record_id = record_id
+        self.student_id = student_id
+        self.key = key
+        self.rank = None
+        self.preferences = preferences
+        self.caste = caste
+        self.quota = quota
+        self.admission_quota = admission_quota
+
+
+class Bucket:
+    __slots__ = ('record_id', 'branch', 'category', 'caste', 'quota', 'admission_quota', 'seats', 'free')
+
+    def __init__(self, row):
+        self.record_id = row['RECORD_ID']
+        self.branch = row['BRANCH_id']
+        self.category = row['CATEGORY']
+        # Applicants carry their caste as a name, so buckets match on it too
+        self.caste = (row['CASTE__NAME'] or '').strip().upper() or None
+        self.quota = row['QUOTA_id']
+        self.admission_quota = row['ADMISSION_QUOTA_id']
+        self.seats = row['SEATS']
+        self.free = row['SEATS']
+
+    @property
+    def specificity(self):
+        return sum(value is not None for value in (self.caste, self.quota, self.admission_quota))
+
+    def admits(self, applicant):
+        return (
+            (self.caste is None or self.caste == applicant.caste)
+            and (self.quota is None or self.quota == applicant.quota)
+            and (self.admission_quota is None or self.admission_quota == applicant.admission_quota)
+        )
+
+
+def _parse_preferences(text, fallback, branch_lookup):
+    preferences = []
+    for token in PREFERENCE_SPLIT.split(text or ''):
+        branch = branch_lookup.get(token.upper())
+        if branch is not None and branch not in preferences:
+            preferences.append(branch)
+    return preferences or ([fallback] if fallback is not None else [])
+
+
+def load_applicants(academic_year):
+    """Applicants of an admission year, ranked; rank 1 is the best."""
+    branch_lookup = {}
+    for branch_id, code in BRANCH.objects.filter(IS_DELETED=False).values_list('BRANCH_ID', 'CODE'):
+        branch_lookup[str(branch_id)] = branch_id
+        if code:
+            branch_lookup.setdefault(code.strip().upper(), branch_id)
+
+    details = {}
+    rows = (
+        STUDENT_DETAILS.objects
+        .filter(STUDENT__ACADEMIC_YEAR=academic_year, STUDENT__IS_DELETED=False, IS_DELETED=False)
+        .order_by('RECORD_ID')
+        .values_list('STUDENT_id', 'MERIT', 'SCORE', 'PCM_MARKS', 'ADMISSION_QUOTA', 'COLLEGE_PREFERENCE')
+    )
+    for student, merit, score, pcm, admission_quota, preference in rows.iterator(chunk_size=5000):
+        # The latest details row wins
+        details[student] = (merit, score, pcm, admission_quota, preference)
+
+    applicants = []
+    skipped = []
+    students = (
+        STUDENT_MASTER.objects
+        .filter(ACADEMIC_YEAR=academic_year, IS_DELETED=False)
+        .values_list('RECORD_ID', 'STUDENT_ID', 'BRANCH_ID', 'CASTE', 'QUOTA_ID', 'ADMN_QUOTA_ID',
+                     'MARK_ID', 'DOB', 'FORM_NO')
+    )
+    for record_id, student_id, branch, caste, quota, admn_quota, mark_id, dob, form_no in students.iterator(chunk_size=5000):
+        merit, score, pcm, admission_quota, preference = details.get(record_id, (None,) * 5)
+        value = next((v for v in (_float(merit), _float(score), _float(mark_id)) if v is not None), None)
+        if value is None:
+            skipped.append(student_id)
+            continue
+        key = (
+            -value,
+            -(_float(pcm) or 0.0),
+            (dob or date.max).toordinal(),  # older first
+            form_no or 0,
+            student_id,
+        )
+        applicants.append(Applicant(
+            record_id, student_id, key,
+            _parse_preferences(preference, branch, branch_lookup),
+            (caste or '').strip().upper() or None,
+            quota,
+            admission_quota if admission_quota is not None else admn_quota,
+        ))
+
+    applicants.sort(key=lambda applicant: applicant.key)
+    for rank, applicant in enumerate(applicants, start=1):
+        applicant.rank = rank
+    return applicants, skipped
+
+
+def load_buckets(academic_year):
+    rows = (
+        SEAT_MATRIX.objects
+        .filter(ACADEMIC_YEAR=academic_year, IS_DELETED=False, SEATS__gt=0)
+        .values('RECORD_ID', 'BRANCH_id', 'CATEGORY', 'CASTE_id', 'CASTE__NAME', 'QUOTA_id',
+                'ADMISSION_QUOTA_id', 'SEATS')
+    )
+    return {row['RECORD_ID']: Bucket(row) for row in rows}
+
+
+class SeatAllocator:
+    """Merit-order allocation over SEAT_MATRIX buckets; see the module docstring."""
+
+    def __init__(self, applicants, buckets):
+        self.applicants = applicants
+        self.buckets = buckets
+        self.by_branch = defaultdict(list)
+        for bucket in sorted(buckets.values(), key=lambda bucket: (bucket.specificity, bucket.record_id)):
+            self.by_branch[bucket.branch].append(bucket)
+        self._eligible = {}
+        self.seat = {}        # applicant rank -> Bucket
+        self.frozen = set()   # ranks whose seat is final
+        self.upgrades = 0
+
+    def eligible(self, applicant, branch):
+        """Buckets of branch the applicant may take, open before reserved (memoized by profile)."""
+        profile = (branch, applicant.caste, applicant.quota, applicant.admission_quota)
+        buckets = self._eligible.get(profile)
+        if buckets is None:
+            buckets = [bucket for bucket in self.by_branch.get(branch, ()) if bucket.admits(applicant)]
+            self._eligible[profile] = buckets
+        return buckets
+
+    def hold(self, applicant, bucket, frozen):
+        """Seat carried over from the previous round."""
+        bucket.free -= 1
+        self.seat[applicant.rank] = bucket
+        if frozen:
+            self.frozen.add(applicant.rank)
+
+    def _choices(self, applicant):
+        current = self.seat.get(applicant.rank)
+        if current is None:
+            return applicant.preferences
+        # Only strictly better preferences count as an upgrade
+        if current.branch in applicant.preferences:
+            return applicant.preferences[:applicant.preferences.index(current.branch)]
+        return applicant.preferences
+
+    def _place(self, applicant):
+        """Seat the applicant at their best free choice; returns the bucket of a seat given up."""
+        for branch in self._choices(applicant):
+            for bucket in self.eligible(applicant, branch):
+                if bucket.free > 0:
+                    bucket.free -= 1
+                    previous = self.seat.get(applicant.rank)
+                    self.seat[applicant.rank] = bucket
+                    if previous is not None:
+                        self.upgrades += 1
+                    return previous
+        return None
+
+    def run(self, pool):
+        """Allocate the applicants in pool (not frozen). Returns the number of sweeps."""
+        candidates = [applicant for applicant in pool if applicant.rank not in self.frozen]
+        by_rank = {applicant.rank: applicant for applicant in candidates}
+        sweeps = 0
+        while candidates:
+            sweeps += 1
+            heap = [applicant.rank for applicant in candidates]
+            heapq.heapify(heap)
+            released = []
+            while heap:
+                bucket = self._place(by_rank[heapq.heappop(heap)])
+                if bucket is not None:
+                    released.append(bucket)
+            if not released:
+                break
+            # Released seats go to whoever ranks highest in the next sweep
+            for bucket in released:
+                bucket.free += 1
+            # Only applicants who could still move up matter in the next sweep
+            candidates = [applicant for applicant in candidates if self._choices(applicant)]
+        return sweeps
+
+
+def _desk_marks(academic_year, round_no, previous):
+    """
+    Live rows of a round whose STATUS the desk has set. A round only writes
+    ALLOTTED and NOT_ALLOTTED, and FREEZE for a seat frozen in the round
+    before.
+    """
+    rows = SEAT_ALLOCATION.objects.filter(
+        ACADEMIC_YEAR=academic_year, ROUND_NO=round_no, IS_DELETED=False
+    ).exclude(
+        STATUS__in=[SEAT_ALLOCATION.STATUS_ALLOTTED, SEAT_ALLOCATION.STATUS_NOT_ALLOTTED]
+    ).values_list('STUDENT_id', 'STATUS')
+    return sum(
+        1 for student, status in rows
+        if status != SEAT_ALLOCATION.STATUS_FREEZE
+        or previous.get(student, {}).get('STATUS') != SEAT_ALLOCATION.STATUS_FREEZE
+    )
+
+
+def run_round(academic_year, round_no, username='SYSTEM', dry_run=False):
+    """Allocate one round and store its SEAT_ALLOCATION rows. Returns a summary."""
+    started = time.perf_counter()
+    if round_no < 1:
+        raise AllocationError('round must be 1 or more')
+    if SEAT_ALLOCATION.objects.filter(ACADEMIC_YEAR=academic_year, ROUND_NO__gt=round_no, IS_DELETED=False).exists():
+        raise AllocationError(f'Round {round_no} has later rounds and cannot be rerun')
+
+    previous = {}
+    if round_no > 1:
+        previous = {
+            row['STUDENT_id']: row for row in SEAT_ALLOCATION.objects.filter(
+                ACADEMIC_YEAR=academic_year, ROUND_NO=round_no - 1, IS_DELETED=False
+            ).values('STUDENT_id', 'SEAT_id', 'STATUS')
+        }
+        if not previous:
+            raise AllocationError(f'Round {round_no - 1} has not been run')
+    marked = _desk_marks(academic_year, round_no, previous)
+    if marked:
+        raise AllocationError(
+            f'Round {round_no} has {marked} allotments marked at the desk and cannot be rerun'
+        )
+
+    applicants, skipped = load_applicants(academic_year)
+    buckets = load_buckets(academic_year)
+    if not buckets:
+        raise AllocationError(f'No seat matrix for {academic_year}')
+    allocator = SeatAllocator(applicants, buckets)
+
+    pool = []
+    withdrawn = 0
+    for applicant in applicants:
+        row = previous.get(applicant.record_id)
+        if row is not None and row['STATUS'] == SEAT_ALLOCATION.STATUS_WITHDRAWN:
+            withdrawn += 1
+            continue
+        if row is not None and row['STATUS'] in CARRIED_STATUSES and row['SEAT_id'] in buckets:
+            allocator.hold(applicant, buckets[row['SEAT_id']], row['STATUS'] == SEAT_ALLOCATION.STATUS_FREEZE)
+        pool.append(applicant)
+
+    oversubscribed = [bucket.category for bucket in buckets.values() if bucket.free < 0]
+    if oversubscribed:
+        raise AllocationError(
+            f"Seats carried from round {round_no - 1} exceed the seat matrix for: {', '.join(oversubscribed)}"
+        )
+
+    sweeps = allocator.run(pool)
+    allocated = time.perf_counter()
+
+    rows = []
+    for applicant in pool:
+        bucket = allocator.seat.get(applicant.rank)
+        if bucket is None:
+            status, preference = SEAT_ALLOCATION.STATUS_NOT_ALLOTTED, None
+        else:
+            preference = (
+                applicant.preferences.index(bucket.branch) + 1
+                if bucket.branch in applicant.preferences else None
+            )
+            status = (
+                SEAT_ALLOCATION.STATUS_FREEZE if applicant.rank in allocator.frozen
+                else SEAT_ALLOCATION.STATUS_ALLOTTED
+            )
+        rows.append(SEAT_ALLOCATION(
+            ACADEMIC_YEAR=academic_year,
+            ROUND_NO=round_no,
+            STUDENT_id=applicant.record_id,
+            MERIT_RANK=applicant.rank,
+            BRANCH_id=bucket.branch if bucket else None,
+            SEAT_id=bucket.record_id if bucket else None,
+            PREFERENCE_NO=preference,
+            STATUS=status,
+            CREATED_BY=username,
+            UPDATED_BY=username,
+        ))
+
+    if not dry_run:
+        now = timezone.now()
+        with transaction.atomic():
+            SEAT_ALLOCATION.objects.filter(ACADEMIC_YEAR=academic_year, ROUND_NO=round_no, IS_DELETED=False).update(
+                IS_DELETED=True, DELETED_BY=username, DELETED_AT=now, UPDATED_BY=username, UPDATED_AT=now,
+            )
+            SEAT_ALLOCATION.objects.bulk_create(rows, batch_size=WRITE_BATCH)
+
+    filled = Counter(bucket.record_id for bucket in allocator.seat.values())
+    branches = defaultdict(lambda: {'seats': 0, 'filled': 0, 'categories': {}})
+    for bucket in buckets.values():
+        summary = branches[bucket.branch]
+        summary['seats'] += bucket.seats
+        summary['filled'] += filled[bucket.record_id]
+        summary['categories'][bucket.category] = {'seats': bucket.seats, 'filled': filled[bucket.record_id]}
+
+    summary = {
+        'academic_year': academic_year,
+        'round': round_no,
+        'applicants': len(applicants),
+        'skipped_without_merit': skipped,
+        'withdrawn': withdrawn,
+        'allotted': sum(filled.values()),
+        'frozen': len(allocator.frozen),
+        'upgraded': allocator.upgrades,
+        'not_allotted': sum(1 for row in rows if row.STATUS == SEAT_ALLOCATION.STATUS_NOT_ALLOTTED),
+        'sweeps': sweeps,
+        'branches': dict(branches),
+        'written': 0 if dry_run else len(rows),
+        'seconds': {
+            'allocate': round(allocated - started, 3),
+            'total': round(time.perf_counter() - started, 3),
+        },
+    }
+    logger.info("Seat allocation %s round %s: %s allotted of %s", academic_year, round_no,
+                summary['allotted'], summary['applicants'])
+    return summary
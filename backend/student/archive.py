@@ -0,0 +1,278 @@
+"""
+Streaming ZIP archives of STUDENT_DOCUMENTS files.
+
+The archive is produced on the fly from the stored files: entries are STORED
+(scans and PDFs are already compressed) with data descriptors, so nothing is
+copied to a temporary file and memory stays at one read buffer no matter how
+many documents are included.
+
+Because every header size is known up front, the exact archive length is
+computed before streaming. That gives a real Content-Length and lets the
+endpoint answer single-range requests (resuming an interrupted download): the
+bytes before the range are skipped, reading the skipped files only for their
+CRC-32, which the central directory needs.
+
+Archives are limited to 4 GiB (no ZIP64).
+"""
+import csv
+import hashlib
+import io
+import os
+import re
+import struct
+import zlib
+
+from .models import CHECK_LIST_DOCUMENTS, STUDENT_DOCUMENTS
+
+READ_SIZE = 64 * 1024
+ZIP_LIMIT = 0xFFFFFFFF
+MANIFEST_NAME = 'manifest.csv'
+
+# Bit 3: sizes and CRC follow the data; bit 11: UTF-8 names
+FLAGS = 0x0808
+LOCAL_HEADER = struct.Struct('<IHHHHHIIIHH')
+DATA_DESCRIPTOR = struct.Struct('<IIII')
+CENTRAL_HEADER = struct.Struct('<IHHHHHHIIIHHHHHII')
+END_OF_CENTRAL_DIR = struct.Struct('<IHHHHIIH')
+
+
+class ArchiveTooLarge(Exception):
+    pass
+
+
+def _dos_timestamp(moment):
+    if moment is None or moment.year < 1980:
+        return 0, (1 << 5) | 1
+    time = (moment.hour << 11) | (moment.minute << 5) | (moment.second // 2)
+    date = ((moment.year - 1980) << 9) | (moment.month << 5) | moment.day
+    return time, date
+
+
+def _safe(value):
+    return re.sub(r'[^A-Za-z0-9._ -]+', '_', str(value or '')).strip() or 'document'
+
+
+class _Entry:
+    def __init__(self, name, size, moment, path=None, data=None, storage=None):
+        self.name = name.encode('utf-8')
+        self.size = size
+        self.time, self.date = _dos_timestamp(moment)
+        self.storage = storage
+        self.path = path
+        self.data = data
+        self.crc = zlib.crc32(data) if data is not None else None
+        self.offset = 0
+
+    def chunks(self):
+        if self.data is not None:
+            yield self.data
+            return
+        with self.storage.open(self.path, 'rb') as handle:
+            for chunk in iter(lambda: handle.read(READ_SIZE), b''):
+                yield chunk
+
+    def compute_crc(self):
+        if self.crc is None:
+            crc = 0
+            for chunk in self.chunks():
+                crc = zlib.crc32(chunk, crc)
+            self.crc = crc
+        return self.crc
+
+    def local_header(self):
+        return LOCAL_HEADER.pack(
+            0x04034b50, 20, FLAGS, 0, self.time, self.date, 0, 0, 0, len(self.name), 0
+        ) + self.name
+
+    def descriptor(self):
+        return DATA_DESCRIPTOR.pack(0x08074b50, self.compute_crc(), self.size, self.size)
+
+    def central_header(self):
+        return CENTRAL_HEADER.pack(
+            0x02014b50, 20, 20, FLAGS, 0, self.time, self.date,
+            self.compute_crc(), self.size, self.size, len(self.name), 0, 0, 0, 0, 0, self.offset
+        ) + self.name
+
+
+class DocumentArchive:
+    """A ZIP of the given STUDENT_DOCUMENTS rows plus a manifest CSV."""
+
+    def __init__(self, students, documents):
+        self.students = list(students)
+        self.documents = list(documents)
+        self.entries = []
+        self._build()
+
+    def _build(self):
+        checklist = list(
+            CHECK_LIST_DOCUMENTS.objects.filter(IS_DELETED=False).order_by('RECORD_ID')
+        )
+        # A student may have any number of rows without a DOCUMENT_ID; each
+        # gets its own entry
+        by_student = {}
+        for document in self.documents:
+            by_student.setdefault(document.STUDENT_id, {}).setdefault(document.DOCUMENT_ID_id, []).append(document)
+
+        file_entries = []
+        used_names = set()
+        manifest_rows = []
+        for student in self.students:
+            submitted = by_student.get(student.RECORD_ID, {})
+            listed = [
+                (item, document) for item in checklist
+                for document in submitted.pop(item.RECORD_ID, None) or [None]
+            ]
+            # Documents whose checklist item was removed, or that have none, still go in
+            listed += [(document.DOCUMENT_ID, document) for documents in submitted.values() for document in documents]
+
+            for item, document in listed:
+                file_name = ''
+                size = ''
+                status = 'MISSING'
+                if document is not None:
+                    status = 'SUBMITTED'
+                    entry = self._file_entry(student, item, document, used_names)
+                    if entry is None:
+                        status = 'FILE MISSING' if document.DOC_IMAGES else 'NO FILE'
+                    else:
+                        file_entries.append(entry)
+                        file_name = entry.name.decode('utf-8')
+                        size = entry.size
+                manifest_rows.append([
+                    student.STUDENT_ID,
+                    f"{student.NAME} {student.SURNAME}".strip(),
+                    item.RECORD_ID if item else '',
+                    item.NAME if item else '',
+                    'YES' if item and item.IS_MANDATORY else 'NO',
+                    status,
+                    file_name,
+                    size,
+                    getattr(document, 'VERIFIED', '') or '',
+                    getattr(document, 'ORIGINAL', '') or '',
+                    getattr(document, 'PHOTOCOPY', '') or '',
+                    getattr(document, 'RETURN', '') or '',
+                    getattr(document, 'DEFICIENCY', '') or '',
+                    getattr(document, 'REMARKS', '') or '',
+                ])
+
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow([
+            'STUDENT_ID', 'STUDENT_NAME', 'DOCUMENT_ID', 'DOCUMENT_NAME', 'IS_MANDATORY',
+            'STATUS', 'FILE', 'SIZE', 'VERIFIED', 'ORIGINAL', 'PHOTOCOPY', 'RETURN', 'DEFICIENCY',
+            'REMARKS'
+        ])
+        writer.writerows(manifest_rows)
+        manifest = buffer.getvalue().encode('utf-8-sig')
+        latest = max((document.UPDATED_AT for document in self.documents if document.UPDATED_AT), default=None)
+
+        self.entries = [_Entry(MANIFEST_NAME, len(manifest), latest, data=manifest)] + file_entries
+
+        offset = 0
+        for entry in self.entries:
+            entry.offset = offset
+            offset += LOCAL_HEADER.size + len(entry.name) + entry.size + DATA_DESCRIPTOR.size
+        self.central_offset = offset
+        self.central_size = sum(CENTRAL_HEADER.size + len(entry.name) for entry in self.entries)
+        self.length = self.central_offset + self.central_size + END_OF_CENTRAL_DIR.size
+        if self.length > ZIP_LIMIT or len(self.entries) > 0xFFFF:
+            raise ArchiveTooLarge('The archive would exceed 4 GiB; narrow the selection')
+
+        fingerprint = hashlib.sha1(manifest)
+        for entry in file_entries:
+            fingerprint.update(entry.name + b'\0' + entry.path.encode() + b'\0' + str(entry.size).encode())
+        self.etag = f'"{fingerprint.hexdigest()}"'
+
+    def _file_entry(self, student, item, document, used_names):
+        field = document.DOC_IMAGES
+        if not field:
+            return None
+        try:
+            size = field.storage.size(field.name)
+        except OSError:
+            return None
+        ext = os.path.splitext(field.name)[1].lower()
+        base = f"{_safe(student.STUDENT_ID)}/{_safe(item.NAME if item else document.pk)}"
+        name = f"{base}{ext}"
+        counter = 2
+        while name in used_names:
+            name = f"{base} ({counter}){ext}"
+            counter += 1
+        used_names.add(name)
+        return _Entry(name, size, document.UPDATED_AT, path=field.name, storage=field.storage)
+
+    def _segments(self):
+        """(length, producer) pieces of the archive in order; producers yield bytes."""
+        for entry in self.entries:
+            header = entry.local_header()
+            yield len(header), lambda header=header: iter([header])
+            yield entry.size, entry
+            yield DATA_DESCRIPTOR.size, lambda entry=entry: iter([entry.descriptor()])
+        central = lambda: iter([b''.join(entry.central_header() for entry in self.entries)])
+        yield self.central_size, central
+        end = END_OF_CENTRAL_DIR.pack(
+            0x06054b50, 0, 0, len(self.entries), len(self.entries),
+            self.central_size, self.central_offset, 0
+        )
+        yield len(end), lambda: iter([end])
+
+    def stream(self, start=0, end=None):
+        """Yield bytes start..end (inclusive) of the archive."""
+        end = self.length - 1 if end is None else end
+        position = 0
+        for length, producer in self._segments():
+            segment_end = position + length
+            if segment_end <= start:
+                position = segment_end
+                continue
+            if position > end:
+                break
+
+            if isinstance(producer, _Entry):
+                chunks = producer.chunks()
+                crc = 0
+            else:
+                chunks = producer()
+                crc = None
+            cursor = position
+            for chunk in chunks:
+                if crc is not None:
+                    crc = zlib.crc32(chunk, crc)
+                chunk_end = cursor + len(chunk)
+                if chunk_end > start and cursor <= end:
+                    yield chunk[max(start - cursor, 0):end - cursor + 1]
+                cursor = chunk_end
+                if cursor > end:
+                    break
+            if crc is not None and cursor == segment_end and producer.crc is None:
+                producer.crc = crc
+            position = segment_end
+
+
+def parse_range(header, length):
+    """
+    (start, end) for a single "bytes=" range, None to send the whole archive,
+    or False when the range can't be satisfied.
+    """
+    match = re.fullmatch(r'\s*bytes=(\d*)-(\d*)\s*', header or '')
+    if not match or not (match.group(1) or match.group(2)):
+        return None
+    first, last = match.groups()
+    if first:
+        start = int(first)
+        end = min(int(last), length - 1) if last else length - 1
+    else:
+        start = max(length - int(last), 0)
+        end = length - 1
+    if start > end or start >= length:
+        return False
+    return start, end
+
+
+def documents_for(students):
+    return (
+        STUDENT_DOCUMENTS.objects
+        .filter(STUDENT__in=students, IS_DELETED=False)
+        .select_related('DOCUMENT_ID')
+        .order_by('STUDENT_id', 'DOCUMENT_ID_id', 'RECORDID')
+    )
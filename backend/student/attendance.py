@@ -0,0 +1,567 @@
+"""
+Attendance stored as one bitmap per session.
+
+Each CURRICULUM entry is taught to a class of STUDENT_ROLL_NUMBER_DETAILS
+rows (the curriculum's branch in one SEMESTER / ACADEMIC_YEAR). That class
+is frozen into an ATTENDANCE_ROSTER: every roll record gets a POSITION, and
+a session stores who was present as a bitmap with bit POSITION set, least
+significant bit first (bit 0 is the low bit of byte 0, as PostgreSQL's
+get_bit() numbers them). A class of 120 costs 15 bytes per lecture instead
+of 120 rows.
+
+Positions are handed out in ROLL_NO order when the roster is first used and
+only appended to afterwards: a student who joins late gets the next free
+position and a regenerated roll number keeps its old one, so no stored
+bitmap ever has to be rewritten. A session also keeps the roster SIZE it
+was marked against, and members beyond it count as neither present nor
+absent for that session.
+
+A whole class is marked in one call, naming only the exceptions:
+
+    {
+      "curriculum": 31, "semester": 5, "academic_year": "2025-26",
+      "sessions": [
+        {"date": "2025-08-04", "period": 2, "absent": ["CE25007", "CE25019"]},
+        {"date": "2025-08-05", "period": 0, "session_type": "LAB", "present": ["CE25001", ...]}
+      ]
+    }
+
+Without "sessions" the payload itself is the one session. Marking a slot
+(date, period) again replaces it. All sessions are written with a single
+INSERT ... ON CONFLICT DO UPDATE.
+
+Percentages are computed from the bitmaps with NumPy: a roster's sessions
+are stacked into a (sessions x bytes) uint8 matrix, per-session counts are a
+popcount over each row and per-student counts a sum over each unpacked bit
+column.
+
+Every member also has an ATTENDANCE_SUMMARY row with running HELD and
+ATTENDED counters. A write works out, per position, how many sessions it
+adds or takes away and how many attendances (the new bitmaps minus the ones
+they replace) and applies both with a single UPDATE ... FROM unnest(); the
+roster row lock taken by every write keeps the counters exact. The shortage
+list then reads the summaries through their (BRANCH, SEMESTER, PERCENTAGE)
+index. rebuild_summaries() recomputes them from the bitmaps.
+"""
+from decimal import ROUND_HALF_UP, Decimal
+
+import numpy as np
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from academic.models import CURRICULUM
+from accounts.models import SEMESTER
+from .models import (
+    ATTENDANCE_ROSTER, ATTENDANCE_ROSTER_MEMBER, ATTENDANCE_SESSION, ATTENDANCE_SUMMARY, STUDENT_ROLL_NUMBER_DETAILS
+)
+
+SESSION_TYPES = {choice for choice, _ in ATTENDANCE_SESSION.SESSION_TYPE_CHOICES}
+UPSERT_KEY = ['ROSTER', 'SESSION_DATE', 'PERIOD']
+UPSERT_FIELDS = [
+    'SESSION_TYPE', 'SIZE', 'PRESENT', 'PRESENT_COUNT', 'IS_DELETED', 'UPDATED_BY', 'UPDATED_AT'
+]
+WRITE_BATCH = 2000
+
+
+class AttendanceError(ValueError):
+    def __init__(self, message, errors=None):
+        super().__init__(message)
+        self.message = message
+        self.errors = errors or []
+
+
+def pack(bits):
+    """Bitmap bytes for a boolean array indexed by position."""
+    return np.packbits(np.asarray(bits, dtype=bool), bitorder='little').tobytes()
+
+
+def unpack(bitmap, size):
+    """Boolean array of length size from bitmap bytes."""
+    raw = np.frombuffer(bytes(bitmap), dtype=np.uint8)
+    bits = np.unpackbits(raw, count=min(size, raw.size * 8), bitorder='little').astype(bool)
+    if bits.size < size:
+        bits = np.concatenate([bits, np.zeros(size - bits.size, dtype=bool)])
+    return bits
+
+
+def popcount(bitmap):
+    return int(np.bitwise_count(np.frombuffer(bytes(bitmap), dtype=np.uint8)).sum())
+
+
+def stack(bitmaps, size):
+    """The bitmaps as one (len(bitmaps) x bytes) uint8 matrix, zero padded."""
+    width = (size + 7) // 8
+    packed = np.zeros((len(bitmaps), width), dtype=np.uint8)
+    for row, bitmap in enumerate(bitmaps):
+        raw = np.frombuffer(bytes(bitmap), dtype=np.uint8)[:width]
+        packed[row, :raw.size] = raw
+    return packed
+
+
+def _class_rolls(roster):
+    return STUDENT_ROLL_NUMBER_DETAILS.objects.filter(
+        BRANCH_id=roster.CURRICULUM.BRANCH_id,
+        SEMESTER_id=roster.SEMESTER_id,
+        ACADEMIC_YEAR=roster.ACADEMIC_YEAR,
+        IS_DELETED=False,
+    )
+
+
+def _summary(roster, position, roll, username, held=0, attended=0):
+    curriculum = roster.CURRICULUM
+    return ATTENDANCE_SUMMARY(
+        ROSTER=roster, POSITION=position, ROLL_id=roll, CURRICULUM_id=curriculum.pk,
+        BRANCH_id=curriculum.BRANCH_id, SEMESTER_id=roster.SEMESTER_id, ACADEMIC_YEAR=roster.ACADEMIC_YEAR,
+        HELD=held, ATTENDED=attended, PERCENTAGE=percentage(attended, held),
+        CREATED_BY=username, UPDATED_BY=username,
+    )
+
+
+def sync_roster(roster, username='SYSTEM'):
+    """
+    Give every roll record of the roster's class that has no position yet
+    the next free one, in ROLL_NO order, with empty counters. The roster row
+    must be locked. Returns how many members were added.
+    """
+    new = list(
+        _class_rolls(roster)
+        .exclude(attendance_positions__ROSTER=roster)
+        .order_by('ROLL_NO', 'RECORD_ID')
+        .values_list('RECORD_ID', flat=True)
+    )
+    if not new:
+        return 0
+    ATTENDANCE_ROSTER_MEMBER.objects.bulk_create([
+        ATTENDANCE_ROSTER_MEMBER(ROSTER=roster, POSITION=roster.SIZE + offset, ROLL_id=roll)
+        for offset, roll in enumerate(new)
+    ], batch_size=WRITE_BATCH)
+    ATTENDANCE_SUMMARY.objects.bulk_create([
+        _summary(roster, roster.SIZE + offset, roll, username) for offset, roll in enumerate(new)
+    ], batch_size=WRITE_BATCH)
+    roster.SIZE += len(new)
+    ATTENDANCE_ROSTER.objects.filter(pk=roster.pk).update(SIZE=roster.SIZE, UPDATED_AT=timezone.now())
+    return len(new)
+
+
+def locked_roster(curriculum, semester, academic_year, username='SYSTEM'):
+    """The class roster, created on first use, locked and brought up to date."""
+    roster, _ = ATTENDANCE_ROSTER.objects.get_or_create(
+        CURRICULUM=curriculum, SEMESTER=semester, ACADEMIC_YEAR=academic_year,
+        defaults={'CREATED_BY': username, 'UPDATED_BY': username},
+    )
+    roster = ATTENDANCE_ROSTER.objects.select_for_update().select_related('CURRICULUM').get(pk=roster.pk)
+    added = sync_roster(roster, username)
+    return roster, added
+
+
+def percentage(attended, held):
+    """attended / held as a percentage to two places, rounded like SQL ROUND()."""
+    if not held:
+        return None
+    return (Decimal(100 * attended) / Decimal(held)).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
+
+
+def apply_deltas(roster, held, attended):
+    """Add per-position session and attendance deltas to the roster's summaries."""
+    changed = np.flatnonzero((held != 0) | (attended != 0))
+    if not changed.size:
+        return 0
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'''
+            UPDATE {ATTENDANCE_SUMMARY._meta.db_table} AS s
+               SET "HELD" = s."HELD" + d.held,
+                   "ATTENDED" = s."ATTENDED" + d.attended,
+                   "PERCENTAGE" = CASE WHEN s."HELD" + d.held > 0
+                                       THEN ROUND(100.0 * (s."ATTENDED" + d.attended) / (s."HELD" + d.held), 2)
+                                  END,
+                   "UPDATED_AT" = now()
+              FROM unnest(%s::integer[], %s::integer[], %s::integer[]) AS d(position, held, attended)
+             WHERE s."ROSTER_ID" = %s AND s."POSITION" = d.position
+            ''',
+            [changed.tolist(), held[changed].tolist(), attended[changed].tolist(), roster.pk]
+        )
+        return cursor.rowcount
+
+
+def _count(deltas, size, bitmap, sign):
+    """Add (sign=1) or take away (sign=-1) one session's worth of counts."""
+    held, attended = deltas
+    held[:size] += sign
+    attended += sign * unpack(bitmap, len(attended)).astype(np.int64)
+
+
+def find_roster(curriculum, semester, academic_year=None):
+    rosters = ATTENDANCE_ROSTER.objects.filter(
+        CURRICULUM_id=curriculum, SEMESTER_id=semester, IS_DELETED=False
+    ).select_related('CURRICULUM__COURSE')
+    if academic_year:
+        rosters = rosters.filter(ACADEMIC_YEAR=academic_year)
+    rosters = list(rosters[:2])
+    if not rosters:
+        raise AttendanceError('No attendance has been marked for this class yet')
+    if len(rosters) > 1:
+        raise AttendanceError('academic_year is required: this curriculum has rosters in several years')
+    return rosters[0]
+
+
+def members(roster):
+    """(positions, roll numbers, active flags) of a roster, in position order."""
+    rows = list(
+        ATTENDANCE_ROSTER_MEMBER.objects.filter(ROSTER=roster)
+        .order_by('POSITION')
+        .values_list('POSITION', 'ROLL__ROLL_NO', 'ROLL__IS_DELETED')
+    )
+    positions = np.array([row[0] for row in rows], dtype=np.int64)
+    roll_numbers = [row[1] for row in rows]
+    active = np.zeros(roster.SIZE, dtype=bool)
+    active[[row[0] for row in rows if not row[2]]] = True
+    return positions, roll_numbers, active
+
+
+def _resolve(data):
+    curriculum = CURRICULUM.objects.filter(
+        pk=data.get('curriculum'), IS_DELETED=False
+    ).select_related('ACADEMIC_YEAR', 'COURSE').first() if str(data.get('curriculum') or '').isdigit() else None
+    if curriculum is None:
+        raise AttendanceError('curriculum not found')
+    semester = SEMESTER.objects.filter(
+        pk=data.get('semester'), IS_DELETED=False
+    ).first() if str(data.get('semester') or '').isdigit() else None
+    if semester is None:
+        raise AttendanceError('semester not found')
+    academic_year = data.get('academic_year') or curriculum.ACADEMIC_YEAR.ACADEMIC_YEAR
+    if not academic_year:
+        raise AttendanceError('academic_year is required')
+    return curriculum, semester, str(academic_year)
+
+
+def _parse_sessions(data, default_type):
+    sessions = data.get('sessions')
+    if sessions is None:
+        sessions = [data]
+    if not isinstance(sessions, list) or not sessions:
+        raise AttendanceError('sessions must be a non-empty list')
+    parsed, errors, seen = [], [], set()
+    for index, session in enumerate(sessions):
+        if not isinstance(session, dict):
+            errors.append({'session': index, 'message': 'Each session must be an object'})
+            continue
+        day = parse_date(str(session.get('date') or ''))
+        try:
+            period = int(session.get('period', 0))
+        except (TypeError, ValueError):
+            period = -1
+        session_type = str(session.get('session_type') or default_type).upper()
+        if day is None:
+            errors.append({'session': index, 'message': 'date must be YYYY-MM-DD'})
+        if period < 0:
+            errors.append({'session': index, 'message': 'period must be a non-negative integer'})
+        if session_type not in SESSION_TYPES:
+            errors.append({'session': index, 'message': f"session_type must be one of {', '.join(sorted(SESSION_TYPES))}"})
+        if 'present' in session and 'absent' in session:
+            errors.append({'session': index, 'message': 'Give either present or absent, not both'})
+        listed = session.get('present', session.get('absent', []))
+        if not isinstance(listed, list):
+            errors.append({'session': index, 'message': 'present/absent must be a list of roll numbers'})
+            listed = []
+        if (day, period) in seen:
+            errors.append({'session': index, 'message': f'{day} period {period} is given twice'})
+        seen.add((day, period))
+        parsed.append((index, day, period, session_type, 'present' in session, [str(value) for value in listed]))
+    return parsed, errors
+
+
+def mark(data, username='SYSTEM', dry_run=False):
+    """
+    Mark one or more sessions of a class. Returns a summary; raises
+    AttendanceError listing every bad session or roll number.
+    """
+    curriculum, semester, academic_year = _resolve(data)
+    default_type = data.get('session_type') or 'LECTURE'
+    parsed, errors = _parse_sessions(data, default_type)
+
+    with transaction.atomic():
+        roster, added = locked_roster(curriculum, semester, academic_year, username)
+        if roster.SIZE == 0:
+            raise AttendanceError(
+                f'No students hold roll numbers in this class ({academic_year}, semester {semester.SEMESTER})'
+            )
+        positions, roll_numbers, active = members(roster)
+        position_of = dict(zip(roll_numbers, positions.tolist()))
+        # A roll number reissued to a new record refers to the live one
+        position_of.update(
+            (roll_no, position) for roll_no, position in zip(roll_numbers, positions.tolist()) if active[position]
+        )
+
+        # Sessions these marks replace, to take their counts back out
+        replaced = {
+            (day, period): (size, bitmap)
+            for day, period, size, bitmap in ATTENDANCE_SESSION.objects.filter(
+                ROSTER=roster, IS_DELETED=False,
+                SESSION_DATE__in={day for _, day, *_ in parsed if day is not None},
+            ).values_list('SESSION_DATE', 'PERIOD', 'SIZE', 'PRESENT')
+        }
+        deltas = (np.zeros(roster.SIZE, dtype=np.int64), np.zeros(roster.SIZE, dtype=np.int64))
+
+        now = timezone.now()
+        rows, summary = [], []
+        for index, day, period, session_type, by_present, listed in parsed:
+            unknown = [value for value in listed if value not in position_of]
+            if unknown:
+                errors.append({'session': index, 'message': f"Not on this class's roster: {', '.join(unknown)}"})
+                continue
+            picked = [position_of[value] for value in listed]
+            if by_present:
+                bits = np.zeros(roster.SIZE, dtype=bool)
+                bits[picked] = True
+            else:
+                # Everyone currently on the roll is present unless listed
+                bits = active.copy()
+                bits[picked] = False
+            bitmap = pack(bits)
+            present = popcount(bitmap)
+            if (day, period) in replaced:
+                _count(deltas, *replaced[(day, period)], -1)
+            _count(deltas, roster.SIZE, bitmap, 1)
+            rows.append(ATTENDANCE_SESSION(
+                ROSTER=roster, SESSION_DATE=day, PERIOD=period, SESSION_TYPE=session_type,
+                SIZE=roster.SIZE, PRESENT=bitmap, PRESENT_COUNT=present, IS_DELETED=False,
+                CREATED_BY=username, UPDATED_BY=username, UPDATED_AT=now,
+            ))
+            summary.append({
+                'date': day, 'period': period, 'session_type': session_type,
+                'present': present, 'absent': int(active.sum()) - int(bits[active].sum()),
+            })
+        if errors:
+            raise AttendanceError(f'{len(errors)} invalid sessions', sorted(errors, key=lambda error: error['session']))
+        if dry_run:
+            transaction.set_rollback(True)
+        else:
+            ATTENDANCE_SESSION.objects.bulk_create(
+                rows, update_conflicts=True, unique_fields=UPSERT_KEY, update_fields=UPSERT_FIELDS,
+            )
+            apply_deltas(roster, *deltas)
+
+    return {
+        'roster': roster.pk,
+        'course': curriculum.COURSE.CODE,
+        'academic_year': academic_year,
+        'students': int(active.sum()),
+        'members_added': added,
+        'written': 0 if dry_run else len(rows),
+        'sessions': summary,
+    }
+
+
+def delete_session(session, username='SYSTEM'):
+    """Soft-delete a session and take it out of its roster's counters."""
+    with transaction.atomic():
+        roster = ATTENDANCE_ROSTER.objects.select_for_update().get(pk=session.ROSTER_id)
+        session = ATTENDANCE_SESSION.objects.get(pk=session.pk)
+        if session.IS_DELETED:
+            return False
+        deltas = (np.zeros(roster.SIZE, dtype=np.int64), np.zeros(roster.SIZE, dtype=np.int64))
+        _count(deltas, session.SIZE, session.PRESENT, -1)
+        session.IS_DELETED = True
+        session.DELETED_BY = username
+        session.DELETED_AT = timezone.now()
+        session.save(update_fields=['IS_DELETED', 'DELETED_BY', 'DELETED_AT', 'UPDATED_AT'])
+        apply_deltas(roster, *deltas)
+    return True
+
+
+def _sessions(rosters, date_from=None, date_to=None):
+    sessions = ATTENDANCE_SESSION.objects.filter(ROSTER__in=rosters, IS_DELETED=False)
+    if date_from:
+        sessions = sessions.filter(SESSION_DATE__gte=date_from)
+    if date_to:
+        sessions = sessions.filter(SESSION_DATE__lte=date_to)
+    return sessions
+
+
+def _percentage(attended, held):
+    value = percentage(attended, held)
+    return None if value is None else float(value)
+
+
+def counts(roster, date_from=None, date_to=None):
+    """(held, attended, stacked bitmaps) per position of a roster, from its sessions."""
+    sessions = list(_sessions([roster], date_from, date_to).values_list('SIZE', 'PRESENT'))
+    size = roster.SIZE
+    sizes = np.array([row[0] for row in sessions], dtype=np.int64)
+    packed = stack([row[1] for row in sessions], size)
+
+    attended = np.unpackbits(packed, axis=1, count=size, bitorder='little').sum(axis=0, dtype=np.int64)
+    # A member counts a session as held when its position was on the roster then
+    held = len(sizes) - np.searchsorted(np.sort(sizes), np.arange(size), side='right')
+    return held, attended, packed
+
+
+def class_report(roster, date_from=None, date_to=None):
+    """Sessions held, attended and percentage for every member of a roster."""
+    held, attended, packed = counts(roster, date_from, date_to)
+
+    members = list(
+        ATTENDANCE_ROSTER_MEMBER.objects.filter(ROSTER=roster, ROLL__IS_DELETED=False)
+        .order_by('ROLL__ROLL_NO')
+        .values_list('POSITION', 'ROLL_id', 'ROLL__ROLL_NO', 'ROLL__STUDENT__STUDENT_ID',
+                     'ROLL__STUDENT__NAME', 'ROLL__STUDENT__SURNAME')
+    )
+    return {
+        'roster': roster.pk,
+        'curriculum': roster.CURRICULUM_id,
+        'course': roster.CURRICULUM.COURSE.CODE,
+        'semester': roster.SEMESTER_id,
+        'academic_year': roster.ACADEMIC_YEAR,
+        'sessions': len(packed),
+        'present_total': int(np.bitwise_count(packed).sum()),
+        'students': [
+            {
+                'roll_record': roll,
+                'roll_no': roll_no,
+                'student_id': student_id,
+                'name': f"{name or ''} {surname or ''}".strip(),
+                'held': int(held[position]),
+                'attended': int(attended[position]),
+                'percentage': _percentage(int(attended[position]), int(held[position])),
+            }
+            for position, roll, roll_no, student_id, name, surname in members
+        ],
+    }
+
+
+def student_report(student, date_from=None, date_to=None):
+    """Held, attended and percentage per course for one STUDENT_MASTER record."""
+    places = list(
+        ATTENDANCE_ROSTER_MEMBER.objects.filter(ROLL__STUDENT_id=student, ROSTER__IS_DELETED=False)
+        .order_by('ROSTER__ACADEMIC_YEAR', 'ROSTER__CURRICULUM__COURSE__CODE')
+        .values_list('ROSTER_id', 'POSITION', 'ROSTER__CURRICULUM_id', 'ROSTER__CURRICULUM__COURSE__CODE',
+                     'ROSTER__CURRICULUM__COURSE__NAME', 'ROSTER__ACADEMIC_YEAR', 'ROSTER__SEMESTER_id')
+    )
+    by_roster = {}
+    for roster, size, bitmap in _sessions([place[0] for place in places], date_from, date_to) \
+            .values_list('ROSTER_id', 'SIZE', 'PRESENT'):
+        by_roster.setdefault(roster, ([], []))
+        by_roster[roster][0].append(size)
+        by_roster[roster][1].append(bitmap)
+
+    courses = []
+    for roster, position, curriculum, code, name, academic_year, semester in places:
+        sizes, bitmaps = by_roster.get(roster, ([], []))
+        sizes = np.array(sizes, dtype=np.int64)
+        packed = stack(bitmaps, position + 1)
+        # Only the byte holding this member's bit matters
+        bits = (packed[:, position >> 3] >> (position & 7)) & 1
+        on_roll = sizes > position
+        held = int(on_roll.sum())
+        attended = int(bits[on_roll].sum())
+        courses.append({
+            'roster': roster,
+            'curriculum': curriculum,
+            'course': code,
+            'course_name': name,
+            'academic_year': academic_year,
+            'semester': semester,
+            'held': held,
+            'attended': attended,
+            'percentage': _percentage(attended, held),
+        })
+    total_held = sum(course['held'] for course in courses)
+    total_attended = sum(course['attended'] for course in courses)
+    return {
+        'student': student,
+        'courses': courses,
+        'held': total_held,
+        'attended': total_attended,
+        'percentage': _percentage(total_attended, total_held),
+    }
+
+
+def absentees(session):
+    """Roll numbers of the members marked absent in a session."""
+    bits = unpack(session.PRESENT, session.SIZE)
+    rows = ATTENDANCE_ROSTER_MEMBER.objects.filter(
+        ROSTER_id=session.ROSTER_id, POSITION__lt=session.SIZE, ROLL__IS_DELETED=False
+    ).order_by('ROLL__ROLL_NO').values_list('POSITION', 'ROLL__ROLL_NO')
+    return [roll_no for position, roll_no in rows if not bits[position]]
+
+
+def rebuild_summaries(rosters=None, username='SYSTEM', dry_run=False):
+    """
+    Recompute every member's counters of the given roster queryset (all by default)
+    from the session bitmaps and replace the stored ones. Returns how many
+    rosters and members were rebuilt and how many stored rows had drifted.
+    """
+    if rosters is None:
+        rosters = ATTENDANCE_ROSTER.objects.filter(IS_DELETED=False)
+    totals = {'rosters': 0, 'members': 0, 'drifted': 0}
+    for roster_id in list(rosters.values_list('pk', flat=True)):
+        with transaction.atomic():
+            roster = ATTENDANCE_ROSTER.objects.select_for_update().select_related('CURRICULUM').get(pk=roster_id)
+            held, attended, _ = counts(roster)
+            stored = {
+                position: (stored_held, stored_attended)
+                for position, stored_held, stored_attended in
+                ATTENDANCE_SUMMARY.objects.filter(ROSTER=roster).values_list('POSITION', 'HELD', 'ATTENDED')
+            }
+            places = list(
+                ATTENDANCE_ROSTER_MEMBER.objects.filter(ROSTER=roster).order_by('POSITION')
+                .values_list('POSITION', 'ROLL_id')
+            )
+            totals['rosters'] += 1
+            totals['members'] += len(places)
+            totals['drifted'] += sum(
+                stored.get(position) != (int(held[position]), int(attended[position])) for position, _ in places
+            )
+            if dry_run:
+                continue
+            ATTENDANCE_SUMMARY.objects.filter(ROSTER=roster).delete()
+            ATTENDANCE_SUMMARY.objects.bulk_create([
+                _summary(roster, position, roll, username, int(held[position]), int(attended[position]))
+                for position, roll in places
+            ], batch_size=WRITE_BATCH)
+    return totals
+
+
+def default_threshold():
+    return getattr(settings, 'ATTENDANCE_SHORTAGE_THRESHOLD', 75)
+
+
+def shortage(branch, semester, threshold=None, academic_year=None, curriculum=None):
+    """Members of a branch/semester whose attendance in a course is below threshold percent."""
+    threshold = default_threshold() if threshold is None else threshold
+    summaries = ATTENDANCE_SUMMARY.objects.filter(
+        BRANCH_id=branch, SEMESTER_id=semester, PERCENTAGE__lt=threshold, ROLL__IS_DELETED=False,
+    )
+    if academic_year:
+        summaries = summaries.filter(ACADEMIC_YEAR=academic_year)
+    if curriculum:
+        summaries = summaries.filter(CURRICULUM_id=curriculum)
+    rows = [
+        {
+            'roll_no': roll_no,
+            'student': student,
+            'student_id': student_id,
+            'name': f"{name or ''} {surname or ''}".strip(),
+            'curriculum': curriculum_id,
+            'course': code,
+            'academic_year': year,
+            'held': held,
+            'attended': attended,
+            'percentage': float(percent),
+        }
+        for roll_no, student, student_id, name, surname, curriculum_id, code, year, held, attended, percent in
+        summaries.order_by('ROLL__ROLL_NO', 'CURRICULUM__COURSE__CODE').values_list(
+            'ROLL__ROLL_NO', 'ROLL__STUDENT_id', 'ROLL__STUDENT__STUDENT_ID', 'ROLL__STUDENT__NAME',
+            'ROLL__STUDENT__SURNAME', 'CURRICULUM_id', 'CURRICULUM__COURSE__CODE', 'ACADEMIC_YEAR',
+            'HELD', 'ATTENDED', 'PERCENTAGE',
+        )
+    ]
+    return {
+        'threshold': threshold,
+        'students': len({row['roll_no'] for row in rows}),
+        'shortages': rows,
+    }
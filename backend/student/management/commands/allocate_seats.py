@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from student.admissions import AllocationError, run_round
+
+
+class Command(BaseCommand):
+    help = 'Allocate one admission round over SEAT_MATRIX in merit order (see student/admissions.py).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('academic_year', help='Admission year, as in STUDENT_MASTER.ACADEMIC_YEAR')
+        parser.add_argument('round', type=int, help='Round number; round N carries over round N-1')
+        parser.add_argument('--dry-run', action='store_true', help='Allocate without writing SEAT_ALLOCATION')
+
+    def handle(self, *args, **options):
+        try:
+            summary = run_round(options['academic_year'], options['round'], dry_run=options['dry_run'])
+        except AllocationError as e:
+            raise CommandError(str(e))
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Round {summary['round']}: {summary['allotted']} of {summary['applicants']} applicants allotted "
+            f"({summary['upgraded']} upgraded, {summary['withdrawn']} withdrawn, {summary['sweeps']} sweeps)"
+        ))
+        for branch, filled in sorted(summary['branches'].items()):
+            categories = ', '.join(
+                f"{category} {counts['filled']}/{counts['seats']}" for category, counts in filled['categories'].items()
+            )
+            self.stdout.write(f"  branch {branch}: {filled['filled']}/{filled['seats']} ({categories})")
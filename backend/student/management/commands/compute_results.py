@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from academic.models import EXAMINATION
+from accounts.models import BRANCH
+from student.results import run
+
+
+class Command(BaseCommand):
+    help = 'Compute SGPA/CGPA from STUDENT_RESULT for one or more examinations'
+
+    def add_arguments(self, parser):
+        parser.add_argument('exams', nargs='+', help='EXAMINATION codes')
+        parser.add_argument('--branch', help='Limit the run to one BRANCH_ID')
+        parser.add_argument('--dry-run', action='store_true', help='Compute without writing results')
+
+    def handle(self, *args, **options):
+        branch = None
+        if options['branch']:
+            branch = BRANCH.objects.filter(pk=options['branch']).first()
+            if branch is None:
+                raise CommandError(f"Unknown branch {options['branch']}")
+
+        examinations = {exam.CODE: exam for exam in EXAMINATION.objects.filter(CODE__in=options['exams'])}
+        missing = [code for code in options['exams'] if code not in examinations]
+        if missing:
+            raise CommandError(f"Unknown examinations: {', '.join(missing)}")
+
+        # Oldest first, so a later examination's CGPA builds on earlier attempts
+        for exam in sorted(examinations.values(), key=lambda exam: (exam.END_DATE, exam.pk)):
+            summary = run(exam, branch=branch, dry_run=options['dry_run'])
+            seconds = summary['seconds']
+            self.stdout.write(self.style.SUCCESS(
+                f"{exam.CODE}: {summary['result_rows']} result rows, {summary['students']} students, "
+                f"{summary['semester_results']} semester results ({summary['failed']} with backlogs), "
+                f"{summary['written']} written; load {seconds['load']}s, compute {seconds['compute']}s, "
+                f"write {seconds['write']}s"
+            ))
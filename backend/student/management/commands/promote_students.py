@@ -0,0 +1,43 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from student.promotion import PromotionError, promote
+
+
+class Command(BaseCommand):
+    help = 'Promote students to their next class from a JSON job file (see student/promotion.py)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('job_file', help='Path to the promotion job JSON')
+        parser.add_argument('--apply', action='store_true', help='Write the promotion; without it only a preview is shown')
+        parser.add_argument('--detail', action='store_true', help='List promoted students too, not only the exceptions')
+        parser.add_argument('--user', default='SYSTEM', help='Recorded as CREATED_BY / UPDATED_BY')
+
+    def handle(self, *args, **options):
+        try:
+            with open(options['job_file']) as handle:
+                data = json.load(handle)
+        except (OSError, ValueError) as e:
+            raise CommandError(f'Cannot read {options["job_file"]}: {e}')
+
+        def progress(stage, done, total):
+            if options['verbosity'] > 1 or done == total:
+                self.stdout.write(f'  {stage}: {done}/{total}')
+
+        try:
+            report = promote(
+                data, username=options['user'], dry_run=not options['apply'],
+                detail=options['detail'], progress=progress,
+            )
+        except PromotionError as e:
+            for error in e.errors:
+                self.stderr.write(f"  transition {error['transition']}: {error['message']}")
+            raise CommandError(e.message)
+
+        self.stdout.write(json.dumps(report, indent=2, default=str))
+        totals = ', '.join(f'{count} {outcome}' for outcome, count in report['totals'].items())
+        if options['apply']:
+            self.stdout.write(self.style.SUCCESS(f"Job {report['job']}: {totals}"))
+        else:
+            self.stdout.write(self.style.WARNING(f'Preview only ({totals}); rerun with --apply to write it'))
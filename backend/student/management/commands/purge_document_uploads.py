@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from student.uploads import purge_expired_uploads
+
+
+class Command(BaseCommand):
+    help = 'Delete expired resumable document uploads and their part files'
+
+    def handle(self, *args, **options):
+        deleted = purge_expired_uploads()
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} expired document uploads"))
@@ -0,0 +1,33 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from student.attendance import rebuild_summaries
+from student.models import ATTENDANCE_ROSTER
+
+
+class Command(BaseCommand):
+    help = 'Recompute ATTENDANCE_SUMMARY counters from the attendance session bitmaps'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--academic-year', help='Only rosters of this ACADEMIC_YEAR, e.g. 2025-26')
+        parser.add_argument('--curriculum', type=int, help='Only rosters of this CURRICULUM_ID')
+        parser.add_argument('--roster', type=int, help='Only this ROSTER_ID')
+        parser.add_argument('--dry-run', action='store_true', help='Report drifted counters without rewriting them')
+
+    def handle(self, *args, **options):
+        rosters = ATTENDANCE_ROSTER.objects.filter(IS_DELETED=False)
+        if options['academic_year']:
+            rosters = rosters.filter(ACADEMIC_YEAR=options['academic_year'])
+        if options['curriculum']:
+            rosters = rosters.filter(CURRICULUM_id=options['curriculum'])
+        if options['roster']:
+            rosters = rosters.filter(pk=options['roster'])
+
+        started = time.perf_counter()
+        totals = rebuild_summaries(rosters, dry_run=options['dry_run'])
+        verb = 'checked' if options['dry_run'] else 'rebuilt'
+        self.stdout.write(self.style.SUCCESS(
+            f"{totals['rosters']} rosters, {totals['members']} members {verb}; "
+            f"{totals['drifted']} counters had drifted; {time.perf_counter() - started:.2f}s"
+        ))
@@ -0,0 +1,173 @@
+"""
+Checklist completeness matrix: which CHECK_LIST_DOCUMENTS each student of a
+branch/batch has submitted, had returned or is deficient in.
+
+The grid comes from one aggregated query: students LEFT JOIN their
+STUDENT_DOCUMENTS, with the document ids and status flags gathered into two
+parallel arrays per student. Each cell is a single hex digit of STATUS_*
+bits, so a student's row is a short string with one character per document
+column ("1350" = submitted, returned+submitted, deficient+submitted,
+missing):
+
+    {
+      "documents": [{"id": 4, "name": "TC", "mandatory": true}, ...],
+      "students": [["CE25001", "Asha Patil", "1350"], ...],
+      "counts": [{"submitted": 51, "returned": 3, "deficient": 2, "missing": 9}, ...],
+      "complete": 48
+    }
+
+Results are cached per branch/batch. Writes to STUDENT_DOCUMENTS bump that
+batch's version; changes to the checklist or to students bump a version
+shared by every batch.
+"""
+from django.conf import settings
+from django.contrib.postgres.aggregates import ArrayAgg
+from django.core.cache import cache
+from django.db.models import Case, Q, Value, When
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import CHECK_LIST_DOCUMENTS, STUDENT_DOCUMENTS, STUDENT_MASTER
+
+STATUS_SUBMITTED = 1
+STATUS_RETURNED = 2
+STATUS_DEFICIENT = 4
+STATUS_LEGEND = {
+    STATUS_SUBMITTED: 'SUBMITTED',
+    STATUS_RETURNED: 'RETURNED',
+    STATUS_DEFICIENT: 'DEFICIENT',
+}
+
+CACHE_PREFIX = 'student:doc-matrix'
+GLOBAL_VERSION_KEY = f'{CACHE_PREFIX}:version'
+
+
+def _cache_ttl():
+    return getattr(settings, 'DOCUMENT_MATRIX_CACHE_TTL', 600)
+
+
+def _batch_version_key(branch, batch):
+    return f'{CACHE_PREFIX}:version:{branch}:{batch}'
+
+
+def _version(key):
+    return cache.get_or_set(key, 1, None)
+
+
+def _bump(key):
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 2, None)
+
+
+def invalidate_batch(branch, batch):
+    _bump(_batch_version_key(branch, batch))
+
+
+def invalidate_students(student_ids):
+    """Invalidate the batches of the given STUDENT_MASTER record ids."""
+    batches = set(
+        STUDENT_MASTER.objects.filter(RECORD_ID__in=student_ids).values_list('BRANCH_ID', 'BATCH')
+    )
+    for branch, batch in batches:
+        invalidate_batch(branch, batch)
+
+
+def invalidate_all():
+    _bump(GLOBAL_VERSION_KEY)
+
+
+def _flags():
+    # Every joined row counts as submitted; RETURN and DEFICIENCY add their bits
+    return (
+        Value(STATUS_SUBMITTED)
+        + Case(When(DOCUMENTS_BY_STUDENT__RETURN='Y', then=Value(STATUS_RETURNED)), default=Value(0))
+        + Case(When(DOCUMENTS_BY_STUDENT__DEFICIENCY='Y', then=Value(STATUS_DEFICIENT)), default=Value(0))
+    )
+
+
+def build_matrix(branch, batch, academic_year=None, mandatory_only=True):
+    documents = CHECK_LIST_DOCUMENTS.objects.filter(IS_DELETED=False)
+    if mandatory_only:
+        documents = documents.filter(IS_MANDATORY=True)
+    documents = list(documents.order_by('RECORD_ID').values_list('RECORD_ID', 'NAME', 'IS_MANDATORY'))
+    columns = {document_id: index for index, (document_id, _, _) in enumerate(documents)}
+
+    students = STUDENT_MASTER.objects.filter(BRANCH_ID=branch, BATCH=batch, IS_DELETED=False)
+    if academic_year:
+        students = students.filter(ACADEMIC_YEAR=academic_year)
+    joined = Q(
+        DOCUMENTS_BY_STUDENT__IS_DELETED=False,
+        DOCUMENTS_BY_STUDENT__DOCUMENT_ID__in=list(columns),
+    )
+    rows = (
+        students
+        .annotate(
+            document_ids=ArrayAgg('DOCUMENTS_BY_STUDENT__DOCUMENT_ID', filter=joined,
+                                  ordering='DOCUMENTS_BY_STUDENT__RECORDID', default=Value([])),
+            document_flags=ArrayAgg(_flags(), filter=joined,
+                                    ordering='DOCUMENTS_BY_STUDENT__RECORDID', default=Value([])),
+        )
+        .order_by('STUDENT_ID')
+        .values_list('STUDENT_ID', 'NAME', 'SURNAME', 'document_ids', 'document_flags')
+    )
+
+    mandatory = [index for index, (_, _, is_mandatory) in enumerate(documents) if is_mandatory]
+    counts = [{'submitted': 0, 'returned': 0, 'deficient': 0, 'missing': 0} for _ in documents]
+    grid = []
+    complete = 0
+    for student_id, name, surname, document_ids, flags in rows:
+        cells = [0] * len(documents)
+        for document_id, flag in zip(document_ids, flags):
+            cells[columns[document_id]] |= flag
+        for index, cell in enumerate(cells):
+            column = counts[index]
+            if cell & STATUS_SUBMITTED:
+                column['submitted'] += 1
+            else:
+                column['missing'] += 1
+            if cell & STATUS_RETURNED:
+                column['returned'] += 1
+            if cell & STATUS_DEFICIENT:
+                column['deficient'] += 1
+        if all(cells[index] & STATUS_SUBMITTED and not cells[index] & STATUS_DEFICIENT for index in mandatory):
+            complete += 1
+        grid.append([student_id, f'{name} {surname}'.strip(), ''.join(format(cell, 'x') for cell in cells)])
+
+    return {
+        'legend': {str(bit): label for bit, label in STATUS_LEGEND.items()},
+        'documents': [
+            {'id': document_id, 'name': name, 'mandatory': is_mandatory}
+            for document_id, name, is_mandatory in documents
+        ],
+        'students': grid,
+        'counts': counts,
+        'complete': complete,
+        'total': len(grid),
+    }
+
+
+def cached_matrix(branch, batch, academic_year=None, mandatory_only=True):
+    key = ':'.join(str(part) for part in (
+        CACHE_PREFIX, branch, batch, academic_year or '', int(mandatory_only),
+        _version(GLOBAL_VERSION_KEY), _version(_batch_version_key(branch, batch)),
+    ))
+    matrix = cache.get(key)
+    if matrix is None:
+        matrix = build_matrix(branch, batch, academic_year, mandatory_only)
+        cache.set(key, matrix, _cache_ttl())
+    return matrix
+
+
+@receiver([post_save, post_delete], sender=STUDENT_DOCUMENTS)
+def _document_changed(sender, instance, **kwargs):
+    if instance.STUDENT_id:
+        invalidate_students([instance.STUDENT_id])
+
+
+@receiver([post_save, post_delete], sender=CHECK_LIST_DOCUMENTS)
+@receiver([post_save, post_delete], sender=STUDENT_MASTER)
+def _checklist_or_student_changed(sender, **kwargs):
+    # A student may have moved between batches, so every batch is refreshed
+    invalidate_all()
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.7 on 2026-10-19 15:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('student', '0003_alter_check_list_documents_table'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='check_list_documents',
+            index=models.Index(fields=['UPDATED_AT', 'RECORD_ID'], name='idx_check_list_documents_sync'),
+        ),
+        migrations.AddIndex(
+            model_name='student_master',
+            index=models.Index(fields=['UPDATED_AT', 'RECORD_ID'], name='idx_student_master_sync'),
+        ),
+    ]
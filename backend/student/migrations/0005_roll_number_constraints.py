@@ -0,0 +1,76 @@
+# Generated by Django 4.2.7 on 2026-10-19 15:48
+
+from django.db import migrations, models
+import django.db.models.constraints
+
+ROLL_NUMBERS = '"STUDENT"."STUDENT_ROLL_NUMBER_DETAILS"'
+
+# Keep one row per (student, semester, academic year): a live one over a
+# deleted one, then the most recently updated. The others are soft-deleted
+# and detached from the student, as a deleted student's rows are, so they
+# leave the (student, semester, academic year) key but keep their numbers
+# reserved in the class
+DROP_DUPLICATE_STUDENTS_SQL = f'''
+    UPDATE {ROLL_NUMBERS} SET
+        "STUDENT_ID" = NULL,
+        "IS_DELETED" = TRUE,
+        "DELETED_BY" = COALESCE("DELETED_BY", 'MIGRATION'),
+        "DELETED_AT" = COALESCE("DELETED_AT", NOW()),
+        "UPDATED_BY" = 'MIGRATION',
+        "UPDATED_AT" = NOW()
+    WHERE "RECORD_ID" IN (
+        SELECT "RECORD_ID" FROM (
+            SELECT "RECORD_ID", ROW_NUMBER() OVER (
+                PARTITION BY "STUDENT_ID", "SEMESTER_ID", "ACADEMIC_YEAR"
+                ORDER BY "IS_DELETED", "UPDATED_AT" DESC NULLS LAST, "RECORD_ID" DESC
+            ) AS position
+            FROM {ROLL_NUMBERS}
+            WHERE "STUDENT_ID" IS NOT NULL
+        ) ranked
+        WHERE position > 1
+    )
+'''
+
+# A number issued twice in a class stays with the live row issued first; the
+# others get a unique placeholder that the next generation run replaces
+RENAME_DUPLICATE_NUMBERS_SQL = f'''
+    UPDATE {ROLL_NUMBERS} SET "ROLLNO" = 'DUP-' || "RECORD_ID" WHERE "RECORD_ID" IN (
+        SELECT "RECORD_ID" FROM (
+            SELECT "RECORD_ID", ROW_NUMBER() OVER (
+                PARTITION BY "BRANCH_ID", "SEMESTER_ID", "ACADEMIC_YEAR", "ROLLNO"
+                ORDER BY "IS_DELETED", "RECORD_ID"
+            ) AS position
+            FROM {ROLL_NUMBERS}
+        ) ranked
+        WHERE position > 1
+    )
+'''
+
+
+def drop_duplicates(apps, schema_editor):
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(DROP_DUPLICATE_STUDENTS_SQL)
+        cursor.execute(RENAME_DUPLICATE_NUMBERS_SQL)
+        # Run the deferred checks now; ALTER TABLE refuses a table with
+        # pending trigger events
+        cursor.execute('SET CONSTRAINTS ALL IMMEDIATE')
+        cursor.execute('SET CONSTRAINTS ALL DEFERRED')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('student', '0004_sync_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(drop_duplicates, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='student_roll_number_details',
+            constraint=models.UniqueConstraint(fields=('STUDENT', 'SEMESTER', 'ACADEMIC_YEAR'), name='uq_roll_student_semester_ay'),
+        ),
+        migrations.AddConstraint(
+            model_name='student_roll_number_details',
+            constraint=models.UniqueConstraint(deferrable=django.db.models.constraints.Deferrable['DEFERRED'], fields=('BRANCH', 'SEMESTER', 'ACADEMIC_YEAR', 'ROLL_NO'), name='uq_roll_no_per_class'),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 4.2.7 on 2026-10-19 15:52
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('student', '0005_roll_number_constraints'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DOCUMENT_UPLOAD',
+            fields=[
+                ('UPLOAD_ID', models.UUIDField(db_column='UPLOAD_ID', primary_key=True, serialize=False)),
+                ('FILENAME', models.CharField(db_column='FILENAME', max_length=255)),
+                ('TOTAL_SIZE', models.BigIntegerField(db_column='TOTAL_SIZE')),
+                ('RECEIVED', models.BigIntegerField(db_column='RECEIVED', default=0)),
+                ('SHA256', models.CharField(blank=True, db_column='SHA256', default='', max_length=64)),
+                ('TEMP_PATH', models.CharField(db_column='TEMP_PATH', max_length=500)),
+                ('STATUS', models.CharField(choices=[('PENDING', 'Pending'), ('COMPLETED', 'Completed')], db_column='STATUS', default='PENDING', max_length=20)),
+                ('CREATED_BY', models.CharField(db_column='CREATED_BY', max_length=50, null=True)),
+                ('CREATED_AT', models.DateTimeField(db_column='CREATED_AT', default=django.utils.timezone.now)),
+                ('UPDATED_AT', models.DateTimeField(auto_now=True, db_column='UPDATED_AT')),
+                ('EXPIRES_AT', models.DateTimeField(db_column='EXPIRES_AT')),
+                ('DOCUMENT', models.ForeignKey(db_column='DOCUMENT_RECORD_ID', on_delete=django.db.models.deletion.CASCADE, related_name='uploads', to='student.student_documents')),
+            ],
+            options={
+                'verbose_name': 'Document Upload',
+                'verbose_name_plural': 'Document Uploads',
+                'db_table': '"STUDENT"."DOCUMENT_UPLOADS"',
+                'indexes': [models.Index(fields=['EXPIRES_AT'], name='idx_document_upload_expiry')],
+            },
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 4.2.7 on 2026-10-19 15:53
+
+import core.storage
+from django.db import migrations, models
+import student.models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('student', '0006_document_upload'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='student_documents',
+            name='DOC_IMAGES',
+            field=models.FileField(blank=True, db_column='DOC_IMAGES', null=True, storage=core.storage.media_blob_storage, upload_to=student.models.student_document_upload_path),
+        ),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 4.2.7 on 2026-10-19 15:59
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('academic', '0005_drop_audit_fk_constraints'),
+        ('student', '0007_doc_images_blob_storage'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='STUDENT_SEMESTER_RESULT',
+            fields=[
+                ('CREATED_BY', models.CharField(blank=True, db_column='CREATED_BY', max_length=50, null=True)),
+                ('CREATED_AT', models.DateTimeField(auto_now_add=True, db_column='CREATED_AT')),
+                ('UPDATED_BY', models.CharField(blank=True, db_column='UPDATED_BY', max_length=50, null=True)),
+                ('UPDATED_AT', models.DateTimeField(auto_now=True, db_column='UPDATED_AT')),
+                ('DELETED_BY', models.CharField(blank=True, db_column='DELETED_BY', max_length=50, null=True)),
+                ('DELETED_AT', models.DateTimeField(blank=True, db_column='DELETED_AT', null=True)),
+                ('IS_DELETED', models.BooleanField(db_column='IS_DELETED', default=False)),
+                ('RECORD_ID', models.BigAutoField(db_column='RECORD_ID', primary_key=True, serialize=False)),
+                ('SEMESTER', models.IntegerField(db_column='SEMESTER')),
+                ('CREDITS_REGISTERED', models.DecimalField(db_column='CREDITS_REGISTERED', decimal_places=2, max_digits=6)),
+                ('CREDITS_EARNED', models.DecimalField(db_column='CREDITS_EARNED', decimal_places=2, max_digits=6)),
+                ('CREDIT_POINTS', models.DecimalField(db_column='CREDIT_POINTS', decimal_places=2, max_digits=8)),
+                ('SGPA', models.DecimalField(db_column='SGPA', decimal_places=2, max_digits=4, null=True)),
+                ('CUMULATIVE_CREDITS', models.DecimalField(db_column='CUMULATIVE_CREDITS', decimal_places=2, max_digits=7)),
+                ('CGPA', models.DecimalField(db_column='CGPA', decimal_places=2, max_digits=4, null=True)),
+                ('BACKLOGS', models.IntegerField(db_column='BACKLOGS', default=0)),
+                ('TOTAL_BACKLOGS', models.IntegerField(db_column='TOTAL_BACKLOGS', default=0)),
+                ('RESULT', models.CharField(choices=[('PASS', 'Pass'), ('FAIL', 'Fail')], db_column='RESULT', max_length=10)),
+                ('EXAMINATION', models.ForeignKey(db_column='EXAMINATION_ID', on_delete=django.db.models.deletion.PROTECT, to='academic.examination')),
+                ('STUDENT', models.ForeignKey(db_column='STUDENT_ID', on_delete=django.db.models.deletion.CASCADE, to='student.student')),
+            ],
+            options={
+                'verbose_name': 'Student Semester Result',
+                'verbose_name_plural': 'Student Semester Results',
+                'db_table': '"STUDENT"."STUDENT_SEMESTER_RESULTS"',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='student_semester_result',
+            constraint=models.UniqueConstraint(fields=('STUDENT', 'EXAMINATION', 'SEMESTER'), name='uq_semester_result_student_exam'),
+        ),
+    ]
@@ -0,0 +1,74 @@
+# Generated by Django 4.2.7 on 2026-10-19 16:03
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0031_profile_picture_blob_storage'),
+        ('student', '0008_student_semester_result'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SEAT_MATRIX',
+            fields=[
+                ('CREATED_BY', models.CharField(blank=True, db_column='CREATED_BY', max_length=50, null=True)),
+                ('CREATED_AT', models.DateTimeField(auto_now_add=True, db_column='CREATED_AT')),
+                ('UPDATED_BY', models.CharField(blank=True, db_column='UPDATED_BY', max_length=50, null=True)),
+                ('UPDATED_AT', models.DateTimeField(auto_now=True, db_column='UPDATED_AT')),
+                ('DELETED_BY', models.CharField(blank=True, db_column='DELETED_BY', max_length=50, null=True)),
+                ('DELETED_AT', models.DateTimeField(blank=True, db_column='DELETED_AT', null=True)),
+                ('IS_DELETED', models.BooleanField(db_column='IS_DELETED', default=False)),
+                ('RECORD_ID', models.AutoField(db_column='RECORD_ID', primary_key=True, serialize=False)),
+                ('ACADEMIC_YEAR', models.CharField(db_column='ACADEMIC_YEAR', max_length=10)),
+                ('CATEGORY', models.CharField(db_column='CATEGORY', max_length=30)),
+                ('SEATS', models.PositiveIntegerField(db_column='SEATS')),
+                ('ADMISSION_QUOTA', models.ForeignKey(blank=True, db_column='ADMN_QUOTA_ID', null=True, on_delete=django.db.models.deletion.PROTECT, to='accounts.admission_quota_master')),
+                ('BRANCH', models.ForeignKey(db_column='BRANCH_ID', on_delete=django.db.models.deletion.PROTECT, to='accounts.branch')),
+                ('CASTE', models.ForeignKey(blank=True, db_column='CASTE_ID', null=True, on_delete=django.db.models.deletion.PROTECT, to='accounts.caste_master')),
+                ('QUOTA', models.ForeignKey(blank=True, db_column='QUOTA_ID', null=True, on_delete=django.db.models.deletion.PROTECT, to='accounts.quota_master')),
+            ],
+            options={
+                'verbose_name': 'Seat Matrix',
+                'verbose_name_plural': 'Seat Matrix',
+                'db_table': '"STUDENT"."SEAT_MATRIX"',
+            },
+        ),
+        migrations.CreateModel(
+            name='SEAT_ALLOCATION',
+            fields=[
+                ('CREATED_BY', models.CharField(blank=True, db_column='CREATED_BY', max_length=50, null=True)),
+                ('CREATED_AT', models.DateTimeField(auto_now_add=True, db_column='CREATED_AT')),
+                ('UPDATED_BY', models.CharField(blank=True, db_column='UPDATED_BY', max_length=50, null=True)),
+                ('UPDATED_AT', models.DateTimeField(auto_now=True, db_column='UPDATED_AT')),
+                ('DELETED_BY', models.CharField(blank=True, db_column='DELETED_BY', max_length=50, null=True)),
+                ('DELETED_AT', models.DateTimeField(blank=True, db_column='DELETED_AT', null=True)),
+                ('IS_DELETED', models.BooleanField(db_column='IS_DELETED', default=False)),
+                ('RECORD_ID', models.BigAutoField(db_column='RECORD_ID', primary_key=True, serialize=False)),
+                ('ACADEMIC_YEAR', models.CharField(db_column='ACADEMIC_YEAR', max_length=10)),
+                ('ROUND_NO', models.PositiveSmallIntegerField(db_column='ROUND_NO')),
+                ('MERIT_RANK', models.PositiveIntegerField(db_column='MERIT_RANK')),
+                ('PREFERENCE_NO', models.PositiveSmallIntegerField(blank=True, db_column='PREFERENCE_NO', null=True)),
+                ('STATUS', models.CharField(choices=[('ALLOTTED', 'Allotted'), ('FLOAT', 'Accepted, open to upgrade'), ('FREEZE', 'Accepted and frozen'), ('WITHDRAWN', 'Withdrawn'), ('NOT_ALLOTTED', 'Not allotted')], db_column='STATUS', default='ALLOTTED', max_length=20)),
+                ('BRANCH', models.ForeignKey(blank=True, db_column='BRANCH_ID', null=True, on_delete=django.db.models.deletion.PROTECT, to='accounts.branch')),
+                ('SEAT', models.ForeignKey(blank=True, db_column='SEAT_MATRIX_ID', null=True, on_delete=django.db.models.deletion.PROTECT, to='student.seat_matrix')),
+                ('STUDENT', models.ForeignKey(db_column='STUDENT_ID', on_delete=django.db.models.deletion.CASCADE, related_name='seat_allocations', to='student.student_master')),
+            ],
+            options={
+                'verbose_name': 'Seat Allocation',
+                'verbose_name_plural': 'Seat Allocations',
+                'db_table': '"STUDENT"."SEAT_ALLOCATIONS"',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='seat_matrix',
+            constraint=models.UniqueConstraint(fields=('ACADEMIC_YEAR', 'BRANCH', 'CATEGORY'), name='uq_seat_matrix_branch_category'),
+        ),
+        migrations.AddConstraint(
+            model_name='seat_allocation',
+            constraint=models.UniqueConstraint(fields=('ACADEMIC_YEAR', 'ROUND_NO', 'STUDENT'), name='uq_seat_allocation_round_student'),
+        ),
+    ]
@@ -0,0 +1,93 @@
+# Generated by Django 4.2.7 on 2026-10-19 16:26
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0031_profile_picture_blob_storage'),
+        ('academic', '0007_room_benches'),
+        ('student', '0009_seat_matrix_allocation'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ATTENDANCE_ROSTER',
+            fields=[
+                ('CREATED_BY', models.CharField(blank=True, db_column='CREATED_BY', max_length=50, null=True)),
+                ('CREATED_AT', models.DateTimeField(auto_now_add=True, db_column='CREATED_AT')),
+                ('UPDATED_BY', models.CharField(blank=True, db_column='UPDATED_BY', max_length=50, null=True)),
+                ('UPDATED_AT', models.DateTimeField(auto_now=True, db_column='UPDATED_AT')),
+                ('DELETED_BY', models.CharField(blank=True, db_column='DELETED_BY', max_length=50, null=True)),
+                ('DELETED_AT', models.DateTimeField(blank=True, db_column='DELETED_AT', null=True)),
+                ('IS_DELETED', models.BooleanField(db_column='IS_DELETED', default=False)),
+                ('ROSTER_ID', models.AutoField(db_column='ROSTER_ID', primary_key=True, serialize=False)),
+                ('ACADEMIC_YEAR', models.CharField(db_column='ACADEMIC_YEAR', max_length=10)),
+                ('SIZE', models.PositiveIntegerField(db_column='SIZE', default=0)),
+                ('CURRICULUM', models.ForeignKey(db_column='CURRICULUM_ID', on_delete=django.db.models.deletion.PROTECT, to='academic.curriculum')),
+                ('SEMESTER', models.ForeignKey(db_column='SEMESTER_ID', on_delete=django.db.models.deletion.PROTECT, to='accounts.semester')),
+            ],
+            options={
+                'verbose_name': 'Attendance Roster',
+                'verbose_name_plural': 'Attendance Rosters',
+                'db_table': '"STUDENT"."ATTENDANCE_ROSTERS"',
+            },
+        ),
+        migrations.CreateModel(
+            name='ATTENDANCE_SESSION',
+            fields=[
+                ('CREATED_BY', models.CharField(blank=True, db_column='CREATED_BY', max_length=50, null=True)),
+                ('CREATED_AT', models.DateTimeField(auto_now_add=True, db_column='CREATED_AT')),
+                ('UPDATED_BY', models.CharField(blank=True, db_column='UPDATED_BY', max_length=50, null=True)),
+                ('UPDATED_AT', models.DateTimeField(auto_now=True, db_column='UPDATED_AT')),
+                ('DELETED_BY', models.CharField(blank=True, db_column='DELETED_BY', max_length=50, null=True)),
+                ('DELETED_AT', models.DateTimeField(blank=True, db_column='DELETED_AT', null=True)),
+                ('IS_DELETED', models.BooleanField(db_column='IS_DELETED', default=False)),
+                ('SESSION_ID', models.BigAutoField(db_column='SESSION_ID', primary_key=True, serialize=False)),
+                ('SESSION_DATE', models.DateField(db_column='SESSION_DATE')),
+                ('PERIOD', models.PositiveSmallIntegerField(db_column='PERIOD', default=0)),
+                ('SESSION_TYPE', models.CharField(choices=[('LECTURE', 'Lecture'), ('TUTORIAL', 'Tutorial'), ('LAB', 'Lab')], db_column='SESSION_TYPE', default='LECTURE', max_length=10)),
+                ('SIZE', models.PositiveIntegerField(db_column='SIZE')),
+                ('PRESENT', models.BinaryField(db_column='PRESENT')),
+                ('PRESENT_COUNT', models.PositiveIntegerField(db_column='PRESENT_COUNT')),
+                ('ROSTER', models.ForeignKey(db_column='ROSTER_ID', on_delete=django.db.models.deletion.PROTECT, related_name='sessions', to='student.attendance_roster')),
+            ],
+            options={
+                'verbose_name': 'Attendance Session',
+                'verbose_name_plural': 'Attendance Sessions',
+                'db_table': '"STUDENT"."ATTENDANCE_SESSIONS"',
+            },
+        ),
+        migrations.CreateModel(
+            name='ATTENDANCE_ROSTER_MEMBER',
+            fields=[
+                ('RECORD_ID', models.BigAutoField(db_column='RECORD_ID', primary_key=True, serialize=False)),
+                ('POSITION', models.PositiveIntegerField(db_column='POSITION')),
+                ('ROLL', models.ForeignKey(db_column='ROLL_RECORD_ID', on_delete=django.db.models.deletion.PROTECT, related_name='attendance_positions', to='student.student_roll_number_details')),
+                ('ROSTER', models.ForeignKey(db_column='ROSTER_ID', on_delete=django.db.models.deletion.CASCADE, related_name='members', to='student.attendance_roster')),
+            ],
+            options={
+                'verbose_name': 'Attendance Roster Member',
+                'verbose_name_plural': 'Attendance Roster Members',
+                'db_table': '"STUDENT"."ATTENDANCE_ROSTER_MEMBERS"',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='attendance_session',
+            constraint=models.UniqueConstraint(fields=('ROSTER', 'SESSION_DATE', 'PERIOD'), name='uq_attendance_session_slot'),
+        ),
+        migrations.AddConstraint(
+            model_name='attendance_roster_member',
+            constraint=models.UniqueConstraint(fields=('ROSTER', 'POSITION'), name='uq_attendance_member_position'),
+        ),
+        migrations.AddConstraint(
+            model_name='attendance_roster_member',
+            constraint=models.UniqueConstraint(fields=('ROSTER', 'ROLL'), name='uq_attendance_member_roll'),
+        ),
+        migrations.AddConstraint(
+            model_name='attendance_roster',
+            constraint=models.UniqueConstraint(fields=('CURRICULUM', 'SEMESTER', 'ACADEMIC_YEAR'), name='uq_attendance_roster_class'),
+        ),
+    ]
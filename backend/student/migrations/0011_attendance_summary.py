@@ -0,0 +1,49 @@
+# Generated by Django 4.2.7 on 2026-10-19 16:29
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0031_profile_picture_blob_storage'),
+        ('academic', '0007_room_benches'),
+        ('student', '0010_attendance'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ATTENDANCE_SUMMARY',
+            fields=[
+                ('CREATED_BY', models.CharField(blank=True, db_column='CREATED_BY', max_length=50, null=True)),
+                ('CREATED_AT', models.DateTimeField(auto_now_add=True, db_column='CREATED_AT')),
+                ('UPDATED_BY', models.CharField(blank=True, db_column='UPDATED_BY', max_length=50, null=True)),
+                ('UPDATED_AT', models.DateTimeField(auto_now=True, db_column='UPDATED_AT')),
+                ('DELETED_BY', models.CharField(blank=True, db_column='DELETED_BY', max_length=50, null=True)),
+                ('DELETED_AT', models.DateTimeField(blank=True, db_column='DELETED_AT', null=True)),
+                ('IS_DELETED', models.BooleanField(db_column='IS_DELETED', default=False)),
+                ('RECORD_ID', models.BigAutoField(db_column='RECORD_ID', primary_key=True, serialize=False)),
+                ('POSITION', models.PositiveIntegerField(db_column='POSITION')),
+                ('ACADEMIC_YEAR', models.CharField(db_column='ACADEMIC_YEAR', max_length=10)),
+                ('HELD', models.PositiveIntegerField(db_column='HELD', default=0)),
+                ('ATTENDED', models.PositiveIntegerField(db_column='ATTENDED', default=0)),
+                ('PERCENTAGE', models.DecimalField(db_column='PERCENTAGE', decimal_places=2, max_digits=5, null=True)),
+                ('BRANCH', models.ForeignKey(db_column='BRANCH_ID', on_delete=django.db.models.deletion.PROTECT, to='accounts.branch')),
+                ('CURRICULUM', models.ForeignKey(db_column='CURRICULUM_ID', on_delete=django.db.models.deletion.PROTECT, to='academic.curriculum')),
+                ('ROLL', models.ForeignKey(db_column='ROLL_RECORD_ID', on_delete=django.db.models.deletion.PROTECT, to='student.student_roll_number_details')),
+                ('ROSTER', models.ForeignKey(db_column='ROSTER_ID', on_delete=django.db.models.deletion.CASCADE, related_name='summaries', to='student.attendance_roster')),
+                ('SEMESTER', models.ForeignKey(db_column='SEMESTER_ID', on_delete=django.db.models.deletion.PROTECT, to='accounts.semester')),
+            ],
+            options={
+                'verbose_name': 'Attendance Summary',
+                'verbose_name_plural': 'Attendance Summaries',
+                'db_table': '"STUDENT"."ATTENDANCE_SUMMARY"',
+                'indexes': [models.Index(fields=['BRANCH', 'SEMESTER', 'PERCENTAGE'], name='idx_attendance_shortage')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='attendance_summary',
+            constraint=models.UniqueConstraint(fields=('ROSTER', 'POSITION'), name='uq_attendance_summary_member'),
+        ),
+    ]
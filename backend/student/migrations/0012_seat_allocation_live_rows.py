@@ -0,0 +1,21 @@
+# Generated by Django 4.2.7 on 2026-10-19 17:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('student', '0011_attendance_summary'),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name='seat_allocation',
+            name='uq_seat_allocation_round_student',
+        ),
+        migrations.AddConstraint(
+            model_name='seat_allocation',
+            constraint=models.UniqueConstraint(condition=models.Q(('IS_DELETED', False)), fields=('ACADEMIC_YEAR', 'ROUND_NO', 'STUDENT'), name='uq_seat_allocation_round_student'),
+        ),
+    ]
@@ -1,8 +1,9 @@
 import os
 from django.db import models
 from core.models import AuditModel
+from core.storage import media_blob_storage
 from django.utils import timezone
-from accounts.models import BRANCH, PROGRAM, INSTITUTE, SEMESTER, YEAR
+from accounts.models import BRANCH, PROGRAM, INSTITUTE, SEMESTER, YEAR, CASTE_MASTER, QUOTA_MASTER, ADMISSION_QUOTA_MASTER
 from academic.models import ACADEMIC_YEAR, EXAMINATION, CURRICULUM
 
 class STUDENT(AuditModel):
@@ -114,6 +115,40 @@ class STUDENT_RESULT(AuditModel):
     def __str__(self):
         return f"{self.STUDENT.ENROLLMENT_NO} - {self.CURRICULUM.COURSE.CODE} - {self.EXAMINATION.NAME}"
 
+class STUDENT_SEMESTER_RESULT(AuditModel):
+    """SGPA/CGPA for one student and semester as of an examination (student/results.py)."""
+    RECORD_ID = models.BigAutoField(primary_key=True, db_column='RECORD_ID')
+    STUDENT = models.ForeignKey(STUDENT, on_delete=models.CASCADE, db_column='STUDENT_ID')
+    EXAMINATION = models.ForeignKey(EXAMINATION, on_delete=models.PROTECT, db_column='EXAMINATION_ID')
+    SEMESTER = models.IntegerField(db_column='SEMESTER')
+    CREDITS_REGISTERED = models.DecimalField(max_digits=6, decimal_places=2, db_column='CREDITS_REGISTERED')
+    CREDITS_EARNED = models.DecimalField(max_digits=6, decimal_places=2, db_column='CREDITS_EARNED')
+    CREDIT_POINTS = models.DecimalField(max_digits=8, decimal_places=2, db_column='CREDIT_POINTS')
+    SGPA = models.DecimalField(max_digits=4, decimal_places=2, null=True, db_column='SGPA')
+    CUMULATIVE_CREDITS = models.DecimalField(max_digits=7, decimal_places=2, db_column='CUMULATIVE_CREDITS')
+    CGPA = models.DecimalField(max_digits=4, decimal_places=2, null=True, db_column='CGPA')
+    BACKLOGS = models.IntegerField(default=0, db_column='BACKLOGS')
+    TOTAL_BACKLOGS = models.IntegerField(default=0, db_column='TOTAL_BACKLOGS')
+    RESULT = models.CharField(
+        max_length=10,
+        choices=[('PASS', 'Pass'), ('FAIL', 'Fail')],
+        db_column='RESULT'
+    )
+
+    class Meta:
+        db_table = '"STUDENT"."STUDENT_SEMESTER_RESULTS"'
+        verbose_name = 'Student Semester Result'
+        verbose_name_plural = 'Student Semester Results'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['STUDENT', 'EXAMINATION', 'SEMESTER'],
+                name='uq_semester_result_student_exam'
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.STUDENT_id} - SEM {self.SEMESTER} - {self.SGPA}/{self.CGPA}"
+
 class STUDENT_MASTER(AuditModel):
     RECORD_ID = models.AutoField(primary_key=True, db_column='RECORD_ID')
     STUDENT_ID = models.CharField(max_length=20, unique=True, db_column='STUDENT_ID')
@@ -206,7 +241,8 @@ class STUDENT_MASTER(AuditModel):
         indexes = [
             models.Index(fields=['STUDENT_ID']),
             models.Index(fields=['EMAIL_ID']),
-            models.Index(fields=['MOB_NO'])
+            models.Index(fields=['MOB_NO']),
+            models.Index(fields=['UPDATED_AT', 'RECORD_ID'], name='idx_student_master_sync')
         ]
 
     def __str__(self):
@@ -236,6 +272,21 @@ class STUDENT_ROLL_NUMBER_DETAILS(AuditModel):
         db_table = '"STUDENT"."STUDENT_ROLL_NUMBER_DETAILS"'
         verbose_name = 'Student Roll Number Details'
         verbose_name_plural = 'Student Roll Number Details'
+        constraints = [
+            # One roll number per student per semester; the upsert target
+            # for roll number generation
+            models.UniqueConstraint(
+                fields=['STUDENT', 'SEMESTER', 'ACADEMIC_YEAR'],
+                name='uq_roll_student_semester_ay'
+            ),
+            # Deferred so a regeneration can swap numbers between students
+            # inside one transaction
+            models.UniqueConstraint(
+                fields=['BRANCH', 'SEMESTER', 'ACADEMIC_YEAR', 'ROLL_NO'],
+                name='uq_roll_no_per_class',
+                deferrable=models.Deferrable.DEFERRED
+            ),
+        ]
 
     def __str__(self):
         return f"{self.STUDENT.RECORD_ID if self.STUDENT else None} - {self.ROLL_NO}"
@@ -339,6 +390,9 @@ class CHECK_LIST_DOCUMENTS(AuditModel):
         db_table = '"STUDENT"."CHECK_LIST_DOCUMENTS"'
         verbose_name = 'Check List Documents'
         verbose_name_plural = 'Check List Documents'
+        indexes = [
+            models.Index(fields=['UPDATED_AT', 'RECORD_ID'], name='idx_check_list_documents_sync'),
+        ]
 
     def _str_(self):
         return f"{self.NAME} - {self.RECORD_ID}"
@@ -392,6 +446,7 @@ class STUDENT_DOCUMENTS(AuditModel):
     # Updated to handle actual file uploads
     DOC_IMAGES = models.FileField(
         upload_to=student_document_upload_path,
+        storage=media_blob_storage,
         blank=True,
         null=True,
         db_column='DOC_IMAGES'
@@ -412,3 +467,263 @@ class STUDENT_DOCUMENTS(AuditModel):
     def __str__(self):
         return f"Student Document Record {self.RECORDID}"
 
+
+
+class DOCUMENT_UPLOAD(models.Model):
+    """
+    A resumable upload of a STUDENT_DOCUMENTS file. Chunks are appended to
+    TEMP_PATH until RECEIVED reaches TOTAL_SIZE. See student/uploads.py.
+    """
+    STATUS_PENDING = 'PENDING'
+    STATUS_COMPLETED = 'COMPLETED'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Pending'),
+        (STATUS_COMPLETED, 'Completed'),
+    ]
+
+    UPLOAD_ID = models.UUIDField(primary_key=True, db_column='UPLOAD_ID')
+    DOCUMENT = models.ForeignKey(
+        STUDENT_DOCUMENTS,
+        on_delete=models.CASCADE,
+        db_column='DOCUMENT_RECORD_ID',
+        related_name='uploads'
+    )
+    FILENAME = models.CharField(max_length=255, db_column='FILENAME')
+    TOTAL_SIZE = models.BigIntegerField(db_column='TOTAL_SIZE')
+    RECEIVED = models.BigIntegerField(default=0, db_column='RECEIVED')
+    SHA256 = models.CharField(max_length=64, blank=True, default='', db_column='SHA256')
+    TEMP_PATH = models.CharField(max_length=500, db_column='TEMP_PATH')
+    STATUS = models.CharField(
+        max_length=20,
+        choices=STATUS_CHOICES,
+        default=STATUS_PENDING,
+        db_column='STATUS'
+    )
+    CREATED_BY = models.CharField(max_length=50, db_column='CREATED_BY', null=True)
+    CREATED_AT = models.DateTimeField(default=timezone.now, db_column='CREATED_AT')
+    UPDATED_AT = models.DateTimeField(auto_now=True, db_column='UPDATED_AT')
+    EXPIRES_AT = models.DateTimeField(db_column='EXPIRES_AT')
+
+    class Meta:
+        db_table = '"STUDENT"."DOCUMENT_UPLOADS"'
+        verbose_name = 'Document Upload'
+        verbose_name_plural = 'Document Uploads'
+        indexes = [
+            models.Index(fields=['EXPIRES_AT'], name='idx_document_upload_expiry'),
+        ]
+
+    def __str__(self):
+        return f"{self.UPLOAD_ID} - {self.FILENAME} ({self.RECEIVED}/{self.TOTAL_SIZE})"
+
+
+class SEAT_MATRIX(AuditModel):
+    """
+    Seats of one branch set aside for one reservation bucket in an admission
+    year. CASTE, QUOTA and ADMISSION_QUOTA left empty match any applicant, so
+    the row with all three empty is the open merit bucket.
+    """
+    RECORD_ID = models.AutoField(primary_key=True, db_column='RECORD_ID')
+    ACADEMIC_YEAR = models.CharField(max_length=10, db_column='ACADEMIC_YEAR')
+    BRANCH = models.ForeignKey(BRANCH, on_delete=models.PROTECT, db_column='BRANCH_ID')
+    CATEGORY = models.CharField(max_length=30, db_column='CATEGORY')  # label shown on results, e.g. OPEN, SC, TFWS
+    CASTE = models.ForeignKey(CASTE_MASTER, on_delete=models.PROTECT, null=True, blank=True, db_column='CASTE_ID')
+    QUOTA = models.ForeignKey(QUOTA_MASTER, on_delete=models.PROTECT, null=True, blank=True, db_column='QUOTA_ID')
+    ADMISSION_QUOTA = models.ForeignKey(
+        ADMISSION_QUOTA_MASTER, on_delete=models.PROTECT, null=True, blank=True, db_column='ADMN_QUOTA_ID'
+    )
+    SEATS = models.PositiveIntegerField(db_column='SEATS')
+
+    class Meta:
+        db_table = '"STUDENT"."SEAT_MATRIX"'
+        verbose_name = 'Seat Matrix'
+        verbose_name_plural = 'Seat Matrix'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['ACADEMIC_YEAR', 'BRANCH', 'CATEGORY'],
+                name='uq_seat_matrix_branch_category'
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.ACADEMIC_YEAR} - {self.BRANCH_id} - {self.CATEGORY}: {self.SEATS}"
+
+
+class SEAT_ALLOCATION(AuditModel):
+    """One applicant's outcome in an allocation round (student/admissions.py)."""
+    STATUS_ALLOTTED = 'ALLOTTED'
+    STATUS_FLOAT = 'FLOAT'
+    STATUS_FREEZE = 'FREEZE'
+    STATUS_WITHDRAWN = 'WITHDRAWN'
+    STATUS_NOT_ALLOTTED = 'NOT_ALLOTTED'
+    STATUS_CHOICES = [
+        (STATUS_ALLOTTED, 'Allotted'),
+        (STATUS_FLOAT, 'Accepted, open to upgrade'),
+        (STATUS_FREEZE, 'Accepted and frozen'),
+        (STATUS_WITHDRAWN, 'Withdrawn'),
+        (STATUS_NOT_ALLOTTED, 'Not allotted'),
+    ]
+
+    RECORD_ID = models.BigAutoField(primary_key=True, db_column='RECORD_ID')
+    ACADEMIC_YEAR = models.CharField(max_length=10, db_column='ACADEMIC_YEAR')
+    ROUND_NO = models.PositiveSmallIntegerField(db_column='ROUND_NO')
+    STUDENT = models.ForeignKey(
+        'STUDENT_MASTER',
+        on_delete=models.CASCADE,
+        db_column='STUDENT_ID',
+        related_name='seat_allocations'
+    )
+    MERIT_RANK = models.PositiveIntegerField(db_column='MERIT_RANK')
+    BRANCH = models.ForeignKey(BRANCH, on_delete=models.PROTECT, null=True, blank=True, db_column='BRANCH_ID')
+    SEAT = models.ForeignKey(SEAT_MATRIX, on_delete=models.PROTECT, null=True, blank=True, db_column='SEAT_MATRIX_ID')
+    PREFERENCE_NO = models.PositiveSmallIntegerField(null=True, blank=True, db_column='PREFERENCE_NO')
+    STATUS = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_ALLOTTED, db_column='STATUS')
+
+    class Meta:
+        db_table = '"STUDENT"."SEAT_ALLOCATIONS"'
+        verbose_name = 'Seat Allocation'
+        verbose_name_plural = 'Seat Allocations'
+        constraints = [
+            # Rows replaced by a rerun of the round are soft-deleted
+            models.UniqueConstraint(
+                fields=['ACADEMIC_YEAR', 'ROUND_NO', 'STUDENT'],
+                condition=models.Q(IS_DELETED=False),
+                name='uq_seat_allocation_round_student'
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.ACADEMIC_YEAR} R{self.ROUND_NO} - {self.STUDENT_id} - {self.BRANCH_id} ({self.STATUS})"
+
+
+class ATTENDANCE_ROSTER(AuditModel):
+    """
+    The students a CURRICULUM entry is taught to, in a fixed order: the class
+    of STUDENT_ROLL_NUMBER_DETAILS rows for the curriculum's branch in
+    SEMESTER / ACADEMIC_YEAR. A member's POSITION is its bit in every
+    ATTENDANCE_SESSION bitmap; positions are only ever appended, never
+    renumbered, so bitmaps already stored stay valid when students join late
+    or roll numbers are regenerated (student/attendance.py).
+    """
+    ROSTER_ID = models.AutoField(primary_key=True, db_column='ROSTER_ID')
+    CURRICULUM = models.ForeignKey(CURRICULUM, on_delete=models.PROTECT, db_column='CURRICULUM_ID')
+    SEMESTER = models.ForeignKey(SEMESTER, on_delete=models.PROTECT, db_column='SEMESTER_ID')
+    ACADEMIC_YEAR = models.CharField(max_length=10, db_column='ACADEMIC_YEAR')
+    SIZE = models.PositiveIntegerField(default=0, db_column='SIZE')  # positions handed out so far
+
+    class Meta:
+        db_table = '"STUDENT"."ATTENDANCE_ROSTERS"'
+        verbose_name = 'Attendance Roster'
+        verbose_name_plural = 'Attendance Rosters'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['CURRICULUM', 'SEMESTER', 'ACADEMIC_YEAR'],
+                name='uq_attendance_roster_class'
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.CURRICULUM_id} - {self.SEMESTER_id} - {self.ACADEMIC_YEAR} ({self.SIZE})"
+
+
+class ATTENDANCE_ROSTER_MEMBER(models.Model):
+    RECORD_ID = models.BigAutoField(primary_key=True, db_column='RECORD_ID')
+    ROSTER = models.ForeignKey(
+        ATTENDANCE_ROSTER, on_delete=models.CASCADE, related_name='members', db_column='ROSTER_ID'
+    )
+    POSITION = models.PositiveIntegerField(db_column='POSITION')
+    ROLL = models.ForeignKey(
+        STUDENT_ROLL_NUMBER_DETAILS,
+        on_delete=models.PROTECT,
+        related_name='attendance_positions',
+        db_column='ROLL_RECORD_ID'
+    )
+
+    class Meta:
+        db_table = '"STUDENT"."ATTENDANCE_ROSTER_MEMBERS"'
+        verbose_name = 'Attendance Roster Member'
+        verbose_name_plural = 'Attendance Roster Members'
+        constraints = [
+            models.UniqueConstraint(fields=['ROSTER', 'POSITION'], name='uq_attendance_member_position'),
+            models.UniqueConstraint(fields=['ROSTER', 'ROLL'], name='uq_attendance_member_roll'),
+        ]
+
+    def __str__(self):
+        return f"{self.ROSTER_id} #{self.POSITION} - {self.ROLL_id}"
+
+
+class ATTENDANCE_SESSION(AuditModel):
+    """
+    One lecture, tutorial or lab of a roster. PRESENT is a bitmap with bit
+    POSITION (least significant bit first within each byte) set for every
+    member present; SIZE is the roster size when the session was marked, so
+    members added later neither attended nor missed it.
+    """
+    SESSION_TYPE_CHOICES = [
+        ('LECTURE', 'Lecture'),
+        ('TUTORIAL', 'Tutorial'),
+        ('LAB', 'Lab'),
+    ]
+
+    SESSION_ID = models.BigAutoField(primary_key=True, db_column='SESSION_ID')
+    ROSTER = models.ForeignKey(
+        ATTENDANCE_ROSTER, on_delete=models.PROTECT, related_name='sessions', db_column='ROSTER_ID'
+    )
+    SESSION_DATE = models.DateField(db_column='SESSION_DATE')
+    PERIOD = models.PositiveSmallIntegerField(default=0, db_column='PERIOD')
+    SESSION_TYPE = models.CharField(
+        max_length=10, choices=SESSION_TYPE_CHOICES, default='LECTURE', db_column='SESSION_TYPE'
+    )
+    SIZE = models.PositiveIntegerField(db_column='SIZE')
+    PRESENT = models.BinaryField(db_column='PRESENT')
+    PRESENT_COUNT = models.PositiveIntegerField(db_column='PRESENT_COUNT')
+
+    class Meta:
+        db_table = '"STUDENT"."ATTENDANCE_SESSIONS"'
+        verbose_name = 'Attendance Session'
+        verbose_name_plural = 'Attendance Sessions'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['ROSTER', 'SESSION_DATE', 'PERIOD'],
+                name='uq_attendance_session_slot'
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.ROSTER_id} {self.SESSION_DATE} P{self.PERIOD}: {self.PRESENT_COUNT}/{self.SIZE}"
+
+
+class ATTENDANCE_SUMMARY(AuditModel):
+    """
+    Running attendance counters of one roster member, kept in step with
+    ATTENDANCE_SESSION by every mark and delete (student/attendance.py) and
+    rebuilt from the bitmaps by `manage.py rebuild_attendance_summary`.
+    Branch, semester and academic year are copied from the roster so the
+    shortage list is a range scan on one index.
+    """
+    RECORD_ID = models.BigAutoField(primary_key=True, db_column='RECORD_ID')
+    ROSTER = models.ForeignKey(
+        ATTENDANCE_ROSTER, on_delete=models.CASCADE, related_name='summaries', db_column='ROSTER_ID'
+    )
+    POSITION = models.PositiveIntegerField(db_column='POSITION')
+    ROLL = models.ForeignKey(STUDENT_ROLL_NUMBER_DETAILS, on_delete=models.PROTECT, db_column='ROLL_RECORD_ID')
+    CURRICULUM = models.ForeignKey(CURRICULUM, on_delete=models.PROTECT, db_column='CURRICULUM_ID')
+    BRANCH = models.ForeignKey(BRANCH, on_delete=models.PROTECT, db_column='BRANCH_ID')
+    SEMESTER = models.ForeignKey(SEMESTER, on_delete=models.PROTECT, db_column='SEMESTER_ID')
+    ACADEMIC_YEAR = models.CharField(max_length=10, db_column='ACADEMIC_YEAR')
+    HELD = models.PositiveIntegerField(default=0, db_column='HELD')
+    ATTENDED = models.PositiveIntegerField(default=0, db_column='ATTENDED')
+    PERCENTAGE = models.DecimalField(max_digits=5, decimal_places=2, null=True, db_column='PERCENTAGE')
+
+    class Meta:
+        db_table = '"STUDENT"."ATTENDANCE_SUMMARY"'
+        verbose_name = 'Attendance Summary'
+        verbose_name_plural = 'Attendance Summaries'
+        constraints = [
+            models.UniqueConstraint(fields=['ROSTER', 'POSITION'], name='uq_attendance_summary_member'),
+        ]
+        indexes = [
+            models.Index(fields=['BRANCH', 'SEMESTER', 'PERCENTAGE'], name='idx_attendance_shortage'),
+        ]
+
+    def __str__(self):
+        return f"{self.ROLL_id} - {self.CURRICULUM_id}: {self.ATTENDED}/{self.HELD}"
@@ -0,0 +1,486 @@
+"""
+Year-end promotion of students to their next class.
+
+A job names the academic year being closed, the one being opened, and one
+transition per class: the YEAR its students are in (STUDENT_MASTER.YEAR_SEM_ID)
+and the YEAR they move to, or none for a final year whose students pass out.
+to_semester is the SEMESTER whose roll numbers the new class gets.
+
+    {
+      "academic_year": "2025-26",
+      "to_academic_year": "2026-27",
+      "transitions": [
+        {"from_year": 11, "to_year": 12, "to_semester": 23},
+        {"from_year": 12, "to_year": 13, "to_semester": 25, "repeat_semester": 23},
+        {"from_year": 13, "to_year": null}
+      ],
+      "rules": {"detained": ["CE24017", "CE24031"], "pass_out_date": "2026-06-30"},
+      "roll_numbers": {"order_by": "name", "pattern": "{branch}{ay}{seq:03d}"}
+    }
+
+Every student of a source class ends up with exactly one outcome:
+
+    LEFT        DATE_LEAVING already set or IS_ACTIVE = 'NO'; left untouched
+    DETAINED    listed in rules.detained; repeats the same YEAR next year
+    PASSED_OUT  in a final year; DATE_LEAVING = rules.pass_out_date (by
+                default the END_DATE of the closing ACADEMIC_YEAR)
+    PROMOTED    everyone else
+
+Students admitted straight into a target class for the new year with
+LATERAL_STATUS = 'YES' are reported as LATERAL and numbered with the class.
+
+The outcomes come from one query over all source classes, so a preview is
+cheap. Applying runs in one transaction and touches each table set-wise:
+an UPDATE of STUDENT_MASTER per transition and outcome, two INSERT ...
+SELECT statements that copy every moving student's latest
+STUDENT_ACADEMIC_RECORD (or their STUDENT_MASTER row when they have none)
+into the new year, one UPDATE closing the pass-outs' records, and one roll
+number upsert per target class (student/rollnumbers.py, append mode, so
+numbers already issued for the new year are kept). Running the same job
+again finds nobody left to move. The UPDATEs bypass STUDENT_MASTER's save
+signals, so the document matrix cache (student/matrix.py) is invalidated
+as a whole once the transaction commits.
+
+Progress is published under the job id to the 'progress' cache, which
+commits each write outside the job's transaction (core/routers.py), so
+another request, on any worker, can poll it while the job runs.
+"""
+import time
+import uuid
+
+from django.core.cache import caches
+from django.db import connection, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from academic.models import ACADEMIC_YEAR
+from accounts.models import SEMESTER, YEAR
+from .matrix import invalidate_all
+from .models import STUDENT_ACADEMIC_RECORD, STUDENT_MASTER
+from .rollnumbers import DEFAULT_PATTERN, RollNumberError, generate_roll_numbers
+
+PROMOTED = 'PROMOTED'
+DETAINED = 'DETAINED'
+PASSED_OUT = 'PASSED_OUT'
+LEFT = 'LEFT'
+LATERAL = 'LATERAL'
+OUTCOMES = (PROMOTED, DETAINED, PASSED_OUT, LEFT, LATERAL)
+
+# STUDENT_MASTER.STATUS / STUDENT_ACADEMIC_RECORD.STATUS values written
+STATUS_ACTIVE = 'ACTIVE'
+STATUS_DETAINED = 'DETAINED'
+STATUS_PASSOUT = 'PASSOUT'
+
+CHUNK = 2000
+PROGRESS_PREFIX = 'student:promotion'
+PROGRESS_TTL = 24 * 60 * 60
+
+
+class PromotionError(ValueError):
+    def __init__(self, message, errors=None):
+        super().__init__(message)
+        self.message = message
+        self.errors = errors or []
+
+
+class Transition:
+    __slots__ = ('source', 'target', 'semester', 'repeat_semester', 'outcomes')
+
+    def __init__(self, source, target, semester, repeat_semester):
+        self.source = source                    # YEAR
+        self.target = target                    # YEAR, or None for a final year
+        self.semester = semester                # SEMESTER numbered in the target class
+        self.repeat_semester = repeat_semester  # SEMESTER numbered for its detainees
+        self.outcomes = {outcome: [] for outcome in OUTCOMES}
+
+    def counts(self):
+        return {outcome.lower(): len(students) for outcome, students in self.outcomes.items()}
+
+
+def progress_key(job):
+    return f'{PROGRESS_PREFIX}:{job}'
+
+
+def get_progress(job):
+    return caches['progress'].get(progress_key(job))
+
+
+def _publish(job, stage, done, total, state='RUNNING'):
+    caches['progress'].set(progress_key(job), {
+        'job': job, 'state': state, 'stage': stage, 'done': done, 'total': total,
+        'at': timezone.now().isoformat(),
+    }, PROGRESS_TTL)
+
+
+def _pk(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _parse(data):
+    """Validated (academic_year, to_academic_year, transitions, detained, pass_out_date)."""
+    errors = []
+    academic_year = str(data.get('academic_year') or '').strip()
+    to_academic_year = str(data.get('to_academic_year') or '').strip()
+    if not academic_year or not to_academic_year:
+        raise PromotionError('academic_year and to_academic_year are required')
+    if academic_year == to_academic_year:
+        raise PromotionError('to_academic_year must differ from academic_year')
+
+    raw = data.get('transitions')
+    if not isinstance(raw, list) or not raw:
+        raise PromotionError('transitions must be a non-empty list')
+    year_ids = {_pk(item.get(key)) for item in raw if isinstance(item, dict) for key in ('from_year', 'to_year')}
+    semester_ids = {
+        _pk(item.get(key)) for item in raw if isinstance(item, dict) for key in ('to_semester', 'repeat_semester')
+    }
+    years = YEAR.objects.filter(pk__in=year_ids - {None}, IS_DELETED=False).select_related('BRANCH__PROGRAM__INSTITUTE').in_bulk()
+    semesters = SEMESTER.objects.filter(pk__in=semester_ids - {None}, IS_DELETED=False).in_bulk()
+
+    transitions = []
+    for index, item in enumerate(raw):
+        if not isinstance(item, dict):
+            errors.append({'transition': index, 'message': 'Each transition must be an object'})
+            continue
+        source = years.get(_pk(item.get('from_year')))
+        target = years.get(_pk(item.get('to_year'))) if item.get('to_year') is not None else None
+        semester = semesters.get(_pk(item.get('to_semester')))
+        repeat = semesters.get(_pk(item.get('repeat_semester'))) if item.get('repeat_semester') else None
+        if source is None:
+            errors.append({'transition': index, 'message': 'from_year is not a known YEAR'})
+            continue
+        if item.get('to_year') is not None:
+            if target is None:
+                errors.append({'transition': index, 'message': 'to_year is not a known YEAR'})
+                continue
+            if target.BRANCH_id != source.BRANCH_id:
+                errors.append({'transition': index, 'message': 'to_year belongs to another branch'})
+            if semester is None or semester.YEAR_id != target.pk:
+                errors.append({'transition': index, 'message': 'to_semester must be a SEMESTER of to_year'})
+        if item.get('repeat_semester') and (repeat is None or repeat.YEAR_id != source.pk):
+            errors.append({'transition': index, 'message': 'repeat_semester must be a SEMESTER of from_year'})
+        transitions.append(Transition(source, target, semester if target else None, repeat))
+
+    sources = [transition.source.pk for transition in transitions]
+    if len(set(sources)) != len(sources):
+        errors.append({'transition': None, 'message': 'A from_year appears in more than one transition'})
+
+    rules = data.get('rules') or {}
+    detained = rules.get('detained') or []
+    if not isinstance(detained, list):
+        errors.append({'transition': None, 'message': 'rules.detained must be a list of STUDENT_IDs'})
+        detained = []
+    pass_out_date = rules.get('pass_out_date')
+    if pass_out_date:
+        pass_out_date = parse_date(str(pass_out_date))
+        if pass_out_date is None:
+            errors.append({'transition': None, 'message': 'rules.pass_out_date must be YYYY-MM-DD'})
+    else:
+        closing = ACADEMIC_YEAR.objects.filter(ACADEMIC_YEAR=academic_year, IS_DELETED=False).first()
+        pass_out_date = closing.END_DATE if closing else timezone.localdate()
+    if errors:
+        raise PromotionError(f'{len(errors)} invalid transitions or rules', errors)
+    return academic_year, to_academic_year, transitions, {str(value) for value in detained}, pass_out_date
+
+
+def _classify(transitions, academic_year, to_academic_year, detained, lock=False):
+    """Fill each transition's outcomes from one query over all source classes."""
+    by_source = {transition.source.pk: transition for transition in transitions}
+    students = STUDENT_MASTER.objects.filter(
+        YEAR_SEM_ID__in=list(by_source), ACADEMIC_YEAR=academic_year, IS_DELETED=False,
+    )
+    if lock:
+        students = students.select_for_update()
+    found = set()
+    for pk, student_id, year, branch, leaving, active in students.order_by('STUDENT_ID').values_list(
+        'RECORD_ID', 'STUDENT_ID', 'YEAR_SEM_ID', 'BRANCH_ID', 'DATE_LEAVING', 'IS_ACTIVE'
+    ):
+        transition = by_source[year]
+        if branch != transition.source.BRANCH_id:
+            # YEAR rows are per branch; a mismatch is bad data, not ours to move
+            continue
+        if leaving is not None or active == 'NO':
+            outcome = LEFT
+        elif student_id in detained:
+            outcome = DETAINED
+        elif transition.target is None:
+            outcome = PASSED_OUT
+        else:
+            outcome = PROMOTED
+        if student_id in detained:
+            found.add(student_id)
+        transition.outcomes[outcome].append((pk, student_id))
+
+    targets = {transition.target.pk: transition for transition in transitions if transition.target}
+    for pk, student_id, year in STUDENT_MASTER.objects.filter(
+        YEAR_SEM_ID__in=list(targets), ACADEMIC_YEAR=to_academic_year, LATERAL_STATUS='YES',
+        IS_DELETED=False, DATE_LEAVING__isnull=True,
+    ).order_by('STUDENT_ID').values_list('RECORD_ID', 'STUDENT_ID', 'YEAR_SEM_ID'):
+        targets[year].outcomes[LATERAL].append((pk, student_id))
+
+    unknown = detained - found
+    if unknown:
+        # Detained by an earlier run of the same job: already repeating
+        unknown -= set(STUDENT_MASTER.objects.filter(
+            STUDENT_ID__in=unknown, YEAR_SEM_ID__in=list(by_source), ACADEMIC_YEAR=to_academic_year,
+        ).values_list('STUDENT_ID', flat=True))
+    unknown = sorted(unknown)
+    if unknown:
+        raise PromotionError('Detained students not found in any source class', [
+            {'transition': None, 'message': f'{student_id} is not in a source class for {academic_year}'}
+            for student_id in unknown
+        ])
+
+
+def _chunks(items):
+    for start in range(0, len(items), CHUNK):
+        yield items[start:start + CHUNK]
+
+
+def _update_students(transitions, to_academic_year, pass_out_date, username, step):
+    now = timezone.now()
+    updated = 0
+    for transition in transitions:
+        plans = [
+            (PROMOTED, {'YEAR_SEM_ID': transition.target.pk if transition.target else None,
+                        'ACADEMIC_YEAR': to_academic_year, 'STATUS': STATUS_ACTIVE}),
+            (DETAINED, {'ACADEMIC_YEAR': to_academic_year}),
+            (PASSED_OUT, {'DATE_LEAVING': pass_out_date, 'STATUS': STATUS_PASSOUT}),
+        ]
+        for outcome, values in plans:
+            for chunk in _chunks([pk for pk, _ in transition.outcomes[outcome]]):
+                updated += STUDENT_MASTER.objects.filter(pk__in=chunk).update(
+                    **values, UPDATED_BY=username, UPDATED_AT=now
+                )
+                step(len(chunk))
+    return updated
+
+
+RECORD_TABLE = STUDENT_ACADEMIC_RECORD._meta.db_table
+MASTER_TABLE = STUDENT_MASTER._meta.db_table
+
+# Carries each moving student's latest academic record into the new year
+COPY_RECORDS_SQL = f'''
+    INSERT INTO {RECORD_TABLE} (
+        "STUDENT_ID", "INSTITUTE_ID", "CATEGORY", "BATCH", "ACADEMIC_YEAR", "CLASS_YEAR", "ADMISSION_DATE",
+        "FORM_NO", "QUOTA_ID", "STATUS", "FEE_CATEGORY_ID",
+        "CREATED_BY", "CREATED_AT", "UPDATED_BY", "UPDATED_AT", "IS_DELETED"
+    )
+    SELECT DISTINCT ON (r."STUDENT_ID")
+           r."STUDENT_ID", r."INSTITUTE_ID", r."CATEGORY", r."BATCH", %(year)s, m.class_year, r."ADMISSION_DATE",
+           r."FORM_NO", r."QUOTA_ID", m.status, r."FEE_CATEGORY_ID",
+           %(user)s, %(now)s, %(user)s, %(now)s, FALSE
+      FROM {RECORD_TABLE} r
+      JOIN unnest(%(students)s::varchar[], %(class_years)s::integer[], %(statuses)s::varchar[])
+           AS m(student_id, class_year, status) ON m.student_id = r."STUDENT_ID"
+     WHERE r."IS_DELETED" = FALSE
+       AND NOT EXISTS (
+           SELECT 1 FROM {RECORD_TABLE} x
+            WHERE x."STUDENT_ID" = r."STUDENT_ID" AND x."ACADEMIC_YEAR" = %(year)s AND x."IS_DELETED" = FALSE
+       )
+     ORDER BY r."STUDENT_ID", r."ACADEMIC_YEAR" DESC, r."RECORD_ID" DESC
+'''
+
+# Students with no academic record at all get one from their master row
+NEW_RECORDS_SQL = f'''
+    INSERT INTO {RECORD_TABLE} (
+        "STUDENT_ID", "INSTITUTE_ID", "CATEGORY", "BATCH", "ACADEMIC_YEAR", "CLASS_YEAR", "ADMISSION_DATE",
+        "FORM_NO", "QUOTA_ID", "STATUS", "FEE_CATEGORY_ID",
+        "CREATED_BY", "CREATED_AT", "UPDATED_BY", "UPDATED_AT", "IS_DELETED"
+    )
+    SELECT s."STUDENT_ID", s."INSTITUTE_CODE",
+           CASE WHEN s."ADMISSION_CATEGORY" ~ '^[0-9]+$' THEN s."ADMISSION_CATEGORY"::integer ELSE 0 END,
+           s."BATCH", %(year)s, m.class_year, s."ADMISSION_DATE", s."FORM_NO", s."QUOTA_ID", m.status,
+           CASE WHEN s."ADMISSION_CATEGORY" ~ '^[0-9]+$' THEN s."ADMISSION_CATEGORY"::integer ELSE 0 END,
+           %(user)s, %(now)s, %(user)s, %(now)s, FALSE
+      FROM {MASTER_TABLE} s
+      JOIN unnest(%(students)s::varchar[], %(class_years)s::integer[], %(statuses)s::varchar[])
+           AS m(student_id, class_year, status) ON m.student_id = s."STUDENT_ID"
+     WHERE NOT EXISTS (
+           SELECT 1 FROM {RECORD_TABLE} x WHERE x."STUDENT_ID" = s."STUDENT_ID" AND x."IS_DELETED" = FALSE
+       )
+'''
+
+
+def _write_records(transitions, academic_year, to_academic_year, username, step):
+    moving = []
+    for transition in transitions:
+        for outcome, class_year, status in (
+            (PROMOTED, transition.target.pk if transition.target else None, STATUS_ACTIVE),
+            (DETAINED, transition.source.pk, STATUS_DETAINED),
+            (LATERAL, transition.target.pk if transition.target else None, STATUS_ACTIVE),
+        ):
+            moving.extend((student_id, class_year, status) for _, student_id in transition.outcomes[outcome])
+    passed_out = [
+        student_id for transition in transitions for _, student_id in transition.outcomes[PASSED_OUT]
+    ]
+
+    now = timezone.now()
+    written = {'created': 0, 'closed': 0}
+    with connection.cursor() as cursor:
+        # Students without a record are inserted second, so the first
+        # statement's NOT EXISTS cannot see them
+        for sql in (COPY_RECORDS_SQL, NEW_RECORDS_SQL):
+            for chunk in _chunks(moving):
+                cursor.execute(sql, {
+                    'year': to_academic_year, 'user': username, 'now': now,
+                    'students': [row[0] for row in chunk],
+                    'class_years': [row[1] for row in chunk],
+                    'statuses': [row[2] for row in chunk],
+                })
+                written['created'] += cursor.rowcount
+        step(len(moving))
+    for chunk in _chunks(passed_out):
+        written['closed'] += STUDENT_ACADEMIC_RECORD.objects.filter(
+            STUDENT_ID__in=chunk, ACADEMIC_YEAR=academic_year, IS_DELETED=False,
+        ).update(STATUS=STATUS_PASSOUT, UPDATED_BY=username, UPDATED_AT=now)
+        step(len(chunk))
+    return written
+
+
+def _roll_classes(transitions):
+    """(year, semester) of every class that needs numbering in the new year."""
+    classes = {}
+    numbered_by = {transition.target.pk: transition.semester for transition in transitions if transition.target}
+    pending = []
+    for transition in transitions:
+        if transition.target and (transition.outcomes[PROMOTED] or transition.outcomes[LATERAL]):
+            classes[(transition.target.pk, transition.semester.pk)] = (transition.target, transition.semester)
+        if transition.outcomes[DETAINED]:
+            semester = transition.repeat_semester or numbered_by.get(transition.source.pk)
+            if semester is None:
+                pending.append(transition.source.pk)
+            else:
+                classes[(transition.source.pk, semester.pk)] = (transition.source, semester)
+    return list(classes.values()), pending
+
+
+def _number(classes, to_academic_year, options, username, step):
+    created = updated = 0
+    for year, semester in classes:
+        branch = year.BRANCH
+        try:
+            summary = generate_roll_numbers(
+                branch.PROGRAM.INSTITUTE, branch, year, semester, to_academic_year,
+                order_by=options.get('order_by') or 'name',
+                pattern=options.get('pattern') or DEFAULT_PATTERN,
+                mode='append', username=username,
+            )
+        except RollNumberError as e:
+            raise PromotionError(f'Roll numbers for {branch.CODE} {year.YEAR}: {e}')
+        created += summary['created']
+        updated += summary['updated']
+        step(1)
+    return {'created': created, 'updated': updated}
+
+
+def _report(job, transitions, academic_year, to_academic_year, pass_out_date, pending, detail):
+    report = {
+        'job': job,
+        'academic_year': academic_year,
+        'to_academic_year': to_academic_year,
+        'pass_out_date': pass_out_date,
+        'transitions': [
+            {
+                'from_year': transition.source.pk,
+                'from_year_name': transition.source.YEAR,
+                'branch': transition.source.BRANCH_id,
+                'to_year': transition.target.pk if transition.target else None,
+                'to_year_name': transition.target.YEAR if transition.target else None,
+                **transition.counts(),
+                # Promotions are only counted unless asked for; the
+                # exceptions are what a reviewer checks
+                'students': {
+                    outcome.lower(): [student_id for _, student_id in students]
+                    for outcome, students in transition.outcomes.items()
+                    if students and (detail or outcome != PROMOTED)
+                },
+            }
+            for transition in transitions
+        ],
+        'totals': {
+            outcome.lower(): sum(len(transition.outcomes[outcome]) for transition in transitions)
+            for outcome in OUTCOMES
+        },
+    }
+    if pending:
+        report['roll_numbers_pending'] = pending
+    return report
+
+
+def promote(data, username='SYSTEM', dry_run=True, job=None, detail=False, progress=None):
+    """
+    Preview (dry_run, the default) or apply a promotion job. Returns the
+    outcome report; applying adds what was written and per-stage seconds.
+    progress(stage, done, total) is called as the job moves on.
+    """
+    job = job or uuid.uuid4().hex
+    academic_year, to_academic_year, transitions, detained, pass_out_date = _parse(data)
+    options = data.get('roll_numbers') or {}
+
+    if dry_run:
+        _classify(transitions, academic_year, to_academic_year, detained)
+        _, pending = _roll_classes(transitions)
+        return _report(job, transitions, academic_year, to_academic_year, pass_out_date, pending, detail)
+
+    seconds = {}
+    state = {'stage': None, 'done': 0, 'total': 0}
+
+    def begin(stage, total):
+        state.update(stage=stage, done=0, total=total)
+        _publish(job, stage, 0, total)
+        if progress:
+            progress(stage, 0, total)
+
+    def step(count):
+        state['done'] += count
+        _publish(job, state['stage'], state['done'], state['total'])
+        if progress:
+            progress(state['stage'], state['done'], state['total'])
+
+    try:
+        with transaction.atomic():
+            started = time.perf_counter()
+            begin('classify', len(transitions))
+            _classify(transitions, academic_year, to_academic_year, detained, lock=True)
+            classes, pending = _roll_classes(transitions)
+            seconds['classify'] = round(time.perf_counter() - started, 3)
+
+            started = time.perf_counter()
+            begin('students', sum(
+                len(transition.outcomes[outcome]) for transition in transitions
+                for outcome in (PROMOTED, DETAINED, PASSED_OUT)
+            ))
+            students = _update_students(transitions, to_academic_year, pass_out_date, username, step)
+            seconds['students'] = round(time.perf_counter() - started, 3)
+
+            started = time.perf_counter()
+            begin('academic_records', sum(
+                len(transition.outcomes[outcome]) for transition in transitions
+                for outcome in (PROMOTED, DETAINED, LATERAL, PASSED_OUT)
+            ))
+            records = _write_records(transitions, academic_year, to_academic_year, username, step)
+            seconds['academic_records'] = round(time.perf_counter() - started, 3)
+
+            started = time.perf_counter()
+            begin('roll_numbers', len(classes))
+            rolls = _number(classes, to_academic_year, options, username, step)
+            seconds['roll_numbers'] = round(time.perf_counter() - started, 3)
+            transaction.on_commit(invalidate_all)
+    except Exception:
+        _publish(job, state['stage'], state['done'], state['total'], state='FAILED')
+        raise
+    _publish(job, 'done', state['done'], state['total'], state='DONE')
+
+    report = _report(job, transitions, academic_year, to_academic_year, pass_out_date, pending, detail)
+    report['written'] = {
+        'students': students,
+        'academic_records': records['created'],
+        'academic_records_closed': records['closed'],
+        'roll_numbers_created': rolls['created'],
+        'roll_numbers_updated': rolls['updated'],
+    }
+    report['seconds'] = seconds
+    return report
@@ -0,0 +1,240 @@
+"""
+SGPA/CGPA engine over STUDENT_RESULT.
+
+A run is scoped to one EXAMINATION (optionally one branch). Every result of
+the students who sat that examination, up to and including it, is loaded
+into NumPy column arrays; the aggregation is then a handful of sorts and
+segmented sums, so a university-wide run over millions of result rows is
+bound by the database read, not by Python.
+
+Rules:
+
+* Best attempt: for each student and CURRICULUM entry the attempt used is a
+  passing one if any, otherwise the one with the highest GRADE_POINTS.
+* Backlogs: a course whose best attempt is a fail keeps its credits in the
+  denominator with zero grade points, and counts as a backlog until a later
+  attempt clears it.
+* SGPA = sum(credits x grade points) / sum(credits) over a semester's
+  courses; CGPA is the same over all semesters up to and including it.
+
+Aggregates are written to STUDENT_SEMESTER_RESULT, one row per student and
+semester that the examination touched, with one bulk upsert per batch.
+"""
+import logging
+import time
+from itertools import islice
+
+import numpy as np
+from django.db import transaction
+from django.db.models import FloatField
+from django.db.models.functions import Cast
+from django.utils import timezone
+
+from .models import STUDENT_RESULT, STUDENT_SEMESTER_RESULT
+
+logger = logging.getLogger(__name__)
+
+READ_CHUNK = 100_000
+WRITE_BATCH = 2000
+
+# Columns of the loaded result matrix
+COLUMNS = ('student', 'curriculum', 'semester', 'credits', 'grade_points', 'passed', 'examination')
+STUDENT, CURRICULUM, SEMESTER, CREDITS, GRADE_POINTS, PASSED, EXAM = range(len(COLUMNS))
+
+UPSERT_KEY = ['STUDENT', 'EXAMINATION', 'SEMESTER']
+UPSERT_FIELDS = [
+    'CREDITS_REGISTERED', 'CREDITS_EARNED', 'CREDIT_POINTS', 'SGPA', 'CUMULATIVE_CREDITS',
+    'CGPA', 'BACKLOGS', 'TOTAL_BACKLOGS', 'RESULT', 'IS_DELETED', 'UPDATED_BY', 'UPDATED_AT'
+]
+
+
+def load_results(examination, branch=None):
+    """
+    All results up to examination for the students who sat it, as a float64
+    array with one row per attempt and COLUMNS as columns.
+    """
+    sat = STUDENT_RESULT.objects.filter(EXAMINATION=examination, IS_DELETED=False)
+    if branch is not None:
+        sat = sat.filter(CURRICULUM__BRANCH=branch)
+    rows = (
+        STUDENT_RESULT.objects
+        .filter(
+            IS_DELETED=False,
+            STUDENT__in=sat.values('STUDENT'),
+            EXAMINATION__END_DATE__lte=examination.END_DATE,
+        )
+        # Floats straight from the database: no Decimal per value
+        .annotate(
+            credits=Cast('CURRICULUM__COURSE__CREDITS', FloatField()),
+            points=Cast('GRADE_POINTS', FloatField()),
+        )
+        .values_list('STUDENT_id', 'CURRICULUM_id', 'CURRICULUM__SEMESTER', 'credits',
+                     'points', 'IS_PASS', 'EXAMINATION_id')
+        .iterator(chunk_size=READ_CHUNK)
+    )
+    chunks = []
+    while True:
+        chunk = list(islice(rows, READ_CHUNK))
+        if not chunk:
+            break
+        chunks.append(np.array(chunk, dtype=np.float64))
+    if not chunks:
+        return np.empty((0, len(COLUMNS)))
+    return np.concatenate(chunks)
+
+
+def _group_starts(*keys):
+    """Start index of each run of equal keys in already sorted arrays."""
+    change = np.zeros(len(keys[0]), dtype=bool)
+    change[0] = True
+    for key in keys:
+        change[1:] |= key[1:] != key[:-1]
+    return np.flatnonzero(change)
+
+
+def compute_semester_results(results, examination_id):
+    """
+    Aggregate a load_results() array. Returns a dict of equal-length column
+    arrays, one entry per student and semester the examination touched.
+    """
+    if not len(results):
+        return {name: np.empty(0) for name in (
+            'student', 'semester', 'credits_registered', 'credits_earned', 'credit_points',
+            'sgpa', 'cumulative_credits', 'cgpa', 'backlogs', 'total_backlogs')}
+
+    student = results[:, STUDENT].astype(np.int64)
+    curriculum = results[:, CURRICULUM].astype(np.int64)
+    passed = results[:, PASSED]
+    grade_points = results[:, GRADE_POINTS]
+
+    # Best attempt per (student, curriculum): sort so it comes last in its group
+    order = np.lexsort((grade_points, passed, curriculum, student))
+    student, curriculum = student[order], curriculum[order]
+    starts = _group_starts(student, curriculum)
+    last = np.r_[starts[1:], len(order)] - 1
+    best = order[last]
+    touched = np.maximum.reduceat(
+        (results[order, EXAM] == examination_id).astype(np.int8), starts
+    ).astype(bool)
+
+    course_student = student[last]
+    semester = results[best, SEMESTER].astype(np.int64)
+    credits = results[best, CREDITS]
+    course_passed = results[best, PASSED]
+    # A failed course earns nothing but still counts in the denominator
+    points = credits * results[best, GRADE_POINTS] * course_passed
+
+    # Per (student, semester)
+    order = np.lexsort((semester, course_student))
+    course_student, semester = course_student[order], semester[order]
+    starts = _group_starts(course_student, semester)
+    registered = np.add.reduceat(credits[order], starts)
+    earned = np.add.reduceat((credits * course_passed)[order], starts)
+    credit_points = np.add.reduceat(points[order], starts)
+    backlogs = np.add.reduceat((1 - course_passed)[order], starts).astype(np.int64)
+    semester_touched = np.maximum.reduceat(touched[order].astype(np.int8), starts).astype(bool)
+    sem_student = course_student[starts]
+    sem_number = semester[starts]
+
+    # Running totals within each student (rows are sorted by semester)
+    student_start = _group_starts(sem_student)
+    first_row = np.repeat(student_start, np.diff(np.r_[student_start, len(sem_student)]))
+
+    def running(values):
+        total = np.cumsum(values)
+        return total - total[first_row] + values[first_row]
+
+    cumulative_credits = running(registered)
+    cumulative_points = running(credit_points)
+    total_backlogs = running(backlogs)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        sgpa = np.where(registered > 0, credit_points / registered, np.nan)
+        cgpa = np.where(cumulative_credits > 0, cumulative_points / cumulative_credits, np.nan)
+
+    keep = semester_touched
+    return {
+        'student': sem_student[keep],
+        'semester': sem_number[keep],
+        'credits_registered': registered[keep],
+        'credits_earned': earned[keep],
+        'credit_points': credit_points[keep],
+        'sgpa': np.round(sgpa[keep], 2),
+        'cumulative_credits': cumulative_credits[keep],
+        'cgpa': np.round(cgpa[keep], 2),
+        'backlogs': backlogs[keep],
+        'total_backlogs': total_backlogs[keep],
+    }
+
+
+def _rows(computed, examination, username):
+    now = timezone.now()
+    columns = [computed[name].tolist() for name in (
+        'student', 'semester', 'credits_registered', 'credits_earned', 'credit_points',
+        'sgpa', 'cumulative_credits', 'cgpa', 'backlogs', 'total_backlogs')]
+    for (student_id, semester, registered, earned, points, sgpa, cumulative,
+         cgpa, backlogs, total_backlogs) in zip(*columns):
+        yield STUDENT_SEMESTER_RESULT(
+            STUDENT_id=student_id,
+            EXAMINATION=examination,
+            SEMESTER=semester,
+            CREDITS_REGISTERED=round(registered, 2),
+            CREDITS_EARNED=round(earned, 2),
+            CREDIT_POINTS=round(points, 2),
+            SGPA=None if sgpa != sgpa else sgpa,
+            CUMULATIVE_CREDITS=round(cumulative, 2),
+            CGPA=None if cgpa != cgpa else cgpa,
+            BACKLOGS=backlogs,
+            TOTAL_BACKLOGS=total_backlogs,
+            RESULT='PASS' if backlogs == 0 else 'FAIL',
+            IS_DELETED=False,
+            CREATED_BY=username,
+            UPDATED_BY=username,
+            UPDATED_AT=now,
+        )
+
+
+def write_semester_results(computed, examination, username='SYSTEM'):
+    """INSERT ... ON CONFLICT (STUDENT, EXAMINATION, SEMESTER) DO UPDATE, in batches."""
+    rows = _rows(computed, examination, username)
+    written = 0
+    with transaction.atomic():
+        while True:
+            batch = list(islice(rows, WRITE_BATCH))
+            if not batch:
+                break
+            STUDENT_SEMESTER_RESULT.objects.bulk_create(
+                batch,
+                update_conflicts=True,
+                unique_fields=UPSERT_KEY,
+                update_fields=UPSERT_FIELDS,
+            )
+            written += len(batch)
+    return written
+
+
+def run(examination, branch=None, username='SYSTEM', dry_run=False):
+    """Load, compute and (unless dry_run) store SGPA/CGPA for an examination."""
+    started = time.perf_counter()
+    results = load_results(examination, branch)
+    loaded = time.perf_counter()
+    computed = compute_semester_results(results, examination.pk)
+    done = time.perf_counter()
+    written = 0 if dry_run else write_semester_results(computed, examination, username)
+    finished = time.perf_counter()
+
+    summary = {
+        'examination': examination.CODE,
+        'result_rows': len(results),
+        'students': int(len(np.unique(computed['student']))),
+        'semester_results': int(len(computed['student'])),
+        'written': written,
+        'failed': int(np.count_nonzero(computed['backlogs'])),
+        'seconds': {
+            'load': round(loaded - started, 3),
+            'compute': round(done - loaded, 3),
+            'write': round(finished - done, 3),
+        },
+    }
+    logger.info("Result run for %s: %s", examination.CODE, summary)
+    return summary
@@ -0,0 +1,421 @@
+"""
+Roll number generation for STUDENT_ROLL_NUMBER_DETAILS.
+
+For one class (branch, year, semester and academic year) the eligible
+STUDENT_MASTER rows are ordered by a configurable key and numbered from a
+pattern such as ``{branch}{ay}{seq:03d}`` (e.g. CE25001). Results are written
+with a single bulk upsert keyed on (STUDENT, SEMESTER, ACADEMIC_YEAR).
+
+Two modes:
+
+* ``append`` (default) keeps every number already issued and gives students
+  who have none (late admissions) the next free numbers, in order.
+* ``full`` renumbers the whole class from 1 and soft-deletes rows of
+  students who are no longer eligible. Their numbers stay reserved, as in
+  append mode, so a number is never reissued to another student.
+
+``merit`` order ranks like seat allocation (student/admissions.py): the
+latest STUDENT_DETAILS MERIT, then its SCORE, then STUDENT_MASTER.MARK_ID,
+unless the caller passes its own scores.
+
+save_roll_numbers() is the bulk write path for rosters posted by the client.
+"""
+import logging
+import re
+import string
+
+from django.db import IntegrityError, connection, transaction
+from django.utils import timezone
+
+from accounts.models import BRANCH, INSTITUTE, SEMESTER, YEAR
+from .models import STUDENT_DETAILS, STUDENT_MASTER, STUDENT_ROLL_NUMBER_DETAILS
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PATTERN = '{branch}{ay}{seq:03d}'
+PATTERN_FIELDS = {'branch', 'year', 'semester', 'academic_year', 'ay', 'seq'}
+MODES = ('append', 'full')
+ROLL_NO_MAX_LENGTH = STUDENT_ROLL_NUMBER_DETAILS._meta.get_field('ROLL_NO').max_length
+UPSERT_KEY = ['STUDENT', 'SEMESTER', 'ACADEMIC_YEAR']
+UPSERT_FIELDS = ['INSTITUTE', 'BRANCH', 'YEAR', 'ROLL_NO', 'IS_DELETED', 'UPDATED_BY', 'UPDATED_AT']
+BATCH_SIZE = 500
+# Deferred, so it is only checked at the outermost commit unless asked for
+CLASS_CONSTRAINT = '"STUDENT".uq_roll_no_per_class'
+
+
+class RollNumberError(ValueError):
+    pass
+
+
+def upsert_roll_numbers(rows):
+    """INSERT ... ON CONFLICT (STUDENT, SEMESTER, ACADEMIC_YEAR) DO UPDATE."""
+    STUDENT_ROLL_NUMBER_DETAILS.objects.bulk_create(
+        rows,
+        batch_size=BATCH_SIZE,
+        update_conflicts=True,
+        unique_fields=UPSERT_KEY,
+        update_fields=UPSERT_FIELDS,
+    )
+
+
+def _check_class_numbers(context):
+    """
+    Check the deferred per-class constraint now, even when a caller's
+    transaction is open, so a conflict is reported, not a 500 at COMMIT.
+    """
+    try:
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                cursor.execute(f'SET CONSTRAINTS {CLASS_CONSTRAINT} IMMEDIATE')
+                cursor.execute(f'SET CONSTRAINTS {CLASS_CONSTRAINT} DEFERRED')
+    except IntegrityError as e:
+        # A number already belongs to another student of the class
+        logger.warning("Roll number conflict while %s: %s", context, e)
+        raise RollNumberError('One or more roll numbers are already assigned to other students of the class')
+
+
+def _merit_score(student, scores):
+    try:
+        return float(scores.get(student['STUDENT_ID']))
+    except (TypeError, ValueError):
+        return float('-inf')
+
+
+def _admission_merit(students):
+    """
+    STUDENT_ID -> merit for STUDENT_MASTER value rows: the latest
+    STUDENT_DETAILS MERIT, then SCORE, then MARK_ID, the first that is a number.
+    """
+    details = {}
+    rows = (
+        STUDENT_DETAILS.objects
+        .filter(STUDENT__in=[student['RECORD_ID'] for student in students], IS_DELETED=False)
+        .order_by('RECORD_ID')
+        .values_list('STUDENT_id', 'MERIT', 'SCORE')
+    )
+    for student_pk, merit, score in rows:
+        details[student_pk] = (merit, score)
+    scores = {}
+    for student in students:
+        for value in (*details.get(student['RECORD_ID'], (None, None)), student['MARK_ID']):
+            try:
+                scores[student['STUDENT_ID']] = float(value)
+                break
+            except (TypeError, ValueError):
+                continue
+    return scores
+
+
+def _name_key(student):
+    return (student['SURNAME'].upper(), student['NAME'].upper(), student['STUDENT_ID'])
+
+
+ORDERINGS = {
+    'name': lambda student, scores: _name_key(student),
+    'id': lambda student, scores: (student['STUDENT_ID'],),
+    # Highest merit first, ties broken by name
+    'merit': lambda student, scores: (-_merit_score(student, scores),) + _name_key(student),
+}
+
+
+def validate_pattern(pattern):
+    try:
+        fields = {name for _, name, _, _ in string.Formatter().parse(pattern) if name is not None}
+    except ValueError as e:
+        raise RollNumberError(f'Invalid pattern: {e}')
+    unknown = fields - PATTERN_FIELDS
+    if unknown:
+        raise RollNumberError(
+            f'Unknown pattern fields: {", ".join(sorted(unknown))}. '
+            f'Available: {", ".join(sorted(PATTERN_FIELDS))}'
+        )
+    if 'seq' not in fields:
+        raise RollNumberError('Pattern must contain {seq}')
+    return pattern
+
+
+def _pattern_context(branch, year, semester, academic_year):
+    start_year = academic_year.split('-')[0]
+    return {
+        'branch': branch.CODE,
+        'year': year.YEAR,
+        'semester': semester.SEMESTER,
+        'academic_year': academic_year,
+        'ay': start_year[-2:],
+    }
+
+
+def _sequence_parser(pattern, context):
+    """Regex that recovers {seq} from roll numbers issued with this pattern."""
+    regex = ''
+    for literal, name, spec, conversion in string.Formatter().parse(pattern):
+        regex += re.escape(literal)
+        if name is None:
+            continue
+        if name == 'seq':
+            regex += r'(?P<seq>\s*\d+)'
+        else:
+            regex += re.escape(format(context[name], spec or ''))
+    return re.compile(f'^{regex}$')
+
+
+def eligible_students(branch, year, academic_year):
+    return STUDENT_MASTER.objects.filter(
+        BRANCH_ID=branch,
+        YEAR_SEM_ID=year.pk,
+        ACADEMIC_YEAR=academic_year,
+        IS_DELETED=False,
+        DATE_LEAVING__isnull=True,
+    ).exclude(IS_ACTIVE='NO')
+
+
+def generate_roll_numbers(institute, branch, year, semester, academic_year,
+                          order_by='name', pattern=DEFAULT_PATTERN, mode='append',
+                          scores=None, username='SYSTEM', dry_run=False):
+    """
+    Assign roll numbers for one class. Returns a summary with the full
+    assignment list ({RECORD_ID, STUDENT_ID, ROLL_NO, NEW}) in roll order.
+    """
+    if order_by not in ORDERINGS:
+        raise RollNumberError(f'order_by must be one of: {", ".join(ORDERINGS)}')
+    if mode not in MODES:
+        raise RollNumberError(f'mode must be one of: {", ".join(MODES)}')
+    validate_pattern(pattern)
+
+    context = _pattern_context(branch, year, semester, academic_year)
+    sort_key = ORDERINGS[order_by]
+
+    with transaction.atomic():
+        # Serialize generators for the same branch
+        BRANCH.objects.select_for_update().filter(pk=branch.pk).first()
+
+        students = list(
+            eligible_students(branch, year, academic_year)
+            .values('RECORD_ID', 'STUDENT_ID', 'NAME', 'SURNAME', 'MARK_ID')
+        )
+        if order_by == 'merit' and scores is None:
+            scores = _admission_merit(students)
+        students.sort(key=lambda student: sort_key(student, scores))
+
+        class_rows = list(
+            STUDENT_ROLL_NUMBER_DETAILS.objects.filter(
+                BRANCH=branch,
+                SEMESTER=semester,
+                ACADEMIC_YEAR=academic_year,
+            ).values('RECORD_ID', 'STUDENT_id', 'ROLL_NO', 'IS_DELETED')
+        )
+        existing = {row['STUDENT_id']: row for row in class_rows if row['STUDENT_id'] is not None}
+
+        if mode == 'append':
+            kept = {
+                student_pk: row['ROLL_NO'] for student_pk, row in existing.items()
+                if student_pk is not None and not row['IS_DELETED']
+            }
+            parser = _sequence_parser(pattern, context)
+            issued = []
+            for roll_no in kept.values():
+                match = parser.match(roll_no)
+                if match:
+                    issued.append(int(match.group('seq')))
+            next_seq = max(issued, default=0) + 1
+        else:
+            kept = {}
+            next_seq = 1
+
+        # Every stored number of the class stays reserved in append mode,
+        # including those of deleted rows and students who left; a full
+        # renumbering only reuses the numbers of the students it renumbers
+        eligible_pks = {student['RECORD_ID'] for student in students}
+        if mode == 'append':
+            taken = {row['ROLL_NO'] for row in class_rows}
+        else:
+            taken = {row['ROLL_NO'] for row in class_rows if row['STUDENT_id'] not in eligible_pks}
+        assignments = []
+        for student in students:
+            roll_no = kept.get(student['RECORD_ID'])
+            is_new = roll_no is None
+            while roll_no is None:
+                candidate = pattern.format(seq=next_seq, **context)
+                next_seq += 1
+                if len(candidate) > ROLL_NO_MAX_LENGTH:
+                    raise RollNumberError(
+                        f'Roll number {candidate} is longer than {ROLL_NO_MAX_LENGTH} characters'
+                    )
+                if candidate not in taken:
+                    roll_no = candidate
+                    taken.add(candidate)
+            assignments.append({
+                'RECORD_ID': student['RECORD_ID'],
+                'STUDENT_ID': student['STUDENT_ID'],
+                'ROLL_NO': roll_no,
+                'NEW': is_new,
+            })
+        if mode == 'append':
+            assignments.sort(key=lambda item: (kept.get(item['RECORD_ID']) is None, item['ROLL_NO']))
+
+        changed = [
+            item for item in assignments
+            if item['RECORD_ID'] not in existing
+            or existing[item['RECORD_ID']]['IS_DELETED']
+            or existing[item['RECORD_ID']]['ROLL_NO'] != item['ROLL_NO']
+        ]
+        stale = [
+            row['RECORD_ID'] for row in class_rows
+            if row['STUDENT_id'] not in eligible_pks and not row['IS_DELETED']
+        ] if mode == 'full' else []
+
+        summary = {
+            'mode': mode,
+            'order_by': order_by,
+            'pattern': pattern,
+            'students': len(assignments),
+            'created': sum(1 for item in changed if item['RECORD_ID'] not in existing),
+            'updated': sum(1 for item in changed if item['RECORD_ID'] in existing),
+            'removed': len(stale),
+            'unchanged': len(assignments) - len(changed),
+            'assignments': assignments,
+        }
+        if dry_run:
+            return summary
+
+        now = timezone.now()
+        if stale:
+            STUDENT_ROLL_NUMBER_DETAILS.objects.filter(RECORD_ID__in=stale).update(
+                IS_DELETED=True, DELETED_BY=username, DELETED_AT=now, UPDATED_BY=username, UPDATED_AT=now,
+            )
+
+        rows = [
+            STUDENT_ROLL_NUMBER_DETAILS(
+                INSTITUTE=institute,
+                BRANCH=branch,
+                YEAR=year,
+                SEMESTER=semester,
+                ACADEMIC_YEAR=academic_year,
+                STUDENT_id=item['RECORD_ID'],
+                ROLL_NO=item['ROLL_NO'],
+                IS_DELETED=False,
+                CREATED_BY=username,
+                UPDATED_BY=username,
+                CREATED_AT=now,
+                UPDATED_AT=now,
+            )
+            for item in changed
+        ]
+        upsert_roll_numbers(rows)
+        # A roster saved for the class meanwhile can hold a number issued here
+        _check_class_numbers('generating roll numbers')
+
+    logger.info(
+        "Roll numbers for branch %s sem %s %s: %s created, %s updated, %s removed",
+        branch.pk, semester.pk, academic_year,
+        summary['created'], summary['updated'], summary['removed']
+    )
+    return summary
+
+
+def _pk(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def save_roll_numbers(records, username='SYSTEM'):
+    """
+    Validate and upsert a posted roster in a handful of statements. Each
+    record carries STUDENT (STUDENT_ID code or RECORD_ID), INSTITUTE, BRANCH,
+    YEAR, SEMESTER (ids), ACADEMIC_YEAR and ROLL_NO. Re-submitting a roster
+    updates the existing rows.
+
+    Returns (keys, errors). errors has one dict per record (empty when the
+    record is valid); if any is non-empty nothing is written. keys are the
+    (STUDENT, SEMESTER, ACADEMIC_YEAR) tuples written.
+    """
+    related = {
+        'INSTITUTE': INSTITUTE,
+        'BRANCH': BRANCH,
+        'YEAR': YEAR,
+        'SEMESTER': SEMESTER,
+    }
+    resolved = {
+        field: model.objects.in_bulk([
+            pk for pk in {_pk(record.get(field)) for record in records} if pk is not None
+        ])
+        for field, model in related.items()
+    }
+
+    student_refs = {str(record.get('STUDENT') or record.get('STUDENT_ID') or '') for record in records}
+    student_refs.discard('')
+    students = {}
+    for student in STUDENT_MASTER.objects.filter(STUDENT_ID__in=student_refs).only('RECORD_ID', 'STUDENT_ID'):
+        students[student.STUDENT_ID] = student.RECORD_ID
+    numeric_refs = [ref for ref in student_refs - set(students) if ref.isdigit()]
+    if numeric_refs:
+        for record_id in STUDENT_MASTER.objects.filter(RECORD_ID__in=numeric_refs).values_list('RECORD_ID', flat=True):
+            students[str(record_id)] = record_id
+
+    now = timezone.now()
+    rows = []
+    errors = []
+    seen_students = {}
+    seen_roll_nos = {}
+    for index, record in enumerate(records):
+        row_errors = {}
+        values = {}
+        for field in related:
+            obj = resolved[field].get(_pk(record.get(field)))
+            if obj is None:
+                row_errors[field] = [f'Invalid pk "{record.get(field)}" - object does not exist.']
+            values[field] = obj
+
+        student_ref = str(record.get('STUDENT') or record.get('STUDENT_ID') or '')
+        student_pk = students.get(student_ref)
+        if student_pk is None:
+            row_errors['STUDENT'] = [f'Student "{student_ref}" does not exist.']
+
+        academic_year = str(record.get('ACADEMIC_YEAR') or '').strip()
+        if not academic_year:
+            row_errors['ACADEMIC_YEAR'] = ['This field is required.']
+
+        roll_no = str(record.get('ROLL_NO') or '').strip()
+        if not roll_no:
+            row_errors['ROLL_NO'] = ['This field is required.']
+        elif len(roll_no) > ROLL_NO_MAX_LENGTH:
+            row_errors['ROLL_NO'] = [f'Ensure this field has no more than {ROLL_NO_MAX_LENGTH} characters.']
+
+        if not row_errors:
+            key = (student_pk, values['SEMESTER'].pk, academic_year)
+            if key in seen_students:
+                row_errors['STUDENT'] = [
+                    f'Student already has a roll number for this semester in row {seen_students[key]}.'
+                ]
+            seen_students.setdefault(key, index)
+
+            class_key = (values['BRANCH'].pk, values['SEMESTER'].pk, academic_year, roll_no)
+            if class_key in seen_roll_nos:
+                row_errors['ROLL_NO'] = [f'Roll number {roll_no} is repeated in row {seen_roll_nos[class_key]}.']
+            seen_roll_nos.setdefault(class_key, index)
+
+        errors.append(row_errors)
+        if row_errors:
+            continue
+        rows.append(STUDENT_ROLL_NUMBER_DETAILS(
+            STUDENT_id=student_pk,
+            ACADEMIC_YEAR=academic_year,
+            ROLL_NO=roll_no,
+            IS_DELETED=False,
+            CREATED_BY=username,
+            UPDATED_BY=username,
+            CREATED_AT=now,
+            UPDATED_AT=now,
+            **values
+        ))
+
+    if any(errors):
+        return [], errors
+
+    with transaction.atomic():
+        upsert_roll_numbers(rows)
+        _check_class_numbers('saving roster')
+
+    return [(row.STUDENT_id, row.SEMESTER_id, row.ACADEMIC_YEAR) for row in rows], errors
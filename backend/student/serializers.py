@@ -1,5 +1,6 @@
 from rest_framework import serializers
-from .models import STUDENT_MASTER, CHECK_LIST_DOCUMENTS, STUDENT_DOCUMENTS,STUDENT_ROLL_NUMBER_DETAILS
+from .models import STUDENT_MASTER, CHECK_LIST_DOCUMENTS, STUDENT_DOCUMENTS,STUDENT_ROLL_NUMBER_DETAILS, SEAT_MATRIX, SEAT_ALLOCATION
+from .models import ATTENDANCE_SESSION
 from django.utils import timezone
 
 # Define required fields at module level
@@ -127,10 +128,12 @@ class StudentRollNumberDetailsSerializer(serializers.ModelSerializer):
     #     slug_field='STUDENT_ID',
     #     queryset=STUDENT_MASTER.objects.all()
     # )
+     STUDENT_ID = serializers.CharField(source='STUDENT.STUDENT_ID', read_only=True, default=None)
+
      class Meta:
         model = STUDENT_ROLL_NUMBER_DETAILS
         fields = [
-            'RECORD_ID', 'INSTITUTE', 'BRANCH', 'YEAR', 'STUDENT_ID',
+            'RECORD_ID', 'INSTITUTE', 'BRANCH', 'YEAR', 'STUDENT', 'STUDENT_ID',
             'ACADEMIC_YEAR', 'ROLL_NO', 'SEMESTER'
         ]
 
@@ -190,3 +193,61 @@ class StudentDocumentsSerializer(serializers.ModelSerializer):
 
     def update(self, instance, validated_data):
         return super().update(instance, validated_data)
+
+
+class SeatMatrixSerializer(serializers.ModelSerializer):
+    BRANCH_NAME = serializers.CharField(source='BRANCH.NAME', read_only=True)
+
+    class Meta:
+        model = SEAT_MATRIX
+        fields = [
+            'RECORD_ID', 'ACADEMIC_YEAR', 'BRANCH', 'BRANCH_NAME', 'CATEGORY', 'CASTE', 'QUOTA',
+            'ADMISSION_QUOTA', 'SEATS', 'IS_DELETED'
+        ]
+        read_only_fields = ['IS_DELETED']
+
+
+class SeatAllocationSerializer(serializers.ModelSerializer):
+    STUDENT_ID = serializers.CharField(source='STUDENT.STUDENT_ID', read_only=True)
+    STUDENT_NAME = serializers.SerializerMethodField()
+    CATEGORY = serializers.CharField(source='SEAT.CATEGORY', read_only=True, default=None)
+
+    # Only the desk's response to an allotment is editable
+    DESK_STATUSES = [
+        SEAT_ALLOCATION.STATUS_FLOAT, SEAT_ALLOCATION.STATUS_FREEZE, SEAT_ALLOCATION.STATUS_WITHDRAWN
+    ]
+
+    class Meta:
+        model = SEAT_ALLOCATION
+        fields = [
+            'RECORD_ID', 'ACADEMIC_YEAR', 'ROUND_NO', 'STUDENT', 'STUDENT_ID', 'STUDENT_NAME', 'MERIT_RANK',
+            'BRANCH', 'SEAT', 'CATEGORY', 'PREFERENCE_NO', 'STATUS'
+        ]
+        read_only_fields = [
+            'ACADEMIC_YEAR', 'ROUND_NO', 'STUDENT', 'MERIT_RANK', 'BRANCH', 'SEAT', 'PREFERENCE_NO'
+        ]
+
+    def get_STUDENT_NAME(self, obj):
+        return f"{obj.STUDENT.NAME} {obj.STUDENT.SURNAME}".strip()
+
+    def validate_STATUS(self, value):
+        if value not in self.DESK_STATUSES:
+            raise serializers.ValidationError(f"STATUS must be one of {', '.join(self.DESK_STATUSES)}")
+        if self.instance is not None and self.instance.SEAT_id is None and value != SEAT_ALLOCATION.STATUS_WITHDRAWN:
+            raise serializers.ValidationError('Only WITHDRAWN applies to an applicant without a seat')
+        return value
+
+
+class AttendanceSessionSerializer(serializers.ModelSerializer):
+    CURRICULUM = serializers.IntegerField(source='ROSTER.CURRICULUM_id', read_only=True)
+    SEMESTER = serializers.IntegerField(source='ROSTER.SEMESTER_id', read_only=True)
+    ACADEMIC_YEAR = serializers.CharField(source='ROSTER.ACADEMIC_YEAR', read_only=True)
+
+    class Meta:
+        model = ATTENDANCE_SESSION
+        # The bitmap itself stays internal; retrieve/ lists the absentees
+        fields = [
+            'SESSION_ID', 'ROSTER', 'CURRICULUM', 'SEMESTER', 'ACADEMIC_YEAR', 'SESSION_DATE', 'PERIOD',
+            'SESSION_TYPE', 'SIZE', 'PRESENT_COUNT', 'UPDATED_BY', 'UPDATED_AT'
+        ]
+        read_only_fields = fields
@@ -1,3 +1,695 @@
-from django.test import TestCase
+import base64
+import csv
+import hashlib
+import io
+import os
+import pickle
+import shutil
+import tempfile
+import zipfile
+from datetime import date, timedelta
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+import numpy as np
+from django.core import mail
+from django.core.cache import caches
+from django.core.files.base import ContentFile
+from django.db import connection, connections
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient, APIRequestFactory, force_authenticate
+
+from academic.models import ACADEMIC_YEAR, COURSE, CURRICULUM
+from accounts.models import BRANCH, INSTITUTE, PASSWORD_HISTORY, PROGRAM, SEMESTER, UNIVERSITY, YEAR, CustomUser
+from core.routers import PROGRESS_CACHE_TABLE
+from . import attendance, matrix, rollnumbers, uploads
+from .admissions import AllocationError, Applicant, Bucket, SeatAllocator, run_round
+from .archive import MANIFEST_NAME, DocumentArchive, documents_for
+from .models import (
+    ATTENDANCE_ROSTER_MEMBER, ATTENDANCE_SESSION, ATTENDANCE_SUMMARY, CHECK_LIST_DOCUMENTS, DOCUMENT_UPLOAD,
+    SEAT_ALLOCATION, SEAT_MATRIX, STUDENT_ACADEMIC_RECORD, STUDENT_DETAILS, STUDENT_DOCUMENTS, STUDENT_MASTER,
+    STUDENT_ROLL_NUMBER_DETAILS,
+)
+from .promotion import get_progress, progress_key, promote
+from .results import compute_semester_results
+from .rollnumbers import RollNumberError, generate_roll_numbers, save_roll_numbers
+from .uploads import UploadError, append_chunk, purge_expired_uploads, start_upload
+from .views import PromotionView, StudentMasterViewSet
+
+
+def _bucket(record_id, branch, seats, caste=None):
+    return Bucket({
+        'RECORD_ID': record_id, 'BRANCH_id': branch, 'CATEGORY': f'{branch}-{caste or "OPEN"}',
+        'CASTE__NAME': caste, 'QUOTA_id': None, 'ADMISSION_QUOTA_id': None, 'SEATS': seats,
+    })
+
+
+def _applicant(rank, preferences, caste=None):
+    applicant = Applicant(rank, f'S{rank}', (rank,), preferences, caste, None, None)
+    applicant.rank = rank
+    return applicant
+
+
+class SeatAllocatorTest(SimpleTestCase):
+    def test_merit_order_and_open_before_reserved(self):
+        buckets = {1: _bucket(1, 'X', 1), 2: _bucket(2, 'X', 1, caste='SC')}
+        applicants = [_applicant(1, ['X'], caste='SC'), _applicant(2, ['X'], caste='SC'), _applicant(3, ['X'])]
+        allocator = SeatAllocator(applicants, buckets)
+        allocator.run(applicants)
+        # The best SC applicant takes the open seat, the next one the reserved seat
+        self.assertEqual(allocator.seat[1].record_id, 1)
+        self.assertEqual(allocator.seat[2].record_id, 2)
+        self.assertNotIn(3, allocator.seat)
+
+    def test_released_seat_goes_to_the_higher_ranked_applicant(self):
+        buckets = {1: _bucket(1, 'X', 1), 2: _bucket(2, 'Y', 1), 3: _bucket(3, 'Z', 1)}
+        second = _applicant(2, ['X', 'Y'])
+        third = _applicant(3, ['Z', 'X'])
+        fourth = _applicant(4, ['X'])
+        allocator = SeatAllocator([second, third, fourth], buckets)
+        allocator.hold(second, buckets[2], frozen=False)
+        allocator.hold(third, buckets[1], frozen=False)
+
+        allocator.run([second, third, fourth])
+
+        self.assertEqual(allocator.seat[3].branch, 'Z')
+        self.assertEqual(allocator.seat[2].branch, 'X')
+        self.assertNotIn(4, allocator.seat)
+        self.assertEqual(allocator.upgrades, 2)
+        self.assertTrue(all(bucket.free >= 0 for bucket in buckets.values()))
+
+
+def _branch(code='CE'):
+    university = UNIVERSITY.objects.create(
+        NAME='University', CODE=f'U-{code}', ADDRESS='-', CONTACT_NUMBER='1', EMAIL=f'u-{code}@example.com', ESTD_YEAR=1990,
+    )
+    institute = INSTITUTE.objects.create(
+        UNIVERSITY=university, NAME='Institute', CODE=f'I-{code}', ADDRESS='-', CONTACT_NUMBER='1',
+        EMAIL=f'i-{code}@example.com', ESTD_YEAR=1990,
+    )
+    program = PROGRAM.objects.create(INSTITUTE=institute, NAME='B.Tech', CODE='BT', DURATION_YEARS=4, LEVEL='UG', TYPE='FT')
+    return BRANCH.objects.create(PROGRAM=program, NAME='Computer', CODE=code)
+
+
+def _student(student_id, branch, year, academic_year='2025-26', **fields):
+    return STUDENT_MASTER.objects.create(
+        STUDENT_ID=student_id, INSTITUTE='I', ACADEMIC_YEAR=academic_year, BATCH='2028', ADMISSION_CATEGORY='3',
+        FORM_NO=int(student_id[-3:]), NAME='Test', SURNAME=student_id, GENDER='M', DOB=date(2007, 1, 1), MOB_NO='1',
+        EMAIL_ID='s@example.com', BRANCH_ID=branch, YEAR_SEM_ID=year.pk, **fields,
+    )
+
+
+class SeatRoundTest(TestCase):
+    def setUp(self):
+        branch = _branch()
+        year = YEAR.objects.create(YEAR='FY', BRANCH=branch)
+        SEAT_MATRIX.objects.create(ACADEMIC_YEAR='2025-26', BRANCH=branch, CATEGORY='OPEN', SEATS=2)
+        for number, mark in enumerate((90, 80, 70), start=1):
+            _student(f'CE25{number:03d}', branch, year, MARK_ID=str(mark))
+
+    def _round(self, round_no=1):
+        return dict(
+            SEAT_ALLOCATION.objects.filter(ROUND_NO=round_no, IS_DELETED=False)
+            .values_list('STUDENT__STUDENT_ID', 'STATUS')
+        )
+
+    def test_rerun_soft_deletes_the_replaced_rows(self):
+        run_round('2025-26', 1)
+        run_round('2025-26', 1)
+        self.assertEqual(self._round(), {'CE25001': 'ALLOTTED', 'CE25002': 'ALLOTTED', 'CE25003': 'NOT_ALLOTTED'})
+        self.assertEqual(SEAT_ALLOCATION.objects.filter(IS_DELETED=True).count(), 3)
+
+    def test_marked_round_is_not_rerun(self):
+        run_round('2025-26', 1)
+        SEAT_ALLOCATION.objects.filter(STUDENT__STUDENT_ID='CE25001').update(STATUS=SEAT_ALLOCATION.STATUS_FREEZE)
+        with self.assertRaises(AllocationError):
+            run_round('2025-26', 1)
+        self.assertEqual(self._round()['CE25001'], 'FREEZE')
+
+        # A seat frozen in round 1 is written as FREEZE by round 2, which stays rerunnable
+        run_round('2025-26', 2)
+        run_round('2025-26', 2)
+        self.assertEqual(self._round(2)['CE25001'], 'FREEZE')
+
+
+class PromotionFixture:
+    databases = {'default', 'progress'}
+
+    def setUp(self):
+        branch = _branch()
+        self.fy = YEAR.objects.create(YEAR='FY', BRANCH=branch)
+        self.sy = YEAR.objects.create(YEAR='SY', BRANCH=branch)
+        sem1 = SEMESTER.objects.create(SEMESTER='SEM 1', YEAR=self.fy)
+        sem3 = SEMESTER.objects.create(SEMESTER='SEM 3', YEAR=self.sy)
+        ACADEMIC_YEAR.objects.create(ACADEMIC_YEAR='2025-26', START_DATE=date(2025, 6, 1), END_DATE=date(2026, 5, 31))
+        for number in range(1, 4):
+            _student(f'CE25{number:03d}', branch, self.fy)
+        _student('CE25004', branch, self.fy, DATE_LEAVING=date(2025, 9, 1))
+        _student('CE24001', branch, self.sy)
+        self.job = {
+            'academic_year': '2025-26', 'to_academic_year': '2026-27',
+            'transitions': [
+                {'from_year': self.fy.pk, 'to_year': self.sy.pk, 'to_semester': sem3.pk, 'repeat_semester': sem1.pk},
+                {'from_year': self.sy.pk, 'to_year': None},
+            ],
+            'rules': {'detained': ['CE25003']},
+        }
+        self.admin = CustomUser(USER_ID='ADMIN1', USERNAME='admin1', IS_SUPERUSER=True)
+
+
+class PromotionTest(PromotionFixture, TestCase):
+    def _post(self, data):
+        request = APIRequestFactory().post('/api/students/promotions/', data, format='json')
+        force_authenticate(request, self.admin)
+        return PromotionView.as_view()(request)
+
+    def _placement(self, student_id):
+        student = STUDENT_MASTER.objects.get(STUDENT_ID=student_id)
+        return student.YEAR_SEM_ID, student.ACADEMIC_YEAR, student.STATUS
+
+    def test_post_without_apply_only_previews(self):
+        response = self._post(self.job)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['message'], 'Promotion previewed')
+        totals = response.data['data']['totals']
+        self.assertEqual((totals['promoted'], totals['detained'], totals['passed_out'], totals['left']), (2, 1, 1, 1))
+        self.assertEqual(self._placement('CE25001'), (self.fy.pk, '2025-26', 'ACTIVE'))
+        self.assertFalse(STUDENT_ACADEMIC_RECORD.objects.exists())
+
+    def test_apply_moves_every_outcome_once(self):
+        version = matrix._version(matrix.GLOBAL_VERSION_KEY)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self._post({**self.job, 'apply': True})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['message'], 'Students promoted')
+
+        self.assertEqual(self._placement('CE25001'), (self.sy.pk, '2026-27', 'ACTIVE'))
+        self.assertEqual(self._placement('CE25003'), (self.fy.pk, '2026-27', 'ACTIVE'))
+        self.assertEqual(self._placement('CE25004'), (self.fy.pk, '2025-26', 'ACTIVE'))
+        passed_out = STUDENT_MASTER.objects.get(STUDENT_ID='CE24001')
+        self.assertEqual((passed_out.STATUS, passed_out.DATE_LEAVING), ('PASSOUT', date(2026, 5, 31)))
+        self.assertEqual(STUDENT_ACADEMIC_RECORD.objects.filter(ACADEMIC_YEAR='2026-27').count(), 3)
+        self.assertEqual(STUDENT_ROLL_NUMBER_DETAILS.objects.filter(ACADEMIC_YEAR='2026-27').count(), 3)
+        # The UPDATEs skip the save signals, so the whole matrix cache is dropped
+        self.assertGreater(matrix._version(matrix.GLOBAL_VERSION_KEY), version)
+
+        response = self._post({**self.job, 'apply': True})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['data']['totals']['promoted'], 0)
+        self.assertEqual(STUDENT_ACADEMIC_RECORD.objects.filter(ACADEMIC_YEAR='2026-27').count(), 3)
+
+
+class PromotionProgressTest(PromotionFixture, TransactionTestCase):
+    def _fixture_teardown(self):
+        # flush skips the schema-qualified tables; truncating the fixture's
+        # roots clears everything the job wrote under them
+        tables = [UNIVERSITY._meta.db_table, ACADEMIC_YEAR._meta.db_table, 'CACHE_ENTRIES', PROGRESS_CACHE_TABLE]
+        with connection.cursor() as cursor:
+            cursor.execute(f'TRUNCATE {", ".join(map(connection.ops.quote_name, tables))} CASCADE')
+
+    def _seen_elsewhere(self, job):
+        """The published progress and CE25001's class, read on a new connection."""
+        other = connections.create_connection('default')
+        try:
+            with other.cursor() as cursor:
+                cursor.execute(f'SELECT value FROM "{PROGRESS_CACHE_TABLE}" WHERE cache_key = %s',
+                               [caches['progress'].make_key(progress_key(job))])
+                row = cursor.fetchone()
+                cursor.execute(f'SELECT "ACADEMIC_YEAR" FROM {STUDENT_MASTER._meta.db_table} WHERE "STUDENT_ID" = %s',
+                               ['CE25001'])
+                academic_year = cursor.fetchone()[0]
+        finally:
+            other.close()
+        return row and pickle.loads(base64.b64decode(row[0])), academic_year
+
+    def test_progress_is_visible_before_the_job_commits(self):
+        seen = []
+
+        def progress(stage, done, total):
+            if stage == 'students' and done:
+                seen.append(self._seen_elsewhere('job-1'))
+
+        promote(self.job, dry_run=False, job='job-1', progress=progress)
+        published, academic_year = seen[0]
+        self.assertEqual((published['state'], published['stage'], published['total']), ('RUNNING', 'students', 4))
+        self.assertEqual(academic_year, '2025-26')
+        self.assertEqual(get_progress('job-1')['state'], 'DONE')
+
+class RollNumberTest(TestCase):
+    def setUp(self):
+        self.branch = _branch()
+        self.year = YEAR.objects.create(YEAR='FY', BRANCH=self.branch)
+        self.semester = SEMESTER.objects.create(SEMESTER='SEM 1', YEAR=self.year)
+        self.students = [_student(f'CE25{number:03d}', self.branch, self.year) for number in range(1, 4)]
+
+    def _generate(self, **options):
+        summary = generate_roll_numbers(
+            self.branch.PROGRAM.INSTITUTE, self.branch, self.year, self.semester, '2025-26', **options
+        )
+        return [item['STUDENT_ID'] for item in summary['assignments']], summary
+
+    def test_merit_order_uses_admission_details(self):
+        first, second, third = self.students
+        STUDENT_DETAILS.objects.create(STUDENT=first, MERIT=None, SCORE=70)
+        STUDENT_DETAILS.objects.create(STUDENT=second, MERIT=60, SCORE=99)
+        STUDENT_DETAILS.objects.create(STUDENT=second, MERIT=95)  # the latest row wins
+        third.MARK_ID = 80
+        third.save()
+        order, _ = self._generate(order_by='merit')
+        self.assertEqual(order, ['CE25002', 'CE25003', 'CE25001'])
+
+    def test_full_mode_soft_deletes_and_keeps_numbers_reserved(self):
+        self._generate()
+        leaving = self.students[0]
+        leaving.DATE_LEAVING = date(2025, 9, 1)
+        leaving.save()
+
+        _, summary = self._generate(mode='full')
+        self.assertEqual(summary['removed'], 1)
+        row = STUDENT_ROLL_NUMBER_DETAILS.objects.get(STUDENT=leaving)
+        self.assertTrue(row.IS_DELETED)
+        self.assertEqual(row.ROLL_NO, 'CE25001')
+        numbers = dict(
+            STUDENT_ROLL_NUMBER_DETAILS.objects.filter(IS_DELETED=False).values_list('STUDENT__STUDENT_ID', 'ROLL_NO')
+        )
+        self.assertEqual(numbers, {'CE25002': 'CE25002', 'CE25003': 'CE25003'})
+
+        _, summary = self._generate(mode='full')
+        self.assertEqual((summary['removed'], summary['unchanged']), (0, 2))
+
+    def test_number_taken_meanwhile_is_reported(self):
+        late = _student('CE25009', self.branch, self.year, DATE_LEAVING=date(2025, 9, 1))
+        upsert = rollnumbers.upsert_roll_numbers
+
+        def roster_saved_first(rows):
+            # Another request stores a number of this run before it writes
+            upsert([STUDENT_ROLL_NUMBER_DETAILS(
+                STUDENT=late, INSTITUTE=self.branch.PROGRAM.INSTITUTE, BRANCH=self.branch, YEAR=self.year,
+                SEMESTER=self.semester, ACADEMIC_YEAR='2025-26', ROLL_NO='CE25001',
+            )])
+            upsert(rows)
+
+        with mock.patch.object(rollnumbers, 'upsert_roll_numbers', roster_saved_first), \
+                self.assertLogs('student.rollnumbers', 'WARNING'), self.assertRaises(RollNumberError):
+            self._generate()
+        self.assertFalse(STUDENT_ROLL_NUMBER_DETAILS.objects.exists())
+
+    def _roster(self, numbers):
+        return [
+            {'STUDENT': student_id, 'INSTITUTE': self.branch.PROGRAM.INSTITUTE_id, 'BRANCH': self.branch.pk,
+             'YEAR': self.year.pk, 'SEMESTER': self.semester.pk, 'ACADEMIC_YEAR': '2025-26', 'ROLL_NO': roll_no}
+            for student_id, roll_no in numbers.items()
+        ]
+
+    def _numbers(self):
+        return dict(STUDENT_ROLL_NUMBER_DETAILS.objects.values_list('STUDENT__STUDENT_ID', 'ROLL_NO'))
+
+    def test_posted_roster_is_upserted(self):
+        keys, errors = save_roll_numbers(self._roster({'CE25001': 'R1', 'CE25002': 'R2'}))
+        self.assertEqual((len(keys), errors), (2, [{}, {}]))
+        # Swapping two numbers in one roster passes the deferred class constraint
+        save_roll_numbers(self._roster({'CE25001': 'R2', 'CE25002': 'R1'}))
+        self.assertEqual(self._numbers(), {'CE25001': 'R2', 'CE25002': 'R1'})
+
+    def test_invalid_roster_writes_nothing(self):
+        keys, errors = save_roll_numbers(self._roster({'CE25001': 'R1', 'CE25002': 'R1', 'CE99999': 'R3'}))
+        self.assertEqual(keys, [])
+        self.assertEqual(errors[0], {})
+        self.assertIn('ROLL_NO', errors[1])
+        self.assertIn('STUDENT', errors[2])
+        self.assertEqual(self._numbers(), {})
+
+        save_roll_numbers(self._roster({'CE25001': 'R1'}))
+        with self.assertLogs('student.rollnumbers', 'WARNING'), self.assertRaises(RollNumberError):
+            save_roll_numbers(self._roster({'CE25002': 'R1'}))
+
+class DocumentArchiveTest(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.settings = override_settings(MEDIA_ROOT=self.media_root)
+        self.settings.enable()
+        branch = _branch()
+        self.student = _student('CE25001', branch, YEAR.objects.create(YEAR='FY', BRANCH=branch))
+
+    def tearDown(self):
+        self.settings.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+
+    def _document(self, content, **fields):
+        document = STUDENT_DOCUMENTS(STUDENT=self.student, **fields)
+        document.DOC_IMAGES.save('scan.pdf', ContentFile(content))
+        return document
+
+    def test_every_document_row_is_archived(self):
+        tc = CHECK_LIST_DOCUMENTS.objects.create(NAME='TC', IS_MANDATORY=True)
+        CHECK_LIST_DOCUMENTS.objects.create(NAME='Caste certificate')
+        self._document(b'tc scan', DOCUMENT_ID=tc, DEFICIENCY='Y')
+        self._document(b'first loose scan')
+        self._document(b'second loose scan')
+
+        archive = DocumentArchive([self.student], documents_for([self.student]))
+        data = b''.join(archive.stream())
+        self.assertEqual(len(data), archive.length)
+
+        with zipfile.ZipFile(io.BytesIO(data)) as bundle:
+            self.assertIsNone(bundle.testzip())
+            contents = sorted(bundle.read(name) for name in bundle.namelist() if name != MANIFEST_NAME)
+            manifest = list(csv.DictReader(io.StringIO(bundle.read(MANIFEST_NAME).decode('utf-8-sig'))))
+        self.assertEqual(contents, [b'first loose scan', b'second loose scan', b'tc scan'])
+        self.assertEqual([row['STATUS'] for row in manifest], ['SUBMITTED', 'MISSING', 'SUBMITTED', 'SUBMITTED'])
+        self.assertEqual([row['DEFICIENCY'] for row in manifest], ['Y', '', '', ''])
+
+    def test_anonymous_callers_cannot_download(self):
+        self._document(b'tc scan')
+        response = APIClient().get('/api/master/document-submission/archive/', {'student': 'CE25001'})
+        self.assertEqual(response.status_code, 401)
+
+    def test_ranged_stream_matches_the_whole(self):
+        self._document(b'x' * 5000)
+        archive = DocumentArchive([self.student], documents_for([self.student]))
+        whole = b''.join(archive.stream())
+        self.assertEqual(b''.join(archive.stream(100, 4200)), whole[100:4201])
+
+
+class SemesterResultTest(SimpleTestCase):
+    # student, curriculum, semester, credits, grade_points, passed, examination
+    RESULTS = np.array([
+        [1, 1, 1, 4, 9, 1, 10],
+        [1, 2, 1, 3, 0, 0, 10],
+        [1, 2, 1, 3, 7, 1, 11],
+        [1, 3, 2, 4, 8, 1, 11],
+        [2, 1, 1, 4, 6, 1, 10],
+    ], dtype=np.float64)
+
+    def _computed(self, results, examination_id):
+        computed = compute_semester_results(results, examination_id)
+        return [
+            tuple(computed[name][index].item() for name in (
+                'student', 'semester', 'credits_earned', 'sgpa', 'cgpa', 'backlogs', 'total_backlogs'))
+            for index in range(len(computed['student']))
+        ]
+
+    def test_failed_course_stays_in_the_denominator(self):
+        first_exam = self.RESULTS[self.RESULTS[:, 6] == 10]
+        self.assertEqual(self._computed(first_exam, 10), [
+            (1, 1, 4.0, 5.14, 5.14, 1, 1),
+            (2, 1, 4.0, 6.0, 6.0, 0, 0),
+        ])
+
+    def test_best_attempt_clears_the_backlog(self):
+        # The retake touches semester 1 again; student 2 did not sit exam 11
+        self.assertEqual(self._computed(self.RESULTS, 11), [
+            (1, 1, 7.0, 8.14, 8.14, 0, 0),
+            (1, 2, 4.0, 8.0, 8.09, 0, 0),
+        ])
+
+    def test_no_results(self):
+        self.assertEqual(self._computed(np.empty((0, 7)), 11), [])
+
+
+class AttendanceTest(TestCase):
+    def setUp(self):
+        self.branch = _branch()
+        self.year = YEAR.objects.create(YEAR='FY', BRANCH=self.branch)
+        self.semester = SEMESTER.objects.create(SEMESTER='SEM 1', YEAR=self.year)
+        academic_year = ACADEMIC_YEAR.objects.create(ACADEMIC_YEAR='2025-26', START_DATE=date(2025, 6, 1),
+                                                     END_DATE=date(2026, 5, 31))
+        course = COURSE.objects.create(CODE='CS101', NAME='Programming', CREDITS=4, LECTURE_HOURS=3)
+        self.curriculum = CURRICULUM.objects.create(BRANCH=self.branch, PROGRAM=self.branch.PROGRAM,
+                                                    ACADEMIC_YEAR=academic_year, COURSE=course, SEMESTER=1)
+        for number in (3, 1, 2):
+            self._enrol(f'CE25{number:03d}', f'R{number:02d}')
+
+    def _enrol(self, student_id, roll_no):
+        return STUDENT_ROLL_NUMBER_DETAILS.objects.create(
+            STUDENT=_student(student_id, self.branch, self.year), INSTITUTE=self.branch.PROGRAM.INSTITUTE,
+            BRANCH=self.branch, YEAR=self.year, SEMESTER=self.semester, ACADEMIC_YEAR='2025-26', ROLL_NO=roll_no,
+        )
+
+    def _mark(self, *sessions):
+        return attendance.mark({
+            'curriculum': self.curriculum.pk, 'semester': self.semester.pk, 'sessions': list(sessions),
+        })
+
+    def _report(self):
+        roster = attendance.find_roster(self.curriculum.pk, self.semester.pk)
+        return {row['roll_no']: (row['held'], row['attended']) for row in attendance.class_report(roster)['students']}
+
+    def test_bitmaps_are_least_significant_bit_first(self):
+        bitmap = attendance.pack([True, False, False, False, False, False, False, False, False, True])
+        self.assertEqual(bitmap, bytes([0b00000001, 0b00000010]))
+        self.assertEqual(attendance.unpack(bitmap, 12).tolist(), [True] + [False] * 8 + [True, False, False])
+        self.assertEqual(attendance.popcount(bitmap), 2)
+
+    def test_class_is_marked_by_its_exceptions(self):
+        summary = self._mark(
+            {'date': '2025-08-04', 'period': 1, 'absent': ['R02']},
+            {'date': '2025-08-04', 'period': 2, 'present': ['R01']},
+        )
+        self.assertEqual((summary['members_added'], summary['written']), (3, 2))
+        self.assertEqual([session['absent'] for session in summary['sessions']], [1, 2])
+        self.assertEqual(self._report(), {'R01': (2, 2), 'R02': (2, 0), 'R03': (2, 1)})
+
+        # Marking a slot again replaces it
+        self._mark({'date': '2025-08-04', 'period': 2, 'absent': []})
+        self.assertEqual(self._report(), {'R01': (2, 2), 'R02': (2, 1), 'R03': (2, 2)})
+
+    def test_late_joiner_keeps_earlier_positions(self):
+        self._mark({'date': '2025-08-04', 'period': 1, 'absent': ['R02']})
+        late = self._enrol('CE25004', 'R00')
+        self._mark({'date': '2025-08-05', 'period': 1, 'absent': ['R00']})
+
+        positions = dict(ATTENDANCE_ROSTER_MEMBER.objects.values_list('ROLL__ROLL_NO', 'POSITION'))
+        self.assertEqual(positions, {'R01': 0, 'R02': 1, 'R03': 2, 'R00': 3})
+        self.assertEqual(self._report(), {'R00': (1, 0), 'R01': (2, 2), 'R02': (2, 1), 'R03': (2, 2)})
+        report = attendance.student_report(late.STUDENT_id)
+        self.assertEqual((report['held'], report['attended'], report['percentage']), (1, 0, 0.0))
+
+    def test_bad_sessions_are_all_reported(self):
+        with self.assertRaises(attendance.AttendanceError) as caught:
+            self._mark(
+                {'date': '2025-08-04', 'period': 1, 'absent': ['R09']},
+                {'date': 'someday', 'period': 1},
+                {'date': '2025-08-04', 'period': 1, 'present': []},
+            )
+        self.assertEqual([error['session'] for error in caught.exception.errors], [0, 1, 2])
+        self.assertFalse(ATTENDANCE_SESSION.objects.exists())
+
+
+    def _summaries(self):
+        return {
+            roll_no: (held, attended, percent)
+            for roll_no, held, attended, percent in ATTENDANCE_SUMMARY.objects.values_list(
+                'ROLL__ROLL_NO', 'HELD', 'ATTENDED', 'PERCENTAGE')
+        }
+
+    def test_counters_follow_every_write(self):
+        self._mark(
+            {'date': '2025-08-04', 'period': 1, 'absent': ['R02']},
+            {'date': '2025-08-04', 'period': 2, 'absent': ['R02', 'R03']},
+            {'date': '2025-08-05', 'period': 1, 'absent': []},
+        )
+        self._mark({'date': '2025-08-04', 'period': 2, 'absent': ['R01']})
+        self._enrol('CE25004', 'R04')
+        self._mark({'date': '2025-08-06', 'period': 1, 'absent': ['R04']})
+        attendance.delete_session(ATTENDANCE_SESSION.objects.get(SESSION_DATE=date(2025, 8, 5)))
+
+        self.assertEqual(self._summaries(), {
+            'R01': (3, 2, Decimal('66.67')), 'R02': (3, 2, Decimal('66.67')),
+            'R03': (3, 3, Decimal('100.00')), 'R04': (1, 0, Decimal('0.00')),
+        })
+        # The incremental counters agree with a rebuild from the bitmaps
+        self.assertEqual(attendance.rebuild_summaries(dry_run=True)['drifted'], 0)
+
+    def test_rebuild_repairs_drifted_counters(self):
+        self._mark({'date': '2025-08-04', 'period': 1, 'absent': ['R02']})
+        ATTENDANCE_SUMMARY.objects.update(HELD=9, ATTENDED=9)
+        self.assertEqual(attendance.rebuild_summaries(), {'rosters': 1, 'members': 3, 'drifted': 3})
+        self.assertEqual(self._summaries()['R02'], (1, 0, Decimal('0.00')))
+        self.assertEqual(attendance.rebuild_summaries(dry_run=True)['drifted'], 0)
+
+    def test_shortage_lists_members_below_the_threshold(self):
+        self._mark(
+            {'date': '2025-08-04', 'period': 1, 'absent': ['R02']},
+            {'date': '2025-08-04', 'period': 2, 'absent': ['R02', 'R03']},
+            {'date': '2025-08-05', 'period': 1, 'absent': ['R03']},
+        )
+        report = attendance.shortage(self.branch.pk, self.semester.pk, threshold=75)
+        self.assertEqual([(row['roll_no'], row['percentage']) for row in report['shortages']],
+                         [('R02', 33.33), ('R03', 33.33)])
+        report = attendance.shortage(self.branch.pk, self.semester.pk, threshold=30)
+        self.assertEqual(report['students'], 0)
+
+
+class DocumentMatrixTest(TestCase):
+    def setUp(self):
+        self.branch = _branch()
+        year = YEAR.objects.create(YEAR='FY', BRANCH=self.branch)
+        self.tc = CHECK_LIST_DOCUMENTS.objects.create(NAME='TC', IS_MANDATORY=True)
+        self.marksheet = CHECK_LIST_DOCUMENTS.objects.create(NAME='Marksheet', IS_MANDATORY=True)
+        CHECK_LIST_DOCUMENTS.objects.create(NAME='Caste certificate')
+        self.asha = _student('CE25001', self.branch, year)
+        self.ravi = _student('CE25002', self.branch, year)
+        STUDENT_DOCUMENTS.objects.create(STUDENT=self.asha, DOCUMENT_ID=self.tc)
+        STUDENT_DOCUMENTS.objects.create(STUDENT=self.asha, DOCUMENT_ID=self.marksheet, RETURN='Y')
+        STUDENT_DOCUMENTS.objects.create(STUDENT=self.ravi, DOCUMENT_ID=self.tc, DEFICIENCY='Y')
+
+    def test_cells_and_counts(self):
+        grid = matrix.build_matrix(self.branch.pk, '2028')
+        self.assertEqual([document['name'] for document in grid['documents']], ['TC', 'Marksheet'])
+        self.assertEqual([row[2] for row in grid['students']], ['13', '50'])
+        self.assertEqual(grid['counts'][0], {'submitted': 2, 'returned': 0, 'deficient': 1, 'missing': 0})
+        self.assertEqual(grid['counts'][1], {'submitted': 1, 'returned': 1, 'deficient': 0, 'missing': 1})
+        self.assertEqual((grid['complete'], grid['total']), (1, 2))
+        self.assertEqual(len(matrix.build_matrix(self.branch.pk, '2028', mandatory_only=False)['documents']), 3)
+
+    def test_anonymous_callers_are_refused(self):
+        response = APIClient().get('/api/master/document-submission/matrix/', {'branch': self.branch.pk, 'batch': '2028'})
+        self.assertEqual(response.status_code, 401)
+
+    def test_cache_follows_document_writes(self):
+        self.assertEqual(matrix.cached_matrix(self.branch.pk, '2028')['complete'], 1)
+        with self.assertNumQueries(3):
+            # Only the two version lookups and the cached entry
+            matrix.cached_matrix(self.branch.pk, '2028')
+
+        STUDENT_DOCUMENTS.objects.filter(STUDENT=self.ravi).update(DEFICIENCY='N')
+        self.assertEqual(matrix.cached_matrix(self.branch.pk, '2028')['complete'], 1)
+        STUDENT_DOCUMENTS.objects.create(STUDENT=self.ravi, DOCUMENT_ID=self.marksheet)
+        self.assertEqual(matrix.cached_matrix(self.branch.pk, '2028')['complete'], 2)
+
+
+class DocumentUploadTest(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.settings = override_settings(MEDIA_ROOT=self.media_root,
+                                          DOCUMENT_UPLOAD_TEMP_DIR=os.path.join(self.media_root, '.uploads'))
+        self.settings.enable()
+        branch = _branch()
+        student = _student('CE25001', branch, YEAR.objects.create(YEAR='FY', BRANCH=branch))
+        self.document = STUDENT_DOCUMENTS.objects.create(STUDENT=student)
+        self.content = b'0123456789' * 10
+
+    def tearDown(self):
+        self.settings.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+
+    def _put(self, upload, offset, chunk, checksum=None):
+        return append_chunk(upload.pk, offset, io.BytesIO(chunk), len(chunk), checksum)
+
+    def test_anonymous_callers_cannot_upload(self):
+        response = APIClient().post(f'/api/master/document-submission/{self.document.pk}/uploads/',
+                                    {'filename': 'tc.pdf', 'size': 100}, format='json')
+        self.assertEqual(response.status_code, 401)
+        self.assertFalse(DOCUMENT_UPLOAD.objects.exists())
+
+    def test_chunks_resume_from_the_server_offset(self):
+        upload = start_upload(self.document, 'tc.pdf', len(self.content), hashlib.sha256(self.content).hexdigest())
+        self._put(upload, 0, self.content[:40])
+        with self.assertRaises(UploadError) as caught:
+            self._put(upload, 0, self.content[:40])
+        self.assertEqual((caught.exception.status_code, caught.exception.upload.RECEIVED), (409, 40))
+
+        upload = self._put(upload, 40, self.content[40:])
+        self.assertEqual(upload.STATUS, DOCUMENT_UPLOAD.STATUS_COMPLETED)
+        self.document.refresh_from_db()
+        with self.document.DOC_IMAGES.open('rb') as handle:
+            self.assertEqual(handle.read(), self.content)
+        self.assertFalse(os.path.exists(upload.TEMP_PATH))
+
+    def test_interrupted_assembly_is_finished_by_an_empty_put(self):
+        upload = start_upload(self.document, 'tc.pdf', len(self.content), hashlib.sha256(self.content).hexdigest())
+        with mock.patch.object(uploads, '_finalize', side_effect=RuntimeError('worker killed')), \
+                self.assertRaises(RuntimeError):
+            self._put(upload, 0, self.content)
+        upload.refresh_from_db()
+        self.assertEqual((upload.RECEIVED, upload.STATUS), (len(self.content), DOCUMENT_UPLOAD.STATUS_PENDING))
+
+        upload = self._put(upload, len(self.content), b'')
+        self.assertEqual(upload.STATUS, DOCUMENT_UPLOAD.STATUS_COMPLETED)
+        self.document.refresh_from_db()
+        with self.document.DOC_IMAGES.open('rb') as handle:
+            self.assertEqual(handle.read(), self.content)
+        with self.assertRaises(UploadError) as caught:
+            self._put(upload, len(self.content), b'')
+        self.assertEqual(caught.exception.status_code, 409)
+
+    def test_bad_chunk_checksum_keeps_the_offset(self):
+        upload = start_upload(self.document, 'tc.pdf', len(self.content))
+        with self.assertRaises(UploadError) as caught:
+            self._put(upload, 0, self.content[:50], 'sha256 ' + hashlib.sha256(b'other').hexdigest())
+        self.assertEqual(caught.exception.status_code, 460)
+        upload.refresh_from_db()
+        self.assertEqual(upload.RECEIVED, 0)
+        self.assertEqual(os.path.getsize(upload.TEMP_PATH), 0)
+
+    def test_corrupt_file_resets_the_upload(self):
+        upload = start_upload(self.document, 'tc.pdf', len(self.content), hashlib.sha256(b'other').hexdigest())
+        with self.assertRaises(UploadError) as caught:
+            self._put(upload, 0, self.content)
+        self.assertEqual(caught.exception.status_code, 422)
+        upload.refresh_from_db()
+        self.assertEqual((upload.RECEIVED, upload.STATUS), (0, DOCUMENT_UPLOAD.STATUS_PENDING))
+
+    def test_chunk_past_declared_size_is_rejected(self):
+        upload = start_upload(self.document, 'tc.pdf', 10)
+        with self.assertRaises(UploadError) as caught:
+            self._put(upload, 0, self.content[:11])
+        self.assertEqual(caught.exception.status_code, 413)
+
+    def test_expired_uploads_are_purged(self):
+        upload = start_upload(self.document, 'tc.pdf', len(self.content))
+        DOCUMENT_UPLOAD.objects.filter(pk=upload.pk).update(EXPIRES_AT=timezone.now() - timedelta(seconds=1))
+        with self.assertRaises(UploadError) as caught:
+            self._put(upload, 0, self.content)
+        self.assertEqual(caught.exception.status_code, 404)
+        self.assertEqual(purge_expired_uploads(), 1)
+        self.assertFalse(os.path.exists(upload.TEMP_PATH))
+
+
+class StudentOnboardingTest(TestCase):
+    def setUp(self):
+        self.branch = _branch()
+        self.year = YEAR.objects.create(YEAR='FY', BRANCH=self.branch)
+        self.admin = CustomUser(USER_ID='ADMIN1', USERNAME='admin1', IS_SUPERUSER=True)
+
+    def _create(self, **overrides):
+        data = {
+            'INSTITUTE': 'I', 'ACADEMIC_YEAR': '2025-26', 'BATCH': '2029', 'ADMISSION_CATEGORY': '3',
+            'ADMN_QUOTA_ID': 1, 'YEAR_ID': self.year.pk, 'FORM_NO': 101, 'NAME': 'Asha', 'SURNAME': 'Patil',
+            'FATHER_NAME': 'Ravi', 'PARENT_NAME': 'Ravi Patil', 'GENDER': 'female', 'DOB': '2007-01-01',
+            'MOB_NO': '9999999999', 'EMAIL_ID': 'asha.patil@example.com', 'PER_ADDRESS': 'Pune',
+            'BRANCH_ID': self.branch.pk,
+            **overrides,
+        }
+        request = APIRequestFactory().post('/api/students/', data, format='json')
+        force_authenticate(request, self.admin)
+        return StudentMasterViewSet.as_view({'post': 'create'})(request)
+
+    def test_admission_writes_every_row_and_mails_after_commit(self):
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            response = self._create()
+            self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(response.status_code, 201, response.data)
+        self.assertEqual(len(callbacks), 1)
+
+        student = STUDENT_MASTER.objects.get()
+        self.assertTrue(STUDENT_DETAILS.objects.filter(STUDENT=student).exists())
+        self.assertTrue(STUDENT_ACADEMIC_RECORD.objects.filter(STUDENT_ID=student.STUDENT_ID).exists())
+        user = CustomUser.objects.get(USER_ID=student.STUDENT_ID)
+        self.assertTrue(user.check_password(student.STUDENT_ID))
+        self.assertEqual(PASSWORD_HISTORY.objects.filter(USER=user).count(), 1)
+        self.assertEqual(len(mail.outbox), 1)
+
+    def test_failure_rolls_back_the_whole_admission(self):
+        CustomUser.objects.create(USER_ID='OTHER', USERNAME='asha.patil', EMAIL='other@example.com')
+        with self.assertLogs('student.views', 'ERROR'):
+            response = self._create()
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(STUDENT_MASTER.objects.exists())
+        self.assertFalse(STUDENT_DETAILS.objects.exists())
+        self.assertFalse(STUDENT_ACADEMIC_RECORD.objects.exists())
+
+    def test_non_numeric_category_is_rejected(self):
+        self.assertEqual(self._create(ADMISSION_CATEGORY='OPEN').status_code, 400)
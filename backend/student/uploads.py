@@ -0,0 +1,240 @@
+"""
+Resumable chunked uploads for STUDENT_DOCUMENTS.DOC_IMAGES.
+
+1. POST /api/master/document-submission/<id>/uploads/
+       {"filename": "tc.pdf", "size": 48213311, "sha256": "<hex, optional>"}
+   opens an upload session and returns its upload_id.
+2. PUT /api/master/document-submission/uploads/<upload_id>/
+       Upload-Offset: <bytes already sent>, body = raw bytes of the next chunk
+   appends a chunk. A wrong offset gets 409 with the server's offset, so a
+   client that lost track sends HEAD (or GET) for the offset and continues.
+   An optional Upload-Checksum: sha256 <hex> header makes the chunk
+   all-or-nothing.
+3. The PUT that completes the file verifies the whole-file SHA-256 and
+   attaches the file to the STUDENT_DOCUMENTS row. If that PUT is cut off
+   after its last byte was stored, an empty PUT at offset = size attaches
+   the file again.
+
+Chunks are streamed from the request straight into a part file under
+MEDIA_ROOT, so no request holds more than CHUNK_READ_SIZE bytes in memory.
+A finished file is hashed and copied into the blob store (core/storage.py)
+outside any transaction; only the switch of the document's file takes the
+upload's row lock.
+"""
+import hashlib
+import logging
+import os
+import re
+import uuid
+
+from django.conf import settings
+from django.core.files import File
+from django.db import transaction
+from django.utils import timezone
+from rest_framework import status
+
+from .models import DOCUMENT_UPLOAD
+
+logger = logging.getLogger(__name__)
+
+CHUNK_READ_SIZE = 64 * 1024
+HASH_READ_SIZE = 1024 * 1024
+SHA256_RE = re.compile(r'^[0-9a-f]{64}$')
+
+
+def _max_size():
+    return getattr(settings, 'DOCUMENT_UPLOAD_MAX_SIZE', 100 * 1024 * 1024)
+
+
+def _max_chunk():
+    return getattr(settings, 'DOCUMENT_UPLOAD_MAX_CHUNK', 16 * 1024 * 1024)
+
+
+def _ttl():
+    return getattr(settings, 'DOCUMENT_UPLOAD_TTL', timezone.timedelta(hours=24))
+
+
+def _temp_dir():
+    return getattr(settings, 'DOCUMENT_UPLOAD_TEMP_DIR', os.path.join(settings.MEDIA_ROOT, '.uploads'))
+
+
+class UploadError(Exception):
+    def __init__(self, message, status_code=status.HTTP_400_BAD_REQUEST, upload=None):
+        super().__init__(message)
+        self.message = message
+        self.status_code = status_code
+        self.upload = upload
+
+
+def start_upload(document, filename, total_size, sha256='', username=None):
+    filename = os.path.basename(str(filename or '')).strip()
+    if not filename:
+        raise UploadError('filename is required')
+    try:
+        total_size = int(total_size)
+    except (TypeError, ValueError):
+        raise UploadError('size must be the file size in bytes')
+    if total_size <= 0 or total_size > _max_size():
+        raise UploadError(f'size must be between 1 and {_max_size()} bytes')
+    sha256 = (sha256 or '').strip().lower()
+    if sha256 and not SHA256_RE.match(sha256):
+        raise UploadError('sha256 must be a hex encoded SHA-256 digest')
+
+    upload_id = uuid.uuid4()
+    os.makedirs(_temp_dir(), exist_ok=True)
+    temp_path = os.path.join(_temp_dir(), f'{upload_id}.part')
+    open(temp_path, 'wb').close()
+
+    return DOCUMENT_UPLOAD.objects.create(
+        UPLOAD_ID=upload_id,
+        DOCUMENT=document,
+        FILENAME=filename[:255],
+        TOTAL_SIZE=total_size,
+        SHA256=sha256,
+        TEMP_PATH=temp_path,
+        CREATED_BY=username,
+        EXPIRES_AT=timezone.now() + _ttl(),
+    )
+
+
+def _parse_checksum(header):
+    if not header:
+        return None
+    algorithm, _, digest = header.strip().partition(' ')
+    digest = digest.strip().lower()
+    if algorithm.lower() != 'sha256' or not SHA256_RE.match(digest):
+        raise UploadError('Upload-Checksum must be "sha256 <hex digest>"')
+    return digest
+
+
+def append_chunk(upload_id, offset, stream, length, checksum_header=None, username=None):
+    """
+    Append length bytes read from stream at offset. Returns the upload, which
+    is COMPLETED once the last byte has arrived and the file is attached.
+    """
+    try:
+        offset = int(offset)
+        length = int(length)
+    except (TypeError, ValueError):
+        raise UploadError('Upload-Offset and Content-Length headers are required')
+    if length < 0 or length > _max_chunk():
+        raise UploadError(f'Chunks must be between 1 and {_max_chunk()} bytes')
+    expected_digest = _parse_checksum(checksum_header)
+
+    with transaction.atomic():
+        # The row lock keeps two PUTs for the same upload from interleaving
+        upload = DOCUMENT_UPLOAD.objects.select_for_update().filter(UPLOAD_ID=upload_id).first()
+        if upload is None or upload.EXPIRES_AT <= timezone.now():
+            raise UploadError('Upload not found or expired', status.HTTP_404_NOT_FOUND)
+        if upload.STATUS == DOCUMENT_UPLOAD.STATUS_COMPLETED:
+            raise UploadError('Upload already completed', status.HTTP_409_CONFLICT, upload)
+        if offset != upload.RECEIVED:
+            raise UploadError(
+                f'Expected offset {upload.RECEIVED}', status.HTTP_409_CONFLICT, upload
+            )
+        if offset + length > upload.TOTAL_SIZE:
+            raise UploadError(
+                f'Chunk runs past the declared size of {upload.TOTAL_SIZE} bytes',
+                status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, upload
+            )
+        if not length and offset < upload.TOTAL_SIZE:
+            raise UploadError(f'Chunks must be between 1 and {_max_chunk()} bytes', upload=upload)
+
+        digest = hashlib.sha256() if expected_digest else None
+        written = 0
+        with open(upload.TEMP_PATH, 'r+b') as part:
+            part.seek(offset)
+            while written < length:
+                piece = stream.read(min(CHUNK_READ_SIZE, length - written))
+                if not piece:
+                    break
+                part.write(piece)
+                if digest:
+                    digest.update(piece)
+                written += len(piece)
+
+            if digest and (written != length or digest.hexdigest() != expected_digest):
+                part.truncate(offset)
+                # 460 Checksum Mismatch, as in the tus protocol
+                raise UploadError(
+                    'Chunk checksum mismatch; resend the chunk', 460, upload
+                )
+            part.truncate(offset + written)
+            part.flush()
+            os.fsync(part.fileno())
+
+        upload.RECEIVED = offset + written
+        upload.save(update_fields=['RECEIVED', 'UPDATED_AT'])
+
+    if upload.RECEIVED == upload.TOTAL_SIZE:
+        return _finalize(upload, username)
+    return upload
+
+
+def _file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as handle:
+        for piece in iter(lambda: handle.read(HASH_READ_SIZE), b''):
+            digest.update(piece)
+    return digest.hexdigest()
+
+
+def _locked(upload):
+    return DOCUMENT_UPLOAD.objects.select_for_update().get(pk=upload.pk)
+
+
+def _finalize(upload, username):
+    """
+    Verify and attach the assembled file. Returns the COMPLETED upload, or
+    raises UploadError when the file is corrupt.
+    """
+    try:
+        if upload.SHA256 and _file_sha256(upload.TEMP_PATH) != upload.SHA256:
+            with transaction.atomic():
+                upload = _locked(upload)
+                if upload.STATUS == DOCUMENT_UPLOAD.STATUS_PENDING and upload.RECEIVED == upload.TOTAL_SIZE:
+                    # Start over rather than keep a corrupt file
+                    with open(upload.TEMP_PATH, 'r+b') as part:
+                        part.truncate(0)
+                    upload.RECEIVED = 0
+                    upload.save(update_fields=['RECEIVED', 'UPDATED_AT'])
+            raise UploadError(
+                'File checksum mismatch; the upload was reset to offset 0',
+                status.HTTP_422_UNPROCESSABLE_ENTITY, upload
+            )
+
+        document = upload.DOCUMENT
+        with open(upload.TEMP_PATH, 'rb') as handle:
+            document.DOC_IMAGES.save(upload.FILENAME, File(handle), save=False)
+    except FileNotFoundError:
+        # A retried PUT attached the file and removed the part file meanwhile
+        raise UploadError('Upload already completed', status.HTTP_409_CONFLICT, upload)
+
+    with transaction.atomic():
+        upload = _locked(upload)
+        if upload.STATUS == DOCUMENT_UPLOAD.STATUS_COMPLETED:
+            document.DOC_IMAGES.storage.delete(document.DOC_IMAGES.name)
+            raise UploadError('Upload already completed', status.HTTP_409_CONFLICT, upload)
+        document.UPDATED_BY = username or document.UPDATED_BY
+        document.save(update_fields=['DOC_IMAGES', 'UPDATED_BY', 'UPDATED_AT'])
+        upload.STATUS = DOCUMENT_UPLOAD.STATUS_COMPLETED
+        upload.save(update_fields=['STATUS', 'UPDATED_AT'])
+
+    if os.path.exists(upload.TEMP_PATH):
+        os.remove(upload.TEMP_PATH)
+    logger.info("Upload %s attached to document %s as %s", upload.pk, document.pk, document.DOC_IMAGES.name)
+    return upload
+
+
+def cancel_upload(upload):
+    if os.path.exists(upload.TEMP_PATH):
+        os.remove(upload.TEMP_PATH)
+    upload.delete()
+
+
+def purge_expired_uploads():
+    """Remove expired sessions and their part files. Returns the number removed."""
+    expired = list(DOCUMENT_UPLOAD.objects.filter(EXPIRES_AT__lte=timezone.now()))
+    for upload in expired:
+        cancel_upload(upload)
+    return len(expired)
@@ -14,11 +14,15 @@ router.register('student', StudentMasterViewSet, basename='student')  # Changed
 router.register(r'master/checklist', views.CheckListDocumentsViewSet, basename='checklist')
 router.register(r'master/document-submission', views.StudentDocumentsViewSet, basename='student-documents')
 router.register('master/rollnumbers', StudentRollNumberDetailsViewSet, basename='rollnumbers')  # Added this line
+router.register(r'master/seat-matrix', views.SeatMatrixViewSet, basename='seat-matrix')
+router.register(r'admissions/allocations', views.SeatAllocationViewSet, basename='seat-allocations')
+router.register(r'attendance/sessions', views.AttendanceSessionViewSet, basename='attendance-sessions')
 
 
 urlpatterns = [
     path('', include(router.urls)),  # Changed from 'student/' to ''
     path('return-documents/', return_documents, name='return-documents'),
+    path('students/promotions/', views.PromotionView.as_view(), name='student-promotions'),
 
    
 ]
@@ -8,8 +8,9 @@ from django.core.mail import send_mail
 from .models import STUDENT_MASTER, BRANCH, STUDENT_DETAILS, STUDENT_ACADEMIC_RECORD
 from .serializers import StudentMasterSerializer
 from .models import STUDENT_MASTER, BRANCH ,STUDENT_ROLL_NUMBER_DETAILS
-from .models import STUDENT_MASTER, BRANCH, STUDENT_DETAILS, CHECK_LIST_DOCUMENTS, STUDENT_DOCUMENTS
+from .models import STUDENT_MASTER, BRANCH, STUDENT_DETAILS, CHECK_LIST_DOCUMENTS, STUDENT_DOCUMENTS, SEAT_MATRIX, SEAT_ALLOCATION, ATTENDANCE_SESSION
 from .serializers import StudentMasterSerializer, CheckListDoumentsSerializer, StudentDocumentsSerializer, StudentRollNumberDetailsSerializer
+from .serializers import SeatMatrixSerializer, SeatAllocationSerializer, AttendanceSessionSerializer
 from django.conf import settings
 import logging
 from django.http import Http404
@@ -21,9 +22,20 @@ from utils.id_generators import generate_student_id
 from django.contrib.auth import get_user_model
 from utils.id_generators import generate_password
 from accounts.models import DESIGNATION
-from accounts.models import CustomUser, YEAR
+from accounts.models import CustomUser, INSTITUTE, SEMESTER, YEAR, PASSWORD_HISTORY
 from accounts.views import BaseModelViewSet
-from django.db import ProgrammingError
+from core.bulk import BulkActionsMixin
+from django.db import IntegrityError, ProgrammingError, transaction
+from django.contrib.auth.hashers import make_password
+from core.idempotency import idempotent
+from .rollnumbers import DEFAULT_PATTERN, RollNumberError, generate_roll_numbers, save_roll_numbers
+from .admissions import AllocationError, run_round
+from django.utils.dateparse import parse_date
+from .attendance import (
+    AttendanceError, absentees, class_report, default_threshold, delete_session, find_roster, mark, shortage,
+    student_report
+)
+from .promotion import PromotionError, get_progress, promote
 
 
 logger = logging.getLogger(__name__)
@@ -56,6 +68,7 @@ class StudentMasterViewSet(viewsets.ModelViewSet):
      return queryset
 
 
+    @idempotent
     def create(self, request, *args, **kwargs):
         try:
             print("=== Student Creation Debug ===")
@@ -105,94 +118,72 @@ class StudentMasterViewSet(viewsets.ModelViewSet):
             except YEAR.DoesNotExist:
                 return Response({'status': 'error', 'message': 'Invalid YEAR_ID'}, status=status.HTTP_400_BAD_REQUEST)
 
-             
+            # The academic record stores the category as an id; reject bad input
+            # up front instead of failing halfway through the transaction
+            try:
+                category_id = int(data.get('ADMISSION_CATEGORY'))
+            except (TypeError, ValueError):
+                return Response({
+                    'status': 'error',
+                    'message': 'ADMISSION_CATEGORY must be a category id'
+                }, status=status.HTTP_400_BAD_REQUEST)
 
             serializer = self.get_serializer(data=data)
-            student = None
-            if serializer.is_valid():
-                student = serializer.save()
-                
-                # Save student details record linking to the created student
-                STUDENT_DETAILS.objects.create(STUDENT=student)
-                
-                # Also save entry in STUDENT_ACADEMIC_RECORD table if available
-                try:
-                    STUDENT_ACADEMIC_RECORD.objects.create(
-                        STUDENT_ID=student.STUDENT_ID,
-                        INSTITUTE_ID=student.INSTITUTE,
-                        CATEGORY=int(student.ADMISSION_CATEGORY),
-                        BATCH=student.BATCH,
-                        ACADEMIC_YEAR=student.ACADEMIC_YEAR,
-                        CLASS_YEAR=student.YEAR_SEM_ID,
-                        ADMISSION_DATE=student.ADMISSION_DATE,
-                        FORM_NO=student.FORM_NO,
-                        QUOTA_ID=student.ADMN_QUOTA_ID,
-                        STATUS=student.STATUS,
-                        FEE_CATEGORY_ID=int(student.ADMISSION_CATEGORY),
-                    )
-                except Exception as acad_err:
-                    logger.exception("Failed to create STUDENT_ACADEMIC_RECORD; continuing without it: %s", acad_err)
-                
-                # Create user account with password same as student_id
-            else:
+            if not serializer.is_valid():
                 return Response({'status': 'error', 'errors': serializer.errors}, status=status.HTTP_400_BAD_REQUEST)
 
-            try:
-                if student is None:
-                    raise Exception("Student record was not created; aborting user creation")
+            email = request.data.get('EMAIL_ID')
+            username = email.split('@')[0]
+
+            # Student, details, academic record and login are created as one
+            # unit: any failure rolls everything back, and the credentials mail
+            # only goes out once the rows are committed.
+            with transaction.atomic():
+                # Pass the branch we already loaded so STUDENT_ID generation
+                # doesn't fetch it (and its program) again
+                student = serializer.save(BRANCH_ID=branch)
+
+                STUDENT_DETAILS.objects.create(STUDENT=student)
 
-                username = request.data.get('EMAIL_ID').split('@')[0]
-                password = student.STUDENT_ID  # Use student_id as password
+                STUDENT_ACADEMIC_RECORD.objects.create(
+                    STUDENT_ID=student.STUDENT_ID,
+                    INSTITUTE_ID=student.INSTITUTE,
+                    CATEGORY=category_id,
+                    BATCH=student.BATCH,
+                    ACADEMIC_YEAR=student.ACADEMIC_YEAR,
+                    CLASS_YEAR=student.YEAR_SEM_ID,
+                    ADMISSION_DATE=student.ADMISSION_DATE,
+                    FORM_NO=student.FORM_NO,
+                    QUOTA_ID=student.ADMN_QUOTA_ID,
+                    STATUS=student.STATUS,
+                    FEE_CATEGORY_ID=category_id,
+                    CREATED_BY=student.CREATED_BY,
+                    UPDATED_BY=student.UPDATED_BY,
+                )
 
-                user = CustomUser.objects.create(
+                # Create user account with password same as student_id,
+                # hashed before the insert so the row is written once
+                password = student.STUDENT_ID
+                user = CustomUser(
                     USER_ID=student.STUDENT_ID,
                     USERNAME=username,
-                    EMAIL=request.data.get('EMAIL_ID'),
+                    EMAIL=email,
                     IS_ACTIVE=True,
                     IS_STAFF=False,
                     IS_SUPERUSER=False,
                     DESIGNATION=None,  # Students typically don't have a designation
-                    FIRST_NAME=request.data.get('NAME')
+                    FIRST_NAME=request.data.get('NAME'),
+                    PASSWORD=make_password(password),
+                    PASSWORD_CHANGED_AT=timezone.now(),
                 )
-                user.set_password(password)
-                user.save()
-
-                print(f"User created with ID: {user.USER_ID}")
+                user.save(force_insert=True)
+                PASSWORD_HISTORY.objects.create(USER=user, PASSWORD=user.PASSWORD)
 
-                # Send welcome email (optional)
-                email_subject = "Your Student Account Credentials"
-                email_message = f"""
-                Dear {request.data.get('NAME')},
+                transaction.on_commit(lambda: self._send_credentials_email(
+                    request.data.get('NAME'), user.EMAIL, student.STUDENT_ID, username, password
+                ))
 
-                Your student account has been created. Here are your login credentials:
-
-                Student ID: {student.STUDENT_ID}
-                Username: {username}
-                Password: {password}
-
-                Please change your password after first login.
-
-                Best regards,
-                College ERP Team
-                """
-
-                send_mail(
-                    email_subject,
-                    email_message,
-                    settings.EMAIL_HOST_USER,
-                    [user.EMAIL],
-                    fail_silently=False,
-                )
-
-            except Exception as user_error:
-                # Rollback student creation if user creation fails (only if student exists)
-                if student is not None:
-                    try:
-                        student.delete()
-                    except Exception:
-                        logger.exception("Failed to delete student during rollback")
-                print(f"User creation failed: {str(user_error)}")
-                raise
+            print(f"User created with ID: {user.USER_ID}")
 
             return Response({
                 'status': 'success',
@@ -201,6 +192,12 @@ class StudentMasterViewSet(viewsets.ModelViewSet):
             }, status=status.HTTP_201_CREATED)
             
             
+        except IntegrityError as e:
+            logger.error(f"Error creating student: {str(e)}", exc_info=True)
+            return Response({
+                'status': 'error',
+                'message': 'A student or user account with these details already exists'
+            }, status=status.HTTP_400_BAD_REQUEST)
         except Exception as e:
             logger.error(f"Error creating student: {str(e)}", exc_info=True)
             return Response({
@@ -208,6 +205,34 @@ class StudentMasterViewSet(viewsets.ModelViewSet):
             'message': str(e)
         }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+    def _send_credentials_email(self, name, email, student_id, username, password):
+        """Runs after the student is committed; a mail failure no longer undoes the admission."""
+        email_subject = "Your Student Account Credentials"
+        email_message = f"""
+                Dear {name},
+
+                Your student account has been created. Here are your login credentials:
+
+                Student ID: {student_id}
+                Username: {username}
+                Password: {password}
+
+                Please change your password after first login.
+
+                Best regards,
+                College ERP Team
+                """
+        try:
+            send_mail(
+                email_subject,
+                email_message,
+                settings.EMAIL_HOST_USER,
+                [email],
+                fail_silently=False,
+            )
+        except Exception as e:
+            logger.error("Failed to send credentials email to %s: %s", email, e)
+
     def list(self, request, *args, **kwargs):
         try:
             branch_id = request.query_params.get('branch_id')
@@ -288,11 +313,32 @@ class StudentRollNumberDetailsViewSet(viewsets.ModelViewSet):
             return Response({"status": "success", "data": []}, status=status.HTTP_200_OK)
 
     def create(self, request, *args, **kwargs):
-        serializer = self.get_serializer(data=request.data, many=True)
-        if serializer.is_valid():
-            serializer.save()
-            return Response({"status": "success", "data": serializer.data}, status=status.HTTP_201_CREATED)
-        return Response({"status": "error", "errors": serializer.errors}, status=status.HTTP_400_BAD_REQUEST)
+        records = request.data if isinstance(request.data, list) else [request.data]
+        if not records or not all(isinstance(record, dict) for record in records):
+            return Response({"status": "error", "message": "Expected a list of roll number records"},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        user = request.user
+        username = getattr(user, 'USERNAME', None) or getattr(user, 'username', None) or 'SYSTEM'
+        try:
+            keys, errors = save_roll_numbers(records, username=username)
+        except RollNumberError as e:
+            return Response({"status": "error", "message": str(e)}, status=status.HTTP_409_CONFLICT)
+        if any(errors):
+            return Response({"status": "error", "errors": errors}, status=status.HTTP_400_BAD_REQUEST)
+
+        # One query to return the saved rows with their ids
+        wanted = set(keys)
+        saved = [
+            row for row in STUDENT_ROLL_NUMBER_DETAILS.objects.select_related('STUDENT').filter(
+                STUDENT_id__in={key[0] for key in keys},
+                SEMESTER_id__in={key[1] for key in keys},
+                ACADEMIC_YEAR__in={key[2] for key in keys},
+            )
+            if (row.STUDENT_id, row.SEMESTER_id, row.ACADEMIC_YEAR) in wanted
+        ]
+        serializer = self.get_serializer(saved, many=True)
+        return Response({"status": "success", "data": serializer.data}, status=status.HTTP_201_CREATED)
 
     def update(self, request, *args, **kwargs):
         instance = self.get_object()
@@ -302,6 +348,67 @@ class StudentRollNumberDetailsViewSet(viewsets.ModelViewSet):
             return Response({"status": "success", "data": serializer.data}, status=status.HTTP_200_OK)
         return Response({"status": "error", "errors": serializer.errors}, status=status.HTTP_400_BAD_REQUEST)
 
+    @action(detail=False, methods=['post'])
+    def generate(self, request):
+        """
+        Generate roll numbers server-side for one class.
+        Body: INSTITUTE, BRANCH, YEAR, SEMESTER (ids), ACADEMIC_YEAR, and
+        optionally order_by (name|merit|id), pattern, mode (append|full),
+        scores ({STUDENT_ID: merit}) and dry_run.
+        """
+        data = request.data
+        missing = [
+            field for field in ('INSTITUTE', 'BRANCH', 'YEAR', 'SEMESTER', 'ACADEMIC_YEAR')
+            if not data.get(field)
+        ]
+        if missing:
+            return Response({
+                "status": "error",
+                "message": f"Missing required fields: {', '.join(missing)}"
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            institute = INSTITUTE.objects.get(pk=data['INSTITUTE'])
+            branch = BRANCH.objects.get(pk=data['BRANCH'])
+            year = YEAR.objects.get(pk=data['YEAR'])
+            semester = SEMESTER.objects.get(pk=data['SEMESTER'])
+        except (INSTITUTE.DoesNotExist, BRANCH.DoesNotExist, YEAR.DoesNotExist,
+                SEMESTER.DoesNotExist, ValueError):
+            return Response({
+                "status": "error",
+                "message": "Invalid INSTITUTE, BRANCH, YEAR or SEMESTER"
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        scores = data.get('scores')
+        if scores is not None and not isinstance(scores, dict):
+            return Response({
+                "status": "error",
+                "message": "scores must map STUDENT_ID to a merit score"
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        user = request.user
+        username = getattr(user, 'USERNAME', None) or getattr(user, 'username', None) or 'SYSTEM'
+        dry_run = str(data.get('dry_run', '')).lower() in ('1', 'true', 'yes')
+
+        try:
+            summary = generate_roll_numbers(
+                institute, branch, year, semester, str(data['ACADEMIC_YEAR']),
+                order_by=data.get('order_by', 'name'),
+                pattern=data.get('pattern') or DEFAULT_PATTERN,
+                mode=data.get('mode', 'append'),
+                scores=scores,
+                username=username,
+                dry_run=dry_run,
+            )
+        except RollNumberError as e:
+            return Response({"status": "error", "message": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response({
+            "status": "success",
+            "message": "Roll numbers previewed" if dry_run else "Roll numbers generated",
+            "data": summary
+        }, status=status.HTTP_200_OK)
+
 #     @action(detail=False, methods=['get'])
 #     def get_students_with_roll_numbers(self, request):
 #         branch_id = request.query_params.get('branch_id')
@@ -352,15 +459,19 @@ class StudentRollNumberDetailsViewSet(viewsets.ModelViewSet):
 #         return Response(serializer.data, status=status.HTTP_201_CREATED)
 #     return Response({"detail": "Invalid request"}, status=status.HTTP_400_BAD_REQUEST)
 
-class CheckListDocumentsViewSet(BaseModelViewSet):
+class CheckListDocumentsViewSet(BulkActionsMixin, BaseModelViewSet):
      queryset = CHECK_LIST_DOCUMENTS.objects.all()   
      serializer_class = CheckListDoumentsSerializer
 
 from rest_framework import status
 from rest_framework.response import Response
 from rest_framework.viewsets import ModelViewSet
-from .models import STUDENT_DOCUMENTS
+from .models import DOCUMENT_UPLOAD, STUDENT_DOCUMENTS
 from .serializers import StudentDocumentsSerializer
+from .uploads import UploadError, append_chunk, cancel_upload, start_upload
+from .archive import ArchiveTooLarge, DocumentArchive, documents_for, parse_range
+from .matrix import cached_matrix, invalidate_students
+from django.http import HttpResponse, StreamingHttpResponse
 
 class StudentDocumentsViewSet(ModelViewSet):  # or BaseModelViewSet if customized
     queryset = STUDENT_DOCUMENTS.objects.all()
@@ -388,6 +499,407 @@ class StudentDocumentsViewSet(ModelViewSet):  # or BaseModelViewSet if customize
         kwargs['partial'] = True  # ALLOWS partial updates via PATCH
         return super().update(request, *args, **kwargs)
 
+    @action(detail=True, methods=['post'], url_path='uploads', permission_classes=[IsAuthenticated])
+    def start_upload(self, request, pk=None):
+        """Open a resumable upload for this document's DOC_IMAGES (see student/uploads.py)."""
+        document = self.get_object()
+        try:
+            upload = start_upload(
+                document,
+                request.data.get('filename'),
+                request.data.get('size'),
+                sha256=request.data.get('sha256'),
+                username=self._username(request),
+            )
+        except UploadError as e:
+            return Response({'status': 'error', 'message': e.message}, status=e.status_code)
+
+        response = Response({
+            'status': 'success',
+            'data': self._upload_state(upload)
+        }, status=status.HTTP_201_CREATED)
+        response['Upload-Offset'] = '0'
+        response['Location'] = f"{request.path.rstrip('/').rsplit('/', 2)[0]}/uploads/{upload.pk}/"
+        return response
+
+    @action(detail=False, methods=['get', 'head', 'put', 'delete'],
+            url_path=r'uploads/(?P<upload_id>[0-9a-fA-F-]{36})', permission_classes=[IsAuthenticated])
+    def upload(self, request, upload_id=None):
+        """HEAD/GET: current offset; PUT: append a chunk; DELETE: cancel."""
+        if request.method == 'PUT':
+            try:
+                upload = append_chunk(
+                    upload_id,
+                    request.headers.get('Upload-Offset'),
+                    request.stream,
+                    request.headers.get('Content-Length'),
+                    checksum_header=request.headers.get('Upload-Checksum'),
+                    username=self._username(request),
+                )
+            except UploadError as e:
+                response = Response({'status': 'error', 'message': e.message}, status=e.status_code)
+                if e.upload is not None:
+                    response['Upload-Offset'] = str(e.upload.RECEIVED)
+                return response
+        else:
+            upload = DOCUMENT_UPLOAD.objects.filter(UPLOAD_ID=upload_id).first()
+            if upload is None:
+                return Response({'status': 'error', 'message': 'Upload not found'},
+                                status=status.HTTP_404_NOT_FOUND)
+            if request.method == 'DELETE':
+                cancel_upload(upload)
+                return Response(status=status.HTTP_204_NO_CONTENT)
+
+        response = Response({'status': 'success', 'data': self._upload_state(upload)})
+        response['Upload-Offset'] = str(upload.RECEIVED)
+        response['Upload-Length'] = str(upload.TOTAL_SIZE)
+        response['Cache-Control'] = 'no-store'
+        return response
+
+    @action(detail=False, methods=['get'], url_path='archive', permission_classes=[IsAuthenticated])
+    def archive(self, request):
+        """
+        Stream a ZIP of the documents of one student (?student=<STUDENT_ID>)
+        or of a branch/batch (?branch=<id>&batch=<yyyy>[&academic_year=]),
+        with a manifest.csv. Single byte ranges are honoured for resuming.
+        """
+        params = request.query_params
+        students = STUDENT_MASTER.objects.filter(IS_DELETED=False)
+        if params.get('student'):
+            students = students.filter(STUDENT_ID=params['student'])
+            label = params['student']
+        elif params.get('branch') and params.get('batch'):
+            students = students.filter(BRANCH_ID=params['branch'], BATCH=params['batch'])
+            if params.get('academic_year'):
+                students = students.filter(ACADEMIC_YEAR=params['academic_year'])
+            label = f"branch{params['branch']}_{params['batch']}"
+        else:
+            return Response({
+                'status': 'error',
+                'message': 'Pass student, or branch and batch'
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        students = list(students.order_by('STUDENT_ID'))
+        if not students:
+            return Response({'status': 'error', 'message': 'No students found'},
+                            status=status.HTTP_404_NOT_FOUND)
+
+        try:
+            archive = DocumentArchive(students, documents_for(students))
+        except ArchiveTooLarge as e:
+            return Response({'status': 'error', 'message': str(e)},
+                            status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+
+        byte_range = None
+        if_range = request.headers.get('If-Range')
+        if not if_range or if_range == archive.etag:
+            byte_range = parse_range(request.headers.get('Range'), archive.length)
+        if byte_range is False:
+            response = HttpResponse(status=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE)
+            response['Content-Range'] = f'bytes */{archive.length}'
+            return response
+
+        if byte_range:
+            start, end = byte_range
+            response = StreamingHttpResponse(archive.stream(start, end), content_type='application/zip',
+                                             status=status.HTTP_206_PARTIAL_CONTENT)
+            response['Content-Range'] = f'bytes {start}-{end}/{archive.length}'
+            response['Content-Length'] = str(end - start + 1)
+        else:
+            response = StreamingHttpResponse(archive.stream(), content_type='application/zip')
+            response['Content-Length'] = str(archive.length)
+        response['Content-Disposition'] = f'attachment; filename="documents_{label}.zip"'
+        response['Accept-Ranges'] = 'bytes'
+        response['ETag'] = archive.etag
+        return response
+
+    @action(detail=False, methods=['get'], url_path='matrix', permission_classes=[IsAuthenticated])
+    def matrix(self, request):
+        """
+        Student x checklist document status grid for ?branch=&batch=
+        [&academic_year=]; mandatory documents only unless all=1.
+        """
+        params = request.query_params
+        if not params.get('branch') or not params.get('batch'):
+            return Response({
+                'status': 'error',
+                'message': 'branch and batch are required'
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        matrix = cached_matrix(
+            params['branch'],
+            params['batch'],
+            academic_year=params.get('academic_year'),
+            mandatory_only=params.get('all') not in ('1', 'true', 'yes'),
+        )
+        return Response({
+            'status': 'success',
+            'data': matrix
+        })
+
+    def _upload_state(self, upload):
+        data = {
+            'upload_id': str(upload.pk),
+            'document': upload.DOCUMENT_id,
+            'filename': upload.FILENAME,
+            'size': upload.TOTAL_SIZE,
+            'offset': upload.RECEIVED,
+            'status': upload.STATUS,
+            'expires_at': upload.EXPIRES_AT,
+        }
+        if upload.STATUS == DOCUMENT_UPLOAD.STATUS_COMPLETED:
+            data['DOC_IMAGES'] = upload.DOCUMENT.DOC_IMAGES.url if upload.DOCUMENT.DOC_IMAGES else None
+        return data
+
+    def _username(self, request):
+        user = request.user
+        if user and user.is_authenticated:
+            return getattr(user, 'USERNAME', None) or getattr(user, 'username', None)
+        return 'SYSTEM'
+
+class SeatMatrixViewSet(BaseModelViewSet):
+    queryset = SEAT_MATRIX.objects.select_related('BRANCH')
+    serializer_class = SeatMatrixSerializer
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        academic_year = self.request.query_params.get('academic_year')
+        if academic_year:
+            queryset = queryset.filter(ACADEMIC_YEAR=academic_year)
+        return queryset.order_by('BRANCH_id', 'RECORD_ID')
+
+
+class SeatAllocationViewSet(BaseModelViewSet):
+    """
+    Round results of the seat allocation (student/admissions.py). The desk
+    records FLOAT / FREEZE / WITHDRAWN per allotment (singly or through
+    bulk/), then POST run/ allocates the next round.
+    """
+    queryset = SEAT_ALLOCATION.objects.select_related('STUDENT', 'SEAT')
+    serializer_class = SeatAllocationSerializer
+    http_method_names = ['get', 'post', 'patch', 'head', 'options']
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        params = self.request.query_params
+        if params.get('academic_year'):
+            queryset = queryset.filter(ACADEMIC_YEAR=params['academic_year'])
+        if params.get('round'):
+            queryset = queryset.filter(ROUND_NO=params['round'])
+        if params.get('branch'):
+            queryset = queryset.filter(BRANCH_id=params['branch'])
+        if params.get('status'):
+            queryset = queryset.filter(STATUS=params['status'].upper())
+        return queryset.order_by('ROUND_NO', 'MERIT_RANK')
+
+    def create(self, request, *args, **kwargs):
+        return Response({
+            'status': 'error',
+            'message': 'Allocations are produced by run/'
+        }, status=status.HTTP_405_METHOD_NOT_ALLOWED)
+
+    @action(detail=False, methods=['post'])
+    def run(self, request):
+        """{"academic_year": "2025-26", "round": 1, "dry_run": false}"""
+        academic_year = request.data.get('academic_year')
+        try:
+            round_no = int(request.data.get('round', 1))
+        except (TypeError, ValueError):
+            round_no = 0
+        if not academic_year:
+            return Response({
+                'status': 'error',
+                'message': 'academic_year is required'
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        user = request.user
+        username = getattr(user, 'USERNAME', None) or getattr(user, 'username', None) or 'SYSTEM'
+        try:
+            summary = run_round(academic_year, round_no, username=username,
+                                dry_run=bool(request.data.get('dry_run')))
+        except AllocationError as e:
+            return Response({'status': 'error', 'message': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response({
+            'status': 'success',
+            'message': f"Round {round_no}: {summary['allotted']} of {summary['applicants']} applicants allotted",
+            'data': summary
+        })
+
+
+class AttendanceSessionViewSet(BaseModelViewSet):
+    """
+    Attendance sessions (student/attendance.py). POST mark/ records a whole
+    class for one or more sessions; report/ and student/ give held, attended
+    and percentage per student of a class or per course of a student, and
+    shortage/ lists who is below the threshold from the running summaries.
+    """
+    queryset = ATTENDANCE_SESSION.objects.select_related('ROSTER')
+    serializer_class = AttendanceSessionSerializer
+    http_method_names = ['get', 'post', 'delete', 'head', 'options']
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        params = self.request.query_params
+        if params.get('roster'):
+            queryset = queryset.filter(ROSTER_id=params['roster'])
+        if params.get('curriculum'):
+            queryset = queryset.filter(ROSTER__CURRICULUM_id=params['curriculum'])
+        if params.get('semester'):
+            queryset = queryset.filter(ROSTER__SEMESTER_id=params['semester'])
+        if params.get('date_from'):
+            queryset = queryset.filter(SESSION_DATE__gte=params['date_from'])
+        if params.get('date_to'):
+            queryset = queryset.filter(SESSION_DATE__lte=params['date_to'])
+        return queryset.order_by('SESSION_DATE', 'PERIOD')
+
+    def create(self, request, *args, **kwargs):
+        return Response({
+            'status': 'error',
+            'message': 'Sessions are recorded through mark/'
+        }, status=status.HTTP_405_METHOD_NOT_ALLOWED)
+
+    def retrieve(self, request, *args, **kwargs):
+        session = self.get_object()
+        data = self.get_serializer(session).data
+        data['ABSENT'] = absentees(session)
+        return Response(data)
+
+    def destroy(self, request, *args, **kwargs):
+        user = request.user
+        username = getattr(user, 'USERNAME', None) or getattr(user, 'username', None) or 'SYSTEM'
+        # Goes through attendance.py so the summaries lose the session too
+        delete_session(self.get_object(), username=username)
+        return Response({"message": "Record deleted successfully!"}, status=status.HTTP_204_NO_CONTENT)
+
+    @action(detail=False, methods=['post'])
+    def mark(self, request):
+        user = request.user
+        username = getattr(user, 'USERNAME', None) or getattr(user, 'username', None) or 'SYSTEM'
+        try:
+            summary = mark(request.data, username=username, dry_run=bool(request.data.get('dry_run')))
+        except AttendanceError as e:
+            return Response({
+                'status': 'error',
+                'message': e.message,
+                'errors': e.errors
+            }, status=status.HTTP_400_BAD_REQUEST)
+        return Response({
+            'status': 'success',
+            'message': f"{summary['written']} sessions recorded for {summary['students']} students",
+            'data': summary
+        })
+
+    @staticmethod
+    def _period(params):
+        bounds = []
+        for name in ('date_from', 'date_to'):
+            bound = parse_date(params.get(name) or '')
+            if params.get(name) and bound is None:
+                raise AttendanceError(f'{name} must be YYYY-MM-DD')
+            bounds.append(bound)
+        return bounds
+
+    @action(detail=False, methods=['get'])
+    def report(self, request):
+        """?curriculum=31&semester=5[&academic_year=2025-26][&date_from=&date_to=]"""
+        params = request.query_params
+        if not params.get('curriculum') or not params.get('semester'):
+            return Response({
+                'status': 'error',
+                'message': 'curriculum and semester are required'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            date_from, date_to = self._period(params)
+            roster = find_roster(params['curriculum'], params['semester'], params.get('academic_year'))
+        except AttendanceError as e:
+            return Response({'status': 'error', 'message': e.message}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({
+            'status': 'success',
+            'data': class_report(roster, date_from, date_to)
+        })
+
+    @action(detail=False, methods=['get'])
+    def shortage(self, request):
+        """?branch=3&semester=5[&threshold=75][&academic_year=2025-26][&curriculum=31]"""
+        params = request.query_params
+        if not str(params.get('branch') or '').isdigit() or not str(params.get('semester') or '').isdigit():
+            return Response({
+                'status': 'error',
+                'message': 'branch and semester are required'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            threshold = float(params.get('threshold', default_threshold()))
+        except (TypeError, ValueError):
+            threshold = -1
+        if not 0 <= threshold <= 100:
+            return Response({
+                'status': 'error',
+                'message': 'threshold must be a percentage between 0 and 100'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        return Response({
+            'status': 'success',
+            'data': shortage(params['branch'], params['semester'], threshold,
+                             params.get('academic_year'), params.get('curriculum'))
+        })
+
+    @action(detail=False, methods=['get'])
+    def student(self, request):
+        """?student=<STUDENT_MASTER RECORD_ID>[&date_from=&date_to=]"""
+        params = request.query_params
+        student = params.get('student')
+        if not student or not student.isdigit():
+            return Response({
+                'status': 'error',
+                'message': 'student is required'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            date_from, date_to = self._period(params)
+        except AttendanceError as e:
+            return Response({'status': 'error', 'message': e.message}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({
+            'status': 'success',
+            'data': student_report(int(student), date_from, date_to)
+        })
+
+class PromotionView(APIView):
+    """
+    Year-end promotion (student/promotion.py). POST previews a job's
+    outcomes, and only writes them with "apply": true; GET ?job=<id> returns
+    the progress of a job that is running or finished within the last day.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        job = request.query_params.get('job')
+        progress = get_progress(job) if job else None
+        if progress is None:
+            return Response({
+                'status': 'error',
+                'message': 'Unknown promotion job'
+            }, status=status.HTTP_404_NOT_FOUND)
+        return Response({'status': 'success', 'data': progress})
+
+    def post(self, request):
+        data = request.data
+        user = request.user
+        username = getattr(user, 'USERNAME', None) or getattr(user, 'username', None) or 'SYSTEM'
+        apply = str(data.get('apply', '')).lower() in ('1', 'true', 'yes')
+        detail = str(data.get('detail', '')).lower() in ('1', 'true', 'yes')
+        try:
+            report = promote(data, username=username, dry_run=not apply, job=data.get('job'), detail=detail)
+        except PromotionError as e:
+            return Response({
+                'status': 'error',
+                'message': e.message,
+                'errors': e.errors
+            }, status=status.HTTP_400_BAD_REQUEST)
+        return Response({
+            'status': 'success',
+            'message': 'Students promoted' if apply else 'Promotion previewed',
+            'data': report
+        })
+
 # ---------------------------------------------------- # 
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
@@ -403,8 +915,10 @@ def return_documents(request):
         return Response({'error': 'Invalid data'}, status=status.HTTP_400_BAD_REQUEST)
 
     STUDENT_DOCUMENTS.objects.filter(
-        STUDENT_ID=student_id,
+        STUDENT_id=student_id,
         DOCUMENT_ID__in=document_ids
     ).update(RETURN='Y')
+    # update() skips the save signals that keep the checklist matrix fresh
+    invalidate_students([student_id])
 
     return Response({'message': 'Documents marked as returned'})
@@ -1,4 +1,4 @@
-from django.core.mail import send_mail
+from django.core.mail import EmailMessage, get_connection, send_mail
 from django.conf import settings
 
 def send_credentials_email(email, employee_id, username, password):
@@ -31,3 +31,44 @@ def send_credentials_email(email, employee_id, username, password):
     except Exception as e:
         print(f"Error sending email: {str(e)}")
         return False
+
+
+def send_credentials_emails(entries):
+    """
+    Send credential mails for many accounts over a single SMTP connection.
+    entries: iterable of dicts with email, user_id, username and password keys.
+    Returns the number of messages the backend accepted.
+    """
+    messages = []
+    for entry in entries:
+        message = f"""
+    Welcome to College ERP!
+
+    Your account has been created with the following credentials:
+
+    User ID: {entry['user_id']}
+    Username: {entry['username']}
+    Password: {entry['password']}
+
+    Please login at: {settings.FRONTEND_URL}/login
+    
+    For security reasons, please change your password after first login.
+
+    Note: This is a system generated email. Please do not reply.
+    """
+        messages.append(EmailMessage(
+            subject='Your College ERP Account Credentials',
+            body=message,
+            from_email=settings.EMAIL_HOST_USER,
+            to=[entry['email']],
+        ))
+
+    if not messages:
+        return 0
+
+    try:
+        connection = get_connection(fail_silently=False)
+        return connection.send_messages(messages) or 0
+    except Exception as e:
+        print(f"Error sending credential emails: {str(e)}")
+        return 0